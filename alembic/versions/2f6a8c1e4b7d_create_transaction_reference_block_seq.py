@@ -0,0 +1,29 @@
+"""create transaction_reference_block_seq
+
+Revision ID: 2f6a8c1e4b7d
+Revises: 9c4e2a7b3d1f
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "2f6a8c1e4b7d"
+down_revision: Union[str, Sequence[str], None] = "9c4e2a7b3d1f"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create the sequence that hands out transaction reference blocks."""
+    op.execute(sa.schema.CreateSequence(sa.Sequence("transaction_reference_block_seq")))
+
+
+def downgrade() -> None:
+    """Drop the reference block sequence."""
+    op.execute(sa.schema.DropSequence(sa.Sequence("transaction_reference_block_seq")))
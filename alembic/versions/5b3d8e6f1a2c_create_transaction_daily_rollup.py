@@ -0,0 +1,76 @@
+"""create transaction_daily_rollup table
+
+Revision ID: 5b3d8e6f1a2c
+Revises: e7a1c9d2b4f8
+Create Date: 2026-10-16 10:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "5b3d8e6f1a2c"
+down_revision: Union[str, Sequence[str], None] = "e7a1c9d2b4f8"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create the daily rollup table and backfill it from CONFIRMED transactions."""
+    op.create_table(
+        "transaction_daily_rollup",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("year", sa.Integer(), nullable=False),
+        sa.Column("month", sa.Integer(), nullable=False),
+        sa.Column("iso_year", sa.Integer(), nullable=False),
+        sa.Column("iso_week", sa.Integer(), nullable=False),
+        sa.Column("type", sa.String(length=10), nullable=False),
+        sa.Column("payment_method", sa.String(length=50), nullable=False),
+        sa.Column("total_amount", sa.Numeric(14, 2), nullable=False, server_default="0"),
+        sa.Column("transaction_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        sa.UniqueConstraint("day", "type", "payment_method", name="uq_transaction_daily_rollup_bucket"),
+    )
+    op.create_index("ix_transaction_daily_rollup_year_month", "transaction_daily_rollup", ["year", "month"])
+    op.create_index("ix_transaction_daily_rollup_iso_week", "transaction_daily_rollup", ["iso_year", "iso_week"])
+
+    # Week/month/year metrics are summed from these buckets, so they must start complete
+    op.execute(
+        """
+        INSERT INTO transaction_daily_rollup
+            (day, year, month, iso_year, iso_week, type, payment_method, total_amount, transaction_count)
+        SELECT
+            d.day,
+            EXTRACT(YEAR FROM d.day)::int,
+            EXTRACT(MONTH FROM d.day)::int,
+            EXTRACT(ISOYEAR FROM d.day)::int,
+            EXTRACT(WEEK FROM d.day)::int,
+            d.type,
+            d.payment_method,
+            d.total_amount,
+            d.transaction_count
+        FROM (
+            SELECT
+                (date AT TIME ZONE 'UTC')::date AS day,
+                type,
+                payment_method,
+                COALESCE(SUM(amount), 0) AS total_amount,
+                COUNT(*) AS transaction_count
+            FROM transaction
+            WHERE status = 'CONFIRMED' AND type IS NOT NULL
+            GROUP BY 1, 2, 3
+        ) AS d
+        """,
+    )
+
+
+def downgrade() -> None:
+    """Drop the transaction_daily_rollup table."""
+    op.drop_index("ix_transaction_daily_rollup_iso_week", table_name="transaction_daily_rollup")
+    op.drop_index("ix_transaction_daily_rollup_year_month", table_name="transaction_daily_rollup")
+    op.drop_table("transaction_daily_rollup")
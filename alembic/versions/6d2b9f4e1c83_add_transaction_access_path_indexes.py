@@ -0,0 +1,57 @@
+"""add transaction access path indexes
+
+Revision ID: 6d2b9f4e1c83
+Revises: 2f6a8c1e4b7d
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "6d2b9f4e1c83"
+down_revision: Union[str, Sequence[str], None] = "2f6a8c1e4b7d"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = ("ix_transaction_confirmed_date", "ix_transaction_status_date", "ix_transaction_status_amount")
+
+
+def upgrade() -> None:
+    """Add the partial covering index for the rollups and the status indexes for the listings.
+
+    The indexes are built concurrently on PostgreSQL so the transaction table stays writable.
+    """
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_transaction_confirmed_date",
+            "transaction",
+            ["date"],
+            postgresql_include=["type", "payment_method", "amount"],
+            postgresql_where=sa.text("status = 'CONFIRMED'"),
+            sqlite_where=sa.text("status = 'CONFIRMED'"),
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_transaction_status_date",
+            "transaction",
+            ["status", "date", "reference"],
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_transaction_status_amount",
+            "transaction",
+            ["status", "amount", "reference"],
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Drop the transaction access path indexes."""
+    with op.get_context().autocommit_block():
+        for name in INDEXES:
+            op.drop_index(name, table_name="transaction", postgresql_concurrently=True)
@@ -0,0 +1,123 @@
+"""add category to daily rollups and category_breakdown to transaction_metrics
+
+Revision ID: 8e5a3c7f2d91
+Revises: 6d2b9f4e1c83
+Create Date: 2026-10-17 15:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "8e5a3c7f2d91"
+down_revision: Union[str, Sequence[str], None] = "6d2b9f4e1c83"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BACKFILL_SQL = """
+INSERT INTO transaction_daily_rollup
+    (day, year, month, iso_year, iso_week, type, payment_method, category, total_amount, transaction_count)
+SELECT
+    d.day,
+    EXTRACT(YEAR FROM d.day)::int,
+    EXTRACT(MONTH FROM d.day)::int,
+    EXTRACT(ISOYEAR FROM d.day)::int,
+    EXTRACT(WEEK FROM d.day)::int,
+    d.type,
+    d.payment_method,
+    d.category,
+    d.total_amount,
+    d.transaction_count
+FROM (
+    SELECT
+        (date AT TIME ZONE 'UTC')::date AS day,
+        type,
+        payment_method,
+        COALESCE(category, 'uncategorized') AS category,
+        COALESCE(SUM(amount), 0) AS total_amount,
+        COUNT(*) AS transaction_count
+    FROM transaction
+    WHERE status = 'CONFIRMED' AND type IS NOT NULL
+    GROUP BY 1, 2, 3, 4
+) AS d
+"""
+
+MERGE_CATEGORIES_SQL = """
+INSERT INTO transaction_daily_rollup
+    (day, year, month, iso_year, iso_week, type, payment_method, total_amount, transaction_count)
+SELECT day, year, month, iso_year, iso_week, type, payment_method, SUM(total_amount), SUM(transaction_count)
+FROM transaction_daily_rollup_by_category
+GROUP BY day, year, month, iso_year, iso_week, type, payment_method
+"""
+
+
+def _recreate_confirmed_date_index(include: list[str]) -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index("ix_transaction_confirmed_date", table_name="transaction", postgresql_concurrently=True)
+        op.create_index(
+            "ix_transaction_confirmed_date",
+            "transaction",
+            ["date"],
+            postgresql_include=include,
+            postgresql_where=sa.text("status = 'CONFIRMED'"),
+            sqlite_where=sa.text("status = 'CONFIRMED'"),
+            postgresql_concurrently=True,
+        )
+
+
+def upgrade() -> None:
+    """Bucket the daily rollups by category and store a per-category breakdown on every period.
+
+    The stored periods keep an empty breakdown until `python -m app.database.rebuild_metrics` runs.
+    """
+    op.add_column(
+        "transaction_daily_rollup",
+        sa.Column("category", sa.String(length=100), nullable=False, server_default="uncategorized"),
+    )
+    op.alter_column("transaction_daily_rollup", "category", server_default=None)
+    op.drop_constraint("uq_transaction_daily_rollup_bucket", "transaction_daily_rollup", type_="unique")
+    op.create_unique_constraint(
+        "uq_transaction_daily_rollup_bucket",
+        "transaction_daily_rollup",
+        ["day", "type", "payment_method", "category"],
+    )
+    # The existing buckets span several categories, so they are re-aggregated from the transactions
+    op.execute("DELETE FROM transaction_daily_rollup")
+    op.execute(BACKFILL_SQL)
+
+    op.add_column(
+        "transaction_metrics",
+        sa.Column(
+            "category_breakdown",
+            postgresql.JSONB(astext_type=sa.Text()),
+            nullable=False,
+            server_default=sa.text("'{}'"),
+        ),
+    )
+
+    # The rollup refresh now groups by category too, so keep it an index-only scan
+    _recreate_confirmed_date_index(["type", "payment_method", "category", "amount"])
+
+
+def downgrade() -> None:
+    """Drop the category breakdown and merge the rollup buckets back per payment method."""
+    _recreate_confirmed_date_index(["type", "payment_method", "amount"])
+
+    op.drop_column("transaction_metrics", "category_breakdown")
+
+    op.execute("CREATE TEMP TABLE transaction_daily_rollup_by_category AS SELECT * FROM transaction_daily_rollup")
+    op.execute("DELETE FROM transaction_daily_rollup")
+    op.drop_constraint("uq_transaction_daily_rollup_bucket", "transaction_daily_rollup", type_="unique")
+    op.drop_column("transaction_daily_rollup", "category")
+    op.create_unique_constraint(
+        "uq_transaction_daily_rollup_bucket",
+        "transaction_daily_rollup",
+        ["day", "type", "payment_method"],
+    )
+    op.execute(MERGE_CATEGORIES_SQL)
+    op.execute("DROP TABLE transaction_daily_rollup_by_category")
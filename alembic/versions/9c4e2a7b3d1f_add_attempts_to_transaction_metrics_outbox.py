@@ -0,0 +1,32 @@
+"""add attempts to transaction_metrics_outbox
+
+Revision ID: 9c4e2a7b3d1f
+Revises: 5b3d8e6f1a2c
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "9c4e2a7b3d1f"
+down_revision: Union[str, Sequence[str], None] = "5b3d8e6f1a2c"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Count failed recalculation attempts per outbox entry."""
+    op.add_column(
+        "transaction_metrics_outbox",
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"),
+    )
+
+
+def downgrade() -> None:
+    """Drop the attempts column."""
+    op.drop_column("transaction_metrics_outbox", "attempts")
@@ -0,0 +1,81 @@
+"""create car_metrics table
+
+Revision ID: a3f9d2c6e8b4
+Revises: 8e5a3c7f2d91
+Create Date: 2026-10-17 17:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "a3f9d2c6e8b4"
+down_revision: Union[str, Sequence[str], None] = "8e5a3c7f2d91"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+PERIOD_UNIQUE_INDEXES = {
+    "week": ["car_id", "year", "week"],
+    "month": ["car_id", "year", "month"],
+    "year": ["car_id", "year"],
+}
+
+
+def upgrade() -> None:
+    """Create the per-car period metrics, let the outbox queue car periods and index transactions by car.
+
+    The table starts empty; `python -m app.database.rebuild_metrics` fills it from the existing history.
+    """
+    op.create_table(
+        "car_metrics",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("car_id", sa.String(length=15), sa.ForeignKey("car.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("period_type", sa.String(length=10), nullable=False),
+        sa.Column("week", sa.Integer(), nullable=True),
+        sa.Column("month", sa.Integer(), nullable=True),
+        sa.Column("year", sa.Integer(), nullable=False),
+        sa.Column("total_income", sa.Numeric(12, 2), nullable=False, server_default="0"),
+        sa.Column("total_expense", sa.Numeric(12, 2), nullable=False, server_default="0"),
+        sa.Column("balance", sa.Numeric(12, 2), nullable=False, server_default="0"),
+        sa.Column("transaction_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+    )
+    op.create_index("ix_car_metrics_ranking", "car_metrics", ["period_type", "year", "month", "week", "balance"])
+    for period_type, columns in PERIOD_UNIQUE_INDEXES.items():
+        op.create_index(
+            f"uq_car_metrics_{period_type}",
+            "car_metrics",
+            columns,
+            unique=True,
+            postgresql_where=sa.text(f"period_type = '{period_type}'"),
+        )
+
+    op.add_column("transaction_metrics_outbox", sa.Column("car_id", sa.String(length=15), nullable=True))
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_transaction_car_confirmed_date",
+            "transaction",
+            ["car_id", "date"],
+            postgresql_include=["type", "amount"],
+            postgresql_where=sa.text("status = 'CONFIRMED'"),
+            sqlite_where=sa.text("status = 'CONFIRMED'"),
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Drop the car metrics, the outbox car column and the transaction car index."""
+    with op.get_context().autocommit_block():
+        op.drop_index("ix_transaction_car_confirmed_date", table_name="transaction", postgresql_concurrently=True)
+
+    op.drop_column("transaction_metrics_outbox", "car_id")
+
+    for period_type in PERIOD_UNIQUE_INDEXES:
+        op.drop_index(f"uq_car_metrics_{period_type}", table_name="car_metrics")
+    op.drop_index("ix_car_metrics_ranking", table_name="car_metrics")
+    op.drop_table("car_metrics")
@@ -0,0 +1,37 @@
+"""create transaction_metrics_outbox table
+
+Revision ID: e7a1c9d2b4f8
+Revises: d1e2f3a4b5c6
+Create Date: 2026-10-16 09:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e7a1c9d2b4f8"
+down_revision: Union[str, Sequence[str], None] = "d1e2f3a4b5c6"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create the outbox of periods pending metrics recalculation."""
+    op.create_table(
+        "transaction_metrics_outbox",
+        sa.Column("id", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("period_type", sa.String(length=10), nullable=False),
+        sa.Column("week", sa.Integer(), nullable=True),
+        sa.Column("month", sa.Integer(), nullable=True),
+        sa.Column("year", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+    )
+
+
+def downgrade() -> None:
+    """Drop the transaction_metrics_outbox table."""
+    op.drop_table("transaction_metrics_outbox")
@@ -1,17 +1,35 @@
 from .constants import AppConfig
 from .variables import (
+    ASYNC_DATABASE_URL,
     AUTHORIZATION,
+    CACHE,
     CORS_ORIGINS,
     DATABASE_URL,
     DEBUG,
     ENVIRONMENT,
+    IMPORT,
+    METRICS,
+    POOL,
+    QUERIES,
+    REFERENCES,
+    REPLICA,
+    SERVERLESS,
 )
 
 __all__ = [
+    "ASYNC_DATABASE_URL",
     "AUTHORIZATION",
+    "CACHE",
     "CORS_ORIGINS",
     "DATABASE_URL",
     "DEBUG",
     "ENVIRONMENT",
+    "IMPORT",
+    "METRICS",
+    "POOL",
+    "QUERIES",
+    "REFERENCES",
+    "REPLICA",
+    "SERVERLESS",
     "AppConfig",
 ]
@@ -18,6 +18,17 @@ def _require_env(key: str, fallback: str | None = None) -> str:
 
 
 DATABASE_URL = _require_env("DATABASE_URL", "sqlite:///./dev.db")
+
+# The same database through an asyncio driver, for the AsyncSession data path
+_ASYNC_DRIVERS = {"postgresql": "postgresql+asyncpg", "postgres": "postgresql+asyncpg", "sqlite": "sqlite+aiosqlite"}
+
+
+def _async_database_url(url: str) -> str:
+    scheme, separator, rest = url.partition("://")
+    return f"{_ASYNC_DRIVERS.get(scheme.split('+')[0], scheme)}{separator}{rest}"
+
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or _async_database_url(DATABASE_URL)
 CORS_ORIGINS: list[str] = [
     o.strip()
     for o in os.getenv("CORS_ORIGINS", "").split(",")
@@ -37,6 +48,97 @@ class R2:
     PUBLIC_URL: str = _require_env("R2_PUBLIC_URL", "")
 
 
+class METRICS:
+    """Transaction metrics engine configuration."""
+
+    RECALC_MODE: str = os.getenv("METRICS_RECALC_MODE", "outbox").lower()
+    # Lambda freezes background threads between invocations, so serverless runs the worker separately
+    WORKER_ENABLED: bool = (
+        os.getenv("METRICS_WORKER_ENABLED", "false" if os.getenv("AWS_LAMBDA_FUNCTION_NAME") else "true").lower() == "true"
+    )
+    WORKER_INTERVAL_SECONDS: float = float(os.getenv("METRICS_WORKER_INTERVAL_SECONDS", "2"))
+    WORKER_BATCH_SIZE: int = int(os.getenv("METRICS_WORKER_BATCH_SIZE", "500"))
+    WORKER_MAX_ATTEMPTS: int = int(os.getenv("METRICS_WORKER_MAX_ATTEMPTS", "5"))
+
+
+class POOL:
+    """Database connection pool configuration.
+
+    Every engine gets its own pool of these settings: a process builds a sync and an async engine on the
+    primary, plus another pair on the replica when `READ_DATABASE_URL` is set. The "server" preset sizes
+    the pools of each gunicorn worker; "serverless" caps each engine at one connection, so a warm Lambda
+    container holds at most 2 connections, or 4 with a replica (`MAX_CONNECTIONS`).
+    """
+
+    PRESET: str = os.getenv("DB_POOL_PRESET", "serverless" if os.getenv("AWS_LAMBDA_FUNCTION_NAME") else "server").lower()
+    # 0 opens a connection per checkout (NullPool), for when an external pooler such as RDS Proxy sits in front
+    SIZE: int = int(os.getenv("DB_POOL_SIZE", "1" if PRESET == "serverless" else "5"))
+    MAX_OVERFLOW: int = int(os.getenv("DB_POOL_MAX_OVERFLOW", "0" if PRESET == "serverless" else "10"))
+    TIMEOUT_SECONDS: float = float(os.getenv("DB_POOL_TIMEOUT_SECONDS", "10" if PRESET == "serverless" else "30"))
+    RECYCLE_SECONDS: int = int(os.getenv("DB_POOL_RECYCLE_SECONDS", "1800"))
+    # Pinging every checkout costs a round-trip; by default only connections idle this long are pinged
+    PRE_PING: bool = os.getenv("DB_POOL_PRE_PING", "false").lower() == "true"
+    IDLE_CHECK_SECONDS: float = float(os.getenv("DB_POOL_IDLE_CHECK_SECONDS", "300"))
+    ENGINES: int = 4 if os.getenv("READ_DATABASE_URL") else 2
+    # Connections one engine and the whole process can hold; 0 means uncapped (NullPool)
+    ENGINE_CONNECTIONS: int = SIZE + MAX_OVERFLOW if SIZE > 0 else 0
+    MAX_CONNECTIONS: int = ENGINES * ENGINE_CONNECTIONS
+    # Whether a request can check out a second connection of an engine next to its own; the serverless preset
+    # cannot, so queries that would run on a separate session run one after the other on the request's
+    CONCURRENT_SESSIONS: bool = SIZE <= 0 or ENGINE_CONNECTIONS >= 2
+
+
+class REPLICA:
+    """Read replica configuration; without a URL every read goes to the primary."""
+
+    URL: str = os.getenv("READ_DATABASE_URL", "")
+    ASYNC_URL: str = os.getenv("READ_ASYNC_DATABASE_URL") or (_async_database_url(URL) if URL else "")
+    # Reads of a client that just wrote stay on the primary this long, so they see their own writes
+    PIN_SECONDS: float = float(os.getenv("READ_PRIMARY_PIN_SECONDS", "5"))
+
+
+class SERVERLESS:
+    """Startup profile of the Mangum/Lambda handler, on by default inside Lambda."""
+
+    # Mounts each router group on its first request, skips the startup DB ping and the ASGI lifespan
+    ENABLED: bool = os.getenv("SERVERLESS_MODE", "true" if os.getenv("AWS_LAMBDA_FUNCTION_NAME") else "false").lower() == "true"
+
+
+class QUERIES:
+    """Per-request SQL statement instrumentation configuration."""
+
+    ENABLED: bool = os.getenv("QUERY_LOG_ENABLED", "true").lower() == "true"
+    SLOW_QUERY_MS: float = float(os.getenv("QUERY_LOG_SLOW_MS", "200"))
+    # A request sending the same statement this many times is reported as a likely N+1
+    REPEAT_THRESHOLD: int = int(os.getenv("QUERY_LOG_REPEAT_THRESHOLD", "5"))
+    # The X-DB-Queries / X-DB-Time headers expose internals, so production never sends them
+    RESPONSE_HEADERS: bool = ENVIRONMENT.upper() not in {"PROD", "PRODUCTION"}
+
+
+class IMPORT:
+    """Bulk transaction import configuration."""
+
+    BATCH_SIZE: int = int(os.getenv("IMPORT_BATCH_SIZE", "500"))
+
+
+class REFERENCES:
+    """Transaction reference generation configuration."""
+
+    BLOCK_SIZE: int = int(os.getenv("REFERENCE_BLOCK_SIZE", "1000"))
+
+
+class CACHE:
+    """Balance metrics response cache configuration."""
+
+    # "local" keeps period versions in process; "redis" shares them across processes (needs `redis`)
+    BACKEND: str = os.getenv("CACHE_BACKEND", "local").lower()
+    REDIS_URL: str = os.getenv("CACHE_REDIS_URL", "redis://localhost:6379/0")
+    # Local versions miss the bumps of other gunicorn workers and of the metrics worker, so only a shared
+    # store turns the cache on by default; enable it explicitly on a single-process deployment
+    ENABLED: bool = os.getenv("CACHE_ENABLED", "true" if BACKEND == "redis" else "false").lower() == "true"
+    MAX_ENTRIES: int = int(os.getenv("CACHE_MAX_ENTRIES", "1024"))
+
+
 class AUTHORIZATION:
     """Authorization configuration."""
 
@@ -1,7 +1,10 @@
 from .base import Base
-from .dependency import get_db
+from .dependency import get_async_db, get_async_read_db, get_db, get_read_db
 
 __all__ = [
     "Base",
+    "get_async_db",
+    "get_async_read_db",
     "get_db",
+    "get_read_db",
 ]
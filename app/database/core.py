@@ -1,14 +1,44 @@
 from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
 from sqlalchemy.orm import declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
-from app.config import DATABASE_URL, DEBUG
+from app.config import ASYNC_DATABASE_URL, DATABASE_URL, DEBUG, REPLICA
+from app.database.pool import PoolMonitor, pool_options
 
-engine = create_engine(
-    DATABASE_URL,
-    echo=DEBUG,
-    pool_pre_ping=True,
-    connect_args={"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {},
-)
+pool_monitors: list[PoolMonitor] = []
+
+
+def _create_engine(url: str, name: str) -> Engine:
+    monitor = PoolMonitor(name)
+    engine = create_engine(
+        url,
+        echo=DEBUG,
+        connect_args={"check_same_thread": False} if url.startswith("sqlite") else {},
+        **pool_options(url, monitor),
+    )
+    monitor.attach(engine)
+    pool_monitors.append(monitor)
+    return engine
+
+
+def _create_async_engine(url: str, name: str) -> AsyncEngine:
+    monitor = PoolMonitor(name)
+    engine = create_async_engine(url, echo=DEBUG, **pool_options(url, monitor, AsyncAdaptedQueuePool))
+    monitor.attach(engine.sync_engine)
+    pool_monitors.append(monitor)
+    return engine
+
+
+engine = _create_engine(DATABASE_URL, "primary")
+
+# Same database through an asyncio driver (asyncpg / aiosqlite); its connections come from a separate pool
+async_engine = _create_async_engine(ASYNC_DATABASE_URL, "primary-async")
+
+# Read-only traffic goes to the streaming replica when one is configured, otherwise to the primary
+read_engine = _create_engine(REPLICA.URL, "replica") if REPLICA.URL else engine
+async_read_engine = _create_async_engine(REPLICA.ASYNC_URL, "replica-async") if REPLICA.URL else async_engine
 
 Base = declarative_base()
 
@@ -1,6 +1,11 @@
+from collections.abc import AsyncIterator
+
+from fastapi import Request
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.database.session import SessionLocal
+from app.database.replica import async_read_session_factory, read_session_factory
+from app.database.session import AsyncSessionLocal, SessionLocal
 
 
 def get_db() -> Session:
@@ -10,3 +15,24 @@ def get_db() -> Session:
         yield db
     finally:
         db.close()
+
+
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    """Yield an async database session and close it after use."""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def get_read_db(request: Request) -> Session:
+    """Yield a read-only session on the replica, or on the primary while the client is pinned to it."""
+    db = read_session_factory(request)()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_read_db(request: Request) -> AsyncIterator[AsyncSession]:
+    """Yield a read-only async session on the replica, or on the primary while the client is pinned to it."""
+    async with async_read_session_factory(request)() as db:
+        yield db
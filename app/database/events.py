@@ -1,23 +1,89 @@
-# TODO BACKGROUND TASKS TO REDIS
 from __future__ import annotations
 
 import logging
 from copy import copy
+from datetime import date
 
 from sqlalchemy import event, inspect
 from sqlalchemy.orm import Session
 
+from app.config import METRICS
+from app.enum.balance import MetricsRecalcMode
 from app.models.balance import Transaction
 from app.repositories.transaction_metrics import TransactionMetricsRepository
-from app.schemas.dto.periods import PeriodKey
-from app.utils.periods import get_affected_periods
+from app.schemas.dto.periods import PeriodKey, PeriodRawMetrics, TransactionSnapshot
+from app.utils.cache import CHANGED_PERIODS_KEY, metrics_cache
+from app.utils.dates import utc_date
+from app.utils.metrics import empty_raw_metrics
+from app.utils.periods import build_period_deltas, get_affected_car_periods, get_affected_periods
 
 logger = logging.getLogger(__name__)
 
 
+def _snapshot(obj: Transaction, *, previous: bool) -> TransactionSnapshot:
+    """Snapshot the current or pre-flush values of the attributes that feed the metrics."""
+    insp = inspect(obj)
+
+    def value(attr: str):
+        hist = insp.attrs[attr].history
+        if previous and hist.deleted:
+            return hist.deleted[0]
+        return getattr(obj, attr)
+
+    return TransactionSnapshot(
+        date=value("date"),
+        type=value("type"),
+        payment_method=value("payment_method"),
+        amount=value("amount"),
+        status=value("status"),
+        category=value("category"),
+        car_id=value("car_id"),
+    )
+
+
+def _changed_snapshots(session: Session) -> tuple[list[TransactionSnapshot], list[TransactionSnapshot]]:
+    """Return the pre-flush and current snapshots of the CONFIRMED transactions changed in this flush."""
+    removed: list[TransactionSnapshot] = []
+    added: list[TransactionSnapshot] = []
+
+    for obj in session.dirty:
+        if not isinstance(obj, Transaction) or not session.is_modified(obj, include_collections=False):
+            continue
+
+        old, new = _snapshot(obj, previous=True), _snapshot(obj, previous=False)
+        if old.status == "CONFIRMED":
+            removed.append(old)
+        if new.status == "CONFIRMED":
+            added.append(new)
+
+    for obj in session.deleted:
+        if isinstance(obj, Transaction):
+            old = _snapshot(obj, previous=True)
+            if old.status == "CONFIRMED":
+                removed.append(old)
+
+    return removed, added
+
+
+def _collect_period_deltas(
+    removed: list[TransactionSnapshot],
+    added: list[TransactionSnapshot],
+) -> dict[PeriodKey, PeriodRawMetrics]:
+    """Return the signed metrics delta per period of the snapshots from `_changed_snapshots`."""
+    empty = empty_raw_metrics()
+    return {key: delta for key, delta in build_period_deltas(removed, added).items() if delta != empty}
+
+
 @event.listens_for(Session, "after_flush")
 def transaction_metrics_after_flush(session: Session, _flush_context: object) -> None:
-    """Recalculate transaction metrics after flushing Transaction changes."""
+    """Recalculate transaction metrics after flushing Transaction changes.
+
+    The daily rollups of the affected days are always refreshed inside this flush. In outbox mode
+    the affected periods are then only queued in the same DB transaction and the metrics worker
+    recalculates them; in sync mode they are recalculated inside this flush, and in delta mode the
+    signed change of each transaction is applied to the stored rows without rescanning. The car
+    periods of the changed transactions, before and after the change, follow the same mode.
+    """
 
     if session.info.get("_updating_metrics", False):
         return
@@ -59,10 +125,13 @@ def transaction_metrics_after_flush(session: Session, _flush_context: object) ->
         return
 
     affected_periods: set[PeriodKey] = set()
+    affected_days: set[date] = set()
     for tx, old_tx in affected:
         affected_periods.update(get_affected_periods(tx.date))
+        affected_days.add(utc_date(tx.date))
         if old_tx is not None:
             affected_periods.update(get_affected_periods(old_tx.date))
+            affected_days.add(utc_date(old_tx.date))
 
     logger.debug(
         "Updating metrics for %d transactions (%d periods)",
@@ -74,16 +143,25 @@ def transaction_metrics_after_flush(session: Session, _flush_context: object) ->
 
     session.info["_updating_metrics"] = True
     try:
-        for key in affected_periods:
-            repo.recalc_period(
-                period_type=key.period_type,
-                year=key.year,
-                month=key.month,
-                week=key.week,
-                commit=False,
-            )
+        # One walk of the attribute history feeds both the period deltas and the car periods
+        removed, added = _changed_snapshots(session)
+        deltas = _collect_period_deltas(removed, added) if METRICS.RECALC_MODE == MetricsRecalcMode.DELTA else None
+        repo.apply_changes(affected_periods, affected_days, deltas, get_affected_car_periods([*removed, *added]))
     except Exception:
         logger.exception("Failed to recalculate transaction metrics")
         raise
     finally:
         session.info["_updating_metrics"] = False
+
+
+@event.listens_for(Session, "after_commit")
+def metrics_cache_after_commit(session: Session) -> None:
+    """Invalidate the cached responses of the metrics periods rewritten by the committed transaction.
+
+    Bumping only after commit keeps readers from caching a value that a rollback would discard; a
+    savepoint rollback can leave extra periods behind, which only costs a cache miss.
+    """
+
+    changed = session.info.pop(CHANGED_PERIODS_KEY, None)
+    if changed:
+        metrics_cache.invalidate(changed)
@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import logging
+import threading
+from collections.abc import Callable
+
+from sqlalchemy.orm import Session
+
+from app.config import METRICS
+from app.repositories.transaction_metrics import TransactionMetricsRepository
+from app.schemas.dto.periods import CarPeriodKey, PeriodKey
+
+logger = logging.getLogger(__name__)
+
+
+def drain_metrics_outbox(
+    session: Session,
+    batch_size: int = METRICS.WORKER_BATCH_SIZE,
+    max_attempts: int = METRICS.WORKER_MAX_ATTEMPTS,
+) -> int:
+    """Recalculate the periods queued in the outbox and return how many distinct periods were recalculated.
+
+    Entries with a `car_id` recalculate that car's car_metrics row instead of the fleet-wide period.
+    Duplicate entries for the same period are coalesced into a single recalculation, and the
+    processed entries are deleted in the same transaction as the upserted metrics. Periods and car
+    periods whose advisory lock another transaction holds are left queued untouched. Each period is recalculated in
+    its own savepoint: when it fails, its entries stay queued with one more attempt counted, and after
+    `max_attempts` failures they are no longer claimed.
+    """
+
+    repo = TransactionMetricsRepository(session)
+
+    try:
+        entries = repo.claim_outbox_entries(batch_size, max_attempts)
+        if not entries:
+            session.rollback()
+            return 0
+
+        entry_ids: dict[PeriodKey | CarPeriodKey, list[int]] = {}
+        for e in entries:
+            key = PeriodKey(period_type=e.period_type, year=e.year, month=e.month, week=e.week)
+            entry_ids.setdefault(key if e.car_id is None else CarPeriodKey(e.car_id, key), []).append(e.id)
+
+        # Periods an API transaction is recalculating right now stay queued for the next pass
+        _locked, busy = repo.try_lock_periods(k for k in entry_ids if isinstance(k, PeriodKey))
+        _locked_cars, busy_cars = repo.try_lock_car_periods(k for k in entry_ids if isinstance(k, CarPeriodKey))
+        for key in [*busy, *busy_cars]:
+            del entry_ids[key]
+
+        done: list[int] = []
+        failed: list[int] = []
+        recalculated = 0
+        for key, ids in entry_ids.items():
+            try:
+                with session.begin_nested():
+                    if isinstance(key, CarPeriodKey):
+                        repo.recalc_car_periods([key], commit=False)
+                    else:
+                        repo.recalc_period(
+                            period_type=key.period_type,
+                            year=key.year,
+                            month=key.month,
+                            week=key.week,
+                            commit=False,
+                        )
+            except Exception:
+                logger.exception("Failed recalculating transaction metrics for %s", key)
+                failed.extend(ids)
+            else:
+                done.extend(ids)
+                recalculated += 1
+
+        repo.delete_outbox_entries(done)
+        repo.mark_outbox_entries_failed(failed)
+        session.commit()
+    except Exception:
+        session.rollback()
+        logger.exception("Failed draining the transaction metrics outbox")
+        raise
+
+    logger.debug("Drained %d outbox entries into %d period recalculations", len(done), recalculated)
+    return recalculated
+
+
+class MetricsOutboxWorker:
+    """Background worker that periodically drains the transaction metrics outbox."""
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        interval: float = METRICS.WORKER_INTERVAL_SECONDS,
+        batch_size: int = METRICS.WORKER_BATCH_SIZE,
+        max_attempts: int = METRICS.WORKER_MAX_ATTEMPTS,
+    ):
+        self.session_factory = session_factory
+        self.interval = interval
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def run_once(self) -> int:
+        """Drain the outbox until it is empty and return the number of periods recalculated."""
+
+        total = 0
+        session = self.session_factory()
+        try:
+            while processed := drain_metrics_outbox(session, self.batch_size, self.max_attempts):
+                total += processed
+        finally:
+            session.close()
+        return total
+
+    def run_forever(self) -> None:
+        """Drain the outbox every `interval` seconds until stopped."""
+
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception:
+                logger.exception("Transaction metrics worker iteration failed")
+            self._stop.wait(self.interval)
+
+    def start(self) -> None:
+        """Start draining the outbox in a daemon thread."""
+
+        if self._thread and self._thread.is_alive():
+            return
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=self.run_forever, name="metrics-outbox-worker", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float | None = None) -> None:
+        """Signal the worker to stop and wait for the current iteration to finish."""
+
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+
+
+if __name__ == "__main__":
+    from app.database.session import SessionLocal
+
+    logging.basicConfig(level=logging.INFO)
+    MetricsOutboxWorker(SessionLocal).run_forever()
@@ -0,0 +1,172 @@
+"""Connection pool settings and instrumentation of the SQLAlchemy engines.
+
+`pool_options` turns the `POOL` configuration into engine arguments. Each engine gets a
+`PoolMonitor` that times every checkout, counts pool timeouts and tracks how many connections are in
+use, so `/internal/stats/db-pool` shows whether requests wait on the pool.
+
+Instead of `pool_pre_ping` (one extra round-trip on every checkout), connections are recycled after
+`POOL.RECYCLE_SECONDS` and only those idle longer than `POOL.IDLE_CHECK_SECONDS` are pinged; a
+failed ping discards the connection and the pool hands out a fresh one.
+"""
+
+import threading
+import time
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import DisconnectionError
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import NullPool, Pool, QueuePool
+
+from app.config import POOL
+from app.schemas.dto.pool import PoolStats
+
+# ConnectionRecord.info key with the monotonic time the connection went back to the pool
+CHECKED_IN_AT = "checked_in_at"
+
+
+class PoolMonitor:
+    """Checkout timing and occupancy counters of one engine's pool."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.engine: Engine | None = None
+        self.max_overflow = 0
+        self._lock = threading.Lock()
+        self._checked_out = 0
+        self._peak_checked_out = 0
+        self._checkouts = 0
+        self._timeouts = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._stale = 0
+
+    def pool_class(self, base: type[Pool]) -> type[Pool]:
+        """Return a subclass of `base` that reports how long each checkout waited to this monitor."""
+
+        monitor = self
+
+        class TimedPool(base):
+            def _do_get(self):
+                started = time.perf_counter()
+                try:
+                    return super()._do_get()
+                except PoolTimeoutError:
+                    monitor.record_timeout()
+                    raise
+                finally:
+                    monitor.record_wait(time.perf_counter() - started)
+
+        TimedPool.__name__ = f"Timed{base.__name__}"
+        return TimedPool
+
+    def attach(self, engine: Engine) -> None:
+        """Listen to the checkouts and checkins of `engine` and apply the idle connection check."""
+
+        self.engine = engine
+        event.listen(engine, "checkout", self._on_checkout)
+        event.listen(engine, "checkin", self._on_checkin)
+        if not POOL.PRE_PING and POOL.IDLE_CHECK_SECONDS > 0:
+            event.listen(engine, "checkout", self._idle_checker(POOL.IDLE_CHECK_SECONDS), insert=True)
+
+    def _on_checkout(self, _dbapi_connection, _connection_record, _connection_proxy) -> None:
+        with self._lock:
+            self._checkouts += 1
+            self._checked_out += 1
+            self._peak_checked_out = max(self._peak_checked_out, self._checked_out)
+
+    def _on_checkin(self, _dbapi_connection, connection_record) -> None:
+        connection_record.info[CHECKED_IN_AT] = time.monotonic()
+        with self._lock:
+            self._checked_out = max(self._checked_out - 1, 0)
+
+    def _idle_checker(self, idle_check_seconds: float):
+        def check_idle(dbapi_connection, connection_record, _connection_proxy) -> None:
+            checked_in_at = connection_record.info.get(CHECKED_IN_AT)
+            if checked_in_at is None or time.monotonic() - checked_in_at < idle_check_seconds:
+                return
+
+            try:
+                cursor = dbapi_connection.cursor()
+                try:
+                    cursor.execute("SELECT 1")
+                finally:
+                    cursor.close()
+            except Exception as ex:
+                with self._lock:
+                    self._stale += 1
+                # The pool discards this connection and retries the checkout with a new one
+                raise DisconnectionError("Idle pooled connection is gone") from ex
+
+        return check_idle
+
+    def record_wait(self, seconds: float) -> None:
+        """Add the time one checkout waited for a connection."""
+
+        with self._lock:
+            self._wait_total += seconds
+            self._wait_max = max(self._wait_max, seconds)
+
+    def record_timeout(self) -> None:
+        """Count a checkout that gave up after the pool timeout."""
+
+        with self._lock:
+            self._timeouts += 1
+
+    def reset(self) -> None:
+        """Reset the counters, keeping the connections currently checked out."""
+
+        with self._lock:
+            self._peak_checked_out = self._checked_out
+            self._checkouts = self._timeouts = self._stale = 0
+            self._wait_total = self._wait_max = 0.0
+
+    def stats(self) -> PoolStats:
+        """Return the counters of the pool along with its current occupancy."""
+
+        pool = self.engine.pool if self.engine is not None else None
+        queue_pool = isinstance(pool, QueuePool)
+        with self._lock:
+            # Checkouts that timed out never reached the checkout event, so they only count as waits
+            waits = self._checkouts + self._timeouts
+            return PoolStats(
+                name=self.name,
+                pool_class=type(pool).__name__ if pool is not None else "",
+                size=pool.size() if queue_pool else 0,
+                max_overflow=self.max_overflow,
+                checked_out=self._checked_out,
+                peak_checked_out=self._peak_checked_out,
+                overflow=max(pool.overflow(), 0) if queue_pool else 0,
+                checkouts=self._checkouts,
+                timeouts=self._timeouts,
+                wait_ms_avg=round(self._wait_total * 1000 / waits, 3) if waits else 0.0,
+                wait_ms_max=round(self._wait_max * 1000, 3),
+                stale_connections=self._stale,
+            )
+
+
+def pool_options(url: str, monitor: PoolMonitor, queue_pool_class: type[QueuePool] = QueuePool) -> dict[str, Any]:
+    """Return the pool arguments of an engine on `url` following the `POOL` configuration.
+
+    SQLite keeps the pool SQLAlchemy picks for it (a single shared connection for in-memory databases).
+    `queue_pool_class` is the pool used when `POOL.SIZE` is positive: `AsyncAdaptedQueuePool` for async
+    engines.
+    """
+
+    options: dict[str, Any] = {"pool_pre_ping": POOL.PRE_PING}
+    if url.startswith("sqlite"):
+        return options
+
+    if POOL.SIZE <= 0:
+        return {**options, "poolclass": monitor.pool_class(NullPool)}
+
+    monitor.max_overflow = POOL.MAX_OVERFLOW
+    return {
+        **options,
+        "poolclass": monitor.pool_class(queue_pool_class),
+        "pool_size": POOL.SIZE,
+        "max_overflow": POOL.MAX_OVERFLOW,
+        "pool_timeout": POOL.TIMEOUT_SECONDS,
+        "pool_recycle": POOL.RECYCLE_SECONDS,
+    }
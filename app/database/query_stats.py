@@ -0,0 +1,117 @@
+"""Per-request SQL statement counting, N+1 detection and slow-query logging.
+
+Every engine reports its statements through the `before_cursor_execute` / `after_cursor_execute`
+hooks. While a request is being served, `instrument_queries` keeps a `QueryStats` in a context
+variable, so the statements of the request, in the threadpool or awaited through an `AsyncSession`
+alike, are added to it. At the end of the request the statements it repeated are logged as likely
+N+1 queries, and outside production the totals are sent back in the `X-DB-Queries` and `X-DB-Time`
+headers.
+"""
+
+import time
+from collections import Counter
+from collections.abc import Awaitable, Callable
+from contextvars import ContextVar
+from typing import Any
+
+from fastapi import Request, Response
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.config import QUERIES
+from app.utils.logging_config import logger
+
+QUERY_COUNT_HEADER = "X-DB-Queries"
+QUERY_TIME_HEADER = "X-DB-Time"
+
+# Connection.info key with the start times of the statements running on that connection
+STARTED_AT = "query_started_at"
+
+# Longest statement text written to the logs
+MAX_LOGGED_STATEMENT = 1000
+
+
+class QueryStats:
+    """SQL statements sent while serving one request."""
+
+    def __init__(self, scope: dict[str, Any] | None = None):
+        """Initialize the counters of the request whose ASGI `scope` is given."""
+        self.scope = scope or {}
+        self.count = 0
+        self.seconds = 0.0
+        self.statements: Counter[str] = Counter()
+
+    @property
+    def route(self) -> str:
+        """Return the method and route template of the request, or its raw path before it is routed."""
+
+        if not self.scope:
+            return "-"
+        route = self.scope.get("route")
+        return f"{self.scope.get('method', '')} {getattr(route, 'path', None) or self.scope.get('path', '')}"
+
+    @property
+    def milliseconds(self) -> float:
+        """Return the time spent executing the statements, in milliseconds."""
+        return self.seconds * 1000
+
+    def record(self, statement: str, seconds: float) -> None:
+        """Add one executed statement."""
+
+        self.count += 1
+        self.seconds += seconds
+        self.statements[statement] += 1
+
+    def repeated(self, threshold: int) -> list[tuple[str, int]]:
+        """Return the statements sent at least `threshold` times, most repeated first."""
+        return [(statement, count) for statement, count in self.statements.most_common() if count >= threshold]
+
+
+current_query_stats: ContextVar[QueryStats | None] = ContextVar("current_query_stats", default=None)
+
+
+def _loggable(statement: str) -> str:
+    return " ".join(statement.split())[:MAX_LOGGED_STATEMENT]
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def query_started(conn, _cursor, _statement, _parameters, _context, _executemany) -> None:
+    """Remember when the statement was sent."""
+    conn.info.setdefault(STARTED_AT, []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def query_finished(conn, _cursor, statement, _parameters, _context, _executemany) -> None:
+    """Add the statement to the current request and log it when slower than `QUERIES.SLOW_QUERY_MS`."""
+
+    started = conn.info.get(STARTED_AT)
+    if not started:
+        return
+    seconds = time.perf_counter() - started.pop()
+
+    stats = current_query_stats.get()
+    if stats is not None:
+        stats.record(statement, seconds)
+
+    if seconds * 1000 >= QUERIES.SLOW_QUERY_MS:
+        route = stats.route if stats is not None else "-"
+        logger.warning("Slow query (%.1f ms) on %s: %s", seconds * 1000, route, _loggable(statement))
+
+
+async def instrument_queries(request: Request, call_next: Callable[[Request], Awaitable[Response]]) -> Response:
+    """Count the statements of the request, report the repeated ones and, outside production, send the totals."""
+
+    stats = QueryStats(request.scope)
+    token = current_query_stats.set(stats)
+    try:
+        response = await call_next(request)
+    finally:
+        current_query_stats.reset(token)
+
+    for statement, count in stats.repeated(QUERIES.REPEAT_THRESHOLD):
+        logger.warning("Possible N+1 on %s: statement sent %d times: %s", stats.route, count, _loggable(statement))
+
+    if QUERIES.RESPONSE_HEADERS:
+        response.headers[QUERY_COUNT_HEADER] = str(stats.count)
+        response.headers[QUERY_TIME_HEADER] = f"{stats.milliseconds:.2f}"
+    return response
@@ -0,0 +1,159 @@
+"""Rebuild the daily rollups, transaction_metrics and car_metrics from the transaction table.
+
+Usage:
+    python -m app.database.rebuild_metrics [--start YYYY-MM-DD] [--end YYYY-MM-DD] [--workers N] [--batch-size N]
+
+Without a range the whole history of CONFIRMED transactions is rebuilt. With `--workers` above 1 the
+work is sharded by year across a process pool: first every year's daily rollups, then every year's
+week/month/year rows, since ISO weeks read rollups across the year boundary.
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import time
+from collections.abc import Callable, Sequence
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from datetime import date
+
+from app.database.core import engine
+from app.database.session import SessionLocal
+from app.repositories.transaction_metrics import REBUILD_BATCH_SIZE, TransactionMetricsRepository
+
+logger = logging.getLogger("app.database.rebuild_metrics")
+
+PERIOD_TYPES = ("week", "month", "year")
+
+
+@dataclass(frozen=True)
+class ShardResult:
+    """Outcome of one unit of rebuild work."""
+
+    label: str
+    rows: int
+    seconds: float
+
+
+def rebuild_rollups(start: date, end: date, batch_size: int = REBUILD_BATCH_SIZE) -> ShardResult:
+    """Rebuild and commit the daily rollups of the inclusive [start, end] days."""
+
+    started = time.perf_counter()
+    with SessionLocal() as session:
+        rows = TransactionMetricsRepository(session).rebuild_daily_rollups(start, end, batch_size)
+        session.commit()
+    return ShardResult(f"rollups {start}..{end}", rows, time.perf_counter() - started)
+
+
+def rebuild_periods(first_year: int, last_year: int, batch_size: int = REBUILD_BATCH_SIZE) -> ShardResult:
+    """Rebuild and commit the week, month and year metrics, fleet-wide and per car, of the inclusive year range."""
+
+    started = time.perf_counter()
+    with SessionLocal() as session:
+        repo = TransactionMetricsRepository(session)
+        rows = sum(repo.rebuild_period_metrics(period_type, first_year, last_year, batch_size) for period_type in PERIOD_TYPES)
+        rows += repo.rebuild_car_metrics(first_year, last_year, batch_size)
+        session.commit()
+    return ShardResult(f"metrics {first_year}..{last_year}", rows, time.perf_counter() - started)
+
+
+def year_shards(start: date, end: date) -> list[tuple[date, date]]:
+    """Split the inclusive [start, end] range into calendar-year pieces."""
+
+    return [(max(start, date(year, 1, 1)), min(end, date(year, 12, 31))) for year in range(start.year, end.year + 1)]
+
+
+def metrics_years(start: date, end: date) -> tuple[int, int]:
+    """Return the year range whose metrics read rollups of [start, end], including ISO-week years."""
+
+    return min(start.year, start.isocalendar().year), max(end.year, end.isocalendar().year)
+
+
+def rebuild(start: date, end: date, workers: int = 1, batch_size: int = REBUILD_BATCH_SIZE) -> list[ShardResult]:
+    """Rebuild rollups and metrics for [start, end], logging progress, and return the result of each shard."""
+
+    first_year, last_year = metrics_years(start, end)
+
+    results: list[ShardResult] = []
+
+    if workers <= 1:
+        results.append(rebuild_rollups(start, end, batch_size))
+        _log_progress(results[-1], 1, 2)
+        results.append(rebuild_periods(first_year, last_year, batch_size))
+        _log_progress(results[-1], 2, 2)
+        return results
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_dispose_inherited_pool) as pool:
+        rollup_jobs = [
+            (rebuild_rollups, (shard_start, shard_end, batch_size)) for shard_start, shard_end in year_shards(start, end)
+        ]
+        results += _run_phase(pool, rollup_jobs)
+
+        period_jobs = [(rebuild_periods, (year, year, batch_size)) for year in range(first_year, last_year + 1)]
+        results += _run_phase(pool, period_jobs)
+
+    return results
+
+
+def _run_phase(pool: ProcessPoolExecutor, jobs: Sequence[tuple[Callable[..., ShardResult], tuple]]) -> list[ShardResult]:
+    """Run one phase of jobs on the pool and wait for all of them, logging each as it completes."""
+
+    results = []
+    futures = [pool.submit(fn, *args) for fn, args in jobs]
+    for future in as_completed(futures):
+        results.append(future.result())
+        _log_progress(results[-1], len(results), len(futures))
+    return results
+
+
+def _dispose_inherited_pool() -> None:
+    """Drop connections inherited from the parent process so each worker opens its own."""
+
+    engine.dispose(close=False)
+
+
+def _log_progress(result: ShardResult, done: int, total: int) -> None:
+    rate = result.rows / result.seconds if result.seconds else 0.0
+    logger.info("[%d/%d] %s: %d rows in %.2fs (%.0f rows/s)", done, total, result.label, result.rows, result.seconds, rate)
+
+
+def _parse_args(argv: Sequence[str] | None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m app.database.rebuild_metrics", description=__doc__.splitlines()[0])
+    parser.add_argument("--start", type=date.fromisoformat, help="First UTC day to rebuild (default: first transaction)")
+    parser.add_argument("--end", type=date.fromisoformat, help="Last UTC day to rebuild (default: last transaction)")
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes, one year per task (default: 1)")
+    parser.add_argument("--batch-size", type=int, default=REBUILD_BATCH_SIZE, help="Rows per multi-row INSERT")
+    return parser.parse_args(argv)
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    """Run the rebuild from the command line and return the process exit code."""
+
+    args = _parse_args(argv)
+
+    start, end = args.start, args.end
+    if start is None or end is None:
+        with SessionLocal() as session:
+            history = TransactionMetricsRepository(session).transaction_date_range()
+        if history is None:
+            logger.info("No CONFIRMED transactions; nothing to rebuild")
+            return 0
+        start, end = start or history[0], end or history[1]
+
+    if end < start:
+        logger.error("--end (%s) is before --start (%s)", end, start)
+        return 2
+
+    started = time.perf_counter()
+    results = rebuild(start, end, args.workers, args.batch_size)
+    elapsed = time.perf_counter() - started
+
+    rows = sum(r.rows for r in results)
+    logger.info("Rebuilt %s..%s: %d rows in %.2fs (%.0f rows/s)", start, end, rows, elapsed, rows / elapsed if elapsed else 0.0)
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(message)s")
+    raise SystemExit(main())
@@ -0,0 +1,57 @@
+"""Read-your-writes for the read replica.
+
+A client whose request wrote to the primary gets a short-lived cookie; while it is valid, the read
+dependencies keep that client's reads on the primary, so it never reads a replica that has not yet
+replayed its own write.
+"""
+
+import math
+import time
+from collections.abc import Awaitable, Callable
+
+from fastapi import Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.config import ENVIRONMENT, REPLICA
+from app.database.session import AsyncReadSessionLocal, AsyncSessionLocal, ReadSessionLocal, SessionLocal
+
+PRIMARY_PIN_COOKIE = "db_primary_until"
+WRITE_METHODS = frozenset({"POST", "PUT", "PATCH", "DELETE"})
+
+
+def pinned_to_primary(request: Request) -> bool:
+    """Return whether the client wrote recently enough that its reads must stay on the primary."""
+
+    try:
+        return float(request.cookies.get(PRIMARY_PIN_COOKIE, "0")) > time.time()
+    except ValueError:
+        return False
+
+
+def read_session_factory(request: Request) -> sessionmaker[Session]:
+    """Return the session factory of the request's reads: the replica, or the primary while pinned."""
+
+    return SessionLocal if pinned_to_primary(request) else ReadSessionLocal
+
+
+def async_read_session_factory(request: Request) -> async_sessionmaker[AsyncSession]:
+    """Return the async session factory of the request's reads: the replica, or the primary while pinned."""
+
+    return AsyncSessionLocal if pinned_to_primary(request) else AsyncReadSessionLocal
+
+
+async def pin_primary_after_writes(request: Request, call_next: Callable[[Request], Awaitable[Response]]) -> Response:
+    """Pin the client to the primary for `REPLICA.PIN_SECONDS` after each successful write request."""
+
+    response = await call_next(request)
+    if REPLICA.URL and REPLICA.PIN_SECONDS > 0 and request.method in WRITE_METHODS and response.status_code < 400:
+        response.set_cookie(
+            PRIMARY_PIN_COOKIE,
+            f"{time.time() + REPLICA.PIN_SECONDS:.3f}",
+            max_age=math.ceil(REPLICA.PIN_SECONDS),
+            httponly=True,
+            secure=ENVIRONMENT != "LOCAL",
+            samesite="lax",
+        )
+    return response
@@ -1,5 +1,30 @@
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 
-from app.database.core import engine
+from app.database.core import async_engine, async_read_engine, engine, read_engine
+from app.errors.database import DBOperationError
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# Objects stay readable after commit: expired attributes could only be reloaded by awaiting
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+
+class ReadOnlySession(Session):
+    """Session of the read-only repositories; it refuses to flush, since a replica cannot be written."""
+
+
+@event.listens_for(ReadOnlySession, "before_flush")
+def reject_read_only_flush(_session: Session, _flush_context: object, _instances: object) -> None:
+    """Fail any write attempted through a read-only session."""
+    raise DBOperationError("Read-only database session cannot write")
+
+
+ReadSessionLocal = sessionmaker(class_=ReadOnlySession, autocommit=False, autoflush=False, bind=read_engine)
+AsyncReadSessionLocal = async_sessionmaker(
+    async_read_engine,
+    sync_session_class=ReadOnlySession,
+    autoflush=False,
+    expire_on_commit=False,
+)
@@ -0,0 +1,117 @@
+"""Dialect-aware INSERT ... ON CONFLICT for the metrics engine.
+
+PostgreSQL and SQLite (3.24+) get a native multi-row `ON CONFLICT` statement, including partial
+unique indexes through `index_where`. Other backends fall back to an UPDATE-then-INSERT per row,
+which is only as safe as the backend's own locking but keeps the pipeline runnable.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable, Mapping, Sequence
+from typing import Any
+
+from sqlalchemy import ColumnElement, and_, insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.dml import Insert
+
+NATIVE_INSERTS: dict[str, Callable[[Any], Any]] = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert,
+}
+
+
+def upsert_stmt(
+    dialect_name: str,
+    model: Any,
+    *,
+    index_elements: Sequence[str],
+    index_where: ColumnElement[bool] | None = None,
+    update_columns: Sequence[str] = (),
+    touch: Mapping[str, Any] | None = None,
+) -> Insert:
+    """Build a native INSERT ... ON CONFLICT for `dialect_name`; rows are bound by the caller.
+
+    Conflicting rows get `update_columns` copied from the proposed row plus the `touch` values;
+    with neither, they are skipped (DO NOTHING).
+    """
+
+    stmt = NATIVE_INSERTS[dialect_name](model)
+    if not update_columns and not touch:
+        return stmt.on_conflict_do_nothing(index_elements=index_elements, index_where=index_where)
+
+    set_ = {column: stmt.excluded[column] for column in update_columns} | dict(touch or {})
+    return stmt.on_conflict_do_update(index_elements=index_elements, index_where=index_where, set_=set_)
+
+
+def upsert(
+    session: Session,
+    model: Any,
+    rows: Sequence[Mapping[str, Any]],
+    *,
+    index_elements: Sequence[str],
+    index_where: ColumnElement[bool] | None = None,
+    update_columns: Sequence[str] = (),
+    touch: Mapping[str, Any] | None = None,
+) -> None:
+    """Insert `rows` or update the ones conflicting on `index_elements`, without committing.
+
+    Native backends get a single multi-row statement; others go through the per-row fallback.
+    """
+
+    if not rows:
+        return
+
+    dialect_name = session.get_bind().dialect.name
+    if dialect_name in NATIVE_INSERTS:
+        stmt = upsert_stmt(
+            dialect_name,
+            model,
+            index_elements=index_elements,
+            index_where=index_where,
+            update_columns=update_columns,
+            touch=touch,
+        )
+        session.execute(stmt.values(list(rows)))
+        return
+
+    for row in rows:
+        conditions = [getattr(model, column) == row[column] for column in index_elements]
+        if index_where is not None:
+            conditions.append(index_where)
+        match = and_(*conditions)
+        if update_columns or touch:
+            values = {column: row[column] for column in update_columns} | dict(touch or {})
+            if session.execute(update(model).where(match).values(values)).rowcount:
+                continue
+        elif session.execute(select(1).select_from(model).where(match)).first() is not None:
+            continue
+        session.execute(insert(model).values(dict(row)))
+
+
+def insert_missing(
+    session: Session,
+    model: Any,
+    rows: Sequence[Mapping[str, Any]],
+    *,
+    key: str,
+) -> set[Any]:
+    """Insert the rows whose `key` is not taken yet and return the keys that were inserted, without committing."""
+
+    if not rows:
+        return set()
+
+    dialect_name = session.get_bind().dialect.name
+    column = getattr(model, key)
+    if dialect_name in NATIVE_INSERTS:
+        stmt = upsert_stmt(dialect_name, model, index_elements=[key]).returning(column)
+        return set(session.scalars(stmt, list(rows)).all())
+
+    taken = set(session.scalars(select(column).where(column.in_([row[key] for row in rows]))).all())
+    created: set[Any] = set()
+    for row in rows:
+        if row[key] in taken or row[key] in created:
+            continue
+        session.execute(insert(model).values(dict(row)))
+        created.add(row[key])
+    return created
@@ -1,8 +1,19 @@
-from fastapi import Depends
+from collections.abc import Iterator
+from contextlib import contextmanager
+from functools import partial
 
-from app.database import get_db
+from fastapi import Depends, Request
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.config import POOL
+from app.database import get_async_db, get_async_read_db, get_db, get_read_db
+from app.database.replica import read_session_factory
+from app.database.session import SessionLocal
 from app.repositories import (
     AssociateRepository,
+    AsyncBalanceRepository,
+    AsyncCarRepository,
+    AsyncUserRepository,
     BalanceRepository,
     CarRepository,
     DocumentRepository,
@@ -26,6 +37,28 @@ class RepositoryFactory:
 
         yield UserRepository(db_session)
 
+    @staticmethod
+    def read_user_repository(db_session=Depends(get_read_db)):
+        """Provide an instance of UserRepository for reads, on the read replica.
+
+        Args:db_session (Session): The read-only database session, injected via FastAPI's Depends.
+
+        Yields:UserRepository: An instance of UserRepository initialized with the provided database session.
+        """
+
+        yield UserRepository(db_session)
+
+    @staticmethod
+    async def async_user_repository(db_session=Depends(get_async_db)):
+        """Provide an instance of AsyncUserRepository.
+
+        Args:db_session (AsyncSession): The async database session, injected via FastAPI's Depends.
+
+        Yields:AsyncUserRepository: An instance of AsyncUserRepository initialized with the provided database session.
+        """
+
+        yield AsyncUserRepository(db_session)
+
     @staticmethod
     def balance_repository(db_session=Depends(get_db)):
         """Provide an instance of BalanceRepository.
@@ -37,6 +70,64 @@ class RepositoryFactory:
 
         yield BalanceRepository(db_session)
 
+    @staticmethod
+    async def async_balance_repository(db_session=Depends(get_async_db)):
+        """Provide an instance of AsyncBalanceRepository.
+
+        Args:db_session (AsyncSession): The async database session, injected via FastAPI's Depends.
+
+        Yields:AsyncBalanceRepository: An instance of AsyncBalanceRepository initialized with the provided database session.
+        """
+
+        yield AsyncBalanceRepository(db_session)
+
+    @staticmethod
+    def read_balance_repository(db_session=Depends(get_read_db)):
+        """Provide an instance of BalanceRepository for reads, on the read replica.
+
+        Args:db_session (Session): The read-only database session, injected via FastAPI's Depends.
+
+        Yields:BalanceRepository: An instance of BalanceRepository initialized with the provided database session.
+        """
+
+        yield BalanceRepository(db_session)
+
+    @staticmethod
+    async def async_read_balance_repository(db_session=Depends(get_async_read_db)):
+        """Provide an instance of AsyncBalanceRepository for reads, on the read replica.
+
+        Args:db_session (AsyncSession): The read-only async database session, injected via FastAPI's Depends.
+
+        Yields:AsyncBalanceRepository: An instance of AsyncBalanceRepository initialized with the provided database session.
+        """
+
+        yield AsyncBalanceRepository(db_session)
+
+    @staticmethod
+    def balance_repository_scope():
+        """Provide a factory of BalanceRepository instances on their own pooled sessions.
+
+        Returns:Callable | None: A context manager factory; each use opens and closes a separate session, so the
+        repository can run in another thread next to the request's one. None when the pool cannot serve a
+        second session while the request holds its connection.
+        """
+
+        return _balance_repository_scope if POOL.CONCURRENT_SESSIONS else None
+
+    @staticmethod
+    def read_balance_repository_scope(request: Request):
+        """Provide a factory of BalanceRepository instances on their own read replica sessions.
+
+        Args:request (Request): The current request; a client pinned to the primary reads from it.
+
+        Returns:Callable | None: A context manager factory; each use opens and closes a separate read-only session.
+        None when the pool cannot serve a second session while the request holds its connection.
+        """
+
+        if not POOL.CONCURRENT_SESSIONS:
+            return None
+        return partial(_balance_repository_scope, read_session_factory(request))
+
     @staticmethod
     def insurance_repository(db_session=Depends(get_db)):
         """Provide an instance of InsuranceRepository.
@@ -70,6 +161,28 @@ class RepositoryFactory:
 
         yield CarRepository(db_session)
 
+    @staticmethod
+    async def async_car_repository(db_session=Depends(get_async_db)):
+        """Provide an instance of AsyncCarRepository.
+
+        Args:db_session (AsyncSession): The async database session, injected via FastAPI's Depends.
+
+        Yields:AsyncCarRepository: An instance of AsyncCarRepository initialized with the provided database session.
+        """
+
+        yield AsyncCarRepository(db_session)
+
+    @staticmethod
+    async def async_read_car_repository(db_session=Depends(get_async_read_db)):
+        """Provide an instance of AsyncCarRepository for reads, on the read replica.
+
+        Args:db_session (AsyncSession): The read-only async database session, injected via FastAPI's Depends.
+
+        Yields:AsyncCarRepository: An instance of AsyncCarRepository initialized with the provided database session.
+        """
+
+        yield AsyncCarRepository(db_session)
+
     @staticmethod
     def document_repository(db_session=Depends(get_db)):
         """Provide an instance of DocumentRepository.
@@ -91,3 +204,9 @@ class RepositoryFactory:
         """
 
         yield ImageRepository(db_session)
+
+
+@contextmanager
+def _balance_repository_scope(session_factory: sessionmaker[Session] | None = None) -> Iterator[BalanceRepository]:
+    with (session_factory or SessionLocal)() as db_session:
+        yield BalanceRepository(db_session)
@@ -1,8 +1,12 @@
 from fastapi import Depends
 from fastapi_jwt_auth import AuthJWT
 
+from app.config import CACHE
 from app.services import (
     AssociateService,
+    AsyncAuthService,
+    AsyncBalanceService,
+    AsyncCarService,
     AuthService,
     BalanceService,
     CarService,
@@ -11,6 +15,7 @@ from app.services import (
     InsuranceService,
     UserService,
 )
+from app.utils.cache import metrics_cache
 
 from .repository_factory import RepositoryFactory
 
@@ -28,6 +33,16 @@ class ServiceFactory:
         """
         yield UserService(repository)
 
+    @staticmethod
+    def read_user_service(repository=Depends(RepositoryFactory.read_user_repository)):
+        """Provide an instance of UserService for reads, on the read replica.
+
+        Args:repository (UserRepository): A read-only UserRepository, injected via FastAPI's Depends.
+
+        Yields:UserService: An instance of UserService initialized with the provided repository.
+        """
+        yield UserService(repository)
+
     @staticmethod
     def auth_service(authorize=Depends(AuthJWT), repository=Depends(RepositoryFactory.user_repository)):
         """Provide an instance of AuthService.
@@ -39,14 +54,67 @@ class ServiceFactory:
         yield AuthService(authorize, repository)
 
     @staticmethod
-    def balance_service(repository=Depends(RepositoryFactory.balance_repository)):
+    def async_auth_service(authorize=Depends(AuthJWT), repository=Depends(RepositoryFactory.async_user_repository)):
+        """Provide an instance of AsyncAuthService.
+
+        Args:authorize (AuthJWT): An instance of AuthJWT, injected via FastAPI's Depends.
+        repository (AsyncUserRepository): An instance of AsyncUserRepository, injected via FastAPI's Depends.
+
+        Yields:AsyncAuthService: An instance of AsyncAuthService initialized with the provided authorize.
+        """
+        yield AsyncAuthService(authorize, repository)
+
+    @staticmethod
+    def balance_service(
+        repository=Depends(RepositoryFactory.balance_repository),
+        repository_scope=Depends(RepositoryFactory.balance_repository_scope),
+    ):
         """Provide an instance of BalaceService.
 
         Args:repository (BlanceRepository): An instance of BalanceRepository, injected via FastAPI's Depends.
+        repository_scope (Callable | None): Factory of repositories on separate sessions, for concurrent queries.
+
+        Yields:BalanceService: An instance of BalanceService initialized with the provided repository and,
+        unless disabled, the process-wide metrics response cache.
+        """
+        yield BalanceService(repository, repository_scope, metrics_cache if CACHE.ENABLED else None)
+
+    @staticmethod
+    def async_balance_service(repository=Depends(RepositoryFactory.async_balance_repository)):
+        """Provide an instance of AsyncBalanceService.
+
+        Args:repository (AsyncBalanceRepository): An instance of AsyncBalanceRepository, injected via FastAPI's Depends.
+
+        Yields:AsyncBalanceService: An instance of AsyncBalanceService initialized with the provided repository and,
+        unless disabled, the process-wide metrics response cache.
+        """
+        yield AsyncBalanceService(repository, metrics_cache if CACHE.ENABLED else None)
+
+    @staticmethod
+    def read_balance_service(
+        repository=Depends(RepositoryFactory.read_balance_repository),
+        repository_scope=Depends(RepositoryFactory.read_balance_repository_scope),
+    ):
+        """Provide an instance of BalanceService for reads, on the read replica.
+
+        Args:repository (BalanceRepository): A read-only BalanceRepository, injected via FastAPI's Depends.
+        repository_scope (Callable | None): Factory of read-only repositories on separate sessions, for concurrent queries.
+
+        Yields:BalanceService: An instance of BalanceService without the metrics cache: a lagging replica would
+        store outdated responses under the current period versions.
+        """
+        yield BalanceService(repository, repository_scope)
+
+    @staticmethod
+    def async_read_balance_service(repository=Depends(RepositoryFactory.async_read_balance_repository)):
+        """Provide an instance of AsyncBalanceService for reads, on the read replica.
 
-        Yields:BalanceService: An instance of BalanceService initialized with the provided repository.
+        Args:repository (AsyncBalanceRepository): A read-only AsyncBalanceRepository, injected via FastAPI's Depends.
+
+        Yields:AsyncBalanceService: An instance of AsyncBalanceService without the metrics cache: a lagging replica
+        would store outdated responses under the current period versions.
         """
-        yield BalanceService(repository)
+        yield AsyncBalanceService(repository)
 
     @staticmethod
     def insurance_service(repository=Depends(RepositoryFactory.insurance_repository)):
@@ -78,6 +146,26 @@ class ServiceFactory:
         """
         yield CarService(repository)
 
+    @staticmethod
+    def async_car_service(repository=Depends(RepositoryFactory.async_car_repository)):
+        """Provide an instance of AsyncCarService.
+
+        Args:repository (AsyncCarRepository): An instance of AsyncCarRepository, injected via FastAPI's Depends.
+
+        Yields:AsyncCarService: An instance of AsyncCarService initialized with the provided repository.
+        """
+        yield AsyncCarService(repository)
+
+    @staticmethod
+    def async_read_car_service(repository=Depends(RepositoryFactory.async_read_car_repository)):
+        """Provide an instance of AsyncCarService for reads, on the read replica.
+
+        Args:repository (AsyncCarRepository): A read-only AsyncCarRepository, injected via FastAPI's Depends.
+
+        Yields:AsyncCarService: An instance of AsyncCarService initialized with the provided repository.
+        """
+        yield AsyncCarService(repository)
+
     @staticmethod
     def document_service(repository=Depends(RepositoryFactory.document_repository)):
         """Provide an instance of DocumentService.
@@ -45,3 +45,32 @@ class TransactionStatus(StrEnum):
     PENDING = "PENDING"
     CONFIRMED = "CONFIRMED"
     REJECTED = "REJECTED"
+
+
+class MetricsRecalcMode(StrEnum):
+    """Enum for how transaction metrics are recalculated after a flush."""
+
+    SYNC = "sync"
+    OUTBOX = "outbox"
+    DELTA = "delta"
+
+
+class ImportFormat(StrEnum):
+    """Enum for bulk transaction import body formats."""
+
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+
+class ImportRowStatus(StrEnum):
+    """Enum for the outcome of a bulk import row."""
+
+    CREATED = "created"
+    FAILED = "failed"
+
+
+class AuthorizationResultStatus(StrEnum):
+    """Per-reference outcome of a batch authorization."""
+
+    UPDATED = "updated"
+    FAILED = "failed"
@@ -1,5 +1,7 @@
 from fastapi import HTTPException, status
 
+from app.utils.etag import METRICS_CACHE_CONTROL
+
 
 class TransactionNotFoundException(HTTPException):
     """Exception raised when a transaction is not found."""
@@ -91,3 +93,38 @@ class TransactionDeleteForbiddenException(HTTPException):
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Admins can only delete REJECTED transactions",
         )
+
+
+class UnsupportedImportFormatException(HTTPException):
+    """415 - Bulk import body is neither NDJSON nor CSV."""
+
+    def __init__(self):
+        """Exception raised when the import content type is not supported."""
+        super().__init__(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Bulk import accepts 'application/x-ndjson' or 'text/csv' bodies",
+        )
+
+
+class InvalidCursorException(HTTPException):
+    """Invalid pagination cursor error."""
+
+    def __init__(self):
+        """Exception raised when an `after` token is malformed or was issued for another sort."""
+
+        super().__init__(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor",
+        )
+
+
+class NotModifiedException(HTTPException):
+    """The client's cached response is still current."""
+
+    def __init__(self, etag: str):
+        """Answer a conditional request with 304 and the unchanged ETag."""
+
+        super().__init__(
+            status_code=status.HTTP_304_NOT_MODIFIED,
+            headers={"ETag": etag, "Cache-Control": METRICS_CACHE_CONTROL},
+        )
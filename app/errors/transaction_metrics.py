@@ -35,3 +35,15 @@ class InvalidMetricsPeriodException(HTTPException):
                 "Valid periods are 'week', 'month', or 'year', with their corresponding parameters."
             ),
         )
+
+
+class InvalidMetricsRangeException(HTTPException):
+    """Invalid date range for metrics."""
+
+    def __init__(self, max_days: int):
+        """Exception raised when the range is inverted or longer than the allowed number of days."""
+
+        super().__init__(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid metrics range. 'start' must not be after 'end' and the range must span at most {max_days} days.",
+        )
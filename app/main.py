@@ -4,19 +4,18 @@ from mangum import Mangum
 
 import app.auth.core
 import app.database.events
-from app.config import CORS_ORIGINS, DEBUG, ENVIRONMENT, AppConfig
+from app.config import CORS_ORIGINS, DEBUG, ENVIRONMENT, METRICS, QUERIES, SERVERLESS, AppConfig
 from app.database.core import test_connection
-from app.routers import (
-    associate_router,
-    auth_router,
-    balance_router,
-    car_router,
-    document_router,
-    health_router,
-    image_router,
-    insurance_router,
-    user_router,
-)
+from app.database.metrics_worker import MetricsOutboxWorker
+from app.database.query_stats import QUERY_COUNT_HEADER, QUERY_TIME_HEADER, instrument_queries
+from app.database.replica import pin_primary_after_writes
+from app.database.session import SessionLocal
+from app.routers import ROUTER_GROUPS, health_router, load_router
+from app.routers.lazy import LazyRouterMiddleware
+
+API_PREFIX = "/pegazzo"
+
+metrics_worker = MetricsOutboxWorker(SessionLocal)
 
 app = FastAPI(
     debug=DEBUG,
@@ -33,6 +32,7 @@ if ENVIRONMENT != "LOCAL":
         allow_credentials=True,
         allow_methods=["GET", "POST", "PUT", "PATCH", "DELETE"],
         allow_headers=["*"],
+        expose_headers=[QUERY_COUNT_HEADER, QUERY_TIME_HEADER],
     )
 else:
     app.add_middleware(
@@ -41,8 +41,16 @@ else:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=[QUERY_COUNT_HEADER, QUERY_TIME_HEADER],
     )
 
+# Keeps a client's reads on the primary right after it writes, while the replica catches up
+app.middleware("http")(pin_primary_after_writes)
+
+# Counts the SQL statements of each request and reports its repeated and slow ones
+if QUERIES.ENABLED:
+    app.middleware("http")(instrument_queries)
+
 
 @app.get("/", tags=["Root"])
 def root():
@@ -53,21 +61,31 @@ def root():
 @app.on_event("startup")
 def on_startup():
     """Startup event handler."""
-    test_connection()
+    # A serverless container learns about an unreachable database from its first query instead
+    if not SERVERLESS.ENABLED:
+        test_connection()
+    # Bulk imports queue their periods in the outbox in every recalculation mode
+    if METRICS.WORKER_ENABLED:
+        metrics_worker.start()
+
+
+@app.on_event("shutdown")
+def on_shutdown():
+    """Shutdown event handler."""
+    metrics_worker.stop()
 
 
 # * ROUTERS * #
 
 app.include_router(health_router)
-app.include_router(auth_router, prefix="/pegazzo")
-app.include_router(user_router, prefix="/pegazzo")
-app.include_router(balance_router, prefix="/pegazzo")
-app.include_router(insurance_router, prefix="/pegazzo")
-app.include_router(associate_router, prefix="/pegazzo")
-app.include_router(car_router, prefix="/pegazzo")
-app.include_router(document_router, prefix="/pegazzo")
-app.include_router(image_router, prefix="/pegazzo")
+if SERVERLESS.ENABLED:
+    app.middleware("http")(LazyRouterMiddleware(app, API_PREFIX))
+else:
+    for names in ROUTER_GROUPS.values():
+        for name in names:
+            app.include_router(load_router(name), prefix=API_PREFIX)
 
 # * HANDLERS * #
 
-handler = Mangum(app)
+# Serverless skips the lifespan, which Mangum would run around every invocation
+handler = Mangum(app, lifespan="off" if SERVERLESS.ENABLED else "auto")
@@ -14,11 +14,13 @@ from .driver import (
 )
 from .event import Event, Scheduler, event_document_table
 from .incidence import Incidence, incidence_document_table
+from .transaction_metrics import CarMetrics, TransactionDailyRollup, TransactionMetrics, TransactionMetricsOutbox
 from .users import Permission, Role, User, role_permission_table
 
 __all__ = [
     "Associate",
     "Car",
+    "CarMetrics",
     "Contract",
     "Document",
     "Driver",
@@ -31,6 +33,9 @@ __all__ = [
     "Role",
     "Scheduler",
     "Transaction",
+    "TransactionDailyRollup",
+    "TransactionMetrics",
+    "TransactionMetricsOutbox",
     "User",
     "associate_car",
     "car_document_table",
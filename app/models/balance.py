@@ -1,9 +1,11 @@
-from sqlalchemy import Column, ForeignKey, Index, Numeric, String
+from sqlalchemy import Column, ForeignKey, Index, Numeric, Sequence, String
 from sqlalchemy.sql import func
 from sqlalchemy.types import DateTime
 
 from app.database.base import Base
 
+TRANSACTION_REFERENCE_BLOCK_SEQ = Sequence("transaction_reference_block_seq", metadata=Base.metadata)
+
 
 class Transaction(Base):
     """transaction model class."""
@@ -19,4 +21,26 @@ class Transaction(Base):
     category = Column(String(100), nullable=True)
     car_id = Column(String(15), ForeignKey("car.id"), nullable=True)
 
-    __table_args__ = (Index("ix_transaction_date", "date"),)
+    __table_args__ = (
+        Index("ix_transaction_date", "date"),
+        # Daily rollup refresh/rebuild: CONFIRMED rows of a date range, grouped by type and payment method
+        Index(
+            "ix_transaction_confirmed_date",
+            "date",
+            postgresql_include=["type", "payment_method", "category", "amount"],
+            postgresql_where=(status == "CONFIRMED"),
+            sqlite_where=(status == "CONFIRMED"),
+        ),
+        # Car metrics: CONFIRMED rows of one car in a date range
+        Index(
+            "ix_transaction_car_confirmed_date",
+            "car_id",
+            "date",
+            postgresql_include=["type", "amount"],
+            postgresql_where=(status == "CONFIRMED"),
+            sqlite_where=(status == "CONFIRMED"),
+        ),
+        # Listings and counts filtered by status, ordered by date with the reference tie-breaker
+        Index("ix_transaction_status_date", "status", "date", "reference"),
+        Index("ix_transaction_status_amount", "status", "amount", "reference"),
+    )
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from sqlalchemy import Column, Index, Integer, Numeric, String, UniqueConstraint
+from sqlalchemy import JSON, Column, Date, ForeignKey, Index, Integer, Numeric, String, UniqueConstraint, text
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.sql import func
 from sqlalchemy.types import DateTime
@@ -26,10 +26,17 @@ class TransactionMetrics(Base):
 
     transaction_count = Column(Integer, nullable=False, server_default="0")
 
+    # JSONB on PostgreSQL (GIN-indexed), plain JSON elsewhere so the engine also runs on SQLite
     payment_method_breakdown = Column(
-        JSONB,
+        JSON().with_variant(JSONB(), "postgresql"),
         nullable=False,
-        server_default=func.cast("{}", JSONB),
+        server_default=text("'{}'"),
+    )
+
+    category_breakdown = Column(
+        JSON().with_variant(JSONB(), "postgresql"),
+        nullable=False,
+        server_default=text("'{}'"),
     )
 
     weekly_average_income = Column(Numeric(12, 2), nullable=False, server_default="0")
@@ -54,6 +61,7 @@ class TransactionMetrics(Base):
             "week",
             unique=True,
             postgresql_where=(period_type == "week"),
+            sqlite_where=(period_type == "week"),
         ),
         Index(
             "uq_transaction_metrics_month",
@@ -61,11 +69,123 @@ class TransactionMetrics(Base):
             "month",
             unique=True,
             postgresql_where=(period_type == "month"),
+            sqlite_where=(period_type == "month"),
         ),
         Index(
             "uq_transaction_metrics_year",
             "year",
             unique=True,
             postgresql_where=(period_type == "year"),
+            sqlite_where=(period_type == "year"),
+        ),
+    )
+
+
+class TransactionMetricsOutbox(Base):
+    """Periods pending metrics recalculation, written in the same DB transaction as the change.
+
+    Entries with a `car_id` queue the car_metrics row of that car instead of the fleet-wide one.
+    """
+
+    __tablename__ = "transaction_metrics_outbox"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+
+    car_id = Column(String(15), nullable=True)
+
+    period_type = Column(String(10), nullable=False)
+    week = Column(Integer, nullable=True)
+    month = Column(Integer, nullable=True)
+    year = Column(Integer, nullable=False)
+
+    attempts = Column(Integer, nullable=False, server_default="0")
+
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+
+class TransactionDailyRollup(Base):
+    """CONFIRMED transaction totals per UTC day, type, payment method and category.
+
+    This is the only aggregation over the raw transaction table; week, month and year metrics are
+    summed from these buckets through the denormalized calendar columns.
+    """
+
+    __tablename__ = "transaction_daily_rollup"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+
+    day = Column(Date, nullable=False)
+    year = Column(Integer, nullable=False)
+    month = Column(Integer, nullable=False)
+    iso_year = Column(Integer, nullable=False)
+    iso_week = Column(Integer, nullable=False)
+
+    type = Column(String(10), nullable=False)
+    payment_method = Column(String(50), nullable=False)
+    # Transactions without a category are bucketed under app.utils.metrics.UNCATEGORIZED
+    category = Column(String(100), nullable=False)
+
+    total_amount = Column(Numeric(14, 2), nullable=False, server_default="0")
+    transaction_count = Column(Integer, nullable=False, server_default="0")
+
+    updated_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        UniqueConstraint("day", "type", "payment_method", "category", name="uq_transaction_daily_rollup_bucket"),
+        Index("ix_transaction_daily_rollup_year_month", "year", "month"),
+        Index("ix_transaction_daily_rollup_iso_week", "iso_year", "iso_week"),
+    )
+
+
+class CarMetrics(Base):
+    """Pre-calculated CONFIRMED transaction totals per car and period."""
+
+    __tablename__ = "car_metrics"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+
+    car_id = Column(String(15), ForeignKey("car.id", ondelete="CASCADE"), nullable=False)
+
+    period_type = Column(String(10), nullable=False)
+    week = Column(Integer, nullable=True)
+    month = Column(Integer, nullable=True)
+    year = Column(Integer, nullable=False)
+
+    total_income = Column(Numeric(12, 2), nullable=False, server_default="0")
+    total_expense = Column(Numeric(12, 2), nullable=False, server_default="0")
+    balance = Column(Numeric(12, 2), nullable=False, server_default="0")
+
+    transaction_count = Column(Integer, nullable=False, server_default="0")
+
+    updated_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        # Fleet ranking: every car of one period, already ordered by balance
+        Index("ix_car_metrics_ranking", "period_type", "year", "month", "week", "balance"),
+        Index(
+            "uq_car_metrics_week",
+            "car_id",
+            "year",
+            "week",
+            unique=True,
+            postgresql_where=(period_type == "week"),
+            sqlite_where=(period_type == "week"),
+        ),
+        Index(
+            "uq_car_metrics_month",
+            "car_id",
+            "year",
+            "month",
+            unique=True,
+            postgresql_where=(period_type == "month"),
+            sqlite_where=(period_type == "month"),
+        ),
+        Index(
+            "uq_car_metrics_year",
+            "car_id",
+            "year",
+            unique=True,
+            postgresql_where=(period_type == "year"),
+            sqlite_where=(period_type == "year"),
         ),
     )
@@ -1,9 +1,20 @@
 from .associate import AssociateRepository
-from .balance import BalanceRepository
-from .car import CarRepository
+from .balance import AsyncBalanceRepository, BalanceRepository
+from .car import AsyncCarRepository, CarRepository
 from .document import DocumentRepository
 from .image import ImageRepository
 from .insurance import InsuranceRepository
-from .user import UserRepository
+from .user import AsyncUserRepository, UserRepository
 
-__all__ = ["AssociateRepository", "BalanceRepository", "CarRepository", "DocumentRepository", "ImageRepository", "InsuranceRepository", "UserRepository"]
+__all__ = [
+    "AssociateRepository",
+    "AsyncBalanceRepository",
+    "AsyncCarRepository",
+    "AsyncUserRepository",
+    "BalanceRepository",
+    "CarRepository",
+    "DocumentRepository",
+    "ImageRepository",
+    "InsuranceRepository",
+    "UserRepository",
+]
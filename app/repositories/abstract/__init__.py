@@ -1,3 +1,4 @@
+from .async_db_repository import AsyncDBRepository
 from .db_repository import DBRepository
 
-__all__ = ["DBRepository"]
+__all__ = ["AsyncDBRepository", "DBRepository"]
@@ -0,0 +1,35 @@
+from abc import ABC
+from collections.abc import Callable
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from .db_repository import DBRepository
+
+
+class AsyncDBRepository[R: DBRepository](ABC):
+    """Abstract base class for repositories on an `AsyncSession`.
+
+    Subclasses name the sync repository they wrap in `repository_class`. Its queries run through
+    `run`, on the session's underlying `Session` inside SQLAlchemy's greenlet bridge: every round-trip
+    is awaited on the asyncio driver instead of pinning a threadpool thread, and the `Session` event
+    hooks (metrics recalculation, cache invalidation) fire exactly as on the sync path.
+    """
+
+    repository_class: type[R]
+
+    def __init__(self, db_session: AsyncSession):
+        """Initialize the repository with an async database session."""
+        self.db = db_session
+
+    async def run[T](self, call: Callable[[R], T]) -> T:
+        """Await `call` with the sync repository bound to this session's underlying `Session`.
+
+        Lazy loads and flushes inside `call` are awaited too; ORM objects it returns must not lazy load
+        afterwards, so anything the caller reads later has to be loaded inside it.
+        """
+
+        def bound(session: Session) -> T:
+            return call(self.repository_class(session))
+
+        return await self.db.run_sync(bound)
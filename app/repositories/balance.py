@@ -1,20 +1,49 @@
-from datetime import datetime
+from collections.abc import Iterable
+from datetime import date, datetime
+from itertools import count
+from secrets import randbelow
+from typing import Any
 
-from sqlalchemy import tuple_
+from sqlalchemy import and_, case, func, or_, select, text, tuple_
+from sqlalchemy.orm import Query
 
-from app.enum.balance import PeriodType, SortOrder, TransactionSortBy
+from app.config import REFERENCES
+from app.database.upsert import insert_missing
+from app.enum.balance import PeriodType, SortOrder, TransactionSortBy, TransactionStatus
 from app.errors.database import DBOperationError
-from app.models.balance import Transaction
-from app.models.transaction_metrics import TransactionMetrics
+from app.errors.transaction_metrics import TransactionMetricsPeriodError
+from app.models.balance import TRANSACTION_REFERENCE_BLOCK_SEQ, Transaction
+from app.models.transaction_metrics import TransactionDailyRollup, TransactionMetrics
+from app.schemas.dto.pagination import TransactionCursor
+from app.schemas.dto.periods import PeriodRawMetrics
+from app.utils.dates import utc_date
 from app.utils.logging_config import logger
-from app.utils.periods import PeriodKey
+from app.utils.metrics import raw_metrics_from_rows
+from app.utils.periods import PeriodKey, get_affected_periods
+from app.utils.reference import SEQUENCE_MODULUS
 
-from .abstract import DBRepository
+from .abstract import AsyncDBRepository, DBRepository
+from .transaction_metrics import TransactionMetricsRepository
+
+# Without a database sequence each process starts at a random block, so processes running side by side
+# and restarts within the same second do not hand out the same references
+_local_reference_blocks = count(randbelow(SEQUENCE_MODULUS // REFERENCES.BLOCK_SIZE))
 
 
 class BalanceRepository(DBRepository):
     """Balance repository class."""
 
+    def reserve_reference_block(self) -> int:
+        """Reserve the next block of reference sequence numbers.
+
+        Uses the `transaction_reference_block_seq` sequence on PostgreSQL, so blocks are unique across
+        processes. Other dialects (local SQLite) fall back to a per-process counter seeded at a random block.
+        """
+        if self.db.get_bind().dialect.name != "postgresql":
+            return next(_local_reference_blocks)
+
+        return self.db.scalar(select(TRANSACTION_REFERENCE_BLOCK_SEQ.next_value()))
+
     def create_transaction(self, transaction: Transaction):
         """Create a new transaction."""
         try:
@@ -33,10 +62,61 @@ class BalanceRepository(DBRepository):
 
         return transaction
 
+    def bulk_create_transactions(self, rows: list[dict]) -> set[str]:
+        """Insert transactions with batched multi-row INSERTs and return the references that were created.
+
+        Rows whose reference already exists are skipped instead of failing the whole batch. For the rows
+        created as CONFIRMED, the daily rollups are refreshed and the affected periods are queued in the
+        metrics outbox in the same transaction, once per distinct day and period.
+        """
+        if not rows:
+            return set()
+
+        try:
+            created = insert_missing(self.db, Transaction, rows, key="reference")
+
+            confirmed = [r["date"] for r in rows if r["reference"] in created and r["status"] == TransactionStatus.CONFIRMED]
+            if confirmed:
+                metrics_repo = TransactionMetricsRepository(self.db)
+                metrics_repo.refresh_days({utc_date(dt) for dt in confirmed})
+                metrics_repo.enqueue_periods({key for dt in confirmed for key in get_affected_periods(dt)})
+
+            self.db.commit()
+        except Exception as ex:
+            self.db.rollback()
+            logger.error("Error bulk creating %d transactions due to: %s", len(rows), ex, exc_info=True)
+            raise DBOperationError("Error creating transactions in the database") from ex
+
+        return created
+
     def get_by_reference(self, reference: str):
         """Retrieve a transaction by their reference."""
         return self.db.query(Transaction).filter(Transaction.reference == reference).first()
 
+    def get_by_references(self, references: list[str]) -> list[Transaction]:
+        """Retrieve the transactions matching any of the given references with a single query."""
+        if not references:
+            return []
+
+        return list(self.db.scalars(select(Transaction).where(Transaction.reference.in_(references))))
+
+    def update_transactions(self, transactions: list[Transaction]) -> list[Transaction]:
+        """Persist changes to many transactions with a single flush and commit."""
+
+        try:
+            self.db.commit()
+        except Exception as ex:
+            self.db.rollback()
+            logger.error(
+                "Error updating %d transactions due to: %s",
+                len(transactions),
+                ex,
+                exc_info=True,
+            )
+            raise DBOperationError("Error updating transactions in the database") from ex
+
+        return transactions
+
     def delete_transaction(self, transaction: Transaction):
         """Delete a transaction."""
         try:
@@ -100,6 +180,36 @@ class BalanceRepository(DBRepository):
 
         return q.first()
 
+    def get_metrics_by_keys(self, keys: Iterable[PeriodKey]) -> dict[PeriodKey, TransactionMetrics]:
+        """Get the stored metrics of a small set of period keys, of any mix of period types, in one query.
+
+        Each period type becomes one branch shaped like its `uq_transaction_metrics_*` partial unique
+        index, so the planner can OR index scans together. Keys without a stored row are left out.
+        """
+
+        branches = _metrics_key_branches(keys)
+        if not branches:
+            return {}
+
+        rows = self.db.scalars(select(TransactionMetrics).where(or_(*branches))).all()
+        return {PeriodKey(r.period_type, r.year, r.month, r.week): r for r in rows}
+
+    def get_metrics_validator(self, keys: list[PeriodKey]) -> tuple[datetime | None, int]:
+        """Get the latest `updated_at` and the number of transaction_metrics rows stored for `keys`.
+
+        Reads two narrow columns of at most one row per key, so it is cheap enough to run before every
+        conditional request.
+        """
+
+        if not keys:
+            return None, 0
+
+        # Week keys may carry the month they were requested in; stored week rows have none
+        updated_at, rows = self.db.execute(
+            select(func.max(TransactionMetrics.updated_at), func.count()).where(or_(*_metrics_key_branches(keys))),
+        ).one()
+        return updated_at, rows
+
     def get_metrics_for_keys(
         self,
         period_type: PeriodType,
@@ -130,6 +240,39 @@ class BalanceRepository(DBRepository):
 
         return q.all()
 
+    def get_range_metrics(
+        self,
+        start: date,
+        end: date,
+        previous_start: date,
+    ) -> tuple[PeriodRawMetrics, PeriodRawMetrics]:
+        """Sum the daily rollups of [start, end] and of [previous_start, start) in a single query."""
+        is_current = case((TransactionDailyRollup.day >= start, True), else_=False).label("is_current")
+
+        stmt = (
+            select(
+                is_current,
+                TransactionDailyRollup.type,
+                TransactionDailyRollup.payment_method,
+                TransactionDailyRollup.category,
+                func.sum(TransactionDailyRollup.total_amount).label("amount"),
+                func.sum(TransactionDailyRollup.transaction_count).label("tx_count"),
+            )
+            .where(TransactionDailyRollup.day >= previous_start, TransactionDailyRollup.day <= end)
+            .group_by(
+                is_current,
+                TransactionDailyRollup.type,
+                TransactionDailyRollup.payment_method,
+                TransactionDailyRollup.category,
+            )
+        )
+        rows = self.db.execute(stmt).all()
+
+        return (
+            raw_metrics_from_rows(r for r in rows if r.is_current),
+            raw_metrics_from_rows(r for r in rows if not r.is_current),
+        )
+
     def count_transactions_in_range(
         self,
         start_dt: datetime,
@@ -142,6 +285,29 @@ class BalanceRepository(DBRepository):
             q = q.filter(Transaction.status == status)
         return q.count()
 
+    def estimate_transactions_in_range(
+        self,
+        start_dt: datetime,
+        end_dt: datetime,
+        status: str | None = None,
+    ) -> int:
+        """Estimate the transactions in a given date range from the PostgreSQL planner statistics.
+
+        Costs a plan instead of a scan; other dialects fall back to an exact count.
+        """
+        bind = self.db.get_bind()
+        if bind.dialect.name != "postgresql":
+            return self.count_transactions_in_range(start_dt=start_dt, end_dt=end_dt, status=status)
+
+        stmt = select(Transaction.reference).where(Transaction.date >= start_dt, Transaction.date <= end_dt)
+        if status is not None:
+            stmt = stmt.where(Transaction.status == status)
+
+        # Bound values are inlined: driver-level params follow each driver's paramstyle (asyncpg's is positional)
+        compiled = stmt.compile(dialect=bind.dialect, compile_kwargs={"literal_binds": True})
+        plan = self.db.execute(text(f"EXPLAIN (FORMAT JSON) {compiled}")).scalar()
+        return int(plan[0]["Plan"]["Plan Rows"])
+
     def list_transactions_in_range(
         self,
         start_dt: datetime,
@@ -151,9 +317,68 @@ class BalanceRepository(DBRepository):
         sort_by: TransactionSortBy,
         sort_order: SortOrder,
         status: str | None = None,
+        after: TransactionCursor | None = None,
     ) -> list[Transaction]:
-        """List transactions in a given date range."""
-        q = self.db.query(Transaction).filter(Transaction.date >= start_dt, Transaction.date <= end_dt)
+        """List transactions in a given date range.
+
+        Rows are ordered by the sort column with the reference as tie-breaker. When `after` is given,
+        the page starts right after that keyset position (seek) instead of skipping `offset` rows.
+        """
+        q = self._transactions_in_range_query(
+            self.db.query(Transaction),
+            start_dt,
+            end_dt,
+            sort_by,
+            sort_order,
+            status,
+            after,
+        )
+
+        return q.offset(offset).limit(limit).all()
+
+    def list_transactions_page(
+        self,
+        start_dt: datetime,
+        end_dt: datetime,
+        limit: int,
+        offset: int,
+        sort_by: TransactionSortBy,
+        sort_order: SortOrder,
+        status: str | None = None,
+    ) -> tuple[list[Transaction], int]:
+        """List a page of transactions together with the total of matching rows in one statement.
+
+        The total comes from `COUNT(*) OVER()`; only a page past the end, which has no rows to carry
+        it, needs a separate count.
+        """
+        q = self._transactions_in_range_query(
+            self.db.query(Transaction, func.count().over().label("total")),
+            start_dt,
+            end_dt,
+            sort_by,
+            sort_order,
+            status,
+        )
+        rows = q.offset(offset).limit(limit).all()
+
+        if rows:
+            return [row.Transaction for row in rows], rows[0].total
+        if offset == 0:
+            return [], 0
+        return [], self.count_transactions_in_range(start_dt=start_dt, end_dt=end_dt, status=status)
+
+    @staticmethod
+    def _transactions_in_range_query(
+        q: Query,
+        start_dt: datetime,
+        end_dt: datetime,
+        sort_by: TransactionSortBy,
+        sort_order: SortOrder,
+        status: str | None = None,
+        after: TransactionCursor | None = None,
+    ) -> Query:
+        """Apply the range, status, keyset and ordering of the transaction listings to `q`."""
+        q = q.filter(Transaction.date >= start_dt, Transaction.date <= end_dt)
 
         if status is not None:
             q = q.filter(Transaction.status == status)
@@ -164,7 +389,44 @@ class BalanceRepository(DBRepository):
             TransactionSortBy.REFERENCE: Transaction.reference,
         }
         col = sort_column_map.get(sort_by, Transaction.date)
+        ascending = sort_order == SortOrder.ASC
 
-        q = q.order_by(col.asc()) if sort_order == SortOrder.ASC else q.order_by(col.desc())
+        if after is not None:
+            if col is Transaction.reference:
+                position, bound = Transaction.reference, after.reference
+            else:
+                position, bound = tuple_(col, Transaction.reference), tuple_(after.value, after.reference)
+            q = q.filter(position > bound if ascending else position < bound)
 
-        return q.offset(offset).limit(limit).all()
+        order = [col] if col is Transaction.reference else [col, Transaction.reference]
+        return q.order_by(*(c.asc() if ascending else c.desc() for c in order))
+
+
+class AsyncBalanceRepository(AsyncDBRepository[BalanceRepository]):
+    """Balance repository on an async database session."""
+
+    repository_class = BalanceRepository
+
+
+def _metrics_key_branches(keys: Iterable[PeriodKey]) -> list[Any]:
+    """Build one condition per period type, shaped like its `uq_transaction_metrics_*` partial unique index."""
+
+    by_type: dict[str, set[PeriodKey]] = {}
+    for key in keys:
+        by_type.setdefault(key.period_type, set()).add(key)
+
+    branches = []
+    for period_type, type_keys in by_type.items():
+        is_type = TransactionMetrics.period_type == period_type
+        match period_type:
+            case PeriodType.YEAR:
+                branches.append(and_(is_type, TransactionMetrics.year.in_({k.year for k in type_keys})))
+            case PeriodType.MONTH:
+                pairs = {(k.year, k.month) for k in type_keys if k.month is not None}
+                branches.append(and_(is_type, tuple_(TransactionMetrics.year, TransactionMetrics.month).in_(pairs)))
+            case PeriodType.WEEK:
+                pairs = {(k.year, k.week) for k in type_keys if k.week is not None}
+                branches.append(and_(is_type, tuple_(TransactionMetrics.year, TransactionMetrics.week).in_(pairs)))
+            case _:
+                raise TransactionMetricsPeriodError.unknown_period_type(period_type)
+    return branches
@@ -1,16 +1,21 @@
+from collections.abc import Iterable
 from datetime import UTC, datetime
+from typing import Any
 
-from sqlalchemy import or_
+from sqlalchemy import and_, or_, select
 
-from app.enum.balance import SortOrder
+from app.enum.balance import PeriodType, SortOrder
 from app.enum.crm import CarSortBy, CarStatus
 from app.errors.database import DBOperationError
+from app.errors.transaction_metrics import TransactionMetricsPeriodError
 from app.models.car import Associate, Car, Insurance, car_document_table
 from app.models.contract import Contract
 from app.models.document import Document
+from app.models.transaction_metrics import CarMetrics
+from app.schemas.dto.periods import PeriodKey
 from app.utils.logging_config import logger
 
-from .abstract import DBRepository
+from .abstract import AsyncDBRepository, DBRepository
 
 _CAR_SORT_COLUMNS = {
     CarSortBy.MAKE: Car.make,
@@ -115,3 +120,50 @@ class CarRepository(DBRepository):
             )
             .first()
         )
+
+    def get_car_metrics_by_keys(self, car_id: str, keys: Iterable[PeriodKey]) -> dict[PeriodKey, CarMetrics]:
+        """Return the stored car_metrics rows of a car for the given periods; periods without a row are left out."""
+        conditions = [_car_period_condition(key) for key in keys]
+        if not conditions:
+            return {}
+
+        rows = self.db.scalars(select(CarMetrics).where(CarMetrics.car_id == car_id, or_(*conditions))).all()
+        return {PeriodKey(r.period_type, r.year, r.month, r.week): r for r in rows}
+
+    def rank_cars_by_balance(self, key: PeriodKey, limit: int, sort_order: SortOrder) -> list[Any]:
+        """Return the cars with a car_metrics row in the period, ordered by balance, with their plate, make and model.
+
+        Served by `ix_car_metrics_ranking`: one index range scan already in balance order.
+        """
+        order = CarMetrics.balance.desc() if sort_order == SortOrder.DESC else CarMetrics.balance.asc()
+        stmt = (
+            select(CarMetrics, Car.plate, Car.make, Car.model)
+            .join(Car, Car.id == CarMetrics.car_id)
+            .where(_car_period_condition(key))
+            .order_by(order, CarMetrics.car_id)
+            .limit(limit)
+        )
+        return list(self.db.execute(stmt).all())
+
+
+class AsyncCarRepository(AsyncDBRepository[CarRepository]):
+    """Car repository on an async database session."""
+
+    repository_class = CarRepository
+
+
+def _car_period_condition(key: PeriodKey) -> Any:
+    """Match the car_metrics rows of one period by the columns its period type stores.
+
+    The unused month/week columns are pinned to NULL so `ix_car_metrics_ranking` yields the rows in balance order.
+    """
+    is_type = CarMetrics.period_type == key.period_type
+    match key.period_type:
+        case PeriodType.YEAR:
+            return and_(is_type, CarMetrics.year == key.year, CarMetrics.month.is_(None), CarMetrics.week.is_(None))
+        case PeriodType.MONTH:
+            return and_(is_type, CarMetrics.year == key.year, CarMetrics.month == key.month, CarMetrics.week.is_(None))
+        case PeriodType.WEEK:
+            return and_(is_type, CarMetrics.year == key.year, CarMetrics.month.is_(None), CarMetrics.week == key.week)
+        case _:
+            raise TransactionMetricsPeriodError.unknown_period_type(key.period_type)
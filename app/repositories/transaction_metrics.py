@@ -2,26 +2,63 @@ from __future__ import annotations
 
 import logging
 from collections.abc import Iterable
-from decimal import ROUND_HALF_UP, Decimal
+from datetime import UTC, date, datetime, time
+from decimal import Decimal
+from itertools import batched
 from typing import Any
 
-from sqlalchemy import func, select
-from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy import (
+    Date,
+    Integer,
+    String,
+    cast,
+    column,
+    delete,
+    func,
+    literal,
+    select,
+    tuple_,
+    type_coerce,
+    union_all,
+    update,
+    values,
+)
 
+from app.config import METRICS
+from app.database.upsert import upsert
+from app.enum.balance import MetricsRecalcMode
 from app.enum.balance import Type as TxType
 from app.errors.transaction_metrics import TransactionMetricsPeriodError
 from app.models.balance import Transaction
-from app.models.transaction_metrics import TransactionMetrics
-from app.schemas.dto.periods import PeriodKey, PeriodRawMetrics
-from app.utils.decimal import DEC_2, round_to_2_decimals
-from app.utils.metrics import calculate_income_expense_ratio, calculate_weekly_averages
-from app.utils.paymenth_method import compute_balance_breakdown, format_payment_method_breakdown
-from app.utils.periods import period_bounds_utc, weeks_for_period
+from app.models.transaction_metrics import CarMetrics, TransactionDailyRollup, TransactionMetrics, TransactionMetricsOutbox
+from app.schemas.dto.periods import CarPeriodKey, PeriodKey, PeriodRawMetrics
+from app.utils.cache import ALL_PERIODS, record_changed_periods
+from app.utils.dates import day_bounds_utc, iso_weeks_in_year
+from app.utils.decimal import round_to_2_decimals
+from app.utils.locks import advisory_lock_key
+from app.utils.metrics import UNCATEGORIZED, derive_period_values, merge_raw_metrics, raw_metrics_from_rows
+from app.utils.periods import get_affected_periods, get_period_date_range, weeks_for_period
 
 from .abstract import DBRepository
 
 logger = logging.getLogger(__name__)
 
+REBUILD_BATCH_SIZE = 1000
+
+METRICS_COLUMNS = (
+    "total_income",
+    "total_expense",
+    "balance",
+    "transaction_count",
+    "payment_method_breakdown",
+    "category_breakdown",
+    "weekly_average_income",
+    "weekly_average_expense",
+    "income_expense_ratio",
+)
+
+CAR_METRICS_COLUMNS = ("total_income", "total_expense", "balance", "transaction_count")
+
 
 class TransactionMetricsRepository(DBRepository):
     """Repository for transaction metrics aggregation and persistence."""
@@ -34,7 +71,7 @@ class TransactionMetricsRepository(DBRepository):
         week: int | None = None,
         commit: bool = True,
     ) -> None:
-        """Recalculate metrics for a single period and UPSERT the row."""
+        """Recalculate metrics for a single period from the daily rollups and UPSERT the row."""
 
         key = PeriodKey(
             period_type=period_type,
@@ -43,69 +80,677 @@ class TransactionMetricsRepository(DBRepository):
             week=week,
         )
 
-        start_d, end_d = period_bounds_utc(key)
-
-        base_filter = (
-            Transaction.date >= start_d,
-            Transaction.date <= end_d,
-            Transaction.status == "CONFIRMED",
-        )
+        base_filter = self._rollup_filter(key)
 
         metrics = self._fetch_period_metrics(base_filter)
 
-        balance = (metrics.total_income - metrics.total_expense).quantize(
-            DEC_2,
-            rounding=ROUND_HALF_UP,
+        self._store_period_metrics(key, metrics, commit=commit)
+
+    def recalc_periods(self, keys: Iterable[PeriodKey], commit: bool = True) -> None:
+        """Recalculate several periods from the daily rollups and UPSERT their rows in one batch.
+
+        The periods are joined to the rollups through their day bounds and aggregated in one grouped
+        query; the rows are then written with one multi-row upsert per period type. Periods without
+        CONFIRMED transactions are stored as empty rows, like `recalc_period` does.
+        """
+
+        keys = set(keys)
+        if not keys:
+            return
+
+        periods = self._period_bounds(keys)
+        group_cols = (
+            periods.c.period_type,
+            periods.c.year,
+            periods.c.month,
+            periods.c.week,
+            TransactionDailyRollup.type,
+            TransactionDailyRollup.payment_method,
+            TransactionDailyRollup.category,
+        )
+        stmt = (
+            select(
+                *group_cols,
+                func.coalesce(func.sum(TransactionDailyRollup.total_amount), 0).label("amount"),
+                func.coalesce(func.sum(TransactionDailyRollup.transaction_count), 0).label("tx_count"),
+            )
+            .select_from(
+                periods.outerjoin(
+                    TransactionDailyRollup,
+                    TransactionDailyRollup.day.between(periods.c.start_day, periods.c.end_day),
+                ),
+            )
+            .group_by(*group_cols)
         )
 
-        breakdown = {
-            "credit": format_payment_method_breakdown(metrics.credit_payment_amounts),
-            "debit": format_payment_method_breakdown(metrics.debit_payment_amounts),
-            "balance": compute_balance_breakdown(
-                metrics.credit_payment_amounts,
-                metrics.debit_payment_amounts,
-            ),
-        }
+        try:
+            # Sorted so concurrent flushes upsert overlapping periods in the same order
+            ordered = sorted(keys, key=_period_sort_key)
+            grouped: dict[PeriodKey, list[Any]] = {key: [] for key in ordered}
+            for r in self.db.execute(stmt).all():
+                if r.type is not None:
+                    grouped[PeriodKey(period_type=r.period_type, year=r.year, month=r.month, week=r.week)].append(r)
+
+            rows_by_type: dict[str, list[dict[str, Any]]] = {}
+            for key, bucket_rows in grouped.items():
+                rows_by_type.setdefault(key.period_type, []).append(self._metrics_row(key, raw_metrics_from_rows(bucket_rows)))
 
-        weeks = weeks_for_period(period_type, year, month)
+            for period_type, rows in sorted(rows_by_type.items()):
+                self._upsert_metrics_rows(period_type, rows)
 
-        weekly_avg_income, weekly_avg_expense = calculate_weekly_averages(
-            total_income=metrics.total_income,
-            total_expense=metrics.total_expense,
-            weeks=weeks,
+            if commit:
+                self.db.commit()
+        except Exception:
+            self.db.rollback()
+            logger.exception("Failed recalculating metrics for %d periods", len(keys))
+            raise
+
+    def apply_period_delta(self, key: PeriodKey, delta: PeriodRawMetrics, commit: bool = True) -> None:
+        """Apply a signed delta to the stored metrics of a period and UPSERT the row.
+
+        Derived fields are recomputed from the updated totals. When the period has no stored row
+        yet, the period is fully recalculated instead, since a missing row does not prove it is empty.
+        """
+
+        current = self._get_stored_raw_metrics(key)
+        if current is None:
+            # Concurrent first writers of a period would each upsert a full recalculation from their
+            # own snapshot; serialize them so the later one sees the committed row and applies its delta.
+            self._advisory_xact_lock(*_period_lock_parts(key))
+            current = self._get_stored_raw_metrics(key)
+
+        if current is None:
+            self.recalc_period(
+                period_type=key.period_type,
+                year=key.year,
+                month=key.month,
+                week=key.week,
+                commit=commit,
+            )
+            return
+
+        self._store_period_metrics(key, merge_raw_metrics(current, delta), commit=commit)
+
+    def _advisory_xact_lock(self, *parts: object) -> None:
+        """Take a transaction-scoped advisory lock on PostgreSQL; other dialects rely on their own locking."""
+        if self.db.get_bind().dialect.name != "postgresql":
+            return
+        self.db.execute(select(func.pg_advisory_xact_lock(advisory_lock_key(*parts))))
+
+    def try_lock_periods(self, keys: Iterable[PeriodKey]) -> tuple[list[PeriodKey], list[PeriodKey]]:
+        """Try to take the transaction-scoped advisory lock of each period without waiting.
+
+        Returns the periods now locked by this transaction and the ones another transaction holds,
+        i.e. is already recalculating. All the locks are tried in one round-trip; other dialects rely
+        on their own locking, so every period counts as locked there.
+        """
+
+        ordered = sorted(set(keys), key=_period_sort_key)
+        if not ordered or self.db.get_bind().dialect.name != "postgresql":
+            return ordered, []
+
+        acquired = self.db.execute(
+            select(*(func.pg_try_advisory_xact_lock(advisory_lock_key(*_period_lock_parts(k))) for k in ordered)),
+        ).one()
+        locked = [key for key, ok in zip(ordered, acquired, strict=True) if ok]
+        busy = [key for key, ok in zip(ordered, acquired, strict=True) if not ok]
+        return locked, busy
+
+    def try_lock_car_periods(self, keys: Iterable[CarPeriodKey]) -> tuple[list[CarPeriodKey], list[CarPeriodKey]]:
+        """Try to take the transaction-scoped advisory lock of each car period without waiting.
+
+        Like `try_lock_periods`, returns the car periods now locked by this transaction and the ones
+        another transaction holds, trying all the locks in one round-trip.
+        """
+
+        ordered = sorted(set(keys), key=_car_period_sort_key)
+        if not ordered or self.db.get_bind().dialect.name != "postgresql":
+            return ordered, []
+
+        acquired = self.db.execute(
+            select(*(func.pg_try_advisory_xact_lock(advisory_lock_key(*_car_period_lock_parts(k))) for k in ordered)),
+        ).one()
+        locked = [key for key, ok in zip(ordered, acquired, strict=True) if ok]
+        busy = [key for key, ok in zip(ordered, acquired, strict=True) if not ok]
+        return locked, busy
+
+    def _get_stored_raw_metrics(self, key: PeriodKey) -> PeriodRawMetrics | None:
+        stmt = (
+            select(
+                TransactionMetrics.total_income,
+                TransactionMetrics.total_expense,
+                TransactionMetrics.transaction_count,
+                TransactionMetrics.payment_method_breakdown,
+                TransactionMetrics.category_breakdown,
+            )
+            .where(*self._period_filter(key))
+            .with_for_update()
         )
+        row = self.db.execute(stmt).first()
+        if row is None:
+            return None
 
-        ratio = calculate_income_expense_ratio(
-            metrics.total_income,
-            metrics.total_expense,
+        breakdown = row.payment_method_breakdown or {}
+        categories = row.category_breakdown or {}
+        return PeriodRawMetrics(
+            total_income=round_to_2_decimals(row.total_income),
+            total_expense=round_to_2_decimals(row.total_expense),
+            transaction_count=int(row.transaction_count or 0),
+            credit_payment_amounts=self._stored_amounts(breakdown, "credit"),
+            debit_payment_amounts=self._stored_amounts(breakdown, "debit"),
+            credit_category_amounts=self._stored_amounts(categories, "credit"),
+            debit_category_amounts=self._stored_amounts(categories, "debit"),
         )
 
+    @staticmethod
+    def _stored_amounts(breakdown: dict[str, Any], side: str) -> dict[str, Decimal]:
+        return {k: round_to_2_decimals(v) for k, v in breakdown.get(side, {}).get("amounts", {}).items()}
+
+    @staticmethod
+    def _period_filter(key: PeriodKey) -> tuple[Any, ...]:
+        match key.period_type:
+            case "week":
+                return (
+                    TransactionMetrics.period_type == "week",
+                    TransactionMetrics.year == key.year,
+                    TransactionMetrics.week == key.week,
+                )
+            case "month":
+                return (
+                    TransactionMetrics.period_type == "month",
+                    TransactionMetrics.year == key.year,
+                    TransactionMetrics.month == key.month,
+                )
+            case "year":
+                return (
+                    TransactionMetrics.period_type == "year",
+                    TransactionMetrics.year == key.year,
+                )
+            case _:
+                raise TransactionMetricsPeriodError.unknown_period_type(key.period_type)
+
+    def _store_period_metrics(self, key: PeriodKey, metrics: PeriodRawMetrics, commit: bool = True) -> None:
+        values = derive_period_values(metrics, weeks_for_period(key.period_type, key.year, key.month))
+
         self._upsert_metrics(
-            period_type=period_type,
-            year=year,
-            month=month,
-            week=week,
-            total_income=metrics.total_income,
-            total_expense=metrics.total_expense,
-            balance=balance,
-            transaction_count=metrics.transaction_count,
-            payment_method_breakdown=breakdown,
-            weekly_average_income=weekly_avg_income,
-            weekly_average_expense=weekly_avg_expense,
-            income_expense_ratio=ratio,
+            period_type=key.period_type,
+            year=key.year,
+            month=key.month,
+            week=key.week,
+            **values,
             commit=commit,
         )
 
-    def _fetch_period_metrics(self, base_filter: Iterable[Any]) -> PeriodRawMetrics:
+    def apply_changes(
+        self,
+        periods: Iterable[PeriodKey],
+        days: Iterable[date],
+        deltas: dict[PeriodKey, PeriodRawMetrics] | None = None,
+        car_periods: Iterable[CarPeriodKey] = (),
+    ) -> None:
+        """Refresh the daily rollups of the changed days and update the affected periods without committing.
+
+        Depending on `METRICS.RECALC_MODE` the periods are recalculated (sync), patched with their
+        signed `deltas` (delta) or queued for the metrics worker (outbox). In sync and delta mode a
+        period whose advisory lock another transaction holds is skipped and queued for the worker
+        instead. Car periods are recalculated in both sync and delta mode, since each one only reads
+        the transactions of a single car, and are skipped and queued the same way when busy.
+        """
+
+        self.refresh_days(days)
+
+        match METRICS.RECALC_MODE:
+            case MetricsRecalcMode.SYNC:
+                locked, busy = self.try_lock_periods(periods)
+                self.recalc_periods(locked, commit=False)
+            case MetricsRecalcMode.DELTA:
+                deltas = deltas or {}
+                locked, busy = self.try_lock_periods(deltas)
+                for key in locked:
+                    self.apply_period_delta(key, deltas[key], commit=False)
+            case _:
+                self.enqueue_periods(set(periods))
+                self.enqueue_car_periods(set(car_periods))
+                return
+
+        locked_cars, busy_cars = self.try_lock_car_periods(car_periods)
+        self.recalc_car_periods(locked_cars, commit=False)
+
+        # Another transaction is recalculating these: instead of queueing behind its row locks, mark
+        # them dirty for the metrics worker, whose full recalculation also covers this change
+        self.enqueue_periods(busy)
+        self.enqueue_car_periods(busy_cars)
+
+    def enqueue_periods(self, keys: Iterable[PeriodKey]) -> None:
+        """Write period keys to the recalculation outbox without committing."""
+
+        rows = [{"period_type": k.period_type, "year": k.year, "month": k.month, "week": k.week} for k in keys]
+        if not rows:
+            return
+
+        self.db.execute(TransactionMetricsOutbox.__table__.insert(), rows)
+
+    def enqueue_car_periods(self, keys: Iterable[CarPeriodKey]) -> None:
+        """Write car period keys to the recalculation outbox without committing."""
+
+        rows = [
+            {
+                "car_id": k.car_id,
+                "period_type": k.period.period_type,
+                "year": k.period.year,
+                "month": k.period.month,
+                "week": k.period.week,
+            }
+            for k in keys
+        ]
+        if not rows:
+            return
+
+        self.db.execute(TransactionMetricsOutbox.__table__.insert(), rows)
+
+    def recalc_car_periods(self, keys: Iterable[CarPeriodKey], commit: bool = True) -> None:
+        """Recalculate the car_metrics rows of several car periods and UPSERT them in one batch per period type.
+
+        Each distinct period is aggregated in one grouped query over the cars that need it, through the
+        partial (car_id, date) transaction index. Cars without CONFIRMED transactions in the period are
+        stored as empty rows, like `recalc_period` does. The rows are rebuilt from the transactions this
+        transaction sees, so the advisory lock of each car period is held first: a concurrent
+        recalculation of the same car period waits for this one to commit instead of overwriting it.
+        """
+
+        ordered = sorted(set(keys), key=_car_period_sort_key)
+        if not ordered:
+            return
+
+        cars_by_period: dict[PeriodKey, list[str]] = {}
+        for key in ordered:
+            cars_by_period.setdefault(key.period, []).append(key.car_id)
+
+        try:
+            self._lock_car_periods(ordered)
+
+            rows_by_type: dict[str, list[dict[str, Any]]] = {}
+            # Grouped in lock order, so concurrent flushes upsert overlapping car periods in the same order
+            for period, car_ids in cars_by_period.items():
+                grouped = self._fetch_car_period_rows(period, car_ids)
+                rows_by_type.setdefault(period.period_type, []).extend(
+                    self._car_metrics_row(car_id, period, grouped.get(car_id, [])) for car_id in car_ids
+                )
+
+            for period_type, rows in sorted(rows_by_type.items()):
+                self._upsert_car_metrics_rows(period_type, rows)
+
+            if commit:
+                self.db.commit()
+        except Exception:
+            self.db.rollback()
+            logger.exception("Failed recalculating car metrics for %d car periods", len(ordered))
+            raise
+
+    def _lock_car_periods(self, ordered: list[CarPeriodKey]) -> None:
+        """Wait for the advisory locks of car periods already in lock order, in one round-trip on PostgreSQL."""
+        if self.db.get_bind().dialect.name != "postgresql":
+            return
+        self.db.execute(select(*(func.pg_advisory_xact_lock(advisory_lock_key(*_car_period_lock_parts(k))) for k in ordered)))
+
+    def rebuild_car_metrics(self, first_year: int, last_year: int, batch_size: int = REBUILD_BATCH_SIZE) -> int:
+        """Recompute every car_metrics row of the inclusive year range without committing.
+
+        The CONFIRMED transactions with a car are aggregated per car, UTC day and type in one grouped
+        pass over the days of those years and their ISO weeks, then folded into week/month/year rows
+        and written with batched multi-row upserts. Rows of the range that were not rewritten are
+        deleted. Returns the number of rows written.
+        """
+
+        start = min(date(first_year, 1, 1), date.fromisocalendar(first_year, 1, 1))
+        end = max(date(last_year, 12, 31), date.fromisocalendar(last_year, iso_weeks_in_year(last_year), 7))
+        start_dt, _ = day_bounds_utc(start)
+        _, end_dt = day_bounds_utc(end)
+
+        day = self._utc_day(Transaction.date).label("day")
+        stmt = (
+            select(
+                Transaction.car_id,
+                day,
+                Transaction.type,
+                func.coalesce(func.sum(Transaction.amount), 0).label("amount"),
+                func.count().label("tx_count"),
+            )
+            .where(
+                Transaction.car_id.isnot(None),
+                Transaction.date >= start_dt,
+                Transaction.date < end_dt,
+                Transaction.status == "CONFIRMED",
+                Transaction.type.isnot(None),
+            )
+            .group_by(Transaction.car_id, day, Transaction.type)
+        )
+
+        grouped: dict[CarPeriodKey, list[Any]] = {}
+        for r in self.db.execute(stmt).all():
+            for period in get_affected_periods(datetime.combine(r.day, time.min, tzinfo=UTC)):
+                if first_year <= period.year <= last_year:
+                    grouped.setdefault(CarPeriodKey(r.car_id, period), []).append(r)
+
+        rows_by_type: dict[str, list[dict[str, Any]]] = {}
+        for key, period_rows in grouped.items():
+            rows_by_type.setdefault(key.period.period_type, []).append(
+                self._car_metrics_row(key.car_id, key.period, period_rows),
+            )
+
+        # One timestamp for the whole rewrite, as in `rebuild_period_metrics`
+        rebuilt_at = datetime.now(UTC)
+        for period_type, rows in sorted(rows_by_type.items()):
+            for batch in batched(rows, batch_size):
+                self._upsert_car_metrics_rows(period_type, list(batch), updated_at=rebuilt_at)
+
+        # Anything in the range older than the rewrite is a stale car period
+        self.db.execute(
+            delete(CarMetrics).where(
+                CarMetrics.year.between(first_year, last_year),
+                CarMetrics.updated_at < rebuilt_at,
+            ),
+        )
+
+        return len(grouped)
+
+    def claim_outbox_entries(self, limit: int, max_attempts: int) -> list[TransactionMetricsOutbox]:
+        """Lock and return the oldest outbox entries, skipping rows claimed by another worker.
+
+        Entries that already failed `max_attempts` times are left aside for inspection.
+        """
+
+        stmt = (
+            select(TransactionMetricsOutbox)
+            .where(TransactionMetricsOutbox.attempts < max_attempts)
+            .order_by(TransactionMetricsOutbox.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        return list(self.db.execute(stmt).scalars().all())
+
+    def delete_outbox_entries(self, ids: Iterable[int]) -> None:
+        """Delete processed outbox entries without committing."""
+
+        ids = list(ids)
+        if not ids:
+            return
+
+        self.db.execute(delete(TransactionMetricsOutbox).where(TransactionMetricsOutbox.id.in_(ids)))
+
+    def mark_outbox_entries_failed(self, ids: Iterable[int]) -> None:
+        """Count a failed recalculation attempt on outbox entries without committing."""
+
+        ids = list(ids)
+        if not ids:
+            return
+
+        self.db.execute(
+            update(TransactionMetricsOutbox)
+            .where(TransactionMetricsOutbox.id.in_(ids))
+            .values(attempts=TransactionMetricsOutbox.attempts + 1),
+        )
+
+    def refresh_days(self, days: Iterable[date], commit: bool = False) -> None:
+        """Re-aggregate the CONFIRMED transactions of the given UTC days into the daily rollup.
+
+        Each day is locked before it is re-aggregated, so a concurrent transaction touching the same
+        day waits for this one to commit and then sums the committed rows instead of a stale snapshot.
+        Days are locked in sorted order to avoid deadlocks between multi-day transactions.
+        """
+
+        category = self._transaction_category()
+        for day in sorted(set(days)):
+            start_dt, end_dt = day_bounds_utc(day)
+            stmt = (
+                select(
+                    Transaction.type,
+                    Transaction.payment_method,
+                    category,
+                    func.coalesce(func.sum(Transaction.amount), 0).label("amount"),
+                    func.count().label("tx_count"),
+                )
+                .where(
+                    Transaction.date >= start_dt,
+                    Transaction.date < end_dt,
+                    Transaction.status == "CONFIRMED",
+                    Transaction.type.isnot(None),
+                )
+                .group_by(Transaction.type, Transaction.payment_method, category)
+            )
+
+            try:
+                self._advisory_xact_lock("transaction_daily_rollup", day.isoformat())
+                rows = self.db.execute(stmt).all()
+                buckets = [self._rollup_bucket(day, r) for r in rows]
+                self._replace_day_buckets(day, buckets)
+            except Exception:
+                self.db.rollback()
+                logger.exception("Failed refreshing daily rollup for day=%s", day)
+                raise
+
+        if commit:
+            self.db.commit()
+
+    def transaction_date_range(self) -> tuple[date, date] | None:
+        """Return the first and last UTC day with a CONFIRMED transaction, or None when there are none."""
+
+        day = self._utc_day(Transaction.date)
+        row = self.db.execute(
+            select(func.min(day), func.max(day)).where(Transaction.status == "CONFIRMED"),
+        ).first()
+        if row is None or row[0] is None:
+            return None
+        return row[0], row[1]
+
+    def rebuild_daily_rollups(self, start: date, end: date, batch_size: int = REBUILD_BATCH_SIZE) -> int:
+        """Recompute the daily rollups of the inclusive [start, end] days without committing.
+
+        The transactions are aggregated in one grouped pass and the buckets of the range are replaced
+        with batched multi-row INSERTs. Returns the number of buckets written.
+        """
+
+        start_dt, _ = day_bounds_utc(start)
+        _, end_dt = day_bounds_utc(end)
+        day = self._utc_day(Transaction.date).label("day")
+        category = self._transaction_category()
         stmt = (
             select(
+                day,
                 Transaction.type,
                 Transaction.payment_method,
+                category,
                 func.coalesce(func.sum(Transaction.amount), 0).label("amount"),
                 func.count().label("tx_count"),
             )
+            .where(
+                Transaction.date >= start_dt,
+                Transaction.date < end_dt,
+                Transaction.status == "CONFIRMED",
+                Transaction.type.isnot(None),
+            )
+            .group_by(day, Transaction.type, Transaction.payment_method, category)
+        )
+
+        buckets = [self._rollup_bucket(r.day, r) for r in self.db.execute(stmt).all()]
+
+        self.db.execute(delete(TransactionDailyRollup).where(TransactionDailyRollup.day.between(start, end)))
+        for batch in batched(buckets, batch_size):
+            self.db.execute(TransactionDailyRollup.__table__.insert(), list(batch))
+
+        return len(buckets)
+
+    def rebuild_period_metrics(
+        self,
+        period_type: str,
+        first_year: int,
+        last_year: int,
+        batch_size: int = REBUILD_BATCH_SIZE,
+    ) -> int:
+        """Recompute every `period_type` row of the inclusive year range from the daily rollups without committing.
+
+        All periods are aggregated in one grouped pass and written with batched multi-row upserts. Rows
+        of the range that were not rewritten (periods without CONFIRMED transactions) are deleted.
+        Week rows are keyed by ISO year. Returns the number of rows written.
+        """
+
+        match period_type:
+            case "week":
+                year_col, key_cols = TransactionDailyRollup.iso_year, (TransactionDailyRollup.iso_week,)
+            case "month":
+                year_col, key_cols = TransactionDailyRollup.year, (TransactionDailyRollup.month,)
+            case "year":
+                year_col, key_cols = TransactionDailyRollup.year, ()
+            case _:
+                raise TransactionMetricsPeriodError.unknown_period_type(period_type)
+
+        group_cols = (
+            year_col,
+            *key_cols,
+            TransactionDailyRollup.type,
+            TransactionDailyRollup.payment_method,
+            TransactionDailyRollup.category,
+        )
+        stmt = (
+            select(
+                *group_cols,
+                func.coalesce(func.sum(TransactionDailyRollup.total_amount), 0).label("amount"),
+                func.coalesce(func.sum(TransactionDailyRollup.transaction_count), 0).label("tx_count"),
+            )
+            .where(year_col.between(first_year, last_year))
+            .group_by(*group_cols)
+        )
+
+        grouped: dict[PeriodKey, list[Any]] = {}
+        for r in self.db.execute(stmt).all():
+            key = PeriodKey(
+                period_type=period_type,
+                year=r[0],
+                month=r[1] if period_type == "month" else None,
+                week=r[1] if period_type == "week" else None,
+            )
+            grouped.setdefault(key, []).append(r)
+
+        # One timestamp for the whole rewrite: SQLite evaluates now() per statement, so the rows of a
+        # rebuild that outlasts a second would look older than the cutoff and be deleted as stale
+        rebuilt_at = datetime.now(UTC)
+        rows = [self._metrics_row(key, raw_metrics_from_rows(bucket_rows)) for key, bucket_rows in grouped.items()]
+        for batch in batched(rows, batch_size):
+            self._upsert_metrics_rows(period_type, list(batch), updated_at=rebuilt_at)
+
+        # Stale rows are deleted without knowing their keys, so every cached period is invalidated
+        record_changed_periods(self.db.info, [ALL_PERIODS])
+
+        # Anything in the range older than the rewrite is a stale period
+        self.db.execute(
+            delete(TransactionMetrics).where(
+                TransactionMetrics.period_type == period_type,
+                TransactionMetrics.year.between(first_year, last_year),
+                TransactionMetrics.updated_at < rebuilt_at,
+            ),
+        )
+
+        return len(rows)
+
+    def _period_bounds(self, keys: Iterable[PeriodKey]) -> Any:
+        """Return the periods with their inclusive [start_day, end_day] as a FROM clause.
+
+        PostgreSQL gets a VALUES list; SQLite has no column aliases on VALUES, so other dialects get
+        the equivalent UNION ALL of literal rows.
+        """
+
+        rows = [(k.period_type, k.year, k.month, k.week, *get_period_date_range(k)) for k in keys]
+        cols = (
+            column("period_type", String),
+            column("year", Integer),
+            column("month", Integer),
+            column("week", Integer),
+            column("start_day", Date),
+            column("end_day", Date),
+        )
+
+        if self.db.get_bind().dialect.name == "postgresql":
+            return values(*cols, name="periods").data(rows)
+
+        selects = [select(*(literal(v, c.type).label(c.name) for v, c in zip(row, cols, strict=True))) for row in rows]
+        return union_all(*selects).subquery("periods")
+
+    def _utc_day(self, column: Any) -> Any:
+        """Return the UTC calendar day of a timestamp column in the session's dialect."""
+        if self.db.get_bind().dialect.name == "sqlite":
+            # SQLite stores the UTC timestamps as text; date() extracts the day and Date parses it back
+            return type_coerce(func.date(column), Date)
+        return cast(func.timezone("UTC", column), Date)
+
+    @staticmethod
+    def _transaction_category() -> Any:
+        """Return the rollup category of a transaction, bucketing the uncategorized ones together."""
+        return func.coalesce(Transaction.category, UNCATEGORIZED).label("category")
+
+    @staticmethod
+    def _rollup_bucket(day: date, row: Any) -> dict[str, Any]:
+        iso = day.isocalendar()
+        return {
+            "day": day,
+            "year": day.year,
+            "month": day.month,
+            "iso_year": iso.year,
+            "iso_week": iso.week,
+            "type": row.type,
+            "payment_method": row.payment_method,
+            "category": row.category,
+            "total_amount": round_to_2_decimals(row.amount),
+            "transaction_count": int(row.tx_count or 0),
+        }
+
+    def _replace_day_buckets(self, day: date, buckets: list[dict[str, Any]]) -> None:
+        stale = delete(TransactionDailyRollup).where(TransactionDailyRollup.day == day)
+        if buckets:
+            stale = stale.where(
+                tuple_(
+                    TransactionDailyRollup.type,
+                    TransactionDailyRollup.payment_method,
+                    TransactionDailyRollup.category,
+                ).notin_([(b["type"], b["payment_method"], b["category"]) for b in buckets]),
+            )
+        self.db.execute(stale)
+
+        upsert(
+            self.db,
+            TransactionDailyRollup,
+            buckets,
+            index_elements=["day", "type", "payment_method", "category"],
+            update_columns=["total_amount", "transaction_count"],
+            touch={"updated_at": func.now()},
+        )
+
+    @staticmethod
+    def _rollup_filter(key: PeriodKey) -> tuple[Any, ...]:
+        match key.period_type:
+            case "week":
+                if key.week is None:
+                    raise TransactionMetricsPeriodError.week_requires_week()
+                return (TransactionDailyRollup.iso_year == key.year, TransactionDailyRollup.iso_week == key.week)
+            case "month":
+                if key.month is None:
+                    raise TransactionMetricsPeriodError.month_requires_month()
+                return (TransactionDailyRollup.year == key.year, TransactionDailyRollup.month == key.month)
+            case "year":
+                return (TransactionDailyRollup.year == key.year,)
+            case _:
+                raise TransactionMetricsPeriodError.unknown_period_type(key.period_type)
+
+    def _fetch_period_metrics(self, base_filter: Iterable[Any]) -> PeriodRawMetrics:
+        stmt = (
+            select(
+                TransactionDailyRollup.type,
+                TransactionDailyRollup.payment_method,
+                TransactionDailyRollup.category,
+                func.coalesce(func.sum(TransactionDailyRollup.total_amount), 0).label("amount"),
+                func.coalesce(func.sum(TransactionDailyRollup.transaction_count), 0).label("tx_count"),
+            )
             .where(*base_filter)
-            .group_by(Transaction.type, Transaction.payment_method)
+            .group_by(TransactionDailyRollup.type, TransactionDailyRollup.payment_method, TransactionDailyRollup.category)
         )
 
         try:
@@ -114,35 +759,104 @@ class TransactionMetricsRepository(DBRepository):
             logger.exception("Failed fetching transaction metrics")
             raise
 
+        return raw_metrics_from_rows(rows)
+
+    def _fetch_car_period_rows(self, period: PeriodKey, car_ids: list[str]) -> dict[str, list[Any]]:
+        """Return the (type, amount, tx_count) CONFIRMED totals of each car in a period."""
+
+        start_day, end_day = get_period_date_range(period)
+        start_dt, _ = day_bounds_utc(start_day)
+        _, end_dt = day_bounds_utc(end_day)
+        stmt = (
+            select(
+                Transaction.car_id,
+                Transaction.type,
+                func.coalesce(func.sum(Transaction.amount), 0).label("amount"),
+                func.count().label("tx_count"),
+            )
+            .where(
+                Transaction.car_id.in_(car_ids),
+                Transaction.date >= start_dt,
+                Transaction.date < end_dt,
+                Transaction.status == "CONFIRMED",
+                Transaction.type.isnot(None),
+            )
+            .group_by(Transaction.car_id, Transaction.type)
+        )
+
+        grouped: dict[str, list[Any]] = {}
+        for r in self.db.execute(stmt).all():
+            grouped.setdefault(r.car_id, []).append(r)
+        return grouped
+
+    @staticmethod
+    def _car_metrics_row(car_id: str, key: PeriodKey, rows: Iterable[Any]) -> dict[str, Any]:
+        """Build the car_metrics row of a car period from its (type, amount, tx_count) rows."""
         total_income = Decimal("0.00")
         total_expense = Decimal("0.00")
         transaction_count = 0
-
-        credit_payment_amounts: dict[str, Decimal] = {}
-        debit_payment_amounts: dict[str, Decimal] = {}
-
         for r in rows:
-            amount = round_to_2_decimals(r.amount)
             transaction_count += int(r.tx_count or 0)
+            if r.type == TxType.CREDIT.value:
+                total_income += round_to_2_decimals(r.amount)
+            elif r.type == TxType.DEBIT.value:
+                total_expense += round_to_2_decimals(r.amount)
 
-            pm_key = str(r.payment_method)
+        return {
+            "car_id": car_id,
+            "period_type": key.period_type,
+            "year": key.year,
+            "month": key.month,
+            "week": key.week,
+            "total_income": total_income,
+            "total_expense": total_expense,
+            "balance": total_income - total_expense,
+            "transaction_count": transaction_count,
+        }
 
-            if r.type == TxType.CREDIT.value:
-                total_income += amount
-                credit_payment_amounts[pm_key] = credit_payment_amounts.get(pm_key, Decimal("0.00")) + amount
+    def _upsert_car_metrics_rows(
+        self,
+        period_type: str,
+        rows: list[dict[str, Any]],
+        updated_at: datetime | None = None,
+    ) -> None:
+        """Upsert car_metrics rows sharing `period_type` against its partial unique index.
 
-            elif r.type == TxType.DEBIT.value:
-                total_expense += amount
-                debit_payment_amounts[pm_key] = debit_payment_amounts.get(pm_key, Decimal("0.00")) + amount
+        The rows are stamped with `updated_at`, or with the database's now() when it is not given.
+        """
 
-        return PeriodRawMetrics(
-            total_income=round_to_2_decimals(total_income),
-            total_expense=round_to_2_decimals(total_expense),
-            transaction_count=transaction_count,
-            credit_payment_amounts=credit_payment_amounts,
-            debit_payment_amounts=debit_payment_amounts,
+        match period_type:
+            case "week":
+                index_elements = ["car_id", "year", "week"]
+            case "month":
+                index_elements = ["car_id", "year", "month"]
+            case "year":
+                index_elements = ["car_id", "year"]
+            case _:
+                raise TransactionMetricsPeriodError.unknown_period_type(period_type)
+
+        stamp = updated_at if updated_at is not None else func.now()
+        upsert(
+            self.db,
+            CarMetrics,
+            [{**row, "updated_at": stamp} for row in rows],
+            index_elements=index_elements,
+            index_where=(CarMetrics.period_type == period_type),
+            update_columns=CAR_METRICS_COLUMNS,
+            touch={"updated_at": stamp},
         )
 
+    @staticmethod
+    def _metrics_row(key: PeriodKey, metrics: PeriodRawMetrics) -> dict[str, Any]:
+        """Build the transaction_metrics row of a period from its raw metrics."""
+        return {
+            "period_type": key.period_type,
+            "year": key.year,
+            "month": key.month,
+            "week": key.week,
+            **derive_period_values(metrics, weeks_for_period(key.period_type, key.year, key.month)),
+        }
+
     def _upsert_metrics(
         self,
         period_type: str,
@@ -154,62 +868,30 @@ class TransactionMetricsRepository(DBRepository):
         balance: Decimal,
         transaction_count: int,
         payment_method_breakdown: dict[str, Any],
+        category_breakdown: dict[str, Any],
         weekly_average_income: Decimal,
         weekly_average_expense: Decimal,
         income_expense_ratio: Decimal,
         commit: bool = True,
     ) -> None:
-        stmt = insert(TransactionMetrics).values(
-            period_type=period_type,
-            year=year,
-            month=month,
-            week=week,
-            total_income=total_income,
-            total_expense=total_expense,
-            balance=balance,
-            transaction_count=transaction_count,
-            payment_method_breakdown=payment_method_breakdown,
-            weekly_average_income=weekly_average_income,
-            weekly_average_expense=weekly_average_expense,
-            income_expense_ratio=income_expense_ratio,
-            updated_at=func.now(),
-        )
-
-        update_set = {
-            "total_income": stmt.excluded.total_income,
-            "total_expense": stmt.excluded.total_expense,
-            "balance": stmt.excluded.balance,
-            "transaction_count": stmt.excluded.transaction_count,
-            "payment_method_breakdown": stmt.excluded.payment_method_breakdown,
-            "weekly_average_income": stmt.excluded.weekly_average_income,
-            "weekly_average_expense": stmt.excluded.weekly_average_expense,
-            "income_expense_ratio": stmt.excluded.income_expense_ratio,
-            "updated_at": func.now(),
+        row = {
+            "period_type": period_type,
+            "year": year,
+            "month": month,
+            "week": week,
+            "total_income": total_income,
+            "total_expense": total_expense,
+            "balance": balance,
+            "transaction_count": transaction_count,
+            "payment_method_breakdown": payment_method_breakdown,
+            "category_breakdown": category_breakdown,
+            "weekly_average_income": weekly_average_income,
+            "weekly_average_expense": weekly_average_expense,
+            "income_expense_ratio": income_expense_ratio,
         }
 
-        if period_type == "week":
-            stmt = stmt.on_conflict_do_update(
-                index_elements=["year", "week"],
-                index_where=(TransactionMetrics.period_type == "week"),
-                set_=update_set,
-            )
-        elif period_type == "month":
-            stmt = stmt.on_conflict_do_update(
-                index_elements=["year", "month"],
-                index_where=(TransactionMetrics.period_type == "month"),
-                set_=update_set,
-            )
-        elif period_type == "year":
-            stmt = stmt.on_conflict_do_update(
-                index_elements=["year"],
-                index_where=(TransactionMetrics.period_type == "year"),
-                set_=update_set,
-            )
-        else:
-            raise TransactionMetricsPeriodError.unknown_period_type(period_type)
-
         try:
-            self.db.execute(stmt)
+            self._upsert_metrics_rows(period_type, [row])
             if commit:
                 try:
                     self.db.commit()
@@ -227,3 +909,55 @@ class TransactionMetricsRepository(DBRepository):
                 week,
             )
             raise
+
+    def _upsert_metrics_rows(self, period_type: str, rows: list[dict[str, Any]], updated_at: datetime | None = None) -> None:
+        """Upsert metrics rows sharing `period_type` against its partial unique index.
+
+        The rows are stamped with `updated_at`, or with the database's now() when it is not given.
+        """
+
+        match period_type:
+            case "week":
+                index_elements = ["year", "week"]
+            case "month":
+                index_elements = ["year", "month"]
+            case "year":
+                index_elements = ["year"]
+            case _:
+                raise TransactionMetricsPeriodError.unknown_period_type(period_type)
+
+        stamp = updated_at if updated_at is not None else func.now()
+        upsert(
+            self.db,
+            TransactionMetrics,
+            [{**row, "updated_at": stamp} for row in rows],
+            index_elements=index_elements,
+            index_where=(TransactionMetrics.period_type == period_type),
+            update_columns=METRICS_COLUMNS,
+            touch={"updated_at": stamp},
+        )
+        record_changed_periods(
+            self.db.info,
+            (PeriodKey(period_type, row["year"], row.get("month"), row.get("week")) for row in rows),
+        )
+
+
+def _period_sort_key(key: PeriodKey) -> tuple[str, int, int, int]:
+    """Order periods the same way in every transaction, so overlapping upserts and locks never cross."""
+    return key.period_type, key.year, key.month or 0, key.week or 0
+
+
+def _period_lock_parts(key: PeriodKey) -> tuple[object, ...]:
+    """Return the advisory lock key parts of a period."""
+    return "transaction_metrics", key.period_type, key.year, key.month, key.week
+
+
+def _car_period_sort_key(key: CarPeriodKey) -> tuple[str, int, int, int, str]:
+    """Order car periods by period, then car, matching the order `recalc_car_periods` upserts them in."""
+    return *_period_sort_key(key.period), key.car_id
+
+
+def _car_period_lock_parts(key: CarPeriodKey) -> tuple[object, ...]:
+    """Return the advisory lock key parts of a car period."""
+    period = key.period
+    return "car_metrics", key.car_id, period.period_type, period.year, period.month, period.week
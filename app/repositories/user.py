@@ -1,8 +1,11 @@
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload
+
 from app.errors.database import DBOperationError
 from app.models.users import Role, User
 from app.utils.logging_config import logger
 
-from .abstract import DBRepository
+from .abstract import AsyncDBRepository, DBRepository
 
 
 class UserRepository(DBRepository):
@@ -75,3 +78,16 @@ class UserRepository(DBRepository):
             self.db.rollback()
             logger.error(f"Error deleting user {user.username} due to: {ex}")
             raise DBOperationError("Error deleting user in the database") from ex
+
+
+class AsyncUserRepository(AsyncDBRepository[UserRepository]):
+    """User repository on an async database session."""
+
+    repository_class = UserRepository
+
+    async def get_by_username(self, username: str) -> User | None:
+        """Retrieve a user by username with its role and permissions loaded, so reading them awaits nothing."""
+        result = await self.db.execute(
+            select(User).options(selectinload(User.role).selectinload(Role.permissions)).where(User.username == username),
+        )
+        return result.scalars().first()
@@ -1,11 +1,49 @@
-from .associate import router as associate_router
-from .auth import router as auth_router
-from .balance import router as balance_router
-from .car import router as car_router
-from .document import router as document_router
-from .health import router as health_router
-from .image import router as image_router
-from .insurance import router as insurance_router
-from .user import router as user_router
-
-__all__ = ["associate_router", "auth_router", "balance_router", "car_router", "document_router", "health_router", "image_router", "insurance_router", "user_router"]
+"""API routers.
+
+The routers are imported on first access (`app.routers.balance_router`, `load_router("balance")`), so
+importing this package stays cheap and the serverless profile can mount each group on its first request.
+"""
+
+import importlib
+
+from fastapi import APIRouter
+
+# Routers mounted under the API prefix, grouped by the path prefix they serve. A group is always
+# included whole and in this order: "/management/cars/{car_id}" would otherwise shadow its siblings.
+ROUTER_GROUPS: dict[str, tuple[str, ...]] = {
+    "/internal/auth": ("auth",),
+    "/internal/user": ("user",),
+    "/internal/stats": ("internal",),
+    "/management/balance": ("balance",),
+    "/management/cars": ("insurance", "associate", "car"),
+    "/management/documents": ("document",),
+    "/management/images": ("image",),
+}
+
+
+def load_router(name: str) -> APIRouter:
+    """Import the router module `name` and return its router."""
+    return importlib.import_module(f"{__name__}.{name}").router
+
+
+def __getattr__(attribute: str) -> APIRouter:
+    name = attribute.removesuffix("_router")
+    if attribute.endswith("_router") and (name == "health" or any(name in group for group in ROUTER_GROUPS.values())):
+        return load_router(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {attribute!r}")
+
+
+__all__ = [
+    "ROUTER_GROUPS",
+    "associate_router",
+    "auth_router",
+    "balance_router",
+    "car_router",
+    "document_router",
+    "health_router",
+    "image_router",
+    "insurance_router",
+    "internal_router",
+    "load_router",
+    "user_router",
+]
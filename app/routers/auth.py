@@ -3,40 +3,40 @@ from fastapi import APIRouter, Body, Depends
 from app.auth import AuthUser, RequiresAuth
 from app.dependencies import ServiceFactory
 from app.schemas.user import ActionSuccess, PermissionsResponse
-from app.services.auth import AuthService
+from app.services.auth import AsyncAuthService
 
 router = APIRouter(prefix="/internal/auth", tags=["Auth"])
 
 
 @router.post("/login", response_model=ActionSuccess)
-def login(
+async def login(
     username: str = Body(..., description="Username for login"),
     password: str = Body(..., description="Password for login"),
-    service: AuthService = Depends(ServiceFactory.auth_service),
+    service: AsyncAuthService = Depends(ServiceFactory.async_auth_service),
 ) -> ActionSuccess:
     """Login a user and return an action success response."""
-    service.login(username, password)
+    await service.login(username, password)
     return {"message": "Successful login"}
 
 
 @router.post("/refresh", response_model=ActionSuccess)
-def refresh(service: AuthService = Depends(ServiceFactory.auth_service)) -> ActionSuccess:
+async def refresh(service: AsyncAuthService = Depends(ServiceFactory.async_auth_service)) -> ActionSuccess:
     """Refresh a user's access token and return an action success response."""
-    service.refresh()
+    await service.refresh()
     return {"message": "Token refreshed successfully"}
 
 
 @router.post("/logout", response_model=ActionSuccess)
-def logout(service: AuthService = Depends(ServiceFactory.auth_service)) -> ActionSuccess:
+async def logout(service: AsyncAuthService = Depends(ServiceFactory.async_auth_service)) -> ActionSuccess:
     """Logout a user and return an action success response."""
-    service.logout()
+    await service.logout()
     return {"message": "Successful logout"}
 
 
 @router.get("/permissions", response_model=PermissionsResponse)
-def permissions(
-    service: AuthService = Depends(ServiceFactory.auth_service),
+async def permissions(
+    service: AsyncAuthService = Depends(ServiceFactory.async_auth_service),
     _user: AuthUser = Depends(RequiresAuth()),
 ) -> PermissionsResponse:
     """Get the current user's permissions."""
-    return service.get_permissions()
+    return await service.get_permissions()
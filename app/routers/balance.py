@@ -1,42 +1,60 @@
-from fastapi import APIRouter, Body, Depends, Path, status
+from fastapi import APIRouter, Body, Depends, Path, Request, Response, status
 
 from app.auth import AuthUser, RequiresAuth
 from app.dependencies import ServiceFactory
 from app.enum.auth import Role
+from app.errors.balance import NotModifiedException
 from app.schemas.balance import (
+    BalanceDashboardQuerySchema,
+    BalanceDashboardResponseSchema,
     BalanceMetricsDetailedQuerySchema,
     BalanceMetricsDetailedResponseSchema,
     BalanceMetricsQuerySchema,
+    BalanceMetricsRangeQuerySchema,
     BalanceMetricsSimpleResponseSchema,
     BalanceTransactionsQuerySchema,
     BalanceTransactionsResponseSchema,
     BalanceTrendQuerySchema,
     BalanceTrendResponseSchema,
+    CategoryTrendResponseSchema,
     TransactionAuthorizationSchema,
+    TransactionBatchAuthorizationResponseSchema,
+    TransactionBatchAuthorizationSchema,
     TransactionCountQuerySchema,
     TransactionCountResponseSchema,
+    TransactionImportQuerySchema,
     TransactionPatchSchema,
     TransactionResponseSchema,
     TransactionSchema,
 )
 from app.schemas.user import ActionSuccess
-from app.services.balance import BalanceService
+from app.services.balance import AsyncBalanceService, BalanceService
+from app.utils.bulk_import import BodyStreamingResponse, import_format, iter_lines, iter_records
+from app.utils.etag import METRICS_CACHE_CONTROL, etag_matches
 
 router = APIRouter(prefix="/management/balance", tags=["Balance"])
 
 
+def _conditional_get(request: Request, response: Response, etag: str) -> None:
+    """Answer 304 when the client already holds `etag`; otherwise send it along with the response."""
+    if etag_matches(request.headers.get("If-None-Match"), etag):
+        raise NotModifiedException(etag)
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = METRICS_CACHE_CONTROL
+
+
 @router.get(
     "/transaction/{reference}",
     response_model=TransactionResponseSchema,
     status_code=status.HTTP_200_OK,
 )
-def get_transaction(
+async def get_transaction(
     reference: str = Path(description="Transaction reference"),
-    service: BalanceService = Depends(ServiceFactory.balance_service),
+    service: AsyncBalanceService = Depends(ServiceFactory.async_read_balance_service),
     _user: AuthUser = Depends(RequiresAuth([Role.OWNER, Role.ADMIN])),
 ) -> TransactionResponseSchema:
     """Get a transaction by reference."""
-    return service.get_transaction(reference)
+    return await service.get_transaction(reference)
 
 
 @router.post(
@@ -44,15 +62,40 @@ def get_transaction(
     response_model=TransactionResponseSchema,
     status_code=status.HTTP_201_CREATED,
 )
-def create_transaction(
+async def create_transaction(
     body: TransactionSchema = Body(..., description="Transaction data"),
-    service: BalanceService = Depends(ServiceFactory.balance_service),
+    service: AsyncBalanceService = Depends(ServiceFactory.async_balance_service),
     _user: AuthUser = Depends(RequiresAuth([Role.OWNER, Role.ADMIN])),
 ) -> TransactionResponseSchema:
     """Create a new transaction."""
     # TODO: Accept car_id (optional) as body parameter once the car module is implemented.
     # Validate that car_id exists in the car table at that point.
-    return service.create_transaction(data=body)
+    return await service.create_transaction(data=body)
+
+
+@router.post(
+    "/transactions/import",
+    response_class=BodyStreamingResponse,
+    status_code=status.HTTP_200_OK,
+    responses={200: {"content": {"application/x-ndjson": {}}, "description": "One TransactionImportResultSchema per line"}},
+)
+async def import_transactions(
+    request: Request,
+    params: TransactionImportQuerySchema = Depends(TransactionImportQuerySchema),
+    service: BalanceService = Depends(ServiceFactory.balance_service),
+    user: AuthUser = Depends(RequiresAuth([Role.OWNER, Role.ADMIN])),
+) -> BodyStreamingResponse:
+    """Bulk import transactions from a streamed NDJSON or CSV body, streaming back one result per row."""
+    fmt = import_format(request.headers.get("content-type"))
+    import_status = service.resolve_import_status(params.confirm, user.role)
+
+    records = iter_records(iter_lines(request.stream()), fmt)
+    report = service.import_transactions(records, import_status)
+
+    return BodyStreamingResponse(
+        (result.model_dump_json(by_alias=True) + "\n" async for result in report),
+        media_type="application/x-ndjson",
+    )
 
 
 @router.delete(
@@ -60,27 +103,27 @@ def create_transaction(
     response_model=ActionSuccess,
     status_code=status.HTTP_200_OK,
 )
-def delete_transaction(
+async def delete_transaction(
     reference: str = Path(description="Transaction reference"),
-    service: BalanceService = Depends(ServiceFactory.balance_service),
+    service: AsyncBalanceService = Depends(ServiceFactory.async_balance_service),
     user: AuthUser = Depends(RequiresAuth([Role.OWNER, Role.ADMIN])),
 ) -> ActionSuccess:
     """Delete a transaction."""
-    service.delete_transaction(reference, user.role)
+    await service.delete_transaction(reference, user.role)
     return {"message": f"Transaction '{reference}' was successfully deleted."}
 
 
 @router.patch("/transaction/{reference}", response_model=TransactionResponseSchema, status_code=status.HTTP_200_OK)
-def update_transaction(
+async def update_transaction(
     reference: str = Path(description="Transaction reference"),
     body: TransactionPatchSchema = Body(..., description="Transaction data"),
-    service: BalanceService = Depends(ServiceFactory.balance_service),
+    service: AsyncBalanceService = Depends(ServiceFactory.async_balance_service),
     user: AuthUser = Depends(RequiresAuth([Role.OWNER, Role.ADMIN])),
 ) -> TransactionResponseSchema:
     """Update a transaction."""
     # TODO: Accept car_id (optional) as body parameter once the car module is implemented.
     # Validate that car_id exists in the car table at that point.
-    return service.update_transaction(reference, body, user.role)
+    return await service.update_transaction(reference, body, user.role)
 
 
 @router.post(
@@ -88,14 +131,28 @@ def update_transaction(
     response_model=TransactionResponseSchema,
     status_code=status.HTTP_200_OK,
 )
-def authorize_transaction(
+async def authorize_transaction(
     reference: str = Path(description="Transaction reference"),
     body: TransactionAuthorizationSchema = Body(..., description="New status"),
-    service: BalanceService = Depends(ServiceFactory.balance_service),
+    service: AsyncBalanceService = Depends(ServiceFactory.async_balance_service),
     user: AuthUser = Depends(RequiresAuth([Role.OWNER, Role.ADMIN])),
 ) -> TransactionResponseSchema:
     """Approve, reject or resubmit a transaction."""
-    return service.authorize_transaction(reference, body.status, user.role)
+    return await service.authorize_transaction(reference, body.status, user.role)
+
+
+@router.post(
+    "/transactions/authorization",
+    response_model=TransactionBatchAuthorizationResponseSchema,
+    status_code=status.HTTP_200_OK,
+)
+async def authorize_transactions(
+    body: TransactionBatchAuthorizationSchema = Body(..., description="References and new status"),
+    service: AsyncBalanceService = Depends(ServiceFactory.async_balance_service),
+    user: AuthUser = Depends(RequiresAuth([Role.OWNER, Role.ADMIN])),
+) -> TransactionBatchAuthorizationResponseSchema:
+    """Approve, reject or resubmit many transactions, reporting the outcome per reference."""
+    return await service.authorize_transactions(body.references, body.status, user.role)
 
 
 @router.get(
@@ -103,13 +160,22 @@ def authorize_transaction(
     response_model=BalanceMetricsDetailedResponseSchema,
     status_code=status.HTTP_200_OK,
 )
-def get_management_metrics(
+async def get_management_metrics(
+    request: Request,
+    response: Response,
     params: BalanceMetricsDetailedQuerySchema = Depends(BalanceMetricsDetailedQuerySchema),
-    service: BalanceService = Depends(ServiceFactory.balance_service),
+    service: AsyncBalanceService = Depends(ServiceFactory.async_balance_service),
     _user: AuthUser = Depends(RequiresAuth([Role.OWNER])),
 ) -> BalanceMetricsDetailedResponseSchema:
-    """Get detailed balance metrics for dashboard."""
-    return service.get_management_metrics(
+    """Get detailed balance metrics for dashboard; 304 when `If-None-Match` still matches."""
+    etag = await service.get_management_metrics_etag(
+        period=params.period,
+        week=params.week,
+        month=params.month,
+        year=params.year,
+    )
+    _conditional_get(request, response, etag)
+    return await service.get_management_metrics(
         period=params.period,
         week=params.week,
         month=params.month,
@@ -117,24 +183,79 @@ def get_management_metrics(
     )
 
 
+@router.get(
+    "/dashboard",
+    response_model=BalanceDashboardResponseSchema,
+    status_code=status.HTTP_200_OK,
+)
+async def get_dashboard(
+    params: BalanceDashboardQuerySchema = Depends(BalanceDashboardQuerySchema),
+    service: BalanceService = Depends(ServiceFactory.read_balance_service),
+    _user: AuthUser = Depends(RequiresAuth([Role.OWNER])),
+) -> BalanceDashboardResponseSchema:
+    """Get the metrics, trend, transaction count and first transaction page of a period in one request."""
+    return await service.get_dashboard(
+        period=params.period,
+        year=params.year,
+        month=params.month,
+        week=params.week,
+        trend_limit=params.trend_limit,
+        limit=params.limit,
+        status=params.status,
+    )
+
+
+@router.get(
+    "/metrics/range",
+    response_model=BalanceMetricsDetailedResponseSchema,
+    status_code=status.HTTP_200_OK,
+)
+async def get_range_metrics(
+    params: BalanceMetricsRangeQuerySchema = Depends(BalanceMetricsRangeQuerySchema),
+    service: AsyncBalanceService = Depends(ServiceFactory.async_read_balance_service),
+    _user: AuthUser = Depends(RequiresAuth([Role.OWNER])),
+) -> BalanceMetricsDetailedResponseSchema:
+    """Get detailed balance metrics for an arbitrary date range, compared with the range right before it."""
+    return await service.get_range_metrics(start=params.start, end=params.end)
+
+
 @router.get("/metrics/simple", response_model=BalanceMetricsSimpleResponseSchema, status_code=status.HTTP_200_OK)
-def get_metrics(
+async def get_metrics(
+    request: Request,
+    response: Response,
     params: BalanceMetricsQuerySchema = Depends(BalanceMetricsQuerySchema),
-    service: BalanceService = Depends(ServiceFactory.balance_service),
+    service: AsyncBalanceService = Depends(ServiceFactory.async_balance_service),
     _user: AuthUser = Depends(RequiresAuth([Role.OWNER])),
 ) -> BalanceMetricsSimpleResponseSchema:
-    """Get metrics."""
-    return service.get_metrics(month=params.month, year=params.year)
+    """Get metrics; 304 when `If-None-Match` still matches."""
+    _conditional_get(request, response, await service.get_metrics_etag(month=params.month, year=params.year))
+    return await service.get_metrics(month=params.month, year=params.year)
 
 
 @router.get("/metrics/trend", response_model=BalanceTrendResponseSchema, status_code=status.HTTP_200_OK)
-def get_trend(
+async def get_trend(
+    request: Request,
+    response: Response,
     params: BalanceTrendQuerySchema = Depends(BalanceTrendQuerySchema),
-    service: BalanceService = Depends(ServiceFactory.balance_service),
+    service: AsyncBalanceService = Depends(ServiceFactory.async_balance_service),
     _user: AuthUser = Depends(RequiresAuth([Role.OWNER])),
 ) -> BalanceTrendResponseSchema:
-    """Get historical balance data."""
-    return service.get_historical(period=params.period, limit=params.limit)
+    """Get historical balance data; 304 when `If-None-Match` still matches."""
+    _conditional_get(request, response, await service.get_historical_etag(period=params.period, limit=params.limit))
+    return await service.get_historical(period=params.period, limit=params.limit)
+
+
+@router.get("/metrics/categories/trend", response_model=CategoryTrendResponseSchema, status_code=status.HTTP_200_OK)
+async def get_category_trend(
+    request: Request,
+    response: Response,
+    params: BalanceTrendQuerySchema = Depends(BalanceTrendQuerySchema),
+    service: AsyncBalanceService = Depends(ServiceFactory.async_balance_service),
+    _user: AuthUser = Depends(RequiresAuth([Role.OWNER])),
+) -> CategoryTrendResponseSchema:
+    """Get historical income and expense by category; 304 when `If-None-Match` still matches."""
+    _conditional_get(request, response, await service.get_category_trend_etag(period=params.period, limit=params.limit))
+    return await service.get_category_trend(period=params.period, limit=params.limit)
 
 
 @router.get(
@@ -142,23 +263,23 @@ def get_trend(
     response_model=TransactionCountResponseSchema,
     status_code=status.HTTP_200_OK,
 )
-def get_transactions_count(
+async def get_transactions_count(
     params: TransactionCountQuerySchema = Depends(TransactionCountQuerySchema),
-    service: BalanceService = Depends(ServiceFactory.balance_service),
+    service: AsyncBalanceService = Depends(ServiceFactory.async_read_balance_service),
     _user: AuthUser = Depends(RequiresAuth([Role.OWNER, Role.ADMIN])),
 ) -> TransactionCountResponseSchema:
     """Get count of transactions for a given month/year with an optional status filter."""
-    return service.get_transactions_count(month=params.month, year=params.year, status=params.status)
+    return await service.get_transactions_count(month=params.month, year=params.year, status=params.status)
 
 
 @router.get("/transactions", response_model=BalanceTransactionsResponseSchema, status_code=status.HTTP_200_OK)
-def get_balance_transactions(
+async def get_balance_transactions(
     params: BalanceTransactionsQuerySchema = Depends(BalanceTransactionsQuerySchema),
-    service: BalanceService = Depends(ServiceFactory.balance_service),
+    service: AsyncBalanceService = Depends(ServiceFactory.async_read_balance_service),
     _user: AuthUser = Depends(RequiresAuth([Role.OWNER, Role.ADMIN])),
 ) -> BalanceTransactionsResponseSchema:
     """List transactions for a given period with pagination & sorting."""
-    return service.get_transactions(
+    return await service.get_transactions(
         period=params.period,
         week=params.week,
         month=params.month,
@@ -168,4 +289,7 @@ def get_balance_transactions(
         sort_by=params.sort_by,
         sort_order=params.sort_order,
         status=params.status,
+        after=params.after,
+        include_total=params.include_total,
+        estimate_total=params.estimate_total,
     )
@@ -3,16 +3,26 @@ from fastapi import APIRouter, Body, Depends, status
 from app.auth import AuthUser, RequiresAuth
 from app.dependencies import ServiceFactory
 from app.enum.auth import Role
-from app.schemas.car import CarDetailResponseSchema, CarListQuerySchema, CarListResponseSchema, CarResponseSchema, CarSchema
-from app.services.car import CarService
+from app.schemas.balance import BalanceMetricsDetailedQuerySchema
+from app.schemas.car import (
+    CarDetailResponseSchema,
+    CarListQuerySchema,
+    CarListResponseSchema,
+    CarMetricsRankingQuerySchema,
+    CarMetricsRankingResponseSchema,
+    CarMetricsResponseSchema,
+    CarResponseSchema,
+    CarSchema,
+)
+from app.services.car import AsyncCarService
 
 router = APIRouter(prefix="/management/cars", tags=["Cars"])
 
 
 @router.get("", response_model=CarListResponseSchema, status_code=status.HTTP_200_OK)
-def list_cars(
+async def list_cars(
     params: CarListQuerySchema = Depends(CarListQuerySchema),
-    service: CarService = Depends(ServiceFactory.car_service),
+    service: AsyncCarService = Depends(ServiceFactory.async_read_car_service),
     _user: AuthUser = Depends(RequiresAuth([Role.OWNER, Role.ADMIN, Role.EMPLOYEE])),
 ) -> CarListResponseSchema:
     """List cars with optional filters (status, search, archived), sorting and pagination.
@@ -22,13 +32,44 @@ def list_cars(
     - **sort_by**: make, plate, status or created_at.
     - **sort_order**: asc or desc.
     """
-    return service.list_cars(params)
+    return await service.list_cars(params)
+
+
+@router.get("/metrics/ranking", response_model=CarMetricsRankingResponseSchema, status_code=status.HTTP_200_OK)
+async def rank_cars(
+    params: CarMetricsRankingQuerySchema = Depends(CarMetricsRankingQuerySchema),
+    service: AsyncCarService = Depends(ServiceFactory.async_read_car_service),
+    _user: AuthUser = Depends(RequiresAuth([Role.OWNER])),
+) -> CarMetricsRankingResponseSchema:
+    """Rank the fleet by balance in a period, read from the precomputed car_metrics.
+
+    - **period**: week (year, month and week required), month (year and month) or year.
+    - **limit**: number of cars returned (max 500).
+    - **sort_order**: desc ranks the most profitable cars first, asc the least profitable.
+
+    Cars without confirmed transactions in the period are left out.
+    """
+    return await service.rank_cars(params)
+
+
+@router.get("/{car_id}/metrics", response_model=CarMetricsResponseSchema, status_code=status.HTTP_200_OK)
+async def get_car_metrics(
+    car_id: str,
+    params: BalanceMetricsDetailedQuerySchema = Depends(BalanceMetricsDetailedQuerySchema),
+    service: AsyncCarService = Depends(ServiceFactory.async_read_car_service),
+    _user: AuthUser = Depends(RequiresAuth([Role.OWNER])),
+) -> CarMetricsResponseSchema:
+    """Return the income, expense and balance of a car in a period, compared with the period before it.
+
+    Returns 404 if the car does not exist.
+    """
+    return await service.get_car_metrics(car_id, params)
 
 
 @router.get("/{car_id}", response_model=CarDetailResponseSchema, status_code=status.HTTP_200_OK)
-def get_car(
+async def get_car(
     car_id: str,
-    service: CarService = Depends(ServiceFactory.car_service),
+    service: AsyncCarService = Depends(ServiceFactory.async_read_car_service),
     _user: AuthUser = Depends(RequiresAuth([Role.OWNER, Role.ADMIN, Role.EMPLOYEE])),
 ) -> CarDetailResponseSchema:
     """Return the full detail for a car.
@@ -38,7 +79,7 @@ def get_car(
 
     Returns 404 if the car does not exist.
     """
-    return service.get_car(car_id)
+    return await service.get_car(car_id)
 
 
 @router.post(
@@ -46,10 +87,10 @@ def get_car(
     response_model=CarResponseSchema,
     status_code=status.HTTP_201_CREATED,
 )
-def create_car(
+async def create_car(
     body: CarSchema = Body(..., description="Car data"),
-    service: CarService = Depends(ServiceFactory.car_service),
+    service: AsyncCarService = Depends(ServiceFactory.async_car_service),
     _user: AuthUser = Depends(RequiresAuth([Role.OWNER, Role.ADMIN])),
 ) -> CarResponseSchema:
     """Register a new car."""
-    return service.create_car(data=body)
+    return await service.create_car(data=body)
@@ -0,0 +1,35 @@
+from dataclasses import asdict
+
+from fastapi import APIRouter, Depends, status
+
+from app.auth import AuthUser, RequiresAuth
+from app.database.core import pool_monitors
+from app.enum.auth import Role
+from app.schemas.internal import CacheStatsResponseSchema, PoolStatsResponseSchema, PoolStatsSchema
+from app.utils.cache import metrics_cache
+
+router = APIRouter(prefix="/internal/stats", tags=["Internal"])
+
+
+@router.get(
+    "/metrics-cache",
+    response_model=CacheStatsResponseSchema,
+    status_code=status.HTTP_200_OK,
+)
+def get_metrics_cache_stats(
+    _user: AuthUser = Depends(RequiresAuth([Role.OWNER])),
+) -> CacheStatsResponseSchema:
+    """Get the hit/miss counters and size of this process's balance metrics cache."""
+    return CacheStatsResponseSchema(**asdict(metrics_cache.stats()))
+
+
+@router.get(
+    "/db-pool",
+    response_model=PoolStatsResponseSchema,
+    status_code=status.HTTP_200_OK,
+)
+def get_db_pool_stats(
+    _user: AuthUser = Depends(RequiresAuth([Role.OWNER])),
+) -> PoolStatsResponseSchema:
+    """Get the checkout wait times and occupancy of this process's database connection pools."""
+    return PoolStatsResponseSchema(pools=[PoolStatsSchema(**asdict(monitor.stats())) for monitor in pool_monitors])
@@ -0,0 +1,41 @@
+from collections.abc import Awaitable, Callable
+
+from fastapi import FastAPI, Request, Response
+
+from app.routers import ROUTER_GROUPS, load_router
+
+# Paths that describe the whole API, so every router has to be mounted to serve them
+SCHEMA_PATHS = frozenset({"/docs", "/redoc", "/openapi.json"})
+
+
+class LazyRouterMiddleware:
+    """Mount each router group on the first request under its path prefix.
+
+    A cold serverless container then imports only the routers, services and schemas its first request
+    needs; warm invocations find the group already mounted and pay nothing.
+    """
+
+    def __init__(self, app: FastAPI, prefix: str):
+        """Initialize the middleware with the app to mount on and the prefix the groups live under."""
+        self.app = app
+        self.prefix = prefix
+        self.mounted: set[str] = set()
+
+    def mount_for(self, path: str) -> None:
+        """Mount the groups that serve `path` (all of them for the API schema and docs)."""
+
+        for group_prefix, names in ROUTER_GROUPS.items():
+            if group_prefix in self.mounted:
+                continue
+            full_prefix = self.prefix + group_prefix
+            if path in SCHEMA_PATHS or path == full_prefix or path.startswith(full_prefix + "/"):
+                for name in names:
+                    self.app.include_router(load_router(name), prefix=self.prefix)
+                self.mounted.add(group_prefix)
+                # The cached OpenAPI schema no longer lists every route
+                self.app.openapi_schema = None
+
+    async def __call__(self, request: Request, call_next: Callable[[Request], Awaitable[Response]]) -> Response:
+        """Mount the groups of the request path, then handle it."""
+        self.mount_for(request.scope["path"])
+        return await call_next(request)
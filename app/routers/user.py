@@ -18,7 +18,7 @@ router = APIRouter(prefix="/internal/user", tags=["User"])
 
 @router.get("", response_model=list[UserSchema])
 def get_all_users(
-    service: UserService = Depends(ServiceFactory.user_service),
+    service: UserService = Depends(ServiceFactory.read_user_service),
     role: Role = Query(None, description="Filter by user role"),
     _user: AuthUser = Depends(RequiresAuth([Role.OWNER])),
 ) -> list[UserSchema]:
@@ -39,7 +39,7 @@ def create_user(
 @router.get("/{username}", response_model=UserSchema)
 def get_user(
     username: str = Path(description="Username of the user"),
-    service: UserService = Depends(ServiceFactory.user_service),
+    service: UserService = Depends(ServiceFactory.read_user_service),
     _user: AuthUser = Depends(RequiresAuth()),
 ) -> UserSchema:
     """Get a user by username."""
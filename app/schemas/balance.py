@@ -1,11 +1,20 @@
-from datetime import UTC, datetime
+from datetime import UTC, date, datetime
 from typing import Annotated
 
 from pydantic import BaseModel, ConfigDict, Field, field_validator, model_validator
 from pydantic.alias_generators import to_camel
 
-from app.enum.balance import PaymentMethod, PeriodType, SortOrder, TransactionSortBy, TransactionStatus, Type
-from app.errors.transaction_metrics import InvalidMetricsPeriodException
+from app.enum.balance import (
+    AuthorizationResultStatus,
+    ImportRowStatus,
+    PaymentMethod,
+    PeriodType,
+    SortOrder,
+    TransactionSortBy,
+    TransactionStatus,
+    Type,
+)
+from app.errors.transaction_metrics import InvalidMetricsPeriodException, InvalidMetricsRangeException
 from app.schemas.types import RequestUTCDatetime
 
 DEFAULT_LIMITS: dict[PeriodType, int] = {
@@ -14,6 +23,9 @@ DEFAULT_LIMITS: dict[PeriodType, int] = {
     PeriodType.YEAR: 3,
 }
 
+MAX_METRICS_RANGE_DAYS = 1096
+MAX_AUTHORIZATION_BATCH_SIZE = 500
+
 # * BODY SCHEMAS * #
 
 
@@ -43,6 +55,39 @@ class TransactionAuthorizationSchema(BaseModel):
     status: TransactionStatus = Field(..., description="New status: CONFIRMED, REJECTED, or PENDING")
 
 
+class TransactionBatchAuthorizationSchema(BaseModel):
+    """Schema for changing the status of many transactions at once."""
+
+    references: list[str] = Field(
+        ...,
+        min_length=1,
+        max_length=MAX_AUTHORIZATION_BATCH_SIZE,
+        description="References of the transactions to authorize",
+    )
+    status: TransactionStatus = Field(..., description="New status: CONFIRMED, REJECTED, or PENDING")
+
+
+class TransactionAuthorizationResultSchema(BaseModel):
+    """Outcome of one reference in a batch authorization."""
+
+    reference: str = Field(..., description="Transaction reference")
+    result: AuthorizationResultStatus = Field(..., description="Outcome of the reference: updated or failed")
+    status: TransactionStatus | None = Field(default=None, description="Status of the transaction after the request")
+    error: str | None = Field(default=None, description="Reason the reference was not updated")
+
+    model_config = ConfigDict(use_enum_values=True, populate_by_name=True, alias_generator=to_camel)
+
+
+class TransactionBatchAuthorizationResponseSchema(BaseModel):
+    """Response of a batch authorization."""
+
+    results: list[TransactionAuthorizationResultSchema] = Field(..., description="Outcome per reference, in request order")
+    updated: int = Field(..., description="Number of transactions updated")
+    failed: int = Field(..., description="Number of references that were not updated")
+
+    model_config = ConfigDict(populate_by_name=True, alias_generator=to_camel)
+
+
 class BalanceMetricsQuerySchema(BaseModel):
     """Schema for balance metrics query."""
 
@@ -88,6 +133,43 @@ class BalanceMetricsDetailedQuerySchema(BaseModel):
         return self
 
 
+class BalanceDashboardQuerySchema(BalanceMetricsDetailedQuerySchema):
+    """Query params for GET /management/balance/dashboard."""
+
+    trend_limit: int | None = Field(
+        default=None,
+        ge=1,
+        le=100,
+        description="Periods in the trend, ending with the requested one. Defaults: week=8, month=6, year=3.",
+    )
+    limit: Annotated[int, Field(default=10, ge=1, le=100, description="Transactions in the first page (max 100)")] = 10
+    status: TransactionStatus | None = Field(
+        default=None,
+        description="Filter the transaction page and count by status: PENDING, CONFIRMED, REJECTED",
+    )
+
+    @model_validator(mode="after")
+    def apply_default_trend_limit(self) -> "BalanceDashboardQuerySchema":
+        """Apply the default trend limit of the period if not provided."""
+        if self.trend_limit is None:
+            self.trend_limit = DEFAULT_LIMITS[self.period]
+        return self
+
+
+class BalanceMetricsRangeQuerySchema(BaseModel):
+    """Query params for GET /management/balance/metrics/range."""
+
+    start: date = Field(..., description="First day of the range (inclusive, UTC)", examples=[date(2026, 1, 1)])
+    end: date = Field(..., description="Last day of the range (inclusive, UTC)", examples=[date(2026, 3, 31)])
+
+    @model_validator(mode="after")
+    def validate_range(self) -> "BalanceMetricsRangeQuerySchema":
+        """Validate that the range is ordered and not longer than the allowed span."""
+        if self.end < self.start or (self.end - self.start).days + 1 > MAX_METRICS_RANGE_DAYS:
+            raise InvalidMetricsRangeException(MAX_METRICS_RANGE_DAYS)
+        return self
+
+
 class BalanceTrendQuerySchema(BaseModel):
     """Schema for balance trend query params.
 
@@ -146,6 +228,20 @@ class BalanceTransactionsQuerySchema(BaseModel):
         description="Sort direction. One of: asc, desc",
     )
 
+    after: str | None = Field(
+        default=None,
+        min_length=1,
+        description="Cursor from `pagination.nextCursor`; when set, `page` is ignored and the page starts after it",
+    )
+    include_total: bool = Field(
+        default=True,
+        description="Count the matching transactions; pass false on cursor pages to skip the count",
+    )
+    estimate_total: bool = Field(
+        default=False,
+        description="Return an estimated total (period rollup or planner statistics) instead of an exact count",
+    )
+
     @model_validator(mode="after")
     def validate_period_requirements(self) -> "BalanceTransactionsQuerySchema":
         """Validate period requirements."""
@@ -187,6 +283,15 @@ class TransactionCountQuerySchema(BaseModel):
         return self
 
 
+class TransactionImportQuerySchema(BaseModel):
+    """Query params for POST /management/balance/transactions/import."""
+
+    confirm: bool = Field(
+        default=False,
+        description="Import the rows as CONFIRMED instead of PENDING (owner only)",
+    )
+
+
 # * RESPONSE SCHEMAS * #
 
 
@@ -289,6 +394,27 @@ class PaymentMethodBreakdownByTypeSchema(BaseModel):
     model_config = ConfigDict(populate_by_name=True, alias_generator=to_camel)
 
 
+class CategoryBreakdownSchema(BaseModel):
+    """Category breakdown from JSONB."""
+
+    amounts: dict[str, float] = Field(default_factory=dict, description="Amounts by category")
+    percentages: dict[str, float] = Field(default_factory=dict, description="Percentages by category")
+
+    model_config = ConfigDict(
+        populate_by_name=True,
+        alias_generator=to_camel,
+    )
+
+
+class CategoryBreakdownByTypeSchema(BaseModel):
+    """Category breakdown by transaction type."""
+
+    credit: CategoryBreakdownSchema = Field(default_factory=CategoryBreakdownSchema)
+    debit: CategoryBreakdownSchema = Field(default_factory=CategoryBreakdownSchema)
+
+    model_config = ConfigDict(populate_by_name=True, alias_generator=to_camel)
+
+
 class WeeklyAveragesSchema(BaseModel):
     """Weekly averages for the current period."""
 
@@ -310,8 +436,16 @@ class BalanceMetricsDetailedResponseSchema(BaseModel):
     payment_method_breakdown: PaymentMethodBreakdownByTypeSchema = Field(
         default_factory=PaymentMethodBreakdownByTypeSchema,
     )
+    category_breakdown: CategoryBreakdownByTypeSchema = Field(
+        default_factory=CategoryBreakdownByTypeSchema,
+        description="Amounts and percentages by category of the current period; uncategorized ones under 'uncategorized'",
+    )
     weekly_averages: WeeklyAveragesSchema = Field(default_factory=WeeklyAveragesSchema)
     income_expense_ratio: float = Field(0.0, description="Income/expense ratio for current period")
+    year_over_year: ComparisonSchema | None = Field(
+        None,
+        description="Comparison with the same period one year earlier; null for arbitrary date ranges",
+    )
 
     model_config = ConfigDict(
         populate_by_name=True,
@@ -373,13 +507,69 @@ class BalanceTrendResponseSchema(BaseModel):
     )
 
 
+class CategoryTrendDataPointSchema(BaseModel):
+    """Category totals of a single historical period."""
+
+    period_start: datetime = Field(
+        ...,
+        description="Start datetime of the period (ISO 8601).",
+        examples=[datetime(2025, 8, 1, 0, 0, 0, tzinfo=UTC)],
+    )
+    period_end: datetime = Field(
+        ...,
+        description="End datetime of the period (ISO 8601).",
+        examples=[datetime(2025, 8, 31, 23, 59, 59, tzinfo=UTC)],
+    )
+    income: dict[str, float] = Field(
+        default_factory=dict,
+        description="Total income by category for this period.",
+        examples=[{"Otro": 4000.00}],
+    )
+    expense: dict[str, float] = Field(
+        default_factory=dict,
+        description="Total expense by category for this period.",
+        examples=[{"Combustible": 1500.00, "uncategorized": 500.00}],
+    )
+
+    model_config = ConfigDict(
+        populate_by_name=True,
+        alias_generator=to_camel,
+    )
+
+
+class CategoryTrendResponseSchema(BaseModel):
+    """Historical trend of the totals by category."""
+
+    period_type: PeriodType = Field(
+        ...,
+        description="The type of period requested (week, month, year).",
+        examples=[PeriodType.MONTH],
+    )
+    data: list[CategoryTrendDataPointSchema] = Field(
+        ...,
+        description=(
+            "Array of period data points ordered chronologically (oldest to newest). "
+            "Periods without transactions are included with empty category totals."
+        ),
+    )
+
+    model_config = ConfigDict(
+        use_enum_values=True,
+        from_attributes=True,
+        populate_by_name=True,
+        alias_generator=to_camel,
+    )
+
+
 class PaginationSchema(BaseModel):
     """Pagination schema."""
 
     page: int = Field(..., ge=1)
     limit: int = Field(..., ge=1, le=100)
-    total: int = Field(..., ge=0)
-    total_pages: int = Field(..., ge=0)
+    total: int | None = Field(default=None, ge=0, description="Matching transactions; null when not counted")
+    total_pages: int | None = Field(default=None, ge=0, description="Number of pages; null when not counted")
+    next_cursor: str | None = Field(default=None, description="`after` token of the next page; null on the last page")
+    total_estimated: bool = Field(default=False, description="Whether `total` is an estimate rather than an exact count")
 
     model_config = ConfigDict(populate_by_name=True, alias_generator=to_camel)
 
@@ -400,3 +590,25 @@ class TransactionCountResponseSchema(BaseModel):
     period: BalancePeriodSchema = Field(..., description="Period for which the count is returned")
 
     model_config = ConfigDict(populate_by_name=True, alias_generator=to_camel)
+
+
+class BalanceDashboardResponseSchema(BaseModel):
+    """Owner dashboard bundle: detailed metrics, trend, transaction count and first transaction page."""
+
+    metrics: BalanceMetricsDetailedResponseSchema = Field(..., description="Same payload as GET /metrics")
+    trend: BalanceTrendResponseSchema = Field(..., description="Trend ending with the requested period")
+    transaction_count: int = Field(..., ge=0, description="Transactions of the period matching the status filter")
+    transactions: BalanceTransactionsResponseSchema = Field(..., description="First page of the period, newest first")
+
+    model_config = ConfigDict(populate_by_name=True, alias_generator=to_camel)
+
+
+class TransactionImportResultSchema(BaseModel):
+    """One line of the streamed bulk import report."""
+
+    row: int = Field(..., ge=1, description="1-based data row number in the uploaded body")
+    status: ImportRowStatus = Field(..., description="Outcome of the row: created or failed")
+    reference: str | None = Field(default=None, description="Reference of the created transaction")
+    errors: list[str] = Field(default_factory=list, description="Validation or persistence errors of the row")
+
+    model_config = ConfigDict(use_enum_values=True, populate_by_name=True, alias_generator=to_camel)
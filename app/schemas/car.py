@@ -5,6 +5,7 @@ from pydantic.alias_generators import to_camel
 
 from app.enum.balance import SortOrder
 from app.enum.crm import CarSortBy, CarStatus
+from app.schemas.balance import BalanceMetricsDetailedQuerySchema, ComparisonSchema, PeriodMetricsSchema
 from app.schemas.types import RequestUTCDatetime
 
 _CAMEL = ConfigDict(alias_generator=to_camel, populate_by_name=True)
@@ -246,3 +247,46 @@ class CarDetailResponseSchema(BaseModel):
     associate: AssociateDetailSchema | None = None
     documents: list[DocumentDetailSchema] = Field(default_factory=list)
     assigned_driver: AssignedDriverSchema | None = None
+
+
+class CarMetricsRankingQuerySchema(BalanceMetricsDetailedQuerySchema):
+    """Query params for GET /management/cars/metrics/ranking."""
+
+    limit: int = Field(default=20, ge=1, le=500, description="Cars in the ranking (max 500)")
+    sort_order: SortOrder = Field(default=SortOrder.DESC, description="desc ranks the most profitable cars first")
+
+
+class CarMetricsResponseSchema(BaseModel):
+    """Profit and loss of a car in a period, compared with the period before it."""
+
+    model_config = _CAMEL
+
+    car_id: str
+    period_type: str
+    current_period: PeriodMetricsSchema = Field(default_factory=PeriodMetricsSchema)
+    previous_period: PeriodMetricsSchema = Field(default_factory=PeriodMetricsSchema)
+    comparison: ComparisonSchema = Field(default_factory=ComparisonSchema)
+
+
+class CarRankingItemSchema(BaseModel):
+    """A car and its profit and loss in the ranked period."""
+
+    model_config = _CAMEL
+
+    car_id: str
+    plate: str
+    make: str
+    model: str
+    balance: float
+    total_income: float
+    total_expense: float
+    transaction_count: int
+
+
+class CarMetricsRankingResponseSchema(BaseModel):
+    """Response for GET /management/cars/metrics/ranking; cars without transactions in the period are left out."""
+
+    model_config = _CAMEL
+
+    period_type: str
+    cars: list[CarRankingItemSchema] = Field(default_factory=list)
@@ -0,0 +1,14 @@
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class CacheStats:
+    """Counters and size of the metrics response cache."""
+
+    enabled: bool
+    backend: str
+    entries: int
+    max_entries: int
+    hits: int
+    misses: int
+    invalidations: int
@@ -0,0 +1,11 @@
+from dataclasses import dataclass
+from typing import Any
+
+
+@dataclass(frozen=True)
+class ImportRecord:
+    """Raw row of a bulk import body, or the reason it could not be parsed."""
+
+    row: int
+    data: dict[str, Any] | None = None
+    error: str | None = None
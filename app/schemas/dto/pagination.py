@@ -0,0 +1,11 @@
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal
+
+
+@dataclass(frozen=True)
+class TransactionCursor:
+    """Keyset position in a transaction listing: the sort column value and the reference tie-breaker."""
+
+    value: datetime | Decimal | str | None
+    reference: str
@@ -1,4 +1,5 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from datetime import datetime
 from decimal import Decimal
 
 
@@ -12,6 +13,14 @@ class PeriodKey:
     week: int | None = None
 
 
+@dataclass(frozen=True)
+class CarPeriodKey:
+    """Period of one car."""
+
+    car_id: str
+    period: PeriodKey
+
+
 @dataclass(frozen=True)
 class PeriodRawMetrics:
     """Period raw metrics."""
@@ -21,6 +30,21 @@ class PeriodRawMetrics:
     transaction_count: int
     credit_payment_amounts: dict[str, Decimal]
     debit_payment_amounts: dict[str, Decimal]
+    credit_category_amounts: dict[str, Decimal] = field(default_factory=dict)
+    debit_category_amounts: dict[str, Decimal] = field(default_factory=dict)
+
+
+@dataclass(frozen=True)
+class TransactionSnapshot:
+    """Metrics-relevant state of a transaction at a point in time."""
+
+    date: datetime
+    type: str
+    payment_method: str
+    amount: Decimal
+    status: str
+    category: str | None = None
+    car_id: str | None = None
 
 
 @dataclass(frozen=True)
@@ -0,0 +1,19 @@
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class PoolStats:
+    """Checkout counters and occupancy of a database connection pool."""
+
+    name: str
+    pool_class: str
+    size: int
+    max_overflow: int
+    checked_out: int
+    peak_checked_out: int
+    overflow: int
+    checkouts: int
+    timeouts: int
+    wait_ms_avg: float
+    wait_ms_max: float
+    stale_connections: int
@@ -0,0 +1,43 @@
+from pydantic import BaseModel, ConfigDict, Field
+from pydantic.alias_generators import to_camel
+
+
+class CacheStatsResponseSchema(BaseModel):
+    """Counters and size of the balance metrics response cache."""
+
+    enabled: bool = Field(..., description="Whether the balance endpoints use the cache")
+    backend: str = Field(..., description="Where the period versions live: local or redis")
+    entries: int = Field(..., ge=0, description="Responses currently cached in this process")
+    max_entries: int = Field(..., ge=0, description="LRU capacity of this process")
+    hits: int = Field(..., ge=0, description="Requests served from the cache")
+    misses: int = Field(..., ge=0, description="Requests that queried the database")
+    invalidations: int = Field(..., ge=0, description="Period versions bumped by metrics recalculations")
+
+    model_config = ConfigDict(populate_by_name=True, alias_generator=to_camel)
+
+
+class PoolStatsSchema(BaseModel):
+    """Checkout counters and occupancy of one database connection pool."""
+
+    name: str = Field(..., description="Engine the pool belongs to")
+    pool_class: str = Field(..., description="SQLAlchemy pool implementation")
+    size: int = Field(..., ge=0, description="Connections the pool keeps open; 0 for NullPool and SQLite pools")
+    max_overflow: int = Field(..., ge=0, description="Connections it may open beyond `size` under load")
+    checked_out: int = Field(..., ge=0, description="Connections currently in use")
+    peak_checked_out: int = Field(..., ge=0, description="Most connections in use at once")
+    overflow: int = Field(..., ge=0, description="Connections currently open beyond `size`")
+    checkouts: int = Field(..., ge=0, description="Connections handed out")
+    timeouts: int = Field(..., ge=0, description="Checkouts that gave up after the pool timeout")
+    wait_ms_avg: float = Field(..., ge=0, description="Average time a checkout waited for a connection")
+    wait_ms_max: float = Field(..., ge=0, description="Longest time a checkout waited for a connection")
+    stale_connections: int = Field(..., ge=0, description="Idle connections found dead and replaced on checkout")
+
+    model_config = ConfigDict(populate_by_name=True, alias_generator=to_camel)
+
+
+class PoolStatsResponseSchema(BaseModel):
+    """Connection pools of this process."""
+
+    pools: list[PoolStatsSchema] = Field(..., description="One entry per database engine")
+
+    model_config = ConfigDict(populate_by_name=True, alias_generator=to_camel)
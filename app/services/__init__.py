@@ -1,10 +1,22 @@
 from .associate import AssociateService
-from .auth import AuthService
-from .balance import BalanceService
-from .car import CarService
+from .auth import AsyncAuthService, AuthService
+from .balance import AsyncBalanceService, BalanceService
+from .car import AsyncCarService, CarService
 from .document import DocumentService
 from .image import ImageService
 from .insurance import InsuranceService
 from .user import UserService
 
-__all__ = ["AssociateService", "AuthService", "BalanceService", "CarService", "DocumentService", "ImageService", "InsuranceService", "UserService"]
+__all__ = [
+    "AssociateService",
+    "AsyncAuthService",
+    "AsyncBalanceService",
+    "AsyncCarService",
+    "AuthService",
+    "BalanceService",
+    "CarService",
+    "DocumentService",
+    "ImageService",
+    "InsuranceService",
+    "UserService",
+]
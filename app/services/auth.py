@@ -1,12 +1,48 @@
+from collections.abc import Callable
+
 from fastapi_jwt_auth import AuthJWT
+from starlette.concurrency import run_in_threadpool
 
 from app.errors.auth import AlreadyLoggedOutException, InvalidCredentials, InvalidRefreshToken
 from app.errors.user import UserNotFoundException
 from app.models.users import User
-from app.repositories.user import UserRepository
+from app.repositories.user import AsyncUserRepository, UserRepository
 from app.utils.auth import AuthUtils
 
 
+def _verify_credentials(user: User | None, password_attempt: str) -> User:
+    """Return `user` when `password_attempt` matches its password hash."""
+
+    if not user:
+        raise UserNotFoundException
+
+    if not AuthUtils.verify_password(password_attempt, user.password):
+        raise InvalidCredentials
+
+    return user
+
+
+def _set_token_cookies(authorize: AuthJWT, username: str, role: str) -> None:
+    """Create an access and refresh token pair and set both as cookies."""
+
+    access_token, refresh_token = AuthUtils.create_access_token(
+        username=username,
+        role=role,
+        authorize=authorize,
+    )
+    authorize.set_access_cookies(access_token)
+    authorize.set_refresh_cookies(refresh_token)
+
+
+def _permissions_of(user: User) -> dict:
+    """Return a user's role and permission names."""
+
+    return {
+        "role": user.role.name,
+        "permissions": [perm.name for perm in user.role.permissions],
+    }
+
+
 class AuthService:
     """Authentication service."""
 
@@ -19,20 +55,8 @@ class AuthService:
     def login(self, username: str, password_attempt: str) -> str:
         """Login a user and return an action success response."""
 
-        user = self.repository.get_by_username(username)
-        if not user:
-            raise UserNotFoundException
-
-        if not AuthUtils.verify_password(password_attempt, user.password):
-            raise InvalidCredentials
-
-        access_token, refresh_token = AuthUtils.create_access_token(
-            username=user.username,
-            role=user.role.name,
-            authorize=self.authorize,
-        )
-        self.authorize.set_access_cookies(access_token)
-        self.authorize.set_refresh_cookies(refresh_token)
+        user = _verify_credentials(self.repository.get_by_username(username), password_attempt)
+        _set_token_cookies(self.authorize, user.username, user.role.name)
 
     def refresh(self) -> str:
         """Refresh a user's access token and return an action success response."""
@@ -45,14 +69,7 @@ class AuthService:
         current_user = self.authorize.get_jwt_subject()
         claims = self.authorize.get_raw_jwt()
 
-        access_token, refresh_token = AuthUtils.create_access_token(
-            username=current_user,
-            role=claims.get("role"),
-            authorize=self.authorize,
-        )
-
-        self.authorize.set_access_cookies(access_token)
-        self.authorize.set_refresh_cookies(refresh_token)
+        _set_token_cookies(self.authorize, current_user, claims.get("role"))
 
     def logout(self) -> str:
         """Logout a user and return an action success response."""
@@ -71,8 +88,45 @@ class AuthService:
 
     def get_permissions(self) -> dict:
         """Get the current user's role and permissions from the DB."""
-        user = self.get_current_user()
-        return {
-            "role": user.role.name,
-            "permissions": [perm.name for perm in user.role.permissions],
-        }
+        return _permissions_of(self.get_current_user())
+
+
+class AsyncAuthService:
+    """Authentication service on an async database session.
+
+    Token refresh and logout run the matching `AuthService` method inside `AsyncUserRepository.run`.
+    Login and the permissions lookup read the user with its role and permissions in one awaited query,
+    and login verifies the password hash in the threadpool so it does not stall the event loop.
+    """
+
+    def __init__(self, authorize: AuthJWT, repository: AsyncUserRepository):
+        """Initialize the service with an authorize instance and an async user repository."""
+
+        self.authorize = authorize
+        self.repository = repository
+
+    async def _run[T](self, call: Callable[[AuthService], T]) -> T:
+        return await self.repository.run(lambda repository: call(AuthService(self.authorize, repository)))
+
+    async def login(self, username: str, password_attempt: str) -> None:
+        """Login a user and set the token cookies."""
+
+        user = await self.repository.get_by_username(username)
+        user = await run_in_threadpool(_verify_credentials, user, password_attempt)
+        _set_token_cookies(self.authorize, user.username, user.role.name)
+
+    async def refresh(self) -> None:
+        """Refresh a user's access token."""
+        return await self._run(lambda service: service.refresh())
+
+    async def logout(self) -> None:
+        """Logout a user."""
+        return await self._run(lambda service: service.logout())
+
+    async def get_current_user(self) -> User:
+        """Get the current user from the DB."""
+        return await self.repository.get_by_username(self.authorize.get_jwt_subject())
+
+    async def get_permissions(self) -> dict:
+        """Get the current user's role and permissions from the DB."""
+        return _permissions_of(await self.get_current_user())
@@ -1,9 +1,26 @@
+import asyncio
 import math
-from datetime import UTC, datetime
+from collections.abc import AsyncIterable, AsyncIterator, Callable, Hashable, Sequence
+from contextlib import AbstractContextManager
+from datetime import UTC, date, datetime, timedelta
 from types import SimpleNamespace
 
+from fastapi import HTTPException
+from pydantic import ValidationError
+from starlette.concurrency import run_in_threadpool
+
+from app.config import IMPORT
 from app.enum.auth import Role
-from app.enum.balance import PaymentMethod, PeriodType, SortOrder, TransactionSortBy, TransactionStatus, Type
+from app.enum.balance import (
+    AuthorizationResultStatus,
+    ImportRowStatus,
+    PaymentMethod,
+    PeriodType,
+    SortOrder,
+    TransactionSortBy,
+    TransactionStatus,
+    Type,
+)
 from app.errors.balance import (
     InvalidDescriptionLengthException,
     InvalidPaymentMethodException,
@@ -14,32 +31,48 @@ from app.errors.balance import (
     TransactionNotFoundException,
     TransactionStatusForbiddenException,
 )
+from app.errors.database import DBOperationError
 from app.models.balance import Transaction
-from app.repositories.balance import BalanceRepository
+from app.repositories.balance import AsyncBalanceRepository, BalanceRepository
 from app.schemas.balance import (
+    BalanceDashboardResponseSchema,
     BalanceMetricsDetailedResponseSchema,
     BalanceMetricsSimpleResponseSchema,
     BalanceTransactionsResponseSchema,
     BalanceTrendDataPointSchema,
     BalanceTrendResponseSchema,
+    CategoryTrendDataPointSchema,
+    CategoryTrendResponseSchema,
     ComparisonSchema,
     PaginationSchema,
+    TransactionAuthorizationResultSchema,
+    TransactionBatchAuthorizationResponseSchema,
     TransactionCountResponseSchema,
+    TransactionImportResultSchema,
     TransactionResponseSchema,
     TransactionSchema,
     WeeklyAveragesSchema,
 )
+from app.schemas.dto.imports import ImportRecord
 from app.schemas.dto.periods import PeriodKey
-from app.utils.metrics import percent_change_from_schemas, safe_float
+from app.utils.bulk_import import chunked
+from app.utils.cache import MetricsCache
+from app.utils.dates import count_iso_weeks_in_range
+from app.utils.etag import build_etag
+from app.utils.metrics import derive_period_values, safe_float
+from app.utils.pagination import decode_cursor, encode_cursor
 from app.utils.periods import (
+    category_breakdown_schemas,
+    compare_periods,
     current_period_key,
     payment_breakdown_schemas,
     period_bounds_utc,
     previous_period_key,
+    same_period_last_year,
     to_period_schema,
     weekly_averages_and_ratio,
 )
-from app.utils.reference import generate_reference
+from app.utils.reference import generate_reference, generate_references
 
 
 def _build_historical_keys(current: PeriodKey, limit: int) -> list[PeriodKey]:
@@ -53,12 +86,136 @@ def _build_historical_keys(current: PeriodKey, limit: int) -> list[PeriodKey]:
     return keys
 
 
+def _simple_metrics_key(month: int | None, year: int | None) -> PeriodKey:
+    """Return the month of the simple metrics, the current one when neither is given."""
+    if month is None and year is None:
+        now = datetime.now(UTC)
+        month = now.month
+        year = now.year
+    return PeriodKey(period_type=PeriodType.MONTH, year=year, month=month)
+
+
+def _management_metrics_keys(period: PeriodType, year: int | None, month: int | None, week: int | None) -> list[PeriodKey]:
+    """Return the requested period, the one before it and the same period one year earlier."""
+    # Stored week rows have no month; the request month only accompanies the week
+    current_key = PeriodKey(period_type=period, year=year, month=None if period == PeriodType.WEEK else month, week=week)
+    return [current_key, previous_period_key(current_key), same_period_last_year(current_key)]
+
+
+def _metrics_by_key(rows) -> dict[tuple[int, int | None, int | None], object]:
+    """Index transaction_metrics rows by (year, month, week)."""
+    return {
+        (int(r.year), int(r.month) if r.month is not None else None, int(r.week) if r.week is not None else None): r
+        for r in rows
+    }
+
+
+def _build_trend(period: PeriodType, keys: list[PeriodKey], metrics_by_key: dict) -> BalanceTrendResponseSchema:
+    """Assemble the trend of `keys` (oldest -> newest), zero-filling periods without a metrics row."""
+    data: list[BalanceTrendDataPointSchema] = []
+    for key in keys:
+        start_dt, end_dt = period_bounds_utc(key)
+        row = metrics_by_key.get((key.year, key.month, key.week))
+
+        data.append(
+            BalanceTrendDataPointSchema(
+                period_start=start_dt,
+                period_end=end_dt,
+                total_income=safe_float(row, "total_income"),
+                total_expense=safe_float(row, "total_expense"),
+            ),
+        )
+
+    return BalanceTrendResponseSchema(period_type=period, data=data)
+
+
+def _build_category_trend(period: PeriodType, keys: list[PeriodKey], metrics_by_key: dict) -> CategoryTrendResponseSchema:
+    """Assemble the category trend of `keys` (oldest -> newest) from the stored category breakdowns."""
+    data: list[CategoryTrendDataPointSchema] = []
+    for key in keys:
+        start_dt, end_dt = period_bounds_utc(key)
+        breakdown = category_breakdown_schemas(metrics_by_key.get((key.year, key.month, key.week)))
+
+        data.append(
+            CategoryTrendDataPointSchema(
+                period_start=start_dt,
+                period_end=end_dt,
+                income=breakdown.credit.amounts,
+                expense=breakdown.debit.amounts,
+            ),
+        )
+
+    return CategoryTrendResponseSchema(period_type=period, data=data)
+
+
+def _build_detailed_metrics(current_row, prev_row) -> BalanceMetricsDetailedResponseSchema:
+    """Assemble the dashboard response from current and previous metrics rows (either may be None)."""
+    current_schema = to_period_schema(current_row)
+    previous_schema = to_period_schema(prev_row)
+
+    payment_breakdown_schema = payment_breakdown_schemas(current_row)
+    weekly_income, weekly_expense, ratio = weekly_averages_and_ratio(current_row)
+
+    return BalanceMetricsDetailedResponseSchema(
+        current_period=current_schema,
+        previous_period=previous_schema,
+        comparison=compare_periods(current_schema, previous_schema),
+        payment_method_breakdown=payment_breakdown_schema,
+        category_breakdown=category_breakdown_schemas(current_row),
+        weekly_averages=WeeklyAveragesSchema(income=weekly_income, expense=weekly_expense),
+        income_expense_ratio=ratio,
+    )
+
+
+def _build_period_metrics(current_row, prev_row, year_ago_row) -> BalanceMetricsDetailedResponseSchema:
+    """Assemble the metrics of a stored period, also compared with the same period one year earlier."""
+    if not current_row and not prev_row and not year_ago_row:
+        return BalanceMetricsDetailedResponseSchema(year_over_year=ComparisonSchema())
+
+    metrics = _build_detailed_metrics(current_row, prev_row)
+    metrics.year_over_year = compare_periods(to_period_schema(current_row), to_period_schema(year_ago_row))
+    return metrics
+
+
 class BalanceService:
     """Balance service class."""
 
-    def __init__(self, repository: BalanceRepository):
-        """Initialize the balance service with a repository."""
+    def __init__(
+        self,
+        repository: BalanceRepository,
+        repository_scope: Callable[[], AbstractContextManager[BalanceRepository]] | None = None,
+        cache: MetricsCache | None = None,
+    ):
+        """Initialize the balance service with a repository.
+
+        `repository_scope` opens repositories on separate sessions; without it, queries that could run
+        concurrently run one after the other on `repository`. With a `cache`, the period metrics
+        responses are served from it until their periods are recalculated.
+        """
         self.repository = repository
+        self.repository_scope = repository_scope
+        self.cache = cache
+
+    def _cached(self, endpoint: str, keys: Sequence[PeriodKey], compute: Callable[[], object], params: Hashable = ()):
+        """Return `compute()` through the metrics cache, or call it directly without one."""
+
+        if self.cache is None:
+            return compute()
+        return self.cache.get_or_set(endpoint, keys, params, compute)
+
+    def _metrics_etag(self, endpoint: str, keys: list[PeriodKey]) -> str:
+        """Build the ETag of an endpoint's response from the rows behind `keys`.
+
+        The validator (latest `updated_at` and row count) changes whenever one of the rows is upserted or
+        deleted. With a shared version store it is cached like the responses, so a revalidation hit does
+        not query either; a process-local store may have missed another process's bump, so it is queried.
+        """
+
+        if self.cache is not None and self.cache.versions.shared:
+            updated_at, rows = self._cached("metrics/validator", keys, lambda: self.repository.get_metrics_validator(keys))
+        else:
+            updated_at, rows = self.repository.get_metrics_validator(keys)
+        return build_etag(endpoint, keys, updated_at, rows)
 
     def get_transaction(self, reference: str) -> TransactionResponseSchema:
         """Get a transaction by reference."""
@@ -82,7 +239,7 @@ class BalanceService:
 
         transaction = Transaction(
             amount=data.amount,
-            reference=generate_reference(data.type, data.payment_method),
+            reference=generate_reference(data.type, data.payment_method, self.repository.reserve_reference_block),
             date=data.date or datetime.now(UTC),
             type=data.type,
             description=data.description,
@@ -92,6 +249,103 @@ class BalanceService:
         )
         return self.repository.create_transaction(transaction)
 
+    def resolve_import_status(self, confirm: bool, user_role: str) -> TransactionStatus:
+        """Return the status bulk imported transactions are created with."""
+
+        if not confirm:
+            return TransactionStatus.PENDING
+
+        if user_role != Role.OWNER:
+            raise TransactionStatusForbiddenException
+
+        return TransactionStatus.CONFIRMED
+
+    def import_batch(
+        self,
+        records: list[ImportRecord],
+        status: TransactionStatus,
+    ) -> list[TransactionImportResultSchema]:
+        """Validate and insert a batch of import records and return the per-row results in input order.
+
+        References for the whole batch are allocated at once from the reserved sequence block.
+        """
+
+        outcomes: list[tuple[int, str | None, list[str]]] = []
+        valid: list[tuple[int, TransactionSchema]] = []
+
+        for record in records:
+            if record.error:
+                outcomes.append((record.row, None, [record.error]))
+                continue
+
+            try:
+                data = TransactionSchema.model_validate(record.data)
+            except ValidationError as ex:
+                errors = [f"{'.'.join(str(loc) for loc in e['loc'])}: {e['msg']}" for e in ex.errors()]
+                outcomes.append((record.row, None, errors))
+                continue
+
+            if len(data.description) > 255:
+                outcomes.append((record.row, None, [InvalidDescriptionLengthException().detail]))
+                continue
+
+            valid.append((len(outcomes), data))
+            outcomes.append((record.row, None, []))
+
+        references = generate_references(
+            [(data.type, data.payment_method) for _idx, data in valid],
+            self.repository.reserve_reference_block,
+        )
+        rows: list[dict] = []
+        for (idx, data), reference in zip(valid, references, strict=True):
+            rows.append(
+                {
+                    "amount": data.amount,
+                    "reference": reference,
+                    "date": data.date or datetime.now(UTC),
+                    "type": data.type,
+                    "description": data.description,
+                    "payment_method": data.payment_method,
+                    "status": status,
+                    "category": data.category,
+                },
+            )
+            outcomes[idx] = (outcomes[idx][0], reference, [])
+
+        try:
+            created = self.repository.bulk_create_transactions(rows)
+        except DBOperationError as ex:
+            created = set()
+            outcomes = [(row, None, errors or [ex.detail]) for row, _reference, errors in outcomes]
+
+        results: list[TransactionImportResultSchema] = []
+        for row, reference, errors in outcomes:
+            if reference is None:
+                results.append(TransactionImportResultSchema(row=row, status=ImportRowStatus.FAILED, errors=errors))
+            elif reference in created:
+                results.append(TransactionImportResultSchema(row=row, status=ImportRowStatus.CREATED, reference=reference))
+            else:
+                results.append(
+                    TransactionImportResultSchema(
+                        row=row,
+                        status=ImportRowStatus.FAILED,
+                        errors=[f"Transaction with reference '{reference}' already exists"],
+                    ),
+                )
+
+        return results
+
+    async def import_transactions(
+        self,
+        records: AsyncIterable[ImportRecord],
+        status: TransactionStatus,
+    ) -> AsyncIterator[TransactionImportResultSchema]:
+        """Import a stream of records in batches, yielding each row result as soon as its batch is stored."""
+
+        async for batch in chunked(records, IMPORT.BATCH_SIZE):
+            for result in await run_in_threadpool(self.import_batch, batch, status):
+                yield result
+
     def delete_transaction(self, reference: str, user_role: str) -> None:
         """Delete a transaction."""
 
@@ -139,22 +393,84 @@ class BalanceService:
         if not transaction:
             raise TransactionNotFoundException(reference)
 
+        self._check_authorization(transaction, new_status, user_role)
+
+        transaction.status = new_status
+        return self.repository.update_transaction(transaction)
+
+    def authorize_transactions(
+        self,
+        references: list[str],
+        new_status: TransactionStatus,
+        user_role: str,
+    ) -> TransactionBatchAuthorizationResponseSchema:
+        """Authorize many transactions with one lookup and one commit.
+
+        The role rules of `authorize_transaction` apply per reference; references that fail them are
+        reported and left untouched. The single flush recalculates each affected period once.
+        """
+
+        references = list(dict.fromkeys(references))
+        transactions = {t.reference: t for t in self.repository.get_by_references(references)}
+
+        results: list[TransactionAuthorizationResultSchema] = []
+        updated: list[Transaction] = []
+        for reference in references:
+            transaction = transactions.get(reference)
+            try:
+                if transaction is None:
+                    raise TransactionNotFoundException(reference)
+                self._check_authorization(transaction, new_status, user_role)
+            except HTTPException as ex:
+                results.append(
+                    TransactionAuthorizationResultSchema(
+                        reference=reference,
+                        result=AuthorizationResultStatus.FAILED,
+                        status=transaction.status if transaction else None,
+                        error=ex.detail,
+                    ),
+                )
+                continue
+
+            transaction.status = new_status
+            updated.append(transaction)
+            results.append(
+                TransactionAuthorizationResultSchema(
+                    reference=reference,
+                    result=AuthorizationResultStatus.UPDATED,
+                    status=new_status,
+                ),
+            )
+
+        if updated:
+            self.repository.update_transactions(updated)
+
+        return TransactionBatchAuthorizationResponseSchema(
+            results=results,
+            updated=len(updated),
+            failed=len(results) - len(updated),
+        )
+
+    @staticmethod
+    def _check_authorization(transaction: Transaction, new_status: TransactionStatus, user_role: str) -> None:
+        """Raise if `user_role` may not move `transaction` to `new_status`."""
+
         if user_role == Role.ADMIN:
             if new_status != TransactionStatus.PENDING:
                 raise TransactionStatusForbiddenException
             if transaction.status != TransactionStatus.REJECTED:
                 raise InvalidTransactionStatusTransitionException
 
-        transaction.status = new_status
-        return self.repository.update_transaction(transaction)
-
     def get_metrics(self, month: int | None = None, year: int | None = None) -> BalanceMetricsSimpleResponseSchema:
         """Get metrics."""
-        if month is None and year is None:
-            now = datetime.now(UTC)
-            month = now.month
-            year = now.year
+        key = _simple_metrics_key(month, year)
+        return self._cached("metrics/simple", [key], lambda: self._simple_metrics(key.month, key.year))
+
+    def get_metrics_etag(self, month: int | None = None, year: int | None = None) -> str:
+        """Get the ETag of the simple metrics response."""
+        return self._metrics_etag("metrics/simple", [_simple_metrics_key(month, year)])
 
+    def _simple_metrics(self, month: int, year: int) -> BalanceMetricsSimpleResponseSchema:
         metrics = self.repository.get_month_year_metrics(month=month, year=year)
         metrics = metrics or SimpleNamespace(
             balance=0,
@@ -180,88 +496,133 @@ class BalanceService:
     ) -> BalanceMetricsDetailedResponseSchema:
         """Get detailed balance metrics for dashboard using precomputed transaction_metrics."""
 
-        current_key = PeriodKey(period_type=period, year=year, month=month, week=week)
-        prev_key = previous_period_key(current_key)
+        keys = _management_metrics_keys(period, year, month, week)
+        return self._cached("metrics", keys, lambda: self._management_metrics(*keys))
 
-        current_row = self.repository.get_period_metrics(
-            period_type=current_key.period_type,
-            year=current_key.year,
-            month=current_key.month,
-            week=current_key.week,
-        )
-        prev_row = self.repository.get_period_metrics(
-            period_type=prev_key.period_type,
-            year=prev_key.year,
-            month=prev_key.month,
-            week=prev_key.week,
-        )
+    def get_management_metrics_etag(
+        self,
+        period: PeriodType,
+        year: int | None = None,
+        month: int | None = None,
+        week: int | None = None,
+    ) -> str:
+        """Get the ETag of the detailed metrics response."""
+        return self._metrics_etag("metrics", _management_metrics_keys(period, year, month, week))
 
-        if not current_row and not prev_row:
-            return BalanceMetricsDetailedResponseSchema()
+    def _management_metrics(
+        self,
+        current_key: PeriodKey,
+        prev_key: PeriodKey,
+        year_ago_key: PeriodKey,
+    ) -> BalanceMetricsDetailedResponseSchema:
+        rows = self.repository.get_metrics_by_keys([current_key, prev_key, year_ago_key])
+        return _build_period_metrics(rows.get(current_key), rows.get(prev_key), rows.get(year_ago_key))
 
-        current_schema = to_period_schema(current_row)
-        previous_schema = to_period_schema(prev_row)
+    def get_range_metrics(self, start: date, end: date) -> BalanceMetricsDetailedResponseSchema:
+        """Get detailed balance metrics for an arbitrary date range by summing the daily rollups.
 
-        payment_breakdown_schema = payment_breakdown_schemas(current_row)
-        weekly_income, weekly_expense, ratio = weekly_averages_and_ratio(current_row)
+        The previous period is the range of the same length that ends the day before `start`.
+        """
 
-        comparison = ComparisonSchema(
-            balance_change_percent=percent_change_from_schemas(
-                current_schema,
-                previous_schema,
-                "balance",
-            ),
-            income_change_percent=percent_change_from_schemas(
-                current_schema,
-                previous_schema,
-                "total_income",
-            ),
-            expense_change_percent=percent_change_from_schemas(
-                current_schema,
-                previous_schema,
-                "total_expense",
-            ),
-            transaction_change=(current_schema.transaction_count - previous_schema.transaction_count),
-        )
+        days = (end - start).days + 1
+        previous_start = start - timedelta(days=days)
+        previous_end = start - timedelta(days=1)
 
-        return BalanceMetricsDetailedResponseSchema(
-            current_period=current_schema,
-            previous_period=previous_schema,
-            comparison=comparison,
-            payment_method_breakdown=payment_breakdown_schema,
-            weekly_averages=WeeklyAveragesSchema(income=weekly_income, expense=weekly_expense),
-            income_expense_ratio=ratio,
-        )
+        current, previous = self.repository.get_range_metrics(start=start, end=end, previous_start=previous_start)
+
+        if not current.transaction_count and not previous.transaction_count:
+            return BalanceMetricsDetailedResponseSchema()
+
+        current_row = SimpleNamespace(**derive_period_values(current, count_iso_weeks_in_range(start, end)))
+        prev_row = SimpleNamespace(**derive_period_values(previous, count_iso_weeks_in_range(previous_start, previous_end)))
+
+        return _build_detailed_metrics(current_row, prev_row)
 
     def get_historical(self, period: PeriodType, limit: int) -> BalanceTrendResponseSchema:
         """Get historical trend from precomputed transaction_metrics."""
-        now = datetime.now(UTC)
-        current_key = current_period_key(period_type=period, now=now)
+        keys = _build_historical_keys(current_period_key(period_type=period, now=datetime.now(UTC)), limit)
+        return self._cached("metrics/trend", keys, lambda: self._trend(period, keys))
 
-        keys = _build_historical_keys(current_key, limit)
+    def get_historical_etag(self, period: PeriodType, limit: int) -> str:
+        """Get the ETag of the trend response."""
+        keys = _build_historical_keys(current_period_key(period_type=period, now=datetime.now(UTC)), limit)
+        return self._metrics_etag("metrics/trend", keys)
 
+    def _trend(self, period: PeriodType, keys: list[PeriodKey]) -> BalanceTrendResponseSchema:
         rows = self.repository.get_metrics_for_keys(period_type=period, keys=keys)
+        return _build_trend(period, keys, _metrics_by_key(rows))
 
-        metrics_by_key = {
-            (int(r.year), int(r.month) if r.month is not None else None, int(r.week) if r.week is not None else None): r
-            for r in rows
-        }
+    def get_category_trend(self, period: PeriodType, limit: int) -> CategoryTrendResponseSchema:
+        """Get the historical totals by category from precomputed transaction_metrics."""
+        keys = _build_historical_keys(current_period_key(period_type=period, now=datetime.now(UTC)), limit)
+        return self._cached("metrics/categories/trend", keys, lambda: self._category_trend(period, keys))
 
-        data: list[BalanceTrendDataPointSchema] = []
-        for key in keys:
-            start_dt, end_dt = period_bounds_utc(key)
-            row = metrics_by_key.get((key.year, key.month, key.week))
-
-            data.append(
-                BalanceTrendDataPointSchema(
-                    period_start=start_dt,
-                    period_end=end_dt,
-                    total_income=safe_float(row, "total_income"),
-                    total_expense=safe_float(row, "total_expense"),
-                ),
+    def get_category_trend_etag(self, period: PeriodType, limit: int) -> str:
+        """Get the ETag of the category trend response."""
+        keys = _build_historical_keys(current_period_key(period_type=period, now=datetime.now(UTC)), limit)
+        return self._metrics_etag("metrics/categories/trend", keys)
+
+    def _category_trend(self, period: PeriodType, keys: list[PeriodKey]) -> CategoryTrendResponseSchema:
+        rows = self.repository.get_metrics_for_keys(period_type=period, keys=keys)
+        return _build_category_trend(period, keys, _metrics_by_key(rows))
+
+    async def get_dashboard(
+        self,
+        period: PeriodType,
+        year: int | None = None,
+        month: int | None = None,
+        week: int | None = None,
+        trend_limit: int = 6,
+        limit: int = 10,
+        status: TransactionStatus | None = None,
+    ) -> BalanceDashboardResponseSchema:
+        """Assemble the owner dashboard of a period in one call.
+
+        The current, previous and trend metrics come from one transaction_metrics query and the count
+        and first page from one windowed transaction query. With a `repository_scope` both run at the
+        same time, the page on its own pooled session.
+        """
+
+        key = _management_metrics_keys(period, year, month, week)[0]
+        page_params = {"period": period, "year": year, "month": month, "week": week, "limit": limit, "status": status}
+
+        if self.repository_scope is None:
+            (metrics, trend), page = await run_in_threadpool(
+                lambda: (self._dashboard_metrics(key, trend_limit), self.get_transactions(**page_params)),
+            )
+        else:
+            (metrics, trend), page = await asyncio.gather(
+                run_in_threadpool(self._dashboard_metrics, key, trend_limit),
+                run_in_threadpool(self._scoped_transactions, **page_params),
             )
 
-        return BalanceTrendResponseSchema(period_type=period, data=data)
+        return BalanceDashboardResponseSchema(
+            metrics=metrics,
+            trend=trend,
+            transaction_count=page.pagination.total,
+            transactions=page,
+        )
+
+    def _dashboard_metrics(
+        self,
+        key: PeriodKey,
+        trend_limit: int,
+    ) -> tuple[BalanceMetricsDetailedResponseSchema, BalanceTrendResponseSchema]:
+        """Build the detailed metrics and trend of `key` from one lookup of all the periods they need."""
+
+        _, prev_key, year_ago_key = _management_metrics_keys(key.period_type, key.year, key.month, key.week)
+        trend_keys = _build_historical_keys(key, trend_limit)
+
+        rows = self.repository.get_metrics_by_keys([*trend_keys, prev_key, year_ago_key])
+        metrics = _build_period_metrics(rows.get(key), rows.get(prev_key), rows.get(year_ago_key))
+
+        return metrics, _build_trend(PeriodType(key.period_type), trend_keys, _metrics_by_key(rows.values()))
+
+    def _scoped_transactions(self, **params) -> BalanceTransactionsResponseSchema:
+        """List transactions through a repository on its own session, so it can run next to this one."""
+
+        with self.repository_scope() as repository:
+            return BalanceService(repository).get_transactions(**params)
 
     def get_transactions_count(
         self,
@@ -297,29 +658,53 @@ class BalanceService:
         sort_by: TransactionSortBy = TransactionSortBy.DATE,
         sort_order: SortOrder = SortOrder.DESC,
         status: TransactionStatus | None = None,
+        after: str | None = None,
+        include_total: bool = True,
+        estimate_total: bool = False,
     ) -> BalanceTransactionsResponseSchema:
-        """Get transactions for a given period with pagination & sorting."""
+        """Get transactions for a given period with pagination & sorting.
+
+        Offset pages carry their total in the same query. With `after` the page is addressed by keyset
+        cursor, so deep pages cost the same as the first one. `include_total=False` skips the total and
+        `estimate_total=True` replaces it with a cheap estimate.
+        """
 
         key = PeriodKey(period_type=period, year=year, month=month, week=week)
         start_dt, end_dt = period_bounds_utc(key)
 
-        offset = (page - 1) * limit
+        cursor = decode_cursor(after, sort_by, sort_order) if after else None
+        offset = 0 if cursor else (page - 1) * limit
 
-        total = self.repository.count_transactions_in_range(
-            start_dt=start_dt,
-            end_dt=end_dt,
-            status=status,
-        )
+        total: int | None = None
+        if cursor is None and include_total and not estimate_total:
+            rows, total = self.repository.list_transactions_page(
+                start_dt=start_dt,
+                end_dt=end_dt,
+                limit=limit,
+                offset=offset,
+                sort_by=sort_by,
+                sort_order=sort_order,
+                status=status,
+            )
+            has_more = offset + len(rows) < total
+        else:
+            rows = self.repository.list_transactions_in_range(
+                start_dt=start_dt,
+                end_dt=end_dt,
+                limit=limit + 1,
+                offset=offset,
+                sort_by=sort_by,
+                sort_order=sort_order,
+                status=status,
+                after=cursor,
+            )
+            has_more = len(rows) > limit
+            rows = rows[:limit]
 
-        rows = self.repository.list_transactions_in_range(
-            start_dt=start_dt,
-            end_dt=end_dt,
-            limit=limit,
-            offset=offset,
-            sort_by=sort_by,
-            sort_order=sort_order,
-            status=status,
-        )
+            if estimate_total:
+                total = self._estimate_transactions_total(key, start_dt, end_dt, status)
+            elif include_total:
+                total = self.repository.count_transactions_in_range(start_dt=start_dt, end_dt=end_dt, status=status)
 
         return BalanceTransactionsResponseSchema(
             transactions=rows,
@@ -327,6 +712,145 @@ class BalanceService:
                 page=page,
                 limit=limit,
                 total=total,
-                total_pages=(0 if total == 0 else math.ceil(total / limit)),
+                total_pages=None if total is None else (0 if total == 0 else math.ceil(total / limit)),
+                next_cursor=encode_cursor(rows[-1], sort_by, sort_order) if has_more and rows else None,
+                total_estimated=estimate_total and total is not None,
             ),
         )
+
+    def _estimate_transactions_total(
+        self,
+        key: PeriodKey,
+        start_dt: datetime,
+        end_dt: datetime,
+        status: TransactionStatus | None,
+    ) -> int:
+        """Estimate the transactions of a period without scanning them.
+
+        CONFIRMED listings read the period rollup, which counts exactly those rows once the metrics
+        are up to date; any other filter uses the planner estimate.
+        """
+
+        if status == TransactionStatus.CONFIRMED:
+            metrics = self.repository.get_period_metrics(
+                period_type=key.period_type,
+                year=key.year,
+                month=key.month,
+                week=key.week,
+            )
+            return metrics.transaction_count if metrics else 0
+
+        return self.repository.estimate_transactions_in_range(start_dt=start_dt, end_dt=end_dt, status=status)
+
+
+class AsyncBalanceService:
+    """Balance service on an async database session.
+
+    Each call runs the matching `BalanceService` method inside `AsyncBalanceRepository.run`, so the
+    business rules, the metrics cache and the flush hooks are shared with the sync path while every
+    query is awaited on the event loop. Bulk imports and the dashboard keep their threadpool fan-out
+    on `BalanceService`.
+    """
+
+    def __init__(self, repository: AsyncBalanceRepository, cache: MetricsCache | None = None):
+        """Initialize the service with an async repository and, optionally, the metrics response cache."""
+        self.repository = repository
+        self.cache = cache
+
+    async def _run[T](self, call: Callable[[BalanceService], T]) -> T:
+        return await self.repository.run(lambda repository: call(BalanceService(repository, cache=self.cache)))
+
+    async def get_transaction(self, reference: str) -> TransactionResponseSchema:
+        """Get a transaction by reference."""
+        return await self._run(lambda service: service.get_transaction(reference))
+
+    async def create_transaction(self, data: TransactionSchema) -> TransactionResponseSchema:
+        """Create a new transaction."""
+        return await self._run(lambda service: service.create_transaction(data))
+
+    async def delete_transaction(self, reference: str, user_role: str) -> None:
+        """Delete a transaction."""
+        return await self._run(lambda service: service.delete_transaction(reference, user_role))
+
+    async def update_transaction(self, reference: str, data: TransactionSchema, user_role: str) -> TransactionResponseSchema:
+        """Update a transaction."""
+        return await self._run(lambda service: service.update_transaction(reference, data, user_role))
+
+    async def authorize_transaction(
+        self,
+        reference: str,
+        new_status: TransactionStatus,
+        user_role: str,
+    ) -> TransactionResponseSchema:
+        """Authorize a transaction."""
+        return await self._run(lambda service: service.authorize_transaction(reference, new_status, user_role))
+
+    async def authorize_transactions(
+        self,
+        references: list[str],
+        new_status: TransactionStatus,
+        user_role: str,
+    ) -> TransactionBatchAuthorizationResponseSchema:
+        """Authorize many transactions with one lookup and one commit."""
+        return await self._run(lambda service: service.authorize_transactions(references, new_status, user_role))
+
+    async def get_metrics(self, month: int | None = None, year: int | None = None) -> BalanceMetricsSimpleResponseSchema:
+        """Get simple balance metrics of a month."""
+        return await self._run(lambda service: service.get_metrics(month=month, year=year))
+
+    async def get_metrics_etag(self, month: int | None = None, year: int | None = None) -> str:
+        """Get the ETag of the simple metrics response."""
+        return await self._run(lambda service: service.get_metrics_etag(month=month, year=year))
+
+    async def get_management_metrics(
+        self,
+        period: PeriodType,
+        year: int | None = None,
+        month: int | None = None,
+        week: int | None = None,
+    ) -> BalanceMetricsDetailedResponseSchema:
+        """Get detailed balance metrics for dashboard using precomputed transaction_metrics."""
+        return await self._run(lambda service: service.get_management_metrics(period, year, month, week))
+
+    async def get_management_metrics_etag(
+        self,
+        period: PeriodType,
+        year: int | None = None,
+        month: int | None = None,
+        week: int | None = None,
+    ) -> str:
+        """Get the ETag of the detailed metrics response."""
+        return await self._run(lambda service: service.get_management_metrics_etag(period, year, month, week))
+
+    async def get_range_metrics(self, start: date, end: date) -> BalanceMetricsDetailedResponseSchema:
+        """Get detailed balance metrics for an arbitrary date range."""
+        return await self._run(lambda service: service.get_range_metrics(start, end))
+
+    async def get_historical(self, period: PeriodType, limit: int) -> BalanceTrendResponseSchema:
+        """Get the income and expense trend of the last `limit` periods."""
+        return await self._run(lambda service: service.get_historical(period, limit))
+
+    async def get_historical_etag(self, period: PeriodType, limit: int) -> str:
+        """Get the ETag of the trend response."""
+        return await self._run(lambda service: service.get_historical_etag(period, limit))
+
+    async def get_category_trend(self, period: PeriodType, limit: int) -> CategoryTrendResponseSchema:
+        """Get the income and expense by category of the last `limit` periods."""
+        return await self._run(lambda service: service.get_category_trend(period, limit))
+
+    async def get_category_trend_etag(self, period: PeriodType, limit: int) -> str:
+        """Get the ETag of the category trend response."""
+        return await self._run(lambda service: service.get_category_trend_etag(period, limit))
+
+    async def get_transactions_count(
+        self,
+        month: int | None = None,
+        year: int | None = None,
+        status: TransactionStatus | None = None,
+    ) -> TransactionCountResponseSchema:
+        """Count transactions for a given month/year with an optional status filter."""
+        return await self._run(lambda service: service.get_transactions_count(month=month, year=year, status=status))
+
+    async def get_transactions(self, **params) -> BalanceTransactionsResponseSchema:
+        """Get transactions for a given period with pagination & sorting; takes the `BalanceService` parameters."""
+        return await self._run(lambda service: service.get_transactions(**params))
@@ -1,6 +1,8 @@
 import math
+from collections.abc import Callable
 from datetime import UTC, datetime, timedelta
 
+from app.enum.balance import PeriodType
 from app.errors.car import (
     AssociateNotFoundException,
     CarIdAlreadyExistsException,
@@ -11,19 +13,26 @@ from app.errors.car import (
     PolicyExpirationDateInPastException,
 )
 from app.models.car import Car
-from app.repositories.car import CarRepository
+from app.repositories.car import AsyncCarRepository, CarRepository
+from app.schemas.balance import BalanceMetricsDetailedQuerySchema
 from app.schemas.car import (
     AssignedDriverSchema,
     AssociateDetailSchema,
     CarDetailResponseSchema,
     CarListQuerySchema,
     CarListResponseSchema,
+    CarMetricsRankingQuerySchema,
+    CarMetricsRankingResponseSchema,
+    CarMetricsResponseSchema,
+    CarRankingItemSchema,
     CarSchema,
     DocumentDetailSchema,
     InsuranceDetailSchema,
     PaginationSchema,
 )
+from app.schemas.dto.periods import PeriodKey
 from app.storage import r2
+from app.utils.periods import compare_periods, previous_period_key, to_period_schema
 
 _EXPIRING_SOON_DAYS = 30
 
@@ -40,6 +49,12 @@ def _compute_expiry_status(expiry_date) -> str | None:
     return "valid"
 
 
+def _car_metrics_key(params: BalanceMetricsDetailedQuerySchema) -> PeriodKey:
+    """Return the requested period; week keys drop the month, car_metrics week rows have none."""
+    month = None if params.period == PeriodType.WEEK else params.month
+    return PeriodKey(period_type=params.period, year=params.year, month=month, week=params.week)
+
+
 class CarService:
     """Car service class."""
 
@@ -218,3 +233,78 @@ class CarService:
         )
 
         return self.repository.create_car(car, associate)
+
+    def get_car_metrics(self, car_id: str, params: BalanceMetricsDetailedQuerySchema) -> CarMetricsResponseSchema:
+        """Return the profit and loss of a car in a period and the one before it, or raise 404 if not found."""
+        if not self.repository.get_by_id(car_id):
+            raise CarNotFoundException(car_id)
+
+        current_key = _car_metrics_key(params)
+        previous_key = previous_period_key(current_key)
+        rows = self.repository.get_car_metrics_by_keys(car_id, [current_key, previous_key])
+
+        current = to_period_schema(rows.get(current_key))
+        previous = to_period_schema(rows.get(previous_key))
+        return CarMetricsResponseSchema(
+            car_id=car_id,
+            period_type=current_key.period_type,
+            current_period=current,
+            previous_period=previous,
+            comparison=compare_periods(current, previous),
+        )
+
+    def rank_cars(self, params: CarMetricsRankingQuerySchema) -> CarMetricsRankingResponseSchema:
+        """Return the cars ranked by their balance in a period."""
+        key = _car_metrics_key(params)
+        rows = self.repository.rank_cars_by_balance(key, params.limit, params.sort_order)
+        return CarMetricsRankingResponseSchema(
+            period_type=key.period_type,
+            cars=[
+                CarRankingItemSchema(
+                    car_id=metrics.car_id,
+                    plate=plate,
+                    make=make,
+                    model=model,
+                    balance=float(metrics.balance),
+                    total_income=float(metrics.total_income),
+                    total_expense=float(metrics.total_expense),
+                    transaction_count=metrics.transaction_count,
+                )
+                for metrics, plate, make, model in rows
+            ],
+        )
+
+
+class AsyncCarService:
+    """Car service on an async database session.
+
+    Each call runs the matching `CarService` method inside `AsyncCarRepository.run`, so the lazy loads
+    of the car detail are awaited along with its queries.
+    """
+
+    def __init__(self, repository: AsyncCarRepository):
+        """Initialize the car service with an async repository."""
+        self.repository = repository
+
+    async def _run[T](self, call: Callable[[CarService], T]) -> T:
+        return await self.repository.run(lambda repository: call(CarService(repository)))
+
+    async def get_car(self, car_id: str) -> CarDetailResponseSchema:
+        """Return the full detail for a single car, or raise 404 if not found."""
+        return await self._run(lambda service: service.get_car(car_id))
+
+    async def list_cars(self, params: CarListQuerySchema) -> CarListResponseSchema:
+        """Return a paginated, filtered and sorted list of cars."""
+        return await self._run(lambda service: service.list_cars(params))
+
+    async def create_car(self, data: CarSchema) -> Car:
+        """Create a new car with validations."""
+        return await self._run(lambda service: service.create_car(data))
+
+    async def get_car_metrics(self, car_id: str, params: BalanceMetricsDetailedQuerySchema) -> CarMetricsResponseSchema:
+        """Return the profit and loss of a car in a period and the one before it, or raise 404 if not found."""
+        return await self._run(lambda service: service.get_car_metrics(car_id, params))
+
+    async def rank_cars(self, params: CarMetricsRankingQuerySchema) -> CarMetricsRankingResponseSchema:
+        """Return the cars ranked by their balance in a period."""
+        return await self._run(lambda service: service.rank_cars(params))
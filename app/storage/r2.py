@@ -1,10 +1,17 @@
-import boto3
-from botocore.config import Config
+from functools import cache
 
 from app.config.variables import R2
 
 
-def _get_client():
+@cache
+def get_client():
+    """Return the R2 client, created on first use and then reused.
+
+    boto3 takes a large share of the API's import time, so it is imported here rather than at startup.
+    """
+    import boto3
+    from botocore.config import Config
+
     return boto3.client(
         "s3",
         endpoint_url=R2.ENDPOINT,
@@ -17,7 +24,7 @@ def _get_client():
 
 def generate_document_upload_url(key: str, content_type: str, expires_in: int = 3600) -> str:
     """Generate a presigned PUT URL to upload a private document."""
-    client = _get_client()
+    client = get_client()
     return client.generate_presigned_url(
         "put_object",
         Params={
@@ -31,7 +38,7 @@ def generate_document_upload_url(key: str, content_type: str, expires_in: int =
 
 def generate_document_read_url(key: str, expires_in: int = 3600) -> str:
     """Generate a presigned GET URL to temporarily read a private document."""
-    client = _get_client()
+    client = get_client()
     return client.generate_presigned_url(
         "get_object",
         Params={
@@ -44,7 +51,7 @@ def generate_document_read_url(key: str, expires_in: int = 3600) -> str:
 
 def generate_image_upload_url(key: str, content_type: str, expires_in: int = 3600) -> str:
     """Generate a presigned PUT URL to upload an image to the public bucket."""
-    client = _get_client()
+    client = get_client()
     return client.generate_presigned_url(
         "put_object",
         Params={
@@ -63,7 +70,7 @@ def get_image_public_url(key: str) -> str:
 
 def upload_image(key: str, data: bytes, content_type: str) -> str:
     """Upload an image to the public bucket and return its public URL."""
-    client = _get_client()
+    client = get_client()
     client.put_object(
         Bucket=R2.IMAGES_BUCKET,
         Key=key,
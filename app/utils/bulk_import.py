@@ -0,0 +1,111 @@
+import codecs
+import csv
+import json
+from collections.abc import AsyncIterable, AsyncIterator
+
+from starlette.requests import ClientDisconnect
+from starlette.responses import StreamingResponse
+from starlette.types import Receive, Scope, Send
+
+from app.enum.balance import ImportFormat
+from app.errors.balance import UnsupportedImportFormatException
+from app.schemas.dto.imports import ImportRecord
+
+CONTENT_TYPES: dict[str, ImportFormat] = {
+    "application/x-ndjson": ImportFormat.NDJSON,
+    "application/jsonl": ImportFormat.NDJSON,
+    "application/json-seq": ImportFormat.NDJSON,
+    "text/csv": ImportFormat.CSV,
+}
+
+
+def import_format(content_type: str | None) -> ImportFormat:
+    """Resolve the import format from a Content-Type header."""
+    media_type = (content_type or "").split(";", 1)[0].strip().lower()
+    try:
+        return CONTENT_TYPES[media_type]
+    except KeyError:
+        raise UnsupportedImportFormatException from None
+
+
+async def iter_lines(chunks: AsyncIterable[bytes]) -> AsyncIterator[str]:
+    """Decode a UTF-8 byte stream into lines without buffering the whole body."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line.rstrip("\r")
+
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending.rstrip("\r")
+
+
+async def iter_records(lines: AsyncIterable[str], fmt: ImportFormat) -> AsyncIterator[ImportRecord]:
+    """Parse NDJSON objects or CSV rows (first line is the header) into numbered import records.
+
+    Blank lines are skipped. CSV fields must not contain line breaks, and empty CSV cells are read as missing values.
+    """
+    header: list[str] | None = None
+    row = 0
+
+    async for line in lines:
+        if not line.strip():
+            continue
+
+        if fmt == ImportFormat.CSV:
+            values = next(csv.reader([line]))
+            if header is None:
+                header = [h.strip() for h in values]
+                continue
+            row += 1
+            if len(values) != len(header):
+                yield ImportRecord(row=row, error=f"Expected {len(header)} columns, got {len(values)}")
+                continue
+            yield ImportRecord(row=row, data={k: v for k, v in zip(header, values, strict=True) if v != ""})
+            continue
+
+        row += 1
+        try:
+            data = json.loads(line)
+        except json.JSONDecodeError as ex:
+            yield ImportRecord(row=row, error=f"Invalid JSON: {ex.msg}")
+            continue
+        if not isinstance(data, dict):
+            yield ImportRecord(row=row, error="Each line must be a JSON object")
+            continue
+        yield ImportRecord(row=row, data=data)
+
+
+async def chunked[T](items: AsyncIterable[T], size: int) -> AsyncIterator[list[T]]:
+    """Group an async stream into lists of at most `size` items."""
+    chunk: list[T] = []
+    async for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+class BodyStreamingResponse(StreamingResponse):
+    """Streaming response whose body iterator keeps reading the request body while responding.
+
+    The default response task listens for `http.disconnect` on the same `receive` channel and would
+    swallow the remaining request chunks. Reading the request stream already raises `ClientDisconnect`
+    when the client goes away, so only the send side is run here.
+    """
+
+    async def __call__(self, _scope: Scope, _receive: Receive, send: Send) -> None:
+        """Send the streamed body without a competing disconnect listener."""
+        try:
+            await self.stream_response(send)
+        except OSError:
+            raise ClientDisconnect from None
+
+        if self.background is not None:
+            await self.background()
@@ -0,0 +1,195 @@
+"""Versioned response cache for the balance metrics endpoints.
+
+Every transaction_metrics period has a version number. Cached entries remember the versions of the
+periods they were computed from and are served only while those versions are unchanged, so the
+metrics recalculation invalidates exactly the periods it rewrote by bumping them after commit.
+
+Versions live in a `VersionStore`: the in-process `LocalVersionStore` for a single process, or Redis when
+several API processes (or a separate metrics worker) must see each other's bumps. The cached values
+themselves always stay in a per-process LRU.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Hashable, Iterable, Sequence
+from typing import Any, Protocol, TypeVar
+
+from app.config import CACHE
+from app.schemas.dto.cache import CacheStats
+from app.schemas.dto.periods import PeriodKey
+
+T = TypeVar("T")
+
+# Its version is part of every entry, so bumping it invalidates the whole cache (full rebuilds)
+ALL_PERIODS = PeriodKey(period_type="*", year=0)
+
+# Session.info key where the metrics repository collects the periods rewritten in a transaction
+CHANGED_PERIODS_KEY = "changed_metric_periods"
+
+
+def version_name(key: PeriodKey) -> str:
+    """Return the version store name of a period."""
+
+    if key == ALL_PERIODS:
+        return "*"
+    return f"{key.period_type}:{key.year}:{key.month or ''}:{key.week or ''}"
+
+
+def record_changed_periods(info: dict[str, Any], keys: Iterable[PeriodKey]) -> None:
+    """Remember in a session's `info` the periods it rewrote, to invalidate them once it commits."""
+
+    info.setdefault(CHANGED_PERIODS_KEY, set()).update(keys)
+
+
+class VersionStore(Protocol):
+    """Storage of the period version numbers."""
+
+    name: str
+    # Whether every process sees the bumps of the others
+    shared: bool
+
+    def get_many(self, names: Sequence[str]) -> list[int]:
+        """Return the version of each name, 0 for names never bumped."""
+
+    def bump(self, names: Iterable[str]) -> None:
+        """Increment the version of each name."""
+
+
+class LocalVersionStore:
+    """Period versions in process memory; the stand-in for a shared store on a single process."""
+
+    name = "local"
+    shared = False
+
+    def __init__(self):
+        self._versions: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def get_many(self, names: Sequence[str]) -> list[int]:
+        """Return the version of each name, 0 for names never bumped."""
+
+        with self._lock:
+            return [self._versions.get(name, 0) for name in names]
+
+    def bump(self, names: Iterable[str]) -> None:
+        """Increment the version of each name."""
+
+        with self._lock:
+            for name in names:
+                self._versions[name] = self._versions.get(name, 0) + 1
+
+
+class RedisVersionStore:
+    """Period versions in Redis, shared by every API process and the metrics worker.
+
+    Needs the optional `redis` package.
+    """
+
+    name = "redis"
+    shared = True
+    prefix = "pegazzo:metrics-version:"
+
+    def __init__(self, url: str):
+        try:
+            import redis
+        except ImportError as exc:
+            raise RuntimeError("CACHE_BACKEND=redis needs the `redis` package installed") from exc
+
+        self._client = redis.Redis.from_url(url)
+
+    def get_many(self, names: Sequence[str]) -> list[int]:
+        """Return the version of each name, 0 for names never bumped."""
+
+        values = self._client.mget([self.prefix + name for name in names])
+        return [int(value or 0) for value in values]
+
+    def bump(self, names: Iterable[str]) -> None:
+        """Increment the version of each name in one round-trip."""
+
+        pipeline = self._client.pipeline(transaction=False)
+        for name in names:
+            pipeline.incr(self.prefix + name)
+        pipeline.execute()
+
+
+class MetricsCache:
+    """LRU of computed responses, each valid while its periods keep the versions it was computed at."""
+
+    def __init__(self, versions: VersionStore, max_entries: int = CACHE.MAX_ENTRIES):
+        self.versions = versions
+        self.max_entries = max_entries
+        self._entries: OrderedDict[Hashable, tuple[tuple[int, ...], Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._invalidations = 0
+
+    def get_or_set(self, endpoint: str, keys: Sequence[PeriodKey], params: Hashable, compute: Callable[[], T]) -> T:
+        """Return the cached value of (endpoint, keys, params), calling `compute` when missing or stale.
+
+        Versions are read before computing, so a bump that lands while `compute` runs leaves the stored
+        entry stale instead of pinning an outdated value.
+        """
+
+        entry_key = (endpoint, tuple(keys), params)
+        current = tuple(self.versions.get_many([version_name(ALL_PERIODS), *map(version_name, keys)]))
+
+        with self._lock:
+            entry = self._entries.get(entry_key)
+            if entry is not None and entry[0] == current:
+                self._entries.move_to_end(entry_key)
+                self._hits += 1
+                return entry[1]
+            self._misses += 1
+
+        value = compute()
+
+        with self._lock:
+            self._entries[entry_key] = (current, value)
+            self._entries.move_to_end(entry_key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+        return value
+
+    def invalidate(self, keys: Iterable[PeriodKey]) -> None:
+        """Bump the version of each period, making every entry computed from it stale."""
+
+        names = {version_name(key) for key in keys}
+        if not names:
+            return
+        self.versions.bump(sorted(names))
+        with self._lock:
+            self._invalidations += len(names)
+
+    def clear(self) -> None:
+        """Drop every entry and reset the counters."""
+
+        with self._lock:
+            self._entries.clear()
+            self._hits = self._misses = self._invalidations = 0
+
+    def stats(self) -> CacheStats:
+        """Return the counters and size of the cache."""
+
+        with self._lock:
+            return CacheStats(
+                enabled=CACHE.ENABLED,
+                backend=self.versions.name,
+                entries=len(self._entries),
+                max_entries=self.max_entries,
+                hits=self._hits,
+                misses=self._misses,
+                invalidations=self._invalidations,
+            )
+
+
+def _version_store() -> VersionStore:
+    if CACHE.BACKEND == "redis":
+        return RedisVersionStore(CACHE.REDIS_URL)
+    return LocalVersionStore()
+
+
+metrics_cache = MetricsCache(_version_store())
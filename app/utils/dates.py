@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from datetime import date, timedelta
+from datetime import UTC, date, datetime, time, timedelta
 
 
 def start_of_month(year: int, month: int) -> date:
@@ -45,3 +45,23 @@ def count_iso_weeks_in_month(year: int, month: int) -> int:
         return (iso_weeks_in_year(start_iso.year) - start_week + 1) + end_week
 
     return max(1, end_week - start_week + 1)
+
+
+def utc_date(dt: datetime) -> date:
+    """Return the UTC calendar day of a datetime (naive datetimes are assumed to be UTC)."""
+    if dt.tzinfo is None:
+        return dt.date()
+    return dt.astimezone(UTC).date()
+
+
+def day_bounds_utc(day: date) -> tuple[datetime, datetime]:
+    """Return the half-open [start, end) UTC datetime range of a calendar day."""
+    start = datetime.combine(day, time.min, tzinfo=UTC)
+    return start, start + timedelta(days=1)
+
+
+def count_iso_weeks_in_range(start: date, end: date) -> int:
+    """Return the number of ISO weeks overlapping an inclusive date range."""
+    start_monday = start - timedelta(days=start.weekday())
+    end_monday = end - timedelta(days=end.weekday())
+    return max(1, (end_monday - start_monday).days // 7 + 1)
@@ -0,0 +1,21 @@
+import hashlib
+
+# Clients may keep metrics responses but must revalidate them with If-None-Match on every use
+METRICS_CACHE_CONTROL = "private, no-cache"
+
+
+def build_etag(*parts: object) -> str:
+    """Build a strong ETag from the values a response depends on."""
+
+    digest = hashlib.blake2b(repr(parts).encode(), digest_size=16).hexdigest()
+    return f'"{digest}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Tell whether an `If-None-Match` header lists `etag` (weak comparison, as RFC 9110 requires)."""
+
+    if not if_none_match:
+        return False
+
+    candidates = {candidate.strip().removeprefix("W/") for candidate in if_none_match.split(",")}
+    return "*" in candidates or etag.removeprefix("W/") in candidates
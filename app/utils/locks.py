@@ -0,0 +1,10 @@
+import hashlib
+
+
+def advisory_lock_key(*parts: object) -> int:
+    """Return a stable signed 64-bit key for PostgreSQL advisory locks.
+
+    Python's `hash()` is salted per process, so workers would not agree on it.
+    """
+    digest = hashlib.blake2b(":".join(str(p) for p in parts).encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big", signed=True)
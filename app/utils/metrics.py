@@ -1,9 +1,17 @@
+from collections.abc import Iterable
 from decimal import Decimal
+from typing import Any
 
-from app.utils.decimal import DEC_2, ROUND_HALF_UP
+from app.enum.balance import Type as TxType
+from app.schemas.dto.periods import PeriodRawMetrics, TransactionSnapshot
+from app.utils.decimal import DEC_2, ROUND_HALF_UP, round_to_2_decimals
+from app.utils.paymenth_method import compute_balance_breakdown, format_payment_method_breakdown
 
 Number = int | float | Decimal | str
 
+# Rollup and breakdown key of transactions without a category
+UNCATEGORIZED = "uncategorized"
+
 
 def calculate_weekly_averages(
     *,
@@ -64,3 +72,129 @@ def safe_float(row, attr: str) -> float:
 def to_decimal(obj, attr: str) -> Decimal:
     """Convert obj.attr to Decimal safely."""
     return Decimal(str(getattr(obj, attr)))
+
+
+def empty_raw_metrics() -> PeriodRawMetrics:
+    """Return raw metrics for a period without transactions."""
+    return PeriodRawMetrics(
+        total_income=Decimal("0.00"),
+        total_expense=Decimal("0.00"),
+        transaction_count=0,
+        credit_payment_amounts={},
+        debit_payment_amounts={},
+    )
+
+
+def snapshot_raw_metrics(snapshot: TransactionSnapshot, sign: int = 1) -> PeriodRawMetrics:
+    """Return the (signed) raw metrics contribution of a single transaction."""
+    amount = round_to_2_decimals(snapshot.amount) * sign
+    is_credit = snapshot.type == TxType.CREDIT.value
+    is_debit = snapshot.type == TxType.DEBIT.value
+    category = snapshot.category or UNCATEGORIZED
+
+    return PeriodRawMetrics(
+        total_income=amount if is_credit else Decimal("0.00"),
+        total_expense=amount if is_debit else Decimal("0.00"),
+        transaction_count=sign,
+        credit_payment_amounts={snapshot.payment_method: amount} if is_credit else {},
+        debit_payment_amounts={snapshot.payment_method: amount} if is_debit else {},
+        credit_category_amounts={category: amount} if is_credit else {},
+        debit_category_amounts={category: amount} if is_debit else {},
+    )
+
+
+def _merge_amounts(base: dict[str, Decimal], delta: dict[str, Decimal]) -> dict[str, Decimal]:
+    merged = dict(base)
+    for method, amount in delta.items():
+        merged[method] = merged.get(method, Decimal("0.00")) + amount
+    return {method: amount for method, amount in merged.items() if amount != 0}
+
+
+def merge_raw_metrics(base: PeriodRawMetrics, delta: PeriodRawMetrics) -> PeriodRawMetrics:
+    """Add a signed delta to raw period metrics, dropping payment methods and categories that net to zero."""
+    return PeriodRawMetrics(
+        total_income=base.total_income + delta.total_income,
+        total_expense=base.total_expense + delta.total_expense,
+        transaction_count=base.transaction_count + delta.transaction_count,
+        credit_payment_amounts=_merge_amounts(base.credit_payment_amounts, delta.credit_payment_amounts),
+        debit_payment_amounts=_merge_amounts(base.debit_payment_amounts, delta.debit_payment_amounts),
+        credit_category_amounts=_merge_amounts(base.credit_category_amounts, delta.credit_category_amounts),
+        debit_category_amounts=_merge_amounts(base.debit_category_amounts, delta.debit_category_amounts),
+    )
+
+
+def raw_metrics_from_rows(rows: Iterable[Any]) -> PeriodRawMetrics:
+    """Fold (type, payment_method, category, amount, tx_count) aggregate rows into raw period metrics."""
+    total_income = Decimal("0.00")
+    total_expense = Decimal("0.00")
+    transaction_count = 0
+
+    credit_payment_amounts: dict[str, Decimal] = {}
+    debit_payment_amounts: dict[str, Decimal] = {}
+    credit_category_amounts: dict[str, Decimal] = {}
+    debit_category_amounts: dict[str, Decimal] = {}
+
+    for r in rows:
+        amount = round_to_2_decimals(r.amount)
+        transaction_count += int(r.tx_count or 0)
+
+        pm_key = str(r.payment_method)
+        category_key = str(r.category or UNCATEGORIZED)
+
+        if r.type == TxType.CREDIT.value:
+            total_income += amount
+            credit_payment_amounts[pm_key] = credit_payment_amounts.get(pm_key, Decimal("0.00")) + amount
+            credit_category_amounts[category_key] = credit_category_amounts.get(category_key, Decimal("0.00")) + amount
+
+        elif r.type == TxType.DEBIT.value:
+            total_expense += amount
+            debit_payment_amounts[pm_key] = debit_payment_amounts.get(pm_key, Decimal("0.00")) + amount
+            debit_category_amounts[category_key] = debit_category_amounts.get(category_key, Decimal("0.00")) + amount
+
+    return PeriodRawMetrics(
+        total_income=round_to_2_decimals(total_income),
+        total_expense=round_to_2_decimals(total_expense),
+        transaction_count=transaction_count,
+        credit_payment_amounts=credit_payment_amounts,
+        debit_payment_amounts=debit_payment_amounts,
+        credit_category_amounts=credit_category_amounts,
+        debit_category_amounts=debit_category_amounts,
+    )
+
+
+def derive_period_values(metrics: PeriodRawMetrics, weeks: int) -> dict[str, Any]:
+    """Return the stored transaction_metrics values (totals plus derived fields) for raw period metrics."""
+    balance = (metrics.total_income - metrics.total_expense).quantize(
+        DEC_2,
+        rounding=ROUND_HALF_UP,
+    )
+
+    breakdown = {
+        "credit": format_payment_method_breakdown(metrics.credit_payment_amounts),
+        "debit": format_payment_method_breakdown(metrics.debit_payment_amounts),
+        "balance": compute_balance_breakdown(
+            metrics.credit_payment_amounts,
+            metrics.debit_payment_amounts,
+        ),
+    }
+
+    weekly_avg_income, weekly_avg_expense = calculate_weekly_averages(
+        total_income=metrics.total_income,
+        total_expense=metrics.total_expense,
+        weeks=weeks,
+    )
+
+    return {
+        "total_income": metrics.total_income,
+        "total_expense": metrics.total_expense,
+        "balance": balance,
+        "transaction_count": metrics.transaction_count,
+        "payment_method_breakdown": breakdown,
+        "category_breakdown": {
+            "credit": format_payment_method_breakdown(metrics.credit_category_amounts),
+            "debit": format_payment_method_breakdown(metrics.debit_category_amounts),
+        },
+        "weekly_average_income": weekly_avg_income,
+        "weekly_average_expense": weekly_avg_expense,
+        "income_expense_ratio": calculate_income_expense_ratio(metrics.total_income, metrics.total_expense),
+    }
@@ -0,0 +1,47 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+
+from app.enum.balance import SortOrder, TransactionSortBy
+from app.errors.balance import InvalidCursorException
+from app.models.balance import Transaction
+from app.schemas.dto.pagination import TransactionCursor
+
+
+def encode_cursor(transaction: Transaction, sort_by: TransactionSortBy, sort_order: SortOrder) -> str:
+    """Encode the keyset position right after `transaction` as an opaque URL-safe token."""
+
+    match sort_by:
+        case TransactionSortBy.DATE:
+            value = transaction.date.isoformat()
+        case TransactionSortBy.AMOUNT:
+            value = None if transaction.amount is None else str(transaction.amount)
+        case _:
+            value = transaction.reference
+
+    payload = {"s": str(sort_by), "o": str(sort_order), "v": value, "r": transaction.reference}
+    return base64.urlsafe_b64encode(json.dumps(payload, separators=(",", ":")).encode()).decode().rstrip("=")
+
+
+def decode_cursor(token: str, sort_by: TransactionSortBy, sort_order: SortOrder) -> TransactionCursor:
+    """Decode an `after` token, rejecting tokens issued for another sort column or direction."""
+
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+        if payload["s"] != sort_by or payload["o"] != sort_order:
+            raise InvalidCursorException
+
+        raw, reference = payload["v"], str(payload["r"])
+        match sort_by:
+            case TransactionSortBy.DATE:
+                value = datetime.fromisoformat(raw)
+            case TransactionSortBy.AMOUNT:
+                value = None if raw is None else Decimal(raw)
+            case _:
+                value = reference
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError, KeyError, InvalidOperation) as ex:
+        raise InvalidCursorException from ex
+
+    return TransactionCursor(value=value, reference=reference)
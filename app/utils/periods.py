@@ -1,14 +1,18 @@
 import calendar
+from collections.abc import Iterable
 from datetime import UTC, date, datetime, timedelta
 
 from app.enum.balance import PeriodType
 from app.errors.transaction_metrics import TransactionMetricsPeriodError
 from app.schemas.balance import (
+    CategoryBreakdownByTypeSchema,
+    CategoryBreakdownSchema,
+    ComparisonSchema,
     PaymentMethodBreakdownByTypeSchema,
     PaymentMethodBreakdownSchema,
     PeriodMetricsSchema,
 )
-from app.schemas.dto.periods import PeriodKey
+from app.schemas.dto.periods import CarPeriodKey, PeriodKey, PeriodRawMetrics, TransactionSnapshot
 from app.utils.dates import (
     count_iso_weeks_in_month,
     end_of_month,
@@ -17,6 +21,7 @@ from app.utils.dates import (
     start_of_month,
     start_of_year,
 )
+from app.utils.metrics import empty_raw_metrics, merge_raw_metrics, percent_change_from_schemas, snapshot_raw_metrics
 
 
 def get_affected_periods(dt: datetime) -> list[PeriodKey]:
@@ -31,6 +36,27 @@ def get_affected_periods(dt: datetime) -> list[PeriodKey]:
     ]
 
 
+def get_affected_car_periods(snapshots: Iterable[TransactionSnapshot]) -> set[CarPeriodKey]:
+    """Return the car periods whose car_metrics row depends on the given CONFIRMED snapshots."""
+    return {CarPeriodKey(snap.car_id, key) for snap in snapshots if snap.car_id for key in get_affected_periods(snap.date)}
+
+
+def build_period_deltas(
+    removed: Iterable[TransactionSnapshot],
+    added: Iterable[TransactionSnapshot],
+) -> dict[PeriodKey, PeriodRawMetrics]:
+    """Return the signed metrics delta per affected period for removed and added CONFIRMED snapshots."""
+    deltas: dict[PeriodKey, PeriodRawMetrics] = {}
+
+    for sign, snapshots in ((-1, removed), (1, added)):
+        for snap in snapshots:
+            contribution = snapshot_raw_metrics(snap, sign)
+            for key in get_affected_periods(snap.date):
+                deltas[key] = merge_raw_metrics(deltas.get(key, empty_raw_metrics()), contribution)
+
+    return deltas
+
+
 def get_period_date_range(key: PeriodKey) -> tuple[date, date]:
     """Return the start and end dates for a period."""
     if key.period_type == "week":
@@ -93,6 +119,23 @@ def previous_period_key(key: PeriodKey) -> PeriodKey:
             raise TransactionMetricsPeriodError.unknown_period_type(key.period_type)
 
 
+def same_period_last_year(key: PeriodKey) -> PeriodKey:
+    """Return the key of the same period one year earlier (ISO week 53 maps to week 52 in 52-week years)."""
+    match key.period_type:
+        case "year" | "month":
+            return PeriodKey(period_type=key.period_type, year=key.year - 1, month=key.month, week=None)
+
+        case "week":
+            if key.week is None:
+                raise TransactionMetricsPeriodError.week_requires_week()
+
+            weeks_last_year = date(key.year - 1, 12, 28).isocalendar().week
+            return PeriodKey(period_type="week", year=key.year - 1, month=None, week=min(key.week, weeks_last_year))
+
+        case _:
+            raise TransactionMetricsPeriodError.unknown_period_type(key.period_type)
+
+
 def to_period_schema(row) -> PeriodMetricsSchema:
     """Convert repository row to PeriodMetricsSchema (or zeros)."""
     if not row:
@@ -105,6 +148,28 @@ def to_period_schema(row) -> PeriodMetricsSchema:
     )
 
 
+def compare_periods(current_schema: PeriodMetricsSchema, previous_schema: PeriodMetricsSchema) -> ComparisonSchema:
+    """Compare a period with an earlier one."""
+    return ComparisonSchema(
+        balance_change_percent=percent_change_from_schemas(
+            current_schema,
+            previous_schema,
+            "balance",
+        ),
+        income_change_percent=percent_change_from_schemas(
+            current_schema,
+            previous_schema,
+            "total_income",
+        ),
+        expense_change_percent=percent_change_from_schemas(
+            current_schema,
+            previous_schema,
+            "total_expense",
+        ),
+        transaction_change=(current_schema.transaction_count - previous_schema.transaction_count),
+    )
+
+
 def payment_breakdown_schemas(row) -> PaymentMethodBreakdownByTypeSchema:
     """Build payment method breakdown schema from current row."""
     breakdown = dict(row.payment_method_breakdown) if row and row.payment_method_breakdown else {}
@@ -129,6 +194,25 @@ def payment_breakdown_schemas(row) -> PaymentMethodBreakdownByTypeSchema:
     )
 
 
+def category_breakdown_schemas(row) -> CategoryBreakdownByTypeSchema:
+    """Build category breakdown schema from current row."""
+    breakdown = dict(row.category_breakdown) if row and row.category_breakdown else {}
+
+    credit = breakdown.get("credit", {})
+    debit = breakdown.get("debit", {})
+
+    return CategoryBreakdownByTypeSchema(
+        credit=CategoryBreakdownSchema(
+            amounts=credit.get("amounts", {}),
+            percentages=credit.get("percentages", {}),
+        ),
+        debit=CategoryBreakdownSchema(
+            amounts=debit.get("amounts", {}),
+            percentages=debit.get("percentages", {}),
+        ),
+    )
+
+
 def weekly_averages_and_ratio(row) -> tuple[float, float, float]:
     """Get weekly averages and ratio from current row, defaulting to 0."""
     weekly_income = float(row.weekly_average_income) if row and row.weekly_average_income else 0.0
@@ -1,5 +1,9 @@
+import threading
+from collections.abc import Callable, Sequence
 from datetime import UTC, datetime
 
+from app.config import REFERENCES
+
 TYPE_MAP = {
     "debit": "1",
     "credit": "2",
@@ -11,6 +15,8 @@ PAYMENT_MAP = {
     "pegazzo_transfer": "03",
 }
 
+SEQUENCE_MODULUS = 10**8
+
 
 def calculate_mod11(numbers: str) -> str:
     """Calculate a Mod11 check digit.
@@ -33,20 +39,74 @@ def calculate_mod11(numbers: str) -> str:
     return str(check_digit)
 
 
-def generate_reference(type_value: str, payment_method: str) -> str:
-    """Generate a payment reference.
+class ReferenceSequence:
+    """Hand out reference sequence numbers from blocks reserved in the database.
 
-    The reference uses the pattern:
-    `[HHMMSS][TYPE][PAYMENT][DV]`, where DV is a Mod11 check digit.
+    Each process reserves a block of `block_size` numbers with a single database call and then
+    serves them from memory, so references stay unique across workers without a round-trip each.
     """
 
-    now = datetime.now(UTC)
+    def __init__(self, block_size: int = REFERENCES.BLOCK_SIZE):
+        self.block_size = block_size
+        self._next = 0
+        self._end = 0
+        self._lock = threading.Lock()
+
+    def take(self, count: int, reserve_block: Callable[[], int]) -> list[int]:
+        """Return `count` unused sequence numbers, calling `reserve_block` whenever the current block runs out."""
+
+        numbers: list[int] = []
+        with self._lock:
+            while len(numbers) < count:
+                if self._next >= self._end:
+                    self._next = reserve_block() * self.block_size
+                    self._end = self._next + self.block_size
+
+                taken = min(count - len(numbers), self._end - self._next)
+                numbers.extend(range(self._next, self._next + taken))
+                self._next += taken
+
+        return numbers
+
+
+reference_sequence = ReferenceSequence()
+
+
+def build_reference(type_value: str, payment_method: str, sequence: int, now: datetime) -> str:
+    """Build a payment reference.
 
-    time_part = now.strftime("%H%M%S")
+    The reference uses the pattern:
+    `[YYMMDDHHMMSS][SEQUENCE][TYPE][PAYMENT][DV]`, where SEQUENCE is 8 digits and DV is a Mod11
+    check digit. References sort by creation time down to the second.
+    """
+
+    time_part = now.strftime("%y%m%d%H%M%S")
     type_digit = TYPE_MAP[type_value]
     payment_digit = PAYMENT_MAP[payment_method]
 
-    base = f"{time_part}{type_digit}{payment_digit}"
+    base = f"{time_part}{sequence % SEQUENCE_MODULUS:08d}{type_digit}{payment_digit}"
     dv = calculate_mod11(base)
 
     return f"{base}{dv}"
+
+
+def generate_references(items: Sequence[tuple[str, str]], reserve_block: Callable[[], int]) -> list[str]:
+    """Generate one reference per (type, payment_method) pair with a single sequence allocation."""
+
+    for type_value, payment_method in items:
+        if type_value not in TYPE_MAP or payment_method not in PAYMENT_MAP:
+            raise KeyError((type_value, payment_method))
+
+    now = datetime.now(UTC)
+    numbers = reference_sequence.take(len(items), reserve_block)
+
+    return [
+        build_reference(type_value, payment_method, number, now)
+        for (type_value, payment_method), number in zip(items, numbers, strict=True)
+    ]
+
+
+def generate_reference(type_value: str, payment_method: str, reserve_block: Callable[[], int]) -> str:
+    """Generate a single payment reference."""
+
+    return generate_references([(type_value, payment_method)], reserve_block)[0]
@@ -0,0 +1,101 @@
+# scripts/benchmark_import_time.py
+# Measure the cold-start import time of the API with `python -X importtime` and check it against a budget
+# Each run imports app.main in a fresh interpreter; the fastest run of each startup profile is reported
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+TARGET = "app.main"
+
+# Cumulative import time of app.main allowed for the serverless profile; raise it deliberately, never silently
+IMPORT_BUDGET_MS = 750
+
+PROFILES = {
+    "serverless": {"SERVERLESS_MODE": "true"},
+    "server": {"SERVERLESS_MODE": "false"},
+}
+
+
+class Colors:
+    CYAN = "\033[96m"
+    GREEN = "\033[92m"
+    RED = "\033[91m"
+    BOLD = "\033[1m"
+    RESET = "\033[0m"
+
+
+def measure(profile_env: dict[str, str]) -> dict[str, tuple[int, int]]:
+    """Import the target in a fresh interpreter and return the (self, cumulative) microseconds of each module."""
+    env = {**os.environ, **profile_env}
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {TARGET}"],
+        cwd=PROJECT_ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line.removeprefix("import time:").split("|")
+        modules[name.strip()] = (int(self_us), int(cumulative_us))
+    return modules
+
+
+def best_run(profile_env: dict[str, str], repeat: int) -> dict[str, tuple[int, int]]:
+    """Return the run whose target import was fastest, to keep scheduling noise out of the comparison."""
+    runs = [measure(profile_env) for _ in range(repeat)]
+    return min(runs, key=lambda modules: modules[TARGET][1])
+
+
+def by_package(modules: dict[str, tuple[int, int]]) -> list[tuple[str, float]]:
+    """Return the self time of each top-level package in milliseconds, slowest first."""
+    totals = defaultdict(int)
+    for name, (self_us, _) in modules.items():
+        totals[name.split(".")[0]] += self_us
+    return sorted(((package, us / 1000) for package, us in totals.items()), key=lambda item: -item[1])
+
+
+def report(name: str, modules: dict[str, tuple[int, int]], top: int) -> float:
+    total_ms = modules[TARGET][1] / 1000
+    print(f"\n{Colors.BOLD}{name}: {TARGET} imported in {total_ms:.1f} ms ({len(modules)} modules){Colors.RESET}")
+    for package, ms in by_package(modules)[:top]:
+        print(f"  {package:<32} {ms:>8.1f} ms")
+    return total_ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the import time of the API per startup profile")
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh interpreters per profile; the fastest is kept")
+    parser.add_argument("--top", type=int, default=10, help="Packages listed per profile (default: 10)")
+    parser.add_argument("--budget-ms", type=float, default=IMPORT_BUDGET_MS, help="Serverless import budget in ms")
+    parser.add_argument("--json", type=Path, help="Also write the totals to this file, to track them across releases")
+    args = parser.parse_args()
+
+    totals = {}
+    for name, profile_env in PROFILES.items():
+        print(f"{Colors.CYAN}> Importing {TARGET} with the {name} profile ({args.repeat} runs){Colors.RESET}")
+        totals[name] = report(name, best_run(profile_env, args.repeat), args.top)
+
+    if args.json:
+        args.json.write_text(json.dumps({"import_ms": totals, "budget_ms": args.budget_ms}, indent=2) + "\n")
+
+    serverless_ms = totals["serverless"]
+    summary = f"Serverless import {serverless_ms:.1f} ms"
+    if serverless_ms > args.budget_ms:
+        print(f"\n{Colors.RED}{summary} is over the {args.budget_ms:.0f} ms budget{Colors.RESET}")
+        raise SystemExit(1)
+    print(f"\n{Colors.GREEN}{summary} is within the {args.budget_ms:.0f} ms budget{Colors.RESET}")
+
+
+if __name__ == "__main__":
+    main()
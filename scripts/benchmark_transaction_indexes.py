@@ -0,0 +1,188 @@
+# scripts/benchmark_transaction_indexes.py
+# EXPLAIN ANALYZE the transaction access paths with and without the access path indexes
+# Everything runs on a temporary table inside one transaction that is rolled back: no data is kept
+
+import argparse
+import json
+import time
+from collections.abc import Callable
+from datetime import UTC, date, datetime, timedelta
+
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from app.config import DATABASE_URL
+from app.enum.balance import SortOrder, TransactionSortBy, TransactionStatus
+from app.models.balance import Transaction
+from app.repositories.balance import BalanceRepository
+from app.repositories.transaction_metrics import TransactionMetricsRepository
+
+BASELINE_INDEXES = {"ix_transaction_date"}
+ACCESS_PATH_INDEXES = [i for i in Transaction.__table__.indexes if i.name not in BASELINE_INDEXES]
+
+HISTORY_DAYS = 3 * 365
+
+SEED_SQL = """
+INSERT INTO "transaction" (reference, date, amount, type, description, payment_method, status, category)
+SELECT
+    'BENCH' || lpad(g::text, 12, '0'),
+    now() - random() * make_interval(days => :days),
+    round((random() * 5000)::numeric, 2),
+    (ARRAY['credit', 'debit'])[1 + floor(random() * 2)::int],
+    NULL,
+    (ARRAY['cash', 'personal_transfer', 'pegazzo_transfer'])[1 + floor(random() * 3)::int],
+    (ARRAY['CONFIRMED', 'CONFIRMED', 'CONFIRMED', 'PENDING', 'REJECTED'])[1 + floor(random() * 5)::int],
+    'Otro'
+FROM generate_series(1, :rows) AS g
+"""
+
+
+class Colors:
+    CYAN = "\033[96m"
+    GREEN = "\033[92m"
+    BOLD = "\033[1m"
+    RESET = "\033[0m"
+
+
+def create_scratch_table(conn: Connection, rows: int):
+    """Shadow the transaction table with a seeded temp table that only has the baseline indexes."""
+    conn.execute(text('CREATE TEMP TABLE "transaction" (LIKE public."transaction" INCLUDING DEFAULTS)'))
+    conn.execute(text('ALTER TABLE pg_temp."transaction" ADD PRIMARY KEY (reference)'))
+    conn.execute(text('CREATE INDEX ix_transaction_date ON pg_temp."transaction" (date)'))
+
+    started = time.perf_counter()
+    conn.execute(text(SEED_SQL), {"rows": rows, "days": HISTORY_DAYS})
+    conn.execute(text('ANALYZE pg_temp."transaction"'))
+    print(f"Seeded {rows:,} transactions in {time.perf_counter() - started:.1f}s")
+
+
+def capture_statement(session: Session, call: Callable[[], object]) -> tuple[str, object]:
+    """Run a repository call and return the first statement it sent that reads the transaction table."""
+    captured = []
+
+    def record(_conn, _cursor, statement, parameters, _context, _executemany):
+        captured.append((statement, parameters))
+
+    bind = session.connection()
+    event.listen(bind, "before_cursor_execute", record)
+    try:
+        with session.begin_nested():
+            call()
+    finally:
+        event.remove(bind, "before_cursor_execute", record)
+
+    return next((s, p) for s, p in captured if s.lstrip().startswith("SELECT") and "transaction.date" in s)
+
+
+def explain_analyze(conn: Connection, statement: str, parameters, repeat: int) -> dict:
+    """Return the fastest EXPLAIN ANALYZE run of a statement."""
+    best = None
+    for _ in range(repeat):
+        plan = conn.exec_driver_sql(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {statement}", parameters).scalar()
+        plan = plan if isinstance(plan, list) else json.loads(plan)
+        if best is None or plan[0]["Execution Time"] < best["Execution Time"]:
+            best = plan[0]
+    return best
+
+
+def plan_indexes(node: dict) -> set[str]:
+    found = {node["Index Name"]} if "Index Name" in node else set()
+    for child in node.get("Plans", []):
+        found |= plan_indexes(child)
+    return found
+
+
+def scenarios(session: Session) -> dict[str, Callable[[], object]]:
+    balance = BalanceRepository(session)
+    metrics = TransactionMetricsRepository(session)
+
+    end_dt = datetime.now(UTC)
+    month_start = end_dt - timedelta(days=30)
+    day = end_dt.date() - timedelta(days=10)
+
+    return {
+        "rollup day aggregate (refresh_days)": lambda: metrics.refresh_days([day]),
+        "rollup rebuild, 1 year": lambda: metrics.rebuild_daily_rollups(date(day.year - 1, 1, 1), date(day.year - 1, 12, 31)),
+        "count_transactions_in_range, 30d CONFIRMED": lambda: balance.count_transactions_in_range(
+            month_start,
+            end_dt,
+            TransactionStatus.CONFIRMED,
+        ),
+        "list_transactions_in_range, 30d PENDING by date": lambda: balance.list_transactions_in_range(
+            month_start,
+            end_dt,
+            20,
+            0,
+            TransactionSortBy.DATE,
+            SortOrder.DESC,
+            TransactionStatus.PENDING,
+        ),
+        "list_transactions_in_range, 30d CONFIRMED by amount": lambda: balance.list_transactions_in_range(
+            month_start,
+            end_dt,
+            20,
+            0,
+            TransactionSortBy.AMOUNT,
+            SortOrder.DESC,
+            TransactionStatus.CONFIRMED,
+        ),
+    }
+
+
+def run_round(session: Session, repeat: int) -> dict[str, dict]:
+    conn = session.connection()
+    results = {}
+    for name, call in scenarios(session).items():
+        statement, parameters = capture_statement(session, call)
+        results[name] = explain_analyze(conn, statement, parameters, repeat)
+    return results
+
+
+def report(before: dict[str, dict], after: dict[str, dict]):
+    print(f"\n{Colors.BOLD}{'query':<52} {'before ms':>10} {'after ms':>10} {'speedup':>8}  indexes used after{Colors.RESET}")
+    for name, plan in before.items():
+        old, new = plan["Execution Time"], after[name]["Execution Time"]
+        speedup = old / new if new else float("inf")
+        indexes = ", ".join(sorted(plan_indexes(after[name]["Plan"]))) or after[name]["Plan"]["Node Type"]
+        print(f"{name:<52} {old:>10.2f} {new:>10.2f} {speedup:>7.1f}x  {indexes}")
+
+
+def benchmark(database_url: str, rows: int, repeat: int):
+    engine = create_engine(database_url)
+    if engine.dialect.name != "postgresql":
+        raise SystemExit("The index benchmark needs PostgreSQL (EXPLAIN ANALYZE, INCLUDE and partial indexes)")
+
+    with engine.connect() as conn:
+        transaction = conn.begin()
+        try:
+            create_scratch_table(conn, rows)
+            session = Session(bind=conn, join_transaction_mode="create_savepoint")
+
+            print(f"{Colors.CYAN}> Baseline (primary key + ix_transaction_date){Colors.RESET}")
+            before = run_round(session, repeat)
+
+            print(f"{Colors.CYAN}> Creating {', '.join(i.name for i in ACCESS_PATH_INDEXES)}{Colors.RESET}")
+            for index in ACCESS_PATH_INDEXES:
+                index.create(conn)
+            conn.execute(text('ANALYZE pg_temp."transaction"'))
+            after = run_round(session, repeat)
+
+            report(before, after)
+            print(f"\n{Colors.GREEN}Done; rolling back the scratch data.{Colors.RESET}")
+        finally:
+            transaction.rollback()
+    engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the transaction access path indexes with EXPLAIN ANALYZE")
+    parser.add_argument("--database-url", default=DATABASE_URL, help="PostgreSQL URL (default: DATABASE_URL)")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Transactions to seed (default: 1,000,000)")
+    parser.add_argument("--repeat", type=int, default=3, help="EXPLAIN ANALYZE runs per query; the fastest is kept")
+    args = parser.parse_args()
+    benchmark(args.database_url, args.rows, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
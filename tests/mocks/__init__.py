@@ -1,4 +1,5 @@
 from .associate_repository_mock import AssociateRepositoryMock
+from .async_repository_mock import AsyncRepositoryMock
 from .balance_repository_mock import BalanceRepositoryMock
 from .car_repository_mock import CarRepositoryMock
 from .document_repository_mock import DocumentRepositoryMock
@@ -6,4 +7,4 @@ from .image_repository_mock import ImageRepositoryMock
 from .insurance_repository_mock import InsuranceRepositoryMock
 from .user_repository_mock import UserRepositoryMock
 
-__all__ = ["AssociateRepositoryMock", "BalanceRepositoryMock", "CarRepositoryMock", "DocumentRepositoryMock", "ImageRepositoryMock", "InsuranceRepositoryMock", "UserRepositoryMock"]
+__all__ = ["AssociateRepositoryMock", "AsyncRepositoryMock", "BalanceRepositoryMock", "CarRepositoryMock", "DocumentRepositoryMock", "ImageRepositoryMock", "InsuranceRepositoryMock", "UserRepositoryMock"]
@@ -0,0 +1,30 @@
+import inspect
+from collections.abc import Callable
+from typing import Any
+
+
+class AsyncRepositoryMock:
+    """Async repository mock class wrapping a sync repository mock.
+
+    `run` hands the sync mock to the call, like `AsyncDBRepository.run` does with the sync repository,
+    and every other method of the sync mock is exposed as a coroutine.
+    """
+
+    def __init__(self, repository):
+        """Initialize the mock with the sync repository mock it wraps."""
+        self.repository = repository
+
+    async def run(self, call: Callable[[Any], Any]) -> Any:
+        """Call `call` with the wrapped sync repository mock."""
+        return call(self.repository)
+
+    def __getattr__(self, name: str) -> Any:
+        """Return the attribute of the sync mock, wrapping its methods as coroutines."""
+        attribute = getattr(self.repository, name)
+        if not inspect.ismethod(attribute):
+            return attribute
+
+        async def method(*args, **kwargs):
+            return attribute(*args, **kwargs)
+
+        return method
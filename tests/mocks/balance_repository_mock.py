@@ -1,7 +1,10 @@
-from datetime import UTC, datetime
+from datetime import UTC, date, datetime
 
 from app.enum.balance import SortOrder, TransactionSortBy
 from app.models.balance import Transaction
+from app.schemas.dto.pagination import TransactionCursor
+from app.schemas.dto.periods import PeriodRawMetrics, TransactionSnapshot
+from app.utils.metrics import empty_raw_metrics, merge_raw_metrics, snapshot_raw_metrics
 from app.utils.periods import PeriodKey
 
 
@@ -24,6 +27,7 @@ class BalanceRepositoryMock:
             ),
         ]
         self.mapping: dict[tuple[str, int, int | None, int | None], object] = {}
+        self.reference_blocks = 0
 
     def reset(self):
         self.transactions = [
@@ -40,13 +44,31 @@ class BalanceRepositoryMock:
         ]
         self.mapping.clear()
 
+    def reserve_reference_block(self) -> int:
+        self.reference_blocks += 1
+        return self.reference_blocks
+
     def get_by_reference(self, reference: str):
         return next((t for t in self.transactions if t.reference == reference), None)
 
+    def get_by_references(self, references: list[str]) -> list[Transaction]:
+        return [t for t in self.transactions if t.reference in references]
+
     def create_transaction(self, transaction: Transaction):
         self.transactions.append(transaction)
         return transaction
 
+    def bulk_create_transactions(self, rows: list[dict]) -> set[str]:
+        existing = {t.reference for t in self.transactions}
+        created = set()
+        for row in rows:
+            if row["reference"] in existing:
+                continue
+            self.transactions.append(Transaction(**row))
+            existing.add(row["reference"])
+            created.add(row["reference"])
+        return created
+
     def update_transaction(self, transaction: Transaction):
         for idx, t in enumerate(self.transactions):
             if t.reference == transaction.reference:
@@ -55,6 +77,9 @@ class BalanceRepositoryMock:
 
         return None
 
+    def update_transactions(self, transactions: list[Transaction]) -> list[Transaction]:
+        return transactions
+
     def delete_transaction(self, transaction: Transaction):
         self.transactions = [t for t in self.transactions if t.reference != transaction.reference]
 
@@ -69,10 +94,34 @@ class BalanceRepositoryMock:
     def get_period_metrics(self, *, period_type: str, year: int, month=None, week=None):
         return self.mapping.get((period_type, year, month, week))
 
+    def get_metrics_by_keys(self, keys: list[PeriodKey]):
+        """Return the stored rows of any mix of period keys, keyed by period."""
+        return {k: row for k in keys if (row := self.mapping.get((k.period_type, k.year, k.month, k.week)))}
+
+    def get_metrics_validator(self, keys: list[PeriodKey]):
+        """Return (latest updated_at, row count) of the stored rows for the keys."""
+        rows = [row for k in dict.fromkeys(keys) if (row := self.mapping.get((k.period_type, k.year, k.month, k.week)))]
+        updated = [u for row in rows if (u := getattr(row, "updated_at", None)) is not None]
+        return max(updated, default=None), len(rows)
+
     def get_metrics_for_keys(self, period_type: str, keys: list[PeriodKey]):
         """Return rows for bulk key lookup (trend endpoint)."""
         return [row for k in keys if (row := self.mapping.get((period_type, k.year, k.month, k.week)))]
 
+    def get_range_metrics(self, start: date, end: date, previous_start: date) -> tuple[PeriodRawMetrics, PeriodRawMetrics]:
+        """Aggregate CONFIRMED transactions the way the daily rollup would."""
+        current, previous = empty_raw_metrics(), empty_raw_metrics()
+        for t in self.transactions:
+            if t.status != "CONFIRMED":
+                continue
+            day = t.date.date()
+            snap = TransactionSnapshot(t.date, t.type, t.payment_method, t.amount, t.status, t.category)
+            if start <= day <= end:
+                current = merge_raw_metrics(current, snapshot_raw_metrics(snap))
+            elif previous_start <= day < start:
+                previous = merge_raw_metrics(previous, snapshot_raw_metrics(snap))
+        return current, previous
+
     def count_transactions_in_range(self, start_dt: datetime, end_dt: datetime, status=None) -> int:
         """Count transactions in a given date range (inclusive end)."""
         filtered = [t for t in self.transactions if start_dt <= t.date <= end_dt]
@@ -80,6 +129,23 @@ class BalanceRepositoryMock:
             filtered = [t for t in filtered if t.status == status]
         return len(filtered)
 
+    def estimate_transactions_in_range(self, start_dt: datetime, end_dt: datetime, status=None) -> int:
+        return self.count_transactions_in_range(start_dt, end_dt, status)
+
+    def list_transactions_page(
+        self,
+        start_dt: datetime,
+        end_dt: datetime,
+        limit: int,
+        offset: int,
+        sort_by,
+        sort_order,
+        status=None,
+    ):
+        """List a page together with the total of matching rows."""
+        total = self.count_transactions_in_range(start_dt, end_dt, status)
+        return self.list_transactions_in_range(start_dt, end_dt, limit, offset, sort_by, sort_order, status), total
+
     def list_transactions_in_range(
         self,
         start_dt: datetime,
@@ -89,6 +155,7 @@ class BalanceRepositoryMock:
         sort_by: TransactionSortBy,
         sort_order: SortOrder,
         status=None,
+        after: TransactionCursor | None = None,
     ) -> list[Transaction]:
         """List transactions in a given date range."""
         filtered = [t for t in self.transactions if start_dt <= t.date <= end_dt]
@@ -98,9 +165,13 @@ class BalanceRepositoryMock:
         sort_by_val = sort_by.value if isinstance(sort_by, TransactionSortBy) else sort_by or "date"
         sort_order_val = sort_order.value if isinstance(sort_order, SortOrder) else sort_order or "desc"
 
+        def sort_key(t):
+            value = t.amount if sort_by_val == "amount" else t.reference if sort_by_val == "reference" else t.date
+            return (value, t.reference)
+
         reverse = sort_order_val.lower() == "desc"
-        filtered.sort(
-            key=lambda t: t.amount if sort_by_val == "amount" else t.reference if sort_by_val == "reference" else t.date,
-            reverse=reverse,
-        )
+        filtered.sort(key=sort_key, reverse=reverse)
+        if after is not None:
+            bound = (after.value, after.reference)
+            filtered = [t for t in filtered if (sort_key(t) < bound if reverse else sort_key(t) > bound)]
         return filtered[offset : offset + limit]
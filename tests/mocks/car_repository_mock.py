@@ -1,3 +1,4 @@
+from collections.abc import Iterable
 from datetime import UTC, datetime
 
 from app.enum.balance import SortOrder
@@ -5,6 +6,8 @@ from app.enum.crm import CarSortBy, CarStatus
 from app.models.car import Associate, Car, Insurance
 from app.models.contract import Contract
 from app.models.document import Document
+from app.models.transaction_metrics import CarMetrics
+from app.schemas.dto.periods import PeriodKey
 
 _DEFAULT_INSURANCE = Insurance(id=1, name="AXA", telephones=["+521234567890"])
 _DEFAULT_ASSOCIATE = Associate(id=1, name="Juan", surnames="Pérez", telephones=["+521234567890"])
@@ -20,6 +23,7 @@ class CarRepositoryMock:
         self.associates: list[Associate] = [_DEFAULT_ASSOCIATE]
         self.car_documents: dict[str, list[Document]] = {}
         self.contracts: list[Contract] = []
+        self.car_metrics: list[CarMetrics] = []
 
     def reset(self):
         """Reset the mock state to its initial values."""
@@ -28,6 +32,7 @@ class CarRepositoryMock:
         self.associates = [_DEFAULT_ASSOCIATE]
         self.car_documents = {}
         self.contracts = []
+        self.car_metrics = []
 
     def get_by_id(self, car_id: str) -> Car | None:
         """Return the car with the given ID, or None."""
@@ -106,3 +111,23 @@ class CarRepositoryMock:
         reverse = sort_order == SortOrder.DESC
         cars.sort(key=lambda c: getattr(c, sort_by, "") or "", reverse=reverse)
         return cars[offset : offset + limit]
+
+    def get_car_metrics_by_keys(self, car_id: str, keys: Iterable[PeriodKey]) -> dict[PeriodKey, CarMetrics]:
+        """Return the stored car_metrics rows of a car for the given periods."""
+        return {k: m for k in keys for m in self.car_metrics if m.car_id == car_id and _matches(m, k)}
+
+    def rank_cars_by_balance(self, key: PeriodKey, limit: int, sort_order: SortOrder) -> list[tuple]:
+        """Return (metrics, plate, make, model) of the cars with a row in the period, ordered by balance."""
+        rows = sorted((m for m in self.car_metrics if _matches(m, key)), key=lambda m: m.car_id)
+        rows.sort(key=lambda m: m.balance, reverse=sort_order == SortOrder.DESC)
+        cars = {c.id: c for c in self.cars}
+        return [(m, cars[m.car_id].plate, cars[m.car_id].make, cars[m.car_id].model) for m in rows[:limit]]
+
+
+def _matches(metrics: CarMetrics, key: PeriodKey) -> bool:
+    """Match a car_metrics row the way its partial unique index does."""
+    if metrics.period_type != key.period_type or metrics.year != key.year:
+        return False
+    if key.period_type == "week":
+        return metrics.week == key.week
+    return key.period_type == "year" or metrics.month == key.month
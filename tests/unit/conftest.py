@@ -1,3 +1,4 @@
+from contextlib import contextmanager
 from datetime import UTC, datetime
 from unittest.mock import patch
 
@@ -9,8 +10,10 @@ from app.dependencies import RepositoryFactory
 from app.enum.auth import Role
 from app.main import app
 from app.models.users import User
+from app.utils.cache import metrics_cache
 from tests.mocks import (
     AssociateRepositoryMock,
+    AsyncRepositoryMock,
     BalanceRepositoryMock,
     CarRepositoryMock,
     DocumentRepositoryMock,
@@ -29,6 +32,15 @@ car_repo_mock = CarRepositoryMock()
 document_repo_mock = DocumentRepositoryMock()
 image_repo_mock = ImageRepositoryMock()
 
+async_user_repo_mock = AsyncRepositoryMock(user_repo_mock)
+async_balance_repo_mock = AsyncRepositoryMock(balance_repo_mock)
+async_car_repo_mock = AsyncRepositoryMock(car_repo_mock)
+
+
+@contextmanager
+def balance_repo_mock_scope():
+    yield balance_repo_mock
+
 
 @pytest.fixture(autouse=True)
 def disable_metrics_listener(monkeypatch):
@@ -47,6 +59,7 @@ def reset_state():
     car_repo_mock.reset()
     document_repo_mock.reset()
     image_repo_mock.reset()
+    metrics_cache.clear()
 
 
 @pytest.fixture
@@ -54,10 +67,19 @@ def client():
     """Client without JWT authentication."""
     app.dependency_overrides = {
         RepositoryFactory.user_repository: lambda: user_repo_mock,
+        RepositoryFactory.read_user_repository: lambda: user_repo_mock,
+        RepositoryFactory.async_user_repository: lambda: async_user_repo_mock,
         RepositoryFactory.balance_repository: lambda: balance_repo_mock,
+        RepositoryFactory.read_balance_repository: lambda: balance_repo_mock,
+        RepositoryFactory.async_balance_repository: lambda: async_balance_repo_mock,
+        RepositoryFactory.async_read_balance_repository: lambda: async_balance_repo_mock,
+        RepositoryFactory.balance_repository_scope: lambda: balance_repo_mock_scope,
+        RepositoryFactory.read_balance_repository_scope: lambda: balance_repo_mock_scope,
         RepositoryFactory.insurance_repository: lambda: insurance_repo_mock,
         RepositoryFactory.associate_repository: lambda: associate_repo_mock,
         RepositoryFactory.car_repository: lambda: car_repo_mock,
+        RepositoryFactory.async_car_repository: lambda: async_car_repo_mock,
+        RepositoryFactory.async_read_car_repository: lambda: async_car_repo_mock,
         RepositoryFactory.document_repository: lambda: document_repo_mock,
         RepositoryFactory.image_repository: lambda: image_repo_mock,
     }
@@ -77,10 +99,19 @@ def authorized_client():
     """Client with valid JWT cookie for role 'owner'."""
     app.dependency_overrides = {
         RepositoryFactory.user_repository: lambda: user_repo_mock,
+        RepositoryFactory.read_user_repository: lambda: user_repo_mock,
+        RepositoryFactory.async_user_repository: lambda: async_user_repo_mock,
         RepositoryFactory.balance_repository: lambda: balance_repo_mock,
+        RepositoryFactory.read_balance_repository: lambda: balance_repo_mock,
+        RepositoryFactory.async_balance_repository: lambda: async_balance_repo_mock,
+        RepositoryFactory.async_read_balance_repository: lambda: async_balance_repo_mock,
+        RepositoryFactory.balance_repository_scope: lambda: balance_repo_mock_scope,
+        RepositoryFactory.read_balance_repository_scope: lambda: balance_repo_mock_scope,
         RepositoryFactory.insurance_repository: lambda: insurance_repo_mock,
         RepositoryFactory.associate_repository: lambda: associate_repo_mock,
         RepositoryFactory.car_repository: lambda: car_repo_mock,
+        RepositoryFactory.async_car_repository: lambda: async_car_repo_mock,
+        RepositoryFactory.async_read_car_repository: lambda: async_car_repo_mock,
         RepositoryFactory.document_repository: lambda: document_repo_mock,
         RepositoryFactory.image_repository: lambda: image_repo_mock,
     }
@@ -117,10 +148,19 @@ def admin_authorized_client():
     """Client with valid JWT cookie for role 'admin'."""
     app.dependency_overrides = {
         RepositoryFactory.user_repository: lambda: user_repo_mock,
+        RepositoryFactory.read_user_repository: lambda: user_repo_mock,
+        RepositoryFactory.async_user_repository: lambda: async_user_repo_mock,
         RepositoryFactory.balance_repository: lambda: balance_repo_mock,
+        RepositoryFactory.read_balance_repository: lambda: balance_repo_mock,
+        RepositoryFactory.async_balance_repository: lambda: async_balance_repo_mock,
+        RepositoryFactory.async_read_balance_repository: lambda: async_balance_repo_mock,
+        RepositoryFactory.balance_repository_scope: lambda: balance_repo_mock_scope,
+        RepositoryFactory.read_balance_repository_scope: lambda: balance_repo_mock_scope,
         RepositoryFactory.insurance_repository: lambda: insurance_repo_mock,
         RepositoryFactory.associate_repository: lambda: associate_repo_mock,
         RepositoryFactory.car_repository: lambda: car_repo_mock,
+        RepositoryFactory.async_car_repository: lambda: async_car_repo_mock,
+        RepositoryFactory.async_read_car_repository: lambda: async_car_repo_mock,
         RepositoryFactory.document_repository: lambda: document_repo_mock,
         RepositoryFactory.image_repository: lambda: image_repo_mock,
     }
@@ -1,12 +1,28 @@
-from datetime import UTC, datetime
+from datetime import UTC, date, datetime
+from decimal import Decimal
 from unittest.mock import MagicMock, call, patch
 
-from sqlalchemy.orm import Session
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
 
-from app.database.events import transaction_metrics_after_flush
+from app.config import METRICS
+from app.database.events import _changed_snapshots, _collect_period_deltas, transaction_metrics_after_flush
+from app.enum.balance import MetricsRecalcMode
 from app.models.balance import Transaction
 from app.repositories.transaction_metrics import TransactionMetricsRepository
-from app.schemas.dto.periods import PeriodKey
+from app.schemas.dto.periods import CarPeriodKey, PeriodKey
+
+
+@pytest.fixture(autouse=True)
+def sync_recalc_mode(monkeypatch):
+    monkeypatch.setattr(METRICS, "RECALC_MODE", MetricsRecalcMode.SYNC)
+
+
+@pytest.fixture(autouse=True)
+def mock_refresh_days():
+    with patch.object(TransactionMetricsRepository, "refresh_days") as mock_refresh:
+        yield mock_refresh
 
 
 def make_tx(tx_dt: datetime, status: str = "CONFIRMED") -> Transaction:
@@ -26,11 +42,11 @@ def mock_session(*, new=None, dirty=None, deleted=None, is_modified=True) -> Ses
     return session
 
 
-@patch.object(TransactionMetricsRepository, "recalc_period")
+@patch.object(TransactionMetricsRepository, "recalc_periods")
 @patch("app.database.events.get_affected_periods")
 def test_new_transaction_does_not_trigger_recalc(
     mock_get_periods,
-    mock_recalc_period,
+    mock_recalc_periods,
 ):
     """New transactions are always PENDING — no metrics recalculation."""
     tx_dt = datetime(2026, 1, 10, 10, 0, 0, tzinfo=UTC)
@@ -41,14 +57,14 @@ def test_new_transaction_does_not_trigger_recalc(
     transaction_metrics_after_flush(session, None)
 
     mock_get_periods.assert_not_called()
-    mock_recalc_period.assert_not_called()
+    mock_recalc_periods.assert_not_called()
 
 
-@patch.object(TransactionMetricsRepository, "recalc_period")
+@patch.object(TransactionMetricsRepository, "recalc_periods")
 @patch("app.database.events.get_affected_periods")
 def test_dirty_confirmed_transaction_with_date_change_triggers_old_and_new_periods(
     mock_get_periods,
-    mock_recalc_period,
+    mock_recalc_periods,
 ):
     """Editing a CONFIRMED transaction's date triggers recalc for both old and new periods."""
     old_dt = datetime(2025, 12, 31, 23, 59, 59, tzinfo=UTC)
@@ -78,14 +94,16 @@ def test_dirty_confirmed_transaction_with_date_change_triggers_old_and_new_perio
         transaction_metrics_after_flush(session, None)
 
     assert mock_get_periods.call_count == 2
-    assert mock_recalc_period.call_count == 2
+    mock_recalc_periods.assert_called_once()
+    assert set(mock_recalc_periods.call_args.args[0]) == {PeriodKey("month", 2026, 1, None), PeriodKey("month", 2025, 12, None)}
+    assert mock_recalc_periods.call_args.kwargs == {"commit": False}
 
 
-@patch.object(TransactionMetricsRepository, "recalc_period")
+@patch.object(TransactionMetricsRepository, "recalc_periods")
 @patch("app.database.events.get_affected_periods")
 def test_dirty_pending_transaction_does_not_trigger_recalc(
     mock_get_periods,
-    mock_recalc_period,
+    mock_recalc_periods,
 ):
     """Editing a PENDING transaction does not trigger metrics recalculation."""
     tx = make_tx(datetime(2026, 1, 10, tzinfo=UTC), status="PENDING")
@@ -102,14 +120,14 @@ def test_dirty_pending_transaction_does_not_trigger_recalc(
         transaction_metrics_after_flush(session, None)
 
     mock_get_periods.assert_not_called()
-    mock_recalc_period.assert_not_called()
+    mock_recalc_periods.assert_not_called()
 
 
-@patch.object(TransactionMetricsRepository, "recalc_period")
+@patch.object(TransactionMetricsRepository, "recalc_periods")
 @patch("app.database.events.get_affected_periods")
 def test_status_transition_to_confirmed_triggers_recalc(
     mock_get_periods,
-    mock_recalc_period,
+    mock_recalc_periods,
 ):
     """Transitioning a transaction to CONFIRMED triggers metrics recalculation."""
     tx_dt = datetime(2026, 3, 5, tzinfo=UTC)
@@ -132,14 +150,14 @@ def test_status_transition_to_confirmed_triggers_recalc(
         transaction_metrics_after_flush(session, None)
 
     mock_get_periods.assert_called_once_with(tx_dt)
-    mock_recalc_period.assert_called_once()
+    mock_recalc_periods.assert_called_once()
 
 
-@patch.object(TransactionMetricsRepository, "recalc_period")
+@patch.object(TransactionMetricsRepository, "recalc_periods")
 @patch("app.database.events.get_affected_periods")
 def test_deleted_confirmed_transaction_triggers_recalc(
     mock_get_periods,
-    mock_recalc_period,
+    mock_recalc_periods,
 ):
     """Deleting a CONFIRMED transaction triggers metrics recalculation."""
     tx_dt = datetime(2026, 2, 5, 12, 0, 0, tzinfo=UTC)
@@ -156,14 +174,14 @@ def test_deleted_confirmed_transaction_triggers_recalc(
     mock_get_periods.assert_has_calls([call(tx_dt), call(tx_dt)])
     assert mock_get_periods.call_count == 2
 
-    mock_recalc_period.assert_called_once()
+    mock_recalc_periods.assert_called_once()
 
 
-@patch.object(TransactionMetricsRepository, "recalc_period")
+@patch.object(TransactionMetricsRepository, "recalc_periods")
 @patch("app.database.events.get_affected_periods")
 def test_deleted_pending_transaction_does_not_trigger_recalc(
     mock_get_periods,
-    mock_recalc_period,
+    mock_recalc_periods,
 ):
     """Deleting a PENDING transaction does NOT trigger metrics recalculation."""
     tx_dt = datetime(2026, 2, 5, 12, 0, 0, tzinfo=UTC)
@@ -174,7 +192,7 @@ def test_deleted_pending_transaction_does_not_trigger_recalc(
     transaction_metrics_after_flush(session, None)
 
     mock_get_periods.assert_not_called()
-    mock_recalc_period.assert_not_called()
+    mock_recalc_periods.assert_not_called()
 
 
 def test_does_nothing_when_flag_is_set():
@@ -184,3 +202,176 @@ def test_does_nothing_when_flag_is_set():
     transaction_metrics_after_flush(session, None)
 
     assert session.is_modified.call_count == 0
+
+
+@patch.object(TransactionMetricsRepository, "enqueue_periods")
+@patch.object(TransactionMetricsRepository, "recalc_periods")
+def test_outbox_mode_enqueues_periods_instead_of_recalculating(
+    mock_recalc_periods,
+    mock_enqueue_periods,
+    monkeypatch,
+):
+    """In outbox mode affected periods are queued for the worker, not recalculated in the flush."""
+    monkeypatch.setattr(METRICS, "RECALC_MODE", MetricsRecalcMode.OUTBOX)
+
+    tx = make_tx(datetime(2026, 2, 5, 12, 0, 0, tzinfo=UTC), status="CONFIRMED")
+    session = mock_session(deleted=[tx])
+
+    transaction_metrics_after_flush(session, None)
+
+    mock_recalc_periods.assert_not_called()
+    mock_enqueue_periods.assert_called_once()
+    queued = mock_enqueue_periods.call_args.args[0]
+    assert queued == {
+        PeriodKey("week", 2026, None, 6),
+        PeriodKey("month", 2026, 2, None),
+        PeriodKey("year", 2026, None, None),
+    }
+    assert session.info["_updating_metrics"] is False
+
+
+@patch.object(TransactionMetricsRepository, "enqueue_car_periods")
+@patch.object(TransactionMetricsRepository, "enqueue_periods")
+def test_outbox_mode_enqueues_the_car_periods_of_car_transactions(
+    mock_enqueue_periods,
+    mock_enqueue_car_periods,
+    monkeypatch,
+):
+    """A transaction assigned to a car also queues that car's week/month/year car_metrics rows."""
+    monkeypatch.setattr(METRICS, "RECALC_MODE", MetricsRecalcMode.OUTBOX)
+
+    tx = make_tx(datetime(2026, 2, 5, 12, 0, 0, tzinfo=UTC), status="CONFIRMED")
+    tx.car_id = "CAR-1"
+    session = mock_session(deleted=[tx, make_tx(datetime(2026, 2, 6, 12, 0, 0, tzinfo=UTC))])
+
+    transaction_metrics_after_flush(session, None)
+
+    mock_enqueue_periods.assert_called_once()
+    assert mock_enqueue_car_periods.call_args.args[0] == {
+        CarPeriodKey("CAR-1", PeriodKey("week", 2026, None, 6)),
+        CarPeriodKey("CAR-1", PeriodKey("month", 2026, 2, None)),
+        CarPeriodKey("CAR-1", PeriodKey("year", 2026, None, None)),
+    }
+
+
+@patch.object(TransactionMetricsRepository, "apply_period_delta")
+@patch.object(TransactionMetricsRepository, "recalc_periods")
+@patch("app.database.events._collect_period_deltas")
+def test_delta_mode_applies_deltas_without_rescanning(
+    mock_collect,
+    mock_recalc_periods,
+    mock_apply_delta,
+    monkeypatch,
+):
+    """In delta mode each affected period receives its signed delta instead of a full recalculation."""
+    monkeypatch.setattr(METRICS, "RECALC_MODE", MetricsRecalcMode.DELTA)
+    key = PeriodKey("month", 2026, 2, None)
+    mock_collect.return_value = {key: "delta"}
+
+    tx = make_tx(datetime(2026, 2, 5, 12, 0, 0, tzinfo=UTC), status="CONFIRMED")
+    session = mock_session(deleted=[tx])
+
+    transaction_metrics_after_flush(session, None)
+
+    mock_recalc_periods.assert_not_called()
+    mock_apply_delta.assert_called_once_with(key, "delta", commit=False)
+
+
+@patch.object(TransactionMetricsRepository, "apply_changes")
+@patch("app.database.events._changed_snapshots", return_value=([], []))
+def test_delta_mode_walks_the_changed_snapshots_once(mock_snapshots, _mock_apply_changes, monkeypatch):
+    """The period deltas and the car periods come from the same snapshots."""
+    monkeypatch.setattr(METRICS, "RECALC_MODE", MetricsRecalcMode.DELTA)
+    tx = make_tx(datetime(2026, 2, 5, 12, 0, 0, tzinfo=UTC), status="CONFIRMED")
+
+    transaction_metrics_after_flush(mock_session(deleted=[tx]), None)
+
+    mock_snapshots.assert_called_once()
+
+
+@pytest.fixture
+def transaction_session():
+    engine = create_engine("sqlite://")
+    Transaction.__table__.create(engine)
+    session = sessionmaker(bind=engine, autoflush=False)()
+    session.add(
+        Transaction(
+            reference="REF1",
+            date=datetime(2026, 3, 5, 10, 0, tzinfo=UTC),
+            amount=Decimal("100.00"),
+            type="credit",
+            payment_method="cash",
+            status="CONFIRMED",
+        ),
+    )
+    session.add(
+        Transaction(
+            reference="REF2",
+            date=datetime(2026, 3, 6, 10, 0, tzinfo=UTC),
+            amount=Decimal("40.00"),
+            type="debit",
+            payment_method="cash",
+            status="PENDING",
+        ),
+    )
+    session.commit()
+    yield session
+    session.close()
+
+
+def test_collect_period_deltas_from_attribute_history(transaction_session):
+    """Edits, approvals and deletions produce signed deltas from the pre-flush attribute values."""
+    edited = transaction_session.get(Transaction, "REF1")
+    approved = transaction_session.get(Transaction, "REF2")
+
+    edited.amount = Decimal("150.00")
+    edited.payment_method = "pegazzo_transfer"
+    approved.status = "CONFIRMED"
+
+    deltas = _collect_period_deltas(*_changed_snapshots(transaction_session))
+
+    month = deltas[PeriodKey("month", 2026, 3, None)]
+    assert month.total_income == Decimal("50.00")
+    assert month.total_expense == Decimal("40.00")
+    assert month.transaction_count == 1
+    assert month.credit_payment_amounts == {"cash": Decimal("-100.00"), "pegazzo_transfer": Decimal("150.00")}
+    assert month.debit_payment_amounts == {"cash": Decimal("40.00")}
+
+
+def test_collect_period_deltas_ignores_unchanged_amounts(transaction_session):
+    """Editing a field that does not feed the metrics produces no delta."""
+    tx = transaction_session.get(Transaction, "REF1")
+    tx.description = "updated"
+
+    assert _collect_period_deltas(*_changed_snapshots(transaction_session)) == {}
+
+
+def test_collect_period_deltas_for_deleted_transaction(transaction_session):
+    tx = transaction_session.get(Transaction, "REF1")
+    transaction_session.delete(tx)
+
+    deltas = _collect_period_deltas(*_changed_snapshots(transaction_session))
+
+    year = deltas[PeriodKey("year", 2026, None, None)]
+    assert year.total_income == Decimal("-100.00")
+    assert year.transaction_count == -1
+
+
+@patch.object(TransactionMetricsRepository, "recalc_periods")
+def test_daily_rollups_refreshed_for_old_and_new_days(mock_recalc_periods, mock_refresh_days):
+    """Moving a CONFIRMED transaction to another day refreshes both daily buckets before the periods."""
+    old_dt = datetime(2026, 3, 4, 23, 30, tzinfo=UTC)
+    new_dt = datetime(2026, 3, 6, 8, 0, tzinfo=UTC)
+    tx = make_tx(new_dt, status="CONFIRMED")
+
+    insp = MagicMock()
+    insp.attrs.date.history.has_changes.return_value = True
+    insp.attrs.date.history.deleted = [old_dt]
+    insp.attrs.status.history.deleted = []
+
+    with patch("app.database.events.inspect", return_value=insp):
+        transaction_metrics_after_flush(mock_session(dirty=[tx]), None)
+
+    mock_refresh_days.assert_called_once_with({date(2026, 3, 4), date(2026, 3, 6)})
+    mock_recalc_periods.assert_called_once()
+    assert len(mock_recalc_periods.call_args.args[0]) == 3
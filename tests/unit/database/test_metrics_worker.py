@@ -0,0 +1,178 @@
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+from sqlalchemy.orm import Session
+
+from app.database.metrics_worker import MetricsOutboxWorker, drain_metrics_outbox
+from app.repositories.transaction_metrics import TransactionMetricsRepository
+from app.schemas.dto.periods import CarPeriodKey, PeriodKey
+
+
+def outbox_entry(entry_id: int, period_type: str, year: int, month=None, week=None, car_id=None):
+    return SimpleNamespace(id=entry_id, period_type=period_type, year=year, month=month, week=week, car_id=car_id)
+
+
+@patch.object(TransactionMetricsRepository, "delete_outbox_entries")
+@patch.object(TransactionMetricsRepository, "recalc_period")
+@patch.object(TransactionMetricsRepository, "claim_outbox_entries")
+def test_drain_coalesces_duplicate_periods(mock_claim, mock_recalc, mock_delete):
+    """Duplicate outbox entries for the same period trigger a single recalculation."""
+    mock_claim.return_value = [
+        outbox_entry(1, "month", 2026, month=3),
+        outbox_entry(2, "month", 2026, month=3),
+        outbox_entry(3, "year", 2026),
+    ]
+    session = MagicMock(spec=Session)
+
+    processed = drain_metrics_outbox(session, batch_size=10, max_attempts=5)
+
+    assert processed == 2
+    mock_claim.assert_called_once_with(10, 5)
+    assert mock_recalc.call_count == 2
+    assert all(c.kwargs["commit"] is False for c in mock_recalc.call_args_list)
+    assert list(mock_delete.call_args.args[0]) == [1, 2, 3]
+    session.commit.assert_called_once()
+
+
+@patch.object(TransactionMetricsRepository, "delete_outbox_entries")
+@patch.object(TransactionMetricsRepository, "recalc_car_periods")
+@patch.object(TransactionMetricsRepository, "recalc_period")
+@patch.object(TransactionMetricsRepository, "claim_outbox_entries")
+def test_drain_recalculates_car_entries_per_car(mock_claim, mock_recalc, mock_recalc_cars, mock_delete):
+    """Entries with a car_id recalculate that car's row and are not coalesced with the fleet-wide period."""
+    mock_claim.return_value = [
+        outbox_entry(1, "month", 2026, month=3),
+        outbox_entry(2, "month", 2026, month=3, car_id="CAR1"),
+        outbox_entry(3, "month", 2026, month=3, car_id="CAR1"),
+    ]
+    session = MagicMock(spec=Session)
+
+    assert drain_metrics_outbox(session) == 2
+
+    mock_recalc.assert_called_once_with(period_type="month", year=2026, month=3, week=None, commit=False)
+    mock_recalc_cars.assert_called_once_with([CarPeriodKey("CAR1", PeriodKey("month", 2026, 3))], commit=False)
+    assert list(mock_delete.call_args.args[0]) == [1, 2, 3]
+
+
+@patch.object(TransactionMetricsRepository, "mark_outbox_entries_failed")
+@patch.object(TransactionMetricsRepository, "delete_outbox_entries")
+@patch.object(TransactionMetricsRepository, "recalc_period")
+@patch.object(TransactionMetricsRepository, "try_lock_periods")
+@patch.object(TransactionMetricsRepository, "claim_outbox_entries")
+def test_drain_leaves_periods_locked_by_another_transaction_queued(
+    mock_claim,
+    mock_try_lock,
+    mock_recalc,
+    mock_delete,
+    mock_mark_failed,
+):
+    """A period an API transaction is recalculating is neither recalculated nor counted as a failed attempt."""
+    mock_claim.return_value = [outbox_entry(1, "year", 2025), outbox_entry(2, "year", 2026)]
+    mock_try_lock.return_value = ([PeriodKey("year", 2025)], [PeriodKey("year", 2026)])
+    session = MagicMock(spec=Session)
+
+    assert drain_metrics_outbox(session) == 1
+
+    mock_recalc.assert_called_once_with(period_type="year", year=2025, month=None, week=None, commit=False)
+    assert list(mock_delete.call_args.args[0]) == [1]
+    assert list(mock_mark_failed.call_args.args[0]) == []
+
+
+@patch.object(TransactionMetricsRepository, "mark_outbox_entries_failed")
+@patch.object(TransactionMetricsRepository, "delete_outbox_entries")
+@patch.object(TransactionMetricsRepository, "recalc_car_periods")
+@patch.object(TransactionMetricsRepository, "try_lock_car_periods")
+@patch.object(TransactionMetricsRepository, "claim_outbox_entries")
+def test_drain_leaves_car_periods_locked_by_another_transaction_queued(
+    mock_claim,
+    mock_try_lock_cars,
+    mock_recalc_cars,
+    mock_delete,
+    mock_mark_failed,
+):
+    """A car period an API flush is recalculating stays queued instead of racing its upsert."""
+    march = PeriodKey("month", 2026, 3)
+    mock_claim.return_value = [
+        outbox_entry(1, "month", 2026, month=3, car_id="CAR1"),
+        outbox_entry(2, "month", 2026, month=3, car_id="CAR2"),
+    ]
+    mock_try_lock_cars.return_value = ([CarPeriodKey("CAR1", march)], [CarPeriodKey("CAR2", march)])
+    session = MagicMock(spec=Session)
+
+    assert drain_metrics_outbox(session) == 1
+
+    mock_recalc_cars.assert_called_once_with([CarPeriodKey("CAR1", march)], commit=False)
+    assert list(mock_delete.call_args.args[0]) == [1]
+    assert list(mock_mark_failed.call_args.args[0]) == []
+
+
+@patch.object(TransactionMetricsRepository, "recalc_period")
+@patch.object(TransactionMetricsRepository, "claim_outbox_entries", return_value=[])
+def test_drain_empty_outbox_does_nothing(_mock_claim, mock_recalc):
+    session = MagicMock(spec=Session)
+
+    assert drain_metrics_outbox(session) == 0
+
+    mock_recalc.assert_not_called()
+    session.commit.assert_not_called()
+
+
+@patch.object(TransactionMetricsRepository, "mark_outbox_entries_failed")
+@patch.object(TransactionMetricsRepository, "delete_outbox_entries")
+@patch.object(TransactionMetricsRepository, "recalc_period")
+@patch.object(TransactionMetricsRepository, "claim_outbox_entries")
+def test_drain_isolates_failing_period(mock_claim, mock_recalc, mock_delete, mock_mark_failed):
+    """A failing period only keeps its own entries queued; the rest of the batch is committed."""
+    mock_claim.return_value = [
+        outbox_entry(1, "year", 2025),
+        outbox_entry(2, "year", 2026),
+        outbox_entry(3, "year", 2025),
+    ]
+
+    def recalc(**kwargs):
+        if kwargs["year"] == 2025:
+            raise RuntimeError("boom")
+
+    mock_recalc.side_effect = recalc
+    session = MagicMock(spec=Session)
+
+    assert drain_metrics_outbox(session) == 1
+
+    assert session.begin_nested.call_count == 2
+    assert mock_delete.call_args.args[0] == [2]
+    assert mock_mark_failed.call_args.args[0] == [1, 3]
+    session.commit.assert_called_once()
+
+
+@patch.object(TransactionMetricsRepository, "claim_outbox_entries", side_effect=RuntimeError("db down"))
+def test_drain_rolls_back_when_claim_fails(_mock_claim):
+    session = MagicMock(spec=Session)
+
+    with pytest.raises(RuntimeError):
+        drain_metrics_outbox(session)
+
+    session.rollback.assert_called()
+    session.commit.assert_not_called()
+
+
+@patch("app.database.metrics_worker.drain_metrics_outbox", side_effect=[2, 1, 0])
+def test_worker_run_once_drains_until_empty(mock_drain):
+    session = MagicMock(spec=Session)
+    worker = MetricsOutboxWorker(lambda: session, interval=0.01, batch_size=5)
+
+    assert worker.run_once() == 3
+
+    assert mock_drain.call_count == 3
+    session.close.assert_called_once()
+
+
+def test_worker_start_and_stop():
+    worker = MetricsOutboxWorker(MagicMock, interval=0.01)
+
+    with patch.object(worker, "run_once", return_value=0) as mock_run_once:
+        worker.start()
+        worker.start()
+        worker.stop(timeout=1)
+
+    assert mock_run_once.called
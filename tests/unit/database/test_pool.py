@@ -0,0 +1,146 @@
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.exc import ProgrammingError
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool
+
+from app.config import POOL
+from app.database.pool import CHECKED_IN_AT, PoolMonitor, pool_options
+
+
+@pytest.fixture
+def file_engine(tmp_path):
+    """Yield a file SQLite engine on a timed single-connection QueuePool, and its monitor."""
+    monitor = PoolMonitor("test")
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=monitor.pool_class(QueuePool),
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.05,
+    )
+    monitor.attach(engine)
+    yield engine, monitor
+    engine.dispose()
+
+
+def test_pool_options_server_preset_sizes_a_queue_pool(monkeypatch):
+    monkeypatch.setattr(POOL, "SIZE", 5)
+    monkeypatch.setattr(POOL, "MAX_OVERFLOW", 10)
+    monkeypatch.setattr(POOL, "PRE_PING", False)
+    monitor = PoolMonitor("primary")
+
+    options = pool_options("postgresql+psycopg2://db/pegazzo", monitor)
+
+    assert issubclass(options["poolclass"], QueuePool)
+    assert (options["pool_size"], options["max_overflow"], options["pool_pre_ping"]) == (5, 10, False)
+    assert monitor.max_overflow == 10
+
+
+def test_pool_options_async_engine_keeps_the_async_queue_pool(monkeypatch):
+    monkeypatch.setattr(POOL, "SIZE", 1)
+
+    options = pool_options("postgresql+asyncpg://db/pegazzo", PoolMonitor("async"), AsyncAdaptedQueuePool)
+
+    assert issubclass(options["poolclass"], AsyncAdaptedQueuePool)
+
+
+def test_pool_options_size_zero_opens_a_connection_per_checkout(monkeypatch):
+    monkeypatch.setattr(POOL, "SIZE", 0)
+
+    options = pool_options("postgresql+psycopg2://db/pegazzo", PoolMonitor("primary"))
+
+    assert issubclass(options["poolclass"], NullPool)
+    assert "pool_size" not in options
+
+
+def test_pool_options_leave_the_sqlite_pool_alone():
+    assert pool_options("sqlite:///./dev.db", PoolMonitor("primary")) == {"pool_pre_ping": POOL.PRE_PING}
+
+
+@pytest.mark.parametrize(("preset", "concurrent"), [("server", "True"), ("serverless", "False")])
+def test_only_pools_with_two_connections_allow_concurrent_sessions(preset, concurrent):
+    env = {k: v for k, v in os.environ.items() if not k.startswith("DB_POOL_")} | {"DB_POOL_PRESET": preset}
+    code = "from app.config import POOL; print(POOL.CONCURRENT_SESSIONS)"
+
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True, env=env)
+
+    assert result.stdout.strip() == concurrent
+
+
+@pytest.mark.parametrize(
+    ("extra_env", "max_connections"),
+    [
+        ({}, "2"),
+        ({"READ_DATABASE_URL": "postgresql+psycopg2://replica/pegazzo"}, "4"),
+        ({"DB_POOL_SIZE": "0"}, "0"),
+    ],
+)
+def test_serverless_preset_counts_a_connection_per_engine(extra_env, max_connections):
+    env = {k: v for k, v in os.environ.items() if not k.startswith(("DB_POOL_", "READ_"))}
+    env |= {"DB_POOL_PRESET": "serverless", **extra_env}
+    code = "from app.config import POOL; print(POOL.MAX_CONNECTIONS)"
+
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True, env=env)
+
+    assert result.stdout.strip() == max_connections
+
+
+def test_monitor_counts_checkouts_and_occupancy(file_engine):
+    engine, monitor = file_engine
+
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+        in_use = monitor.stats()
+    released = monitor.stats()
+
+    assert (in_use.checked_out, released.checked_out, released.peak_checked_out) == (1, 0, 1)
+    assert released.checkouts == 1
+    assert released.size == 1
+    assert released.pool_class == "TimedQueuePool"
+
+
+def test_monitor_counts_checkouts_that_time_out(file_engine):
+    engine, monitor = file_engine
+
+    with engine.connect(), pytest.raises(PoolTimeoutError):
+        engine.connect()
+
+    stats = monitor.stats()
+    assert stats.timeouts == 1
+    assert stats.wait_ms_max >= 50
+
+
+def test_idle_check_replaces_a_dead_idle_connection(file_engine):
+    engine, monitor = file_engine
+    records = []
+    event.listen(engine, "checkin", lambda _conn, record: records.append(record))
+    with engine.connect():
+        pass
+    records[0].info[CHECKED_IN_AT] = time.monotonic() - POOL.IDLE_CHECK_SECONDS - 1
+    records[0].dbapi_connection.close()
+
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT 1")).scalar() == 1
+
+    assert monitor.stats().stale_connections == 1
+
+
+def test_idle_check_skips_the_ping_for_recently_used_connections(file_engine):
+    engine, monitor = file_engine
+    records = []
+    event.listen(engine, "checkin", lambda _conn, record: records.append(record))
+    with engine.connect():
+        pass
+    records[0].dbapi_connection.close()
+
+    # Without a ping the dead connection is handed out as is
+    with engine.connect() as conn, pytest.raises(ProgrammingError):
+        conn.execute(text("SELECT 1"))
+
+    assert monitor.stats().stale_connections == 0
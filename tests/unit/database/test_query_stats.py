@@ -0,0 +1,124 @@
+import logging
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+
+from app.config import QUERIES
+from app.database.query_stats import (
+    QUERY_COUNT_HEADER,
+    QUERY_TIME_HEADER,
+    QueryStats,
+    current_query_stats,
+    instrument_queries,
+)
+
+
+@pytest.fixture
+def engine():
+    """Return an in-memory SQLite engine."""
+    engine = create_engine("sqlite://")
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def query_app(engine):
+    """Return a client of an app whose routes run a given number of statements."""
+    app = FastAPI()
+    app.middleware("http")(instrument_queries)
+
+    @app.get("/items/{count}")
+    def read_items(count: int):
+        with engine.connect() as conn:
+            for _ in range(count):
+                conn.execute(text("SELECT 1"))
+        return {}
+
+    return TestClient(app)
+
+
+class TestQueryStats:
+    """Test the counters of one request."""
+
+    def test_record_counts_statements_and_time(self):
+        """Test each statement adds to the count, the time and its repetitions."""
+        stats = QueryStats()
+
+        stats.record("SELECT 1", 0.002)
+        stats.record("SELECT 1", 0.003)
+        stats.record("SELECT 2", 0.001)
+
+        assert stats.count == 3
+        assert stats.milliseconds == pytest.approx(6.0)
+        assert stats.repeated(2) == [("SELECT 1", 2)]
+        assert stats.repeated(3) == []
+
+    def test_route_uses_the_route_template(self):
+        """Test the route names the matched path template rather than the requested path."""
+        route = type("Route", (), {"path": "/items/{count}"})()
+
+        assert QueryStats({"method": "GET", "path": "/items/3", "route": route}).route == "GET /items/{count}"
+        assert QueryStats({"method": "GET", "path": "/items/3"}).route == "GET /items/3"
+        assert QueryStats().route == "-"
+
+    def test_statements_are_recorded_for_the_current_request_only(self, engine):
+        """Test the engine events add statements only while a request is being instrumented."""
+        stats = QueryStats()
+        token = current_query_stats.set(stats)
+        try:
+            with engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+        finally:
+            current_query_stats.reset(token)
+
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+
+        assert stats.count == 1
+        assert stats.statements["SELECT 1"] == 1
+
+
+class TestInstrumentQueries:
+    """Test the query instrumentation middleware."""
+
+    def test_headers_report_the_statements(self, query_app, monkeypatch):
+        """Test the response reports how many statements ran and how long they took."""
+        monkeypatch.setattr(QUERIES, "RESPONSE_HEADERS", True)
+
+        response = query_app.get("/items/3")
+
+        assert response.headers[QUERY_COUNT_HEADER] == "3"
+        assert float(response.headers[QUERY_TIME_HEADER]) >= 0
+
+    def test_headers_omitted_when_disabled(self, query_app, monkeypatch):
+        """Test production responses do not carry the query headers."""
+        monkeypatch.setattr(QUERIES, "RESPONSE_HEADERS", False)
+
+        response = query_app.get("/items/3")
+
+        assert QUERY_COUNT_HEADER not in response.headers
+        assert QUERY_TIME_HEADER not in response.headers
+
+    def test_repeated_statement_logged_as_n_plus_one(self, query_app, monkeypatch, caplog):
+        """Test a statement repeated up to the threshold is logged with its route."""
+        monkeypatch.setattr(QUERIES, "REPEAT_THRESHOLD", 3)
+
+        with caplog.at_level(logging.WARNING):
+            query_app.get("/items/2")
+            assert "Possible N+1" not in caplog.text
+
+            query_app.get("/items/3")
+
+        assert "Possible N+1 on GET /items/{count}: statement sent 3 times: SELECT 1" in caplog.text
+
+    def test_slow_statement_logged_with_route(self, query_app, monkeypatch, caplog):
+        """Test statements over the slow query threshold are logged with their route."""
+        monkeypatch.setattr(QUERIES, "SLOW_QUERY_MS", 0)
+
+        with caplog.at_level(logging.WARNING):
+            query_app.get("/items/1")
+
+        assert "Slow query" in caplog.text
+        assert "on GET /items/{count}: SELECT 1" in caplog.text
@@ -0,0 +1,97 @@
+from datetime import date
+from unittest.mock import MagicMock, patch
+
+from app.database import rebuild_metrics
+from app.database.rebuild_metrics import ShardResult, main, metrics_years, rebuild, year_shards
+
+
+def test_year_shards_clip_to_range():
+    assert year_shards(date(2024, 11, 3), date(2026, 2, 1)) == [
+        (date(2024, 11, 3), date(2024, 12, 31)),
+        (date(2025, 1, 1), date(2025, 12, 31)),
+        (date(2026, 1, 1), date(2026, 2, 1)),
+    ]
+
+
+def test_metrics_years_include_iso_week_years():
+    """2024-12-30 belongs to ISO week 1 of 2025, and 2021-01-01 to ISO week 53 of 2020."""
+    assert metrics_years(date(2021, 1, 1), date(2024, 12, 30)) == (2020, 2025)
+
+
+def test_rebuild_sequential_runs_one_pass_per_phase():
+    with (
+        patch.object(rebuild_metrics, "rebuild_rollups", return_value=ShardResult("rollups", 10, 0.1)) as rollups,
+        patch.object(rebuild_metrics, "rebuild_periods", return_value=ShardResult("metrics", 4, 0.1)) as periods,
+    ):
+        results = rebuild(date(2025, 3, 1), date(2026, 2, 1), workers=1, batch_size=50)
+
+    rollups.assert_called_once_with(date(2025, 3, 1), date(2026, 2, 1), 50)
+    periods.assert_called_once_with(2025, 2026, 50)
+    assert [r.rows for r in results] == [10, 4]
+
+
+def test_rebuild_with_workers_shards_by_year_and_waits_for_rollups_first():
+    order: list[str] = []
+
+    class InlinePool:
+        def __init__(self, **_kwargs):
+            pass
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *_exc):
+            return False
+
+        def submit(self, fn, *args):
+            order.append(f"{fn.__name__}{args[:2]}")
+            future = MagicMock()
+            future.result.return_value = ShardResult(fn.__name__, 1, 0.0)
+            return future
+
+    with (
+        patch.object(rebuild_metrics, "ProcessPoolExecutor", InlinePool),
+        patch.object(rebuild_metrics, "as_completed", side_effect=lambda futures: futures),
+    ):
+        results = rebuild(date(2025, 6, 1), date(2026, 1, 10), workers=2)
+
+    assert order == [
+        "rebuild_rollups(datetime.date(2025, 6, 1), datetime.date(2025, 12, 31))",
+        "rebuild_rollups(datetime.date(2026, 1, 1), datetime.date(2026, 1, 10))",
+        "rebuild_periods(2025, 2025)",
+        "rebuild_periods(2026, 2026)",
+    ]
+    assert len(results) == 4
+
+
+def test_main_defaults_to_transaction_history():
+    with (
+        patch.object(rebuild_metrics, "SessionLocal"),
+        patch.object(rebuild_metrics, "TransactionMetricsRepository") as repo,
+        patch.object(rebuild_metrics, "rebuild", return_value=[ShardResult("x", 3, 0.1)]) as run,
+    ):
+        repo.return_value.transaction_date_range.return_value = (date(2024, 1, 5), date(2026, 4, 1))
+
+        assert main(["--workers", "3"]) == 0
+
+    run.assert_called_once_with(date(2024, 1, 5), date(2026, 4, 1), 3, rebuild_metrics.REBUILD_BATCH_SIZE)
+
+
+def test_main_without_transactions_is_a_noop():
+    with (
+        patch.object(rebuild_metrics, "SessionLocal"),
+        patch.object(rebuild_metrics, "TransactionMetricsRepository") as repo,
+        patch.object(rebuild_metrics, "rebuild") as run,
+    ):
+        repo.return_value.transaction_date_range.return_value = None
+
+        assert main([]) == 0
+
+    run.assert_not_called()
+
+
+def test_main_rejects_inverted_range():
+    with patch.object(rebuild_metrics, "rebuild") as run:
+        assert main(["--start", "2026-02-01", "--end", "2026-01-01"]) == 2
+
+    run.assert_not_called()
@@ -0,0 +1,97 @@
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+from app.config import REPLICA
+from app.database.replica import (
+    PRIMARY_PIN_COOKIE,
+    pin_primary_after_writes,
+    pinned_to_primary,
+    read_session_factory,
+)
+from app.database.session import ReadOnlySession, ReadSessionLocal, SessionLocal
+from app.errors.database import DBOperationError
+from app.models.balance import Transaction
+
+
+class FakeRequest:
+    """Request stand-in carrying only cookies."""
+
+    def __init__(self, cookies: dict[str, str] | None = None):
+        self.cookies = cookies or {}
+
+
+@pytest.fixture
+def pin_app(monkeypatch):
+    """Return a client of an app with the pinning middleware and a replica configured."""
+    monkeypatch.setattr(REPLICA, "URL", "sqlite:///./replica.db")
+    monkeypatch.setattr(REPLICA, "PIN_SECONDS", 5.0)
+    app = FastAPI()
+    app.middleware("http")(pin_primary_after_writes)
+
+    @app.get("/item")
+    def read_item():
+        return {}
+
+    @app.post("/item")
+    def write_item():
+        return {}
+
+    @app.delete("/item")
+    def fail_write():
+        raise DBOperationError
+
+    return TestClient(app)
+
+
+@pytest.mark.parametrize(
+    ("cookie", "pinned"),
+    [
+        (None, False),
+        (f"{time.time() + 60:.3f}", True),
+        (f"{time.time() - 1:.3f}", False),
+        ("garbage", False),
+    ],
+)
+def test_pinned_to_primary_follows_the_cookie_expiry(cookie, pinned):
+    request = FakeRequest({PRIMARY_PIN_COOKIE: cookie} if cookie else None)
+
+    assert pinned_to_primary(request) is pinned
+
+
+def test_read_session_factory_routes_pinned_clients_to_the_primary():
+    assert read_session_factory(FakeRequest()) is ReadSessionLocal
+    assert read_session_factory(FakeRequest({PRIMARY_PIN_COOKIE: f"{time.time() + 60}"})) is SessionLocal
+
+
+def test_successful_writes_pin_the_client_to_the_primary(pin_app):
+    assert PRIMARY_PIN_COOKIE not in pin_app.get("/item").cookies
+    assert PRIMARY_PIN_COOKIE not in pin_app.delete("/item").cookies
+
+    response = pin_app.post("/item")
+
+    pinned_until = float(response.cookies[PRIMARY_PIN_COOKIE])
+    assert time.time() < pinned_until <= time.time() + 5
+
+
+def test_writes_do_not_pin_without_a_replica(pin_app, monkeypatch):
+    monkeypatch.setattr(REPLICA, "URL", "")
+
+    assert PRIMARY_PIN_COOKIE not in pin_app.post("/item").cookies
+
+
+def test_read_only_session_reads_but_refuses_to_write(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'replica.db'}")
+    Transaction.__table__.create(engine)
+
+    with sessionmaker(bind=engine, class_=ReadOnlySession)() as session:
+        assert session.scalars(select(Transaction)).all() == []
+
+        session.add(Transaction(reference="REF1", amount=1, type="credit", payment_method="cash", status="PENDING"))
+        with pytest.raises(DBOperationError):
+            session.flush()
+    engine.dispose()
@@ -0,0 +1,360 @@
+import time
+from datetime import UTC, date, datetime
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import create_engine, delete, event, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.config import METRICS
+from app.enum.balance import MetricsRecalcMode
+from app.models.balance import Transaction
+from app.models.transaction_metrics import CarMetrics, TransactionDailyRollup, TransactionMetrics, TransactionMetricsOutbox
+from app.repositories.balance import AsyncBalanceRepository, BalanceRepository
+from app.repositories.car import CarRepository
+from app.repositories.transaction_metrics import TransactionMetricsRepository
+from app.schemas.dto.periods import PeriodKey
+from app.utils.cache import LocalVersionStore, MetricsCache
+
+TABLES = [
+    Transaction.__table__,
+    TransactionMetrics.__table__,
+    TransactionMetricsOutbox.__table__,
+    TransactionDailyRollup.__table__,
+    CarMetrics.__table__,
+]
+
+
+@pytest.fixture
+def session(monkeypatch):
+    """Yield a session on an in-memory SQLite database with the metrics tables, recalculating in sync mode."""
+    monkeypatch.setattr(METRICS, "RECALC_MODE", MetricsRecalcMode.SYNC)
+    engine = create_engine("sqlite://")
+    for table in TABLES:
+        table.create(engine)
+    with sessionmaker(bind=engine)() as session:
+        yield session
+    engine.dispose()
+
+
+def add_transaction(
+    session,
+    reference: str,
+    amount: str,
+    tx_type: str,
+    when: datetime,
+    status: str = "PENDING",
+    category: str | None = None,
+    car_id: str | None = None,
+):
+    tx = Transaction(
+        reference=reference,
+        amount=Decimal(amount),
+        type=tx_type,
+        date=when,
+        payment_method="cash",
+        status=status,
+        category=category,
+        car_id=car_id,
+    )
+    session.add(tx)
+    session.commit()
+    return tx
+
+
+def metrics_by_period(session) -> dict[tuple, tuple]:
+    rows = session.execute(
+        select(
+            TransactionMetrics.period_type,
+            TransactionMetrics.year,
+            TransactionMetrics.month,
+            TransactionMetrics.week,
+            TransactionMetrics.total_income,
+            TransactionMetrics.total_expense,
+            TransactionMetrics.transaction_count,
+        ),
+    ).all()
+    return {(r[0], r[1], r[2], r[3]): (Decimal(r[4]), Decimal(r[5]), r[6]) for r in rows}
+
+
+def test_after_flush_pipeline_maintains_rollups_and_metrics_on_sqlite(session):
+    when = datetime(2026, 3, 10, 12, 0, tzinfo=UTC)
+    income = add_transaction(session, "REF1", "100.00", "credit", when)
+    expense = add_transaction(session, "REF2", "40.00", "debit", when)
+
+    income.status = expense.status = "CONFIRMED"
+    session.commit()
+
+    metrics = metrics_by_period(session)
+    assert metrics[("month", 2026, 3, None)] == (Decimal("100.00"), Decimal("40.00"), 2)
+    assert metrics[("year", 2026, None, None)] == (Decimal("100.00"), Decimal("40.00"), 2)
+    assert metrics[("week", 2026, None, 11)] == (Decimal("100.00"), Decimal("40.00"), 2)
+
+    breakdown = session.scalar(
+        select(TransactionMetrics.payment_method_breakdown).where(TransactionMetrics.period_type == "year"),
+    )
+    assert isinstance(breakdown, dict)
+
+    # Moving a transaction to another month updates both months through the same upsert rows
+    expense = session.get(Transaction, "REF2", populate_existing=True)
+    expense.date = datetime(2026, 4, 2, 12, 0, tzinfo=UTC)
+    session.commit()
+
+    metrics = metrics_by_period(session)
+    assert metrics[("month", 2026, 3, None)] == (Decimal("100.00"), Decimal("0.00"), 1)
+    assert metrics[("month", 2026, 4, None)] == (Decimal("0.00"), Decimal("40.00"), 1)
+    assert metrics[("year", 2026, None, None)] == (Decimal("100.00"), Decimal("40.00"), 2)
+    assert session.query(TransactionMetrics).filter_by(period_type="year").count() == 1
+
+    rollup_days = session.scalars(select(TransactionDailyRollup.day).order_by(TransactionDailyRollup.day)).all()
+    assert [d.isoformat() for d in rollup_days] == ["2026-03-10", "2026-04-02"]
+
+
+def test_rebuild_matches_the_incremental_pipeline_on_sqlite(session):
+    for i, month in enumerate((1, 1, 6)):
+        add_transaction(session, f"REF{i}", "25.00", "credit", datetime(2025, month, 15, 9, 0, tzinfo=UTC), status="CONFIRMED")
+
+    repo = TransactionMetricsRepository(session)
+    start, end = repo.transaction_date_range()
+    assert (start.isoformat(), end.isoformat()) == ("2025-01-15", "2025-06-15")
+
+    assert repo.rebuild_daily_rollups(start, end) == 2
+    for period_type in ("week", "month", "year"):
+        repo.rebuild_period_metrics(period_type, start.year, end.year)
+    session.commit()
+
+    metrics = metrics_by_period(session)
+    assert metrics[("month", 2025, 1, None)] == (Decimal("50.00"), Decimal("0.00"), 2)
+    assert metrics[("year", 2025, None, None)] == (Decimal("75.00"), Decimal("0.00"), 3)
+
+
+def test_rebuild_keeps_the_rows_it_wrote_when_it_outlasts_a_second_on_sqlite(session):
+    for i, month in enumerate((1, 2, 3)):
+        add_transaction(session, f"REF{i}", "25.00", "credit", datetime(2025, month, 15, 9, 0, tzinfo=UTC), status="CONFIRMED")
+    session.execute(delete(TransactionMetrics))
+    stale = TransactionMetrics(period_type="month", year=2025, month=7, total_income=1, total_expense=0, balance=1)
+    session.add(stale)
+    session.commit()
+
+    repo = TransactionMetricsRepository(session)
+    repo.rebuild_daily_rollups(date(2025, 1, 1), date(2025, 12, 31))
+
+    def slow_delete(_conn, _cursor, statement, *_args):
+        # SQLite's CURRENT_TIMESTAMP has a one-second resolution and is evaluated per statement
+        if statement.startswith("DELETE FROM transaction_metrics"):
+            time.sleep(1.1)
+
+    event.listen(session.get_bind(), "before_cursor_execute", slow_delete)
+    try:
+        assert repo.rebuild_period_metrics("month", 2025, 2025) == 3
+    finally:
+        event.remove(session.get_bind(), "before_cursor_execute", slow_delete)
+    session.commit()
+
+    assert sorted(key[2] for key in metrics_by_period(session)) == [1, 2, 3]
+
+
+def test_recalc_periods_matches_recalc_period_on_sqlite(session):
+    add_transaction(session, "REF1", "30.00", "debit", datetime(2026, 5, 20, 9, 0, tzinfo=UTC), status="CONFIRMED")
+    repo = TransactionMetricsRepository(session)
+    repo.refresh_days([date(2026, 5, 20)], commit=True)
+
+    keys = [
+        PeriodKey("month", 2026, 5),
+        PeriodKey("month", 2026, 6),
+        PeriodKey("week", 2026, None, 21),
+        PeriodKey("year", 2026),
+    ]
+    repo.recalc_periods(keys)
+    batched_metrics = metrics_by_period(session)
+
+    for key in keys:
+        repo.recalc_period(key.period_type, key.year, key.month, key.week)
+
+    assert metrics_by_period(session) == batched_metrics
+    assert batched_metrics[("month", 2026, 5, None)] == (Decimal("0.00"), Decimal("30.00"), 1)
+    assert batched_metrics[("month", 2026, 6, None)] == (Decimal("0.00"), Decimal("0.00"), 0)
+    assert batched_metrics[("week", 2026, None, 21)] == (Decimal("0.00"), Decimal("30.00"), 1)
+
+
+def test_commit_invalidates_only_the_recalculated_periods(session, monkeypatch):
+    cache = MetricsCache(LocalVersionStore())
+    monkeypatch.setattr("app.database.events.metrics_cache", cache)
+    march, april = PeriodKey("month", 2026, 3), PeriodKey("month", 2026, 4)
+    cache.get_or_set("metrics", [march], (), lambda: "march")
+    cache.get_or_set("metrics", [april], (), lambda: "april")
+
+    tx = add_transaction(session, "REF1", "100.00", "credit", datetime(2026, 3, 10, 12, 0, tzinfo=UTC))
+    tx.status = "CONFIRMED"
+    session.commit()
+
+    assert cache.get_or_set("metrics", [march], (), lambda: "fresh") == "fresh"
+    assert cache.get_or_set("metrics", [april], (), lambda: "fresh") == "april"
+
+
+def test_metrics_validator_covers_only_the_requested_rows(session):
+    tx = add_transaction(session, "REF1", "100.00", "credit", datetime(2026, 3, 10, 12, 0, tzinfo=UTC))
+    tx.status = "CONFIRMED"
+    session.commit()
+    repo = BalanceRepository(session)
+
+    keys = [PeriodKey("month", 2026, 3), PeriodKey("year", 2026), PeriodKey("month", 2026, 4)]
+    updated_at, rows = repo.get_metrics_validator(keys)
+
+    assert rows == 2
+    assert updated_at is not None
+    assert repo.get_metrics_validator([PeriodKey("month", 2026, 4)]) == (None, 0)
+    # Weekly requests carry the month too, but the stored week rows have none
+    assert repo.get_metrics_validator([PeriodKey("week", 2026, 3, 11)])[1] == 1
+
+
+def test_get_metrics_by_keys_fetches_mixed_period_types_in_one_query(session):
+    tx = add_transaction(session, "REF1", "100.00", "credit", datetime(2026, 3, 10, 12, 0, tzinfo=UTC))
+    tx.status = "CONFIRMED"
+    session.commit()
+    statements = []
+    event.listen(session.get_bind(), "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    keys = [PeriodKey("month", 2026, 3), PeriodKey("year", 2026), PeriodKey("week", 2026, week=11), PeriodKey("month", 2026, 4)]
+    rows = BalanceRepository(session).get_metrics_by_keys(keys)
+
+    assert len(statements) == 1
+    assert set(rows) == set(keys[:3])
+    assert rows[PeriodKey("week", 2026, week=11)].total_income == Decimal("100.00")
+
+
+def category_amounts(session, period_type: str) -> dict:
+    breakdown = session.scalar(
+        select(TransactionMetrics.category_breakdown).where(TransactionMetrics.period_type == period_type),
+    )
+    return {side: breakdown[side]["amounts"] for side in ("credit", "debit")}
+
+
+def test_category_breakdown_follows_recategorized_transactions_on_sqlite(session):
+    when = datetime(2026, 3, 10, 12, 0, tzinfo=UTC)
+    add_transaction(session, "REF1", "100.00", "credit", when, status="CONFIRMED", category="Flete")
+    fuel = add_transaction(session, "REF2", "40.00", "debit", when, category="Combustible")
+    other = add_transaction(session, "REF3", "10.00", "debit", when)
+
+    fuel.status = other.status = "CONFIRMED"
+    session.commit()
+
+    assert category_amounts(session, "month") == {
+        "credit": {"Flete": 100.0},
+        "debit": {"Combustible": 40.0, "uncategorized": 10.0},
+    }
+
+    fuel = session.get(Transaction, "REF2", populate_existing=True)
+    fuel.category = "Refacciones"
+    session.commit()
+
+    assert category_amounts(session, "year") == {
+        "credit": {"Flete": 100.0},
+        "debit": {"Refacciones": 40.0, "uncategorized": 10.0},
+    }
+    assert session.query(TransactionDailyRollup).count() == 3
+
+    repo = TransactionMetricsRepository(session)
+    repo.rebuild_daily_rollups(when.date(), when.date())
+    repo.rebuild_period_metrics("month", 2026, 2026)
+    session.commit()
+
+    assert category_amounts(session, "month") == {
+        "credit": {"Flete": 100.0},
+        "debit": {"Refacciones": 40.0, "uncategorized": 10.0},
+    }
+
+
+def car_metrics_by_period(session) -> dict[tuple, tuple]:
+    rows = session.scalars(select(CarMetrics).where(CarMetrics.transaction_count > 0)).all()
+    return {
+        (r.car_id, r.period_type, r.year, r.month, r.week): (r.total_income, r.total_expense, r.transaction_count) for r in rows
+    }
+
+
+def test_car_metrics_follow_confirmations_and_car_changes_on_sqlite(session):
+    when = datetime(2026, 3, 10, 12, 0, tzinfo=UTC)
+    add_transaction(session, "REF1", "100.00", "credit", when, status="CONFIRMED", car_id="CAR-1")
+    fuel = add_transaction(session, "REF2", "40.00", "debit", when, car_id="CAR-1")
+    add_transaction(session, "REF3", "70.00", "credit", when, status="CONFIRMED")
+
+    fuel.status = "CONFIRMED"
+    session.commit()
+
+    metrics = car_metrics_by_period(session)
+    assert metrics[("CAR-1", "month", 2026, 3, None)] == (Decimal("100.00"), Decimal("40.00"), 2)
+    assert metrics[("CAR-1", "week", 2026, None, 11)] == (Decimal("100.00"), Decimal("40.00"), 2)
+    assert {key[0] for key in metrics} == {"CAR-1"}
+
+    # Reassigning the expense moves it between both cars' periods
+    fuel = session.get(Transaction, "REF2", populate_existing=True)
+    fuel.car_id = "CAR-2"
+    session.commit()
+
+    metrics = car_metrics_by_period(session)
+    assert metrics[("CAR-1", "year", 2026, None, None)] == (Decimal("100.00"), Decimal("0.00"), 1)
+    assert metrics[("CAR-2", "year", 2026, None, None)] == (Decimal("0.00"), Decimal("40.00"), 1)
+
+    month = PeriodKey("month", 2026, 3)
+    assert CarRepository(session).get_car_metrics_by_keys("CAR-2", [month])[month].balance == Decimal("-40.00")
+
+    session.execute(delete(CarMetrics))
+    TransactionMetricsRepository(session).rebuild_car_metrics(2026, 2026)
+    session.commit()
+    assert car_metrics_by_period(session) == metrics
+
+
+def test_car_rebuild_keeps_the_rows_it_wrote_when_it_outlasts_a_second_on_sqlite(session):
+    when = datetime(2026, 3, 10, 9, 0, tzinfo=UTC)
+    add_transaction(session, "REF1", "25.00", "credit", when, status="CONFIRMED", car_id="CAR-1")
+    session.execute(delete(CarMetrics))
+    session.add(CarMetrics(car_id="CAR-2", period_type="year", year=2026, total_income=1, transaction_count=1))
+    session.commit()
+
+    def slow_delete(_conn, _cursor, statement, *_args):
+        if statement.startswith("DELETE FROM car_metrics"):
+            time.sleep(1.1)
+
+    event.listen(session.get_bind(), "before_cursor_execute", slow_delete)
+    try:
+        TransactionMetricsRepository(session).rebuild_car_metrics(2026, 2026)
+    finally:
+        event.remove(session.get_bind(), "before_cursor_execute", slow_delete)
+    session.commit()
+
+    assert {key[:2] for key in car_metrics_by_period(session)} == {("CAR-1", "week"), ("CAR-1", "month"), ("CAR-1", "year")}
+
+
+@pytest.mark.asyncio
+async def test_async_session_runs_the_metrics_pipeline_on_aiosqlite(monkeypatch):
+    monkeypatch.setattr(METRICS, "RECALC_MODE", MetricsRecalcMode.SYNC)
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        for table in TABLES:
+            await conn.run_sync(table.create)
+
+    def confirm(repo: BalanceRepository) -> None:
+        tx = repo.create_transaction(
+            Transaction(
+                reference="REF1",
+                amount=Decimal("75.00"),
+                type="credit",
+                date=datetime(2026, 3, 10, 12, 0, tzinfo=UTC),
+                payment_method="cash",
+                status="PENDING",
+            ),
+        )
+        tx.status = "CONFIRMED"
+        repo.db.commit()
+
+    async with AsyncSession(engine, expire_on_commit=False) as db:
+        repository = AsyncBalanceRepository(db)
+        await repository.run(confirm)
+
+        month = PeriodKey(period_type="month", year=2026, month=3)
+        metrics = await repository.run(lambda repo: repo.get_metrics_by_keys([month]))
+
+    assert metrics[month].total_income == Decimal("75.00")
+    assert metrics[month].transaction_count == 1
+    await engine.dispose()
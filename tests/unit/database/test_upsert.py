@@ -0,0 +1,106 @@
+from unittest.mock import Mock
+
+import pytest
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.database.upsert import insert_missing, upsert, upsert_stmt
+from app.models.balance import Transaction
+from app.models.transaction_metrics import TransactionDailyRollup, TransactionMetrics
+
+TABLES = [Transaction.__table__, TransactionMetrics.__table__, TransactionDailyRollup.__table__]
+
+
+@pytest.fixture
+def sqlite_session():
+    engine = create_engine("sqlite://")
+    for table in TABLES:
+        table.create(engine)
+    with sessionmaker(bind=engine)() as session:
+        yield session
+    engine.dispose()
+
+
+@pytest.fixture
+def generic_session(sqlite_session, monkeypatch):
+    """Return the SQLite session reporting an unknown dialect, forcing the per-row fallback."""
+    bind = Mock(wraps=sqlite_session.get_bind())
+    bind.dialect = Mock(wraps=bind.dialect)
+    bind.dialect.name = "generic"
+    monkeypatch.setattr(sqlite_session, "get_bind", lambda *_args, **_kwargs: bind)
+    return sqlite_session
+
+
+def year_row(year: int, count: int) -> dict:
+    return {
+        "period_type": "year",
+        "year": year,
+        "transaction_count": count,
+        "payment_method_breakdown": {"amounts": {"cash": count}},
+    }
+
+
+def test_upsert_stmt_targets_the_partial_index_on_postgresql():
+    stmt = upsert_stmt(
+        "postgresql",
+        TransactionMetrics,
+        index_elements=["year"],
+        index_where=TransactionMetrics.period_type == "year",
+        update_columns=["transaction_count"],
+    ).values([year_row(2026, 1)])
+
+    sql = str(stmt.compile(dialect=postgresql.dialect()))
+
+    assert "ON CONFLICT (year) WHERE period_type = " in sql
+    assert "DO UPDATE SET transaction_count = excluded.transaction_count" in sql
+
+
+def test_upsert_stmt_without_updates_does_nothing_on_conflict():
+    sql = str(upsert_stmt("sqlite", Transaction, index_elements=["reference"]).compile(dialect=sqlite.dialect()))
+
+    assert "ON CONFLICT (reference) DO NOTHING" in sql
+
+
+@pytest.mark.parametrize("session_fixture", ["sqlite_session", "generic_session"])
+def test_upsert_inserts_then_updates_against_partial_index(session_fixture, request):
+    session: Session = request.getfixturevalue(session_fixture)
+    kwargs = {
+        "index_elements": ["year"],
+        "index_where": TransactionMetrics.period_type == "year",
+        "update_columns": ["transaction_count", "payment_method_breakdown"],
+        "touch": {"updated_at": func.now()},
+    }
+
+    upsert(session, TransactionMetrics, [year_row(2025, 1), year_row(2026, 2)], **kwargs)
+    upsert(session, TransactionMetrics, [year_row(2026, 5)], **kwargs)
+
+    rows = session.execute(
+        select(
+            TransactionMetrics.year,
+            TransactionMetrics.transaction_count,
+            TransactionMetrics.payment_method_breakdown,
+        ).order_by(TransactionMetrics.year),
+    ).all()
+    assert rows == [(2025, 1, {"amounts": {"cash": 1}}), (2026, 5, {"amounts": {"cash": 5}})]
+
+
+@pytest.mark.parametrize("session_fixture", ["sqlite_session", "generic_session"])
+def test_insert_missing_returns_only_new_keys(session_fixture, request):
+    session: Session = request.getfixturevalue(session_fixture)
+    rows = [{"reference": ref, "payment_method": "cash", "status": "PENDING"} for ref in ("A", "B")]
+
+    assert insert_missing(session, Transaction, rows, key="reference") == {"A", "B"}
+
+    rows.append({"reference": "C", "payment_method": "cash", "status": "PENDING"})
+    assert insert_missing(session, Transaction, rows, key="reference") == {"C"}
+    assert session.scalar(select(func.count()).select_from(Transaction)) == 3
+
+
+def test_upsert_and_insert_missing_skip_empty_rows():
+    session = Mock(spec=Session)
+
+    upsert(session, TransactionMetrics, [], index_elements=["year"])
+
+    assert insert_missing(session, Transaction, [], key="reference") == set()
+    session.execute.assert_not_called()
@@ -1,23 +1,78 @@
-from unittest.mock import patch
-
-from app.dependencies import RepositoryFactory
-from app.repositories import BalanceRepository, UserRepository
-
-
-@patch("app.dependencies.repository_factory.get_db")
-class TestRepositoryFactory:
-    """Class of tests for the repository factory."""
-
-    def test_user_repository(self, mock_get_db):
-        repository_generator = RepositoryFactory.user_repository(mock_get_db)
-        repository = next(repository_generator)
-
-        assert isinstance(repository, UserRepository)
-        assert repository.db == mock_get_db
-
-    def test_balance_repository(self, mock_get_db):
-        repository_generator = RepositoryFactory.balance_repository(mock_get_db)
-        repository = next(repository_generator)
-
-        assert isinstance(repository, BalanceRepository)
-        assert repository.db == mock_get_db
+from unittest.mock import patch
+
+import pytest
+
+from app.config import POOL
+from app.dependencies import RepositoryFactory
+from app.repositories import (
+    AsyncBalanceRepository,
+    AsyncCarRepository,
+    AsyncUserRepository,
+    BalanceRepository,
+    UserRepository,
+)
+
+
+@patch("app.dependencies.repository_factory.get_db")
+class TestRepositoryFactory:
+    """Class of tests for the repository factory."""
+
+    def test_user_repository(self, mock_get_db):
+        repository_generator = RepositoryFactory.user_repository(mock_get_db)
+        repository = next(repository_generator)
+
+        assert isinstance(repository, UserRepository)
+        assert repository.db == mock_get_db
+
+    def test_balance_repository(self, mock_get_db):
+        repository_generator = RepositoryFactory.balance_repository(mock_get_db)
+        repository = next(repository_generator)
+
+        assert isinstance(repository, BalanceRepository)
+        assert repository.db == mock_get_db
+
+    @patch("app.dependencies.repository_factory.SessionLocal")
+    def test_balance_repository_scope_opens_and_closes_own_session(self, mock_session_local, _mock_get_db):
+        scope = RepositoryFactory.balance_repository_scope()
+        session = mock_session_local.return_value.__enter__.return_value
+
+        with scope() as repository:
+            assert isinstance(repository, BalanceRepository)
+            assert repository.db == session
+
+        mock_session_local.return_value.__exit__.assert_called_once()
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        ("factory", "repository_class"),
+        [
+            (RepositoryFactory.async_user_repository, AsyncUserRepository),
+            (RepositoryFactory.async_balance_repository, AsyncBalanceRepository),
+            (RepositoryFactory.async_car_repository, AsyncCarRepository),
+        ],
+    )
+    async def test_async_repositories_wrap_the_async_session(self, _mock_get_db, factory, repository_class):
+        session = object()
+
+        repository = await anext(factory(session))
+
+        assert isinstance(repository, repository_class)
+        assert repository.db is session
+
+    @patch("app.dependencies.repository_factory.read_session_factory")
+    def test_read_balance_repository_scope_opens_sessions_from_the_read_factory(self, mock_read_session_factory, _mock_get_db):
+        request = object()
+        scope = RepositoryFactory.read_balance_repository_scope(request)
+        session = mock_read_session_factory.return_value.return_value.__enter__.return_value
+
+        with scope() as repository:
+            assert isinstance(repository, BalanceRepository)
+            assert repository.db == session
+
+        mock_read_session_factory.assert_called_once_with(request)
+
+    def test_repository_scopes_are_withheld_when_the_pool_cannot_serve_two_sessions(self, _mock_get_db, monkeypatch):
+        monkeypatch.setattr(POOL, "CONCURRENT_SESSIONS", False)
+
+        assert RepositoryFactory.balance_repository_scope() is None
+        assert RepositoryFactory.read_balance_repository_scope(object()) is None
@@ -1,34 +1,74 @@
-from unittest.mock import patch
-
-from app.dependencies import ServiceFactory
-from app.services import AuthService, BalanceService, UserService
-
-
-class TestServiceFactory:
-    """Class of tests for the service factory."""
-
-    @patch("app.dependencies.service_factory.RepositoryFactory.user_repository")
-    def test_user_service(self, mock_user_repository):
-        service_generator = ServiceFactory.user_service(mock_user_repository)
-        service = next(service_generator)
-
-        assert isinstance(service, UserService)
-        assert service.repository == mock_user_repository
-
-    @patch("app.dependencies.service_factory.RepositoryFactory.user_repository")
-    @patch("app.dependencies.service_factory.AuthJWT")
-    def test_auth_service(self, mock_authjwt, mock_user_repository):
-        service_generator = ServiceFactory.auth_service(mock_authjwt, mock_user_repository)
-        service = next(service_generator)
-
-        assert isinstance(service, AuthService)
-        assert service.authorize == mock_authjwt
-        assert service.repository == mock_user_repository
-
-    @patch("app.dependencies.service_factory.RepositoryFactory.balance_repository")
-    def test_balance_service(self, mock_balance_repository):
-        service_generator = ServiceFactory.balance_service(mock_balance_repository)
-        service = next(service_generator)
-
-        assert isinstance(service, BalanceService)
-        assert service.repository == mock_balance_repository
+from unittest.mock import patch
+
+from app.dependencies import ServiceFactory
+from app.services import AsyncAuthService, AsyncBalanceService, AsyncCarService, AuthService, BalanceService, UserService
+
+
+class TestServiceFactory:
+    """Class of tests for the service factory."""
+
+    @patch("app.dependencies.service_factory.RepositoryFactory.user_repository")
+    def test_user_service(self, mock_user_repository):
+        service_generator = ServiceFactory.user_service(mock_user_repository)
+        service = next(service_generator)
+
+        assert isinstance(service, UserService)
+        assert service.repository == mock_user_repository
+
+    @patch("app.dependencies.service_factory.RepositoryFactory.user_repository")
+    @patch("app.dependencies.service_factory.AuthJWT")
+    def test_auth_service(self, mock_authjwt, mock_user_repository):
+        service_generator = ServiceFactory.auth_service(mock_authjwt, mock_user_repository)
+        service = next(service_generator)
+
+        assert isinstance(service, AuthService)
+        assert service.authorize == mock_authjwt
+        assert service.repository == mock_user_repository
+
+    @patch("app.dependencies.service_factory.RepositoryFactory.balance_repository_scope")
+    @patch("app.dependencies.service_factory.RepositoryFactory.balance_repository")
+    def test_balance_service(self, mock_balance_repository, mock_balance_repository_scope):
+        service_generator = ServiceFactory.balance_service(mock_balance_repository, mock_balance_repository_scope)
+        service = next(service_generator)
+
+        assert isinstance(service, BalanceService)
+        assert service.repository == mock_balance_repository
+        assert service.repository_scope == mock_balance_repository_scope
+
+    @patch("app.dependencies.service_factory.RepositoryFactory.async_user_repository")
+    @patch("app.dependencies.service_factory.AuthJWT")
+    def test_async_auth_service(self, mock_authjwt, mock_user_repository):
+        service = next(ServiceFactory.async_auth_service(mock_authjwt, mock_user_repository))
+
+        assert isinstance(service, AsyncAuthService)
+        assert service.repository == mock_user_repository
+
+    @patch("app.dependencies.service_factory.RepositoryFactory.async_balance_repository")
+    def test_async_balance_service(self, mock_balance_repository):
+        service = next(ServiceFactory.async_balance_service(mock_balance_repository))
+
+        assert isinstance(service, AsyncBalanceService)
+        assert service.repository == mock_balance_repository
+
+    @patch("app.dependencies.service_factory.RepositoryFactory.async_car_repository")
+    def test_async_car_service(self, mock_car_repository):
+        service = next(ServiceFactory.async_car_service(mock_car_repository))
+
+        assert isinstance(service, AsyncCarService)
+        assert service.repository == mock_car_repository
+
+    @patch("app.dependencies.service_factory.RepositoryFactory.read_balance_repository_scope")
+    @patch("app.dependencies.service_factory.RepositoryFactory.read_balance_repository")
+    def test_read_balance_service_skips_the_metrics_cache(self, mock_balance_repository, mock_balance_repository_scope):
+        service = next(ServiceFactory.read_balance_service(mock_balance_repository, mock_balance_repository_scope))
+
+        assert isinstance(service, BalanceService)
+        assert service.repository_scope == mock_balance_repository_scope
+        assert service.cache is None
+
+    @patch("app.dependencies.service_factory.RepositoryFactory.async_read_balance_repository")
+    def test_async_read_balance_service_skips_the_metrics_cache(self, mock_balance_repository):
+        service = next(ServiceFactory.async_read_balance_service(mock_balance_repository))
+
+        assert isinstance(service, AsyncBalanceService)
+        assert service.cache is None
@@ -1,15 +1,25 @@
-from datetime import UTC, datetime
-from unittest.mock import Mock
+import subprocess
+import sys
+from datetime import UTC, date, datetime
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest.mock import Mock, patch
 
 import pytest
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.dialects.postgresql import asyncpg
 from sqlalchemy.orm import Session
 
+from app.config import REFERENCES
 from app.enum.balance import PeriodType, SortOrder, TransactionSortBy
 from app.errors.database import DBOperationError
 from app.models.balance import Transaction
 from app.models.transaction_metrics import TransactionMetrics
 from app.repositories.balance import BalanceRepository
+from app.repositories.transaction_metrics import TransactionMetricsRepository
+from app.schemas.dto.pagination import TransactionCursor
 from app.utils.periods import PeriodKey
+from app.utils.reference import SEQUENCE_MODULUS
 
 
 @pytest.fixture
@@ -450,3 +460,233 @@ class TestBalanceRepository:
         mock_q4.all.assert_called_once()
 
         assert result == []
+
+    def test_get_range_metrics_splits_current_and_previous(self):
+        rows = [
+            SimpleNamespace(
+                is_current=True,
+                type="credit",
+                payment_method="cash",
+                category="Otro",
+                amount=Decimal("300.00"),
+                tx_count=2,
+            ),
+            SimpleNamespace(
+                is_current=True,
+                type="debit",
+                payment_method="card",
+                category="Otro",
+                amount=Decimal("50.00"),
+                tx_count=1,
+            ),
+            SimpleNamespace(
+                is_current=False,
+                type="credit",
+                payment_method="cash",
+                category="Otro",
+                amount=Decimal("100.00"),
+                tx_count=1,
+            ),
+        ]
+        self.mock_db.execute.return_value.all.return_value = rows
+
+        current, previous = self.repository.get_range_metrics(
+            start=date(2026, 3, 1),
+            end=date(2026, 3, 10),
+            previous_start=date(2026, 2, 19),
+        )
+
+        self.mock_db.execute.assert_called_once()
+        assert current.total_income == Decimal("300.00")
+        assert current.total_expense == Decimal("50.00")
+        assert current.transaction_count == 3
+        assert previous.total_income == Decimal("100.00")
+        assert previous.transaction_count == 1
+
+    def test_bulk_create_transactions_queues_metrics_for_confirmed_rows(self):
+        rows = [
+            {"reference": "A", "date": datetime(2026, 3, 4, 10, tzinfo=UTC), "status": "CONFIRMED"},
+            {"reference": "B", "date": datetime(2026, 3, 4, 11, tzinfo=UTC), "status": "CONFIRMED"},
+            {"reference": "C", "date": datetime(2026, 3, 5, 11, tzinfo=UTC), "status": "PENDING"},
+        ]
+        self.mock_db.get_bind.return_value.dialect.name = "postgresql"
+        self.mock_db.scalars.return_value.all.return_value = ["A", "B", "C"]
+
+        with (
+            patch.object(TransactionMetricsRepository, "refresh_days") as mock_refresh,
+            patch.object(TransactionMetricsRepository, "enqueue_periods") as mock_enqueue,
+        ):
+            created = self.repository.bulk_create_transactions(rows)
+
+        assert created == {"A", "B", "C"}
+        mock_refresh.assert_called_once_with({date(2026, 3, 4)})
+        assert len(mock_enqueue.call_args.args[0]) == 3
+        self.mock_db.commit.assert_called_once()
+
+    def test_bulk_create_transactions_failure_rolls_back(self):
+        self.mock_db.scalars.side_effect = Exception("boom")
+
+        with pytest.raises(DBOperationError):
+            self.repository.bulk_create_transactions([{"reference": "A", "date": datetime.now(UTC), "status": "PENDING"}])
+
+        self.mock_db.rollback.assert_called_once()
+        self.mock_db.commit.assert_not_called()
+
+    def test_reserve_reference_block_uses_sequence_on_postgres(self):
+        self.mock_db.get_bind.return_value.dialect.name = "postgresql"
+        self.mock_db.scalar.return_value = 42
+
+        assert self.repository.reserve_reference_block() == 42
+        assert "transaction_reference_block_seq" in str(self.mock_db.scalar.call_args.args[0])
+
+    def test_reserve_reference_block_falls_back_to_local_counter(self):
+        self.mock_db.get_bind.return_value.dialect.name = "sqlite"
+
+        first = self.repository.reserve_reference_block()
+        second = self.repository.reserve_reference_block()
+
+        assert second == first + 1
+        self.mock_db.scalar.assert_not_called()
+
+    def test_local_reference_blocks_start_at_a_random_block_per_process(self):
+        code = "from app.repositories.balance import _local_reference_blocks; print(next(_local_reference_blocks))"
+        starts = {
+            int(subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout)
+            for _ in range(2)
+        }
+
+        assert len(starts) == 2
+        assert all(0 <= start < SEQUENCE_MODULUS // REFERENCES.BLOCK_SIZE for start in starts)
+
+    def test_get_by_references_single_in_query(self, sample_transaction):
+        self.mock_db.scalars.return_value = [sample_transaction]
+
+        result = self.repository.get_by_references(["0054291019", "OTHER"])
+
+        assert result == [sample_transaction]
+        self.mock_db.scalars.assert_called_once()
+        assert " IN " in str(self.mock_db.scalars.call_args.args[0])
+
+    def test_get_by_references_empty_skips_query(self):
+        assert self.repository.get_by_references([]) == []
+        self.mock_db.scalars.assert_not_called()
+
+    def test_update_transactions_commits_once(self, sample_transaction):
+        result = self.repository.update_transactions([sample_transaction])
+
+        assert result == [sample_transaction]
+        self.mock_db.commit.assert_called_once()
+
+    def test_update_transactions_failure_rolls_back(self, sample_transaction):
+        self.mock_db.commit.side_effect = Exception("boom")
+
+        with pytest.raises(DBOperationError):
+            self.repository.update_transactions([sample_transaction])
+
+        self.mock_db.rollback.assert_called_once()
+
+    @pytest.mark.parametrize(
+        ("sort_by", "sort_order", "predicate"),
+        [
+            (TransactionSortBy.DATE, SortOrder.DESC, "(transaction.date, transaction.reference) < ("),
+            (TransactionSortBy.AMOUNT, SortOrder.ASC, "(transaction.amount, transaction.reference) > ("),
+            (TransactionSortBy.REFERENCE, SortOrder.ASC, "transaction.reference > "),
+        ],
+    )
+    def test_list_transactions_in_range_after_cursor_seeks(self, sort_by, sort_order, predicate):
+        """A cursor adds a keyset predicate and orders by the reference as tie-breaker."""
+        mock_query = self.mock_db.query.return_value
+        mock_seek = mock_query.filter.return_value.filter.return_value
+        mock_seek.order_by.return_value.offset.return_value.limit.return_value.all.return_value = []
+
+        self.repository.list_transactions_in_range(
+            start_dt=datetime(2026, 1, 1, tzinfo=UTC),
+            end_dt=datetime(2026, 1, 31, tzinfo=UTC),
+            limit=11,
+            offset=0,
+            sort_by=sort_by,
+            sort_order=sort_order,
+            after=TransactionCursor(value="X", reference="REF"),
+        )
+
+        seek = mock_query.filter.return_value.filter.call_args.args[0]
+        assert predicate in str(seek)
+        order = mock_seek.order_by.call_args.args
+        assert str(order[-1]).startswith("transaction.reference")
+        mock_seek.order_by.return_value.offset.assert_called_once_with(0)
+
+    def test_list_transactions_page_returns_rows_and_window_total(self, sample_transaction):
+        """The page and its total come from one windowed query."""
+        mock_query = self.mock_db.query.return_value
+        mock_page = mock_query.filter.return_value.order_by.return_value.offset.return_value.limit.return_value
+        mock_page.all.return_value = [SimpleNamespace(Transaction=sample_transaction, total=42)]
+
+        rows, total = self.repository.list_transactions_page(
+            start_dt=datetime(2026, 1, 1, tzinfo=UTC),
+            end_dt=datetime(2026, 1, 31, tzinfo=UTC),
+            limit=10,
+            offset=20,
+            sort_by=TransactionSortBy.DATE,
+            sort_order=SortOrder.DESC,
+        )
+
+        assert rows == [sample_transaction]
+        assert total == 42
+        assert "count(*) OVER ()" in str(self.mock_db.query.call_args.args[1])
+        self.mock_db.query.assert_called_once()
+
+    def test_list_transactions_page_past_the_end_counts_separately(self):
+        mock_query = self.mock_db.query.return_value
+        mock_query.filter.return_value.order_by.return_value.offset.return_value.limit.return_value.all.return_value = []
+        mock_query.filter.return_value.count.return_value = 15
+
+        rows, total = self.repository.list_transactions_page(
+            start_dt=datetime(2026, 1, 1, tzinfo=UTC),
+            end_dt=datetime(2026, 1, 31, tzinfo=UTC),
+            limit=10,
+            offset=30,
+            sort_by=TransactionSortBy.DATE,
+            sort_order=SortOrder.DESC,
+        )
+
+        assert (rows, total) == ([], 15)
+
+    def test_estimate_transactions_in_range_reads_planner_rows_on_postgres(self):
+        self.mock_db.get_bind.return_value.dialect = postgresql.dialect()
+        self.mock_db.execute.return_value.scalar.return_value = [{"Plan": {"Plan Rows": 980}}]
+
+        total = self.repository.estimate_transactions_in_range(
+            start_dt=datetime(2026, 1, 1, tzinfo=UTC),
+            end_dt=datetime(2026, 12, 31, tzinfo=UTC),
+            status="PENDING",
+        )
+
+        assert total == 980
+        sql = str(self.mock_db.execute.call_args.args[0])
+        assert sql.startswith("EXPLAIN (FORMAT JSON) SELECT")
+        assert "transaction.status = 'PENDING'" in sql
+        assert "'2026-01-01 00:00:00+00:00'" in sql
+
+    def test_estimate_transactions_in_range_inlines_values_for_asyncpg(self):
+        self.mock_db.get_bind.return_value.dialect = asyncpg.dialect()
+        self.mock_db.execute.return_value.scalar.return_value = [{"Plan": {"Plan Rows": 12}}]
+
+        total = self.repository.estimate_transactions_in_range(
+            start_dt=datetime(2026, 1, 1, tzinfo=UTC),
+            end_dt=datetime(2026, 12, 31, tzinfo=UTC),
+        )
+
+        assert total == 12
+        statement = self.mock_db.execute.call_args.args[0]
+        assert self.mock_db.execute.call_args.args[1:] == ()
+        assert "$1" not in str(statement)
+        assert "'2026-12-31 00:00:00+00:00'" in str(statement)
+
+    def test_estimate_transactions_in_range_counts_on_other_dialects(self):
+        self.mock_db.get_bind.return_value.dialect.name = "sqlite"
+        self.mock_db.query.return_value.filter.return_value.count.return_value = 7
+
+        assert (
+            self.repository.estimate_transactions_in_range(datetime(2026, 1, 1, tzinfo=UTC), datetime(2026, 2, 1, tzinfo=UTC))
+            == 7
+        )
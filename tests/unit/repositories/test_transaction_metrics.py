@@ -1,15 +1,23 @@
-from datetime import UTC, datetime
+from collections import namedtuple
+from datetime import UTC, date, datetime
 from decimal import Decimal
 from unittest.mock import Mock
 
 import pytest
+from sqlalchemy.dialects import postgresql
 from sqlalchemy.orm import Session
 
+from app.config import METRICS
+from app.enum.balance import MetricsRecalcMode
+from app.errors.transaction_metrics import TransactionMetricsPeriodError
 from app.repositories.transaction_metrics import TransactionMetricsRepository
-from app.schemas.dto.periods import PeriodRawMetrics
+from app.schemas.dto.periods import CarPeriodKey, PeriodKey, PeriodRawMetrics
+from app.utils.locks import advisory_lock_key
 from app.utils.paymenth_method import compute_balance_breakdown, format_payment_method_breakdown
 from app.utils.periods import get_affected_periods
 
+RollupRow = namedtuple("RollupRow", ["year", "key", "type", "payment_method", "category", "amount", "tx_count"])
+
 
 @pytest.fixture
 def transaction_metrics_repository_setup(request):
@@ -173,3 +181,438 @@ class TestTransactionMetricsRepository:
 
         assert result["amounts"] == {}
         assert result["percentages"] == {}
+
+    def test_enqueue_periods_inserts_outbox_rows(self):
+        """Affected periods are written to the outbox in a single executemany."""
+        keys = [PeriodKey("month", 2026, 3, None), PeriodKey("year", 2026, None, None)]
+
+        self.repository.enqueue_periods(keys)
+
+        self.mock_session.execute.assert_called_once()
+        _stmt, rows = self.mock_session.execute.call_args.args
+        assert rows == [
+            {"period_type": "month", "year": 2026, "month": 3, "week": None},
+            {"period_type": "year", "year": 2026, "month": None, "week": None},
+        ]
+        self.mock_session.commit.assert_not_called()
+
+    def test_enqueue_periods_empty_is_noop(self):
+        self.repository.enqueue_periods([])
+
+        self.mock_session.execute.assert_not_called()
+
+    def test_claim_outbox_entries_uses_skip_locked(self):
+        self.mock_session.execute.return_value.scalars.return_value.all.return_value = ["entry"]
+
+        entries = self.repository.claim_outbox_entries(50, max_attempts=5)
+
+        assert entries == ["entry"]
+        sql = str(self.mock_session.execute.call_args.args[0].compile(dialect=postgresql.dialect()))
+        assert "FOR UPDATE SKIP LOCKED" in sql
+        assert "attempts <" in sql
+
+    def test_mark_outbox_entries_failed(self):
+        self.repository.mark_outbox_entries_failed([1, 2])
+        self.repository.mark_outbox_entries_failed([])
+
+        self.mock_session.execute.assert_called_once()
+        sql = str(self.mock_session.execute.call_args.args[0].compile(dialect=postgresql.dialect()))
+        assert "attempts=(transaction_metrics_outbox.attempts +" in sql
+
+    def test_delete_outbox_entries(self):
+        self.repository.delete_outbox_entries([1, 2])
+        self.repository.delete_outbox_entries([])
+
+        self.mock_session.execute.assert_called_once()
+
+    def test_apply_period_delta_updates_totals_and_derived_fields(self, monkeypatch):
+        """The delta is added to the stored totals and derived fields are recomputed from them."""
+        stored = Mock(
+            total_income=Decimal("300.00"),
+            total_expense=Decimal("100.00"),
+            transaction_count=4,
+            payment_method_breakdown={
+                "credit": {"amounts": {"cash": 300.0}},
+                "debit": {"amounts": {"cash": 100.0}},
+            },
+            category_breakdown={
+                "credit": {"amounts": {"Flete": 300.0}},
+                "debit": {"amounts": {"Combustible": 100.0}},
+            },
+        )
+        self.mock_session.execute.return_value.first.return_value = stored
+
+        upsert_mock = Mock()
+        monkeypatch.setattr(self.repository, "_upsert_metrics", upsert_mock)
+
+        delta = PeriodRawMetrics(
+            total_income=Decimal("100.00"),
+            total_expense=Decimal("0.00"),
+            transaction_count=1,
+            credit_payment_amounts={"pegazzo_transfer": Decimal("100.00")},
+            debit_payment_amounts={},
+            credit_category_amounts={"uncategorized": Decimal("100.00")},
+        )
+
+        self.repository.apply_period_delta(PeriodKey("month", 2026, 3, None), delta, commit=False)
+
+        kwargs = upsert_mock.call_args.kwargs
+        assert kwargs["total_income"] == Decimal("400.00")
+        assert kwargs["balance"] == Decimal("300.00")
+        assert kwargs["transaction_count"] == 5
+        assert kwargs["income_expense_ratio"] == Decimal("4.00")
+        assert kwargs["payment_method_breakdown"]["credit"]["percentages"] == {"cash": 75.0, "pegazzo_transfer": 25.0}
+        assert kwargs["category_breakdown"]["credit"]["amounts"] == {"Flete": 300.0, "uncategorized": 100.0}
+        assert kwargs["category_breakdown"]["debit"]["amounts"] == {"Combustible": 100.0}
+        assert kwargs["commit"] is False
+
+    def test_apply_period_delta_drops_methods_that_net_to_zero(self, monkeypatch):
+        stored = Mock(
+            total_income=Decimal("100.00"),
+            total_expense=Decimal("0.00"),
+            transaction_count=1,
+            payment_method_breakdown={"credit": {"amounts": {"cash": 100.0}}},
+            category_breakdown={"credit": {"amounts": {"Flete": 100.0}}},
+        )
+        self.mock_session.execute.return_value.first.return_value = stored
+        upsert_mock = Mock()
+        monkeypatch.setattr(self.repository, "_upsert_metrics", upsert_mock)
+
+        delta = PeriodRawMetrics(
+            total_income=Decimal("-100.00"),
+            total_expense=Decimal("0.00"),
+            transaction_count=-1,
+            credit_payment_amounts={"cash": Decimal("-100.00")},
+            debit_payment_amounts={},
+            credit_category_amounts={"Flete": Decimal("-100.00")},
+        )
+
+        self.repository.apply_period_delta(PeriodKey("year", 2026, None, None), delta)
+
+        kwargs = upsert_mock.call_args.kwargs
+        assert kwargs["transaction_count"] == 0
+        assert kwargs["payment_method_breakdown"]["credit"] == {"amounts": {}, "percentages": {}}
+        assert kwargs["category_breakdown"]["credit"] == {"amounts": {}, "percentages": {}}
+
+    def test_apply_period_delta_falls_back_to_full_recalc_without_stored_row(self, monkeypatch):
+        """A missing row may just mean the period was never calculated, so it is rescanned."""
+        self.mock_session.execute.return_value.first.return_value = None
+        recalc_mock = Mock()
+        monkeypatch.setattr(self.repository, "recalc_period", recalc_mock)
+
+        self.repository.apply_period_delta(PeriodKey("week", 2026, None, 10), Mock(), commit=False)
+
+        recalc_mock.assert_called_once_with(period_type="week", year=2026, month=None, week=10, commit=False)
+
+    def test_apply_period_delta_locks_period_before_first_write(self, monkeypatch):
+        """A concurrent first writer that created the row meanwhile gets the delta applied instead of a rescan."""
+        self.mock_session.get_bind.return_value.dialect.name = "postgresql"
+        stored = Mock(
+            total_income=Decimal("50.00"),
+            total_expense=Decimal("0.00"),
+            transaction_count=1,
+            payment_method_breakdown={"credit": {"amounts": {"cash": 50.0}}, "debit": {"amounts": {}}},
+            category_breakdown={},
+        )
+        self.mock_session.execute.return_value.first.side_effect = [None, stored]
+        recalc_mock = Mock()
+        upsert_mock = Mock()
+        monkeypatch.setattr(self.repository, "recalc_period", recalc_mock)
+        monkeypatch.setattr(self.repository, "_upsert_metrics", upsert_mock)
+        delta = PeriodRawMetrics(Decimal("10.00"), Decimal("0.00"), 1, {"cash": Decimal("10.00")}, {})
+
+        self.repository.apply_period_delta(PeriodKey("year", 2026), delta, commit=False)
+
+        statements = [str(c.args[0].compile(dialect=postgresql.dialect())) for c in self.mock_session.execute.call_args_list]
+        assert "pg_advisory_xact_lock" in statements[1]
+        recalc_mock.assert_not_called()
+        assert upsert_mock.call_args.kwargs["total_income"] == Decimal("60.00")
+
+    def test_try_lock_periods_splits_locked_and_busy_periods_in_one_round_trip(self):
+        self.mock_session.get_bind.return_value.dialect.name = "postgresql"
+        self.mock_session.execute.return_value.one.return_value = (True, False)
+        month, year = PeriodKey("month", 2026, 3), PeriodKey("year", 2026)
+
+        locked, busy = self.repository.try_lock_periods([year, month, year])
+
+        assert (locked, busy) == ([month], [year])
+        self.mock_session.execute.assert_called_once()
+        sql = str(self.mock_session.execute.call_args.args[0].compile(dialect=postgresql.dialect()))
+        assert sql.count("pg_try_advisory_xact_lock(") == 2
+
+    def test_try_lock_periods_outside_postgresql_locks_everything(self):
+        self.mock_session.get_bind.return_value.dialect.name = "sqlite"
+
+        locked, busy = self.repository.try_lock_periods([PeriodKey("year", 2026)])
+
+        assert (locked, busy) == ([PeriodKey("year", 2026)], [])
+        self.mock_session.execute.assert_not_called()
+
+    @pytest.mark.parametrize("mode", [MetricsRecalcMode.SYNC, MetricsRecalcMode.DELTA])
+    def test_apply_changes_queues_periods_another_transaction_is_recalculating(self, mode, monkeypatch):
+        """Busy periods are marked dirty in the outbox instead of waiting on the other transaction's row locks."""
+        monkeypatch.setattr(METRICS, "RECALC_MODE", mode)
+        month, year = PeriodKey("month", 2026, 3), PeriodKey("year", 2026)
+        mocks = {name: Mock() for name in ("refresh_days", "recalc_periods", "apply_period_delta", "enqueue_periods")}
+        for name, mock in mocks.items():
+            monkeypatch.setattr(self.repository, name, mock)
+        monkeypatch.setattr(self.repository, "try_lock_periods", Mock(return_value=([month], [year])))
+        delta = PeriodRawMetrics(Decimal("10.00"), Decimal("0.00"), 1, {"cash": Decimal("10.00")}, {})
+
+        self.repository.apply_changes([month, year], [date(2026, 3, 10)], {month: delta, year: delta})
+
+        if mode == MetricsRecalcMode.SYNC:
+            mocks["recalc_periods"].assert_called_once_with([month], commit=False)
+        else:
+            mocks["apply_period_delta"].assert_called_once_with(month, delta, commit=False)
+        mocks["enqueue_periods"].assert_called_once_with([year])
+
+    def test_try_lock_car_periods_splits_locked_and_busy_car_periods_in_one_round_trip(self):
+        self.mock_session.get_bind.return_value.dialect.name = "postgresql"
+        self.mock_session.execute.return_value.one.return_value = (False, True)
+        march = PeriodKey("month", 2026, 3)
+        car_1, car_2 = CarPeriodKey("CAR-1", march), CarPeriodKey("CAR-2", march)
+
+        locked, busy = self.repository.try_lock_car_periods([car_2, car_1, car_2])
+
+        assert (locked, busy) == ([car_2], [car_1])
+        self.mock_session.execute.assert_called_once()
+        sql = str(self.mock_session.execute.call_args.args[0].compile(dialect=postgresql.dialect()))
+        assert sql.count("pg_try_advisory_xact_lock(") == 2
+
+    @pytest.mark.parametrize("mode", [MetricsRecalcMode.SYNC, MetricsRecalcMode.DELTA])
+    def test_apply_changes_queues_car_periods_another_transaction_is_recalculating(self, mode, monkeypatch):
+        monkeypatch.setattr(METRICS, "RECALC_MODE", mode)
+        march = PeriodKey("month", 2026, 3)
+        car_1, car_2 = CarPeriodKey("CAR-1", march), CarPeriodKey("CAR-2", march)
+        mocks = {name: Mock() for name in ("refresh_days", "recalc_periods", "recalc_car_periods", "enqueue_car_periods")}
+        for name, mock in mocks.items():
+            monkeypatch.setattr(self.repository, name, mock)
+        monkeypatch.setattr(self.repository, "try_lock_periods", Mock(return_value=([], [])))
+        monkeypatch.setattr(self.repository, "try_lock_car_periods", Mock(return_value=([car_1], [car_2])))
+
+        self.repository.apply_changes([], [date(2026, 3, 10)], {}, [car_1, car_2])
+
+        mocks["recalc_car_periods"].assert_called_once_with([car_1], commit=False)
+        mocks["enqueue_car_periods"].assert_called_once_with([car_2])
+
+    def test_recalc_car_periods_waits_for_the_car_period_locks_in_order(self, monkeypatch):
+        """Two transactions rebuilding the same car period from their own snapshots must not overlap."""
+        self.mock_session.get_bind.return_value.dialect.name = "postgresql"
+        monkeypatch.setattr(self.repository, "_fetch_car_period_rows", Mock(return_value={}))
+        monkeypatch.setattr(self.repository, "_upsert_car_metrics_rows", Mock())
+        year, march = PeriodKey("year", 2026), PeriodKey("month", 2026, 3)
+
+        self.repository.recalc_car_periods(
+            [CarPeriodKey("CAR-2", year), CarPeriodKey("CAR-1", march), CarPeriodKey("CAR-1", year)],
+            commit=False,
+        )
+
+        self.mock_session.execute.assert_called_once()
+        compiled = self.mock_session.execute.call_args.args[0].compile(dialect=postgresql.dialect())
+        assert str(compiled).count("pg_advisory_xact_lock(") == 3
+        assert list(compiled.params.values()) == [
+            advisory_lock_key("car_metrics", "CAR-1", "month", 2026, 3, None),
+            advisory_lock_key("car_metrics", "CAR-1", "year", 2026, None, None),
+            advisory_lock_key("car_metrics", "CAR-2", "year", 2026, None, None),
+        ]
+
+    def test_apply_period_delta_unknown_period_type(self):
+        with pytest.raises(TransactionMetricsPeriodError):
+            self.repository.apply_period_delta(PeriodKey("quarter", 2026), Mock())
+
+    def test_recalc_period_sums_daily_rollups(self, monkeypatch):
+        """Period metrics are aggregated from the daily rollup buckets, not from raw transactions."""
+        self.mock_session.execute.return_value.all.return_value = [
+            Mock(type="credit", payment_method="cash", amount=Decimal("120.00"), tx_count=3),
+            Mock(type="debit", payment_method="cash", amount=Decimal("20.00"), tx_count=1),
+        ]
+        upsert_mock = Mock()
+        monkeypatch.setattr(self.repository, "_upsert_metrics", upsert_mock)
+
+        self.repository.recalc_period(period_type="week", year=2026, week=10)
+
+        sql = str(self.mock_session.execute.call_args.args[0])
+        assert "FROM transaction_daily_rollup" in sql
+        assert "transaction_daily_rollup.iso_week" in sql
+        assert upsert_mock.call_args.kwargs["transaction_count"] == 4
+        assert upsert_mock.call_args.kwargs["balance"] == Decimal("100.00")
+
+    @pytest.mark.parametrize(
+        ("key", "columns"),
+        [
+            (PeriodKey("week", 2026, None, 10), ["iso_year", "iso_week"]),
+            (PeriodKey("month", 2026, 3, None), ["year", "month"]),
+            (PeriodKey("year", 2026, None, None), ["year"]),
+        ],
+    )
+    def test_recalc_period_filters_rollups_by_calendar_columns(self, key, columns, monkeypatch):
+        fetch_mock = Mock(return_value=PeriodRawMetrics(Decimal(0), Decimal(0), 0, {}, {}))
+        monkeypatch.setattr(self.repository, "_fetch_period_metrics", fetch_mock)
+        monkeypatch.setattr(self.repository, "_upsert_metrics", Mock())
+
+        self.repository.recalc_period(period_type=key.period_type, year=key.year, month=key.month, week=key.week)
+
+        clauses = fetch_mock.call_args.args[0]
+        assert [c.left.name for c in clauses] == columns
+
+    @pytest.mark.parametrize(
+        "key",
+        [PeriodKey("week", 2026), PeriodKey("month", 2026), PeriodKey("quarter", 2026)],
+    )
+    def test_recalc_period_invalid_keys(self, key):
+        with pytest.raises(TransactionMetricsPeriodError):
+            self.repository.recalc_period(period_type=key.period_type, year=key.year, month=key.month, week=key.week)
+
+    def test_recalc_periods_aggregates_all_periods_in_one_query(self):
+        """All periods share one grouped SELECT over VALUES bounds and one upsert per period type."""
+        self.mock_session.get_bind.return_value.dialect.name = "postgresql"
+        PeriodRow = namedtuple(
+            "PeriodRow",
+            ["period_type", "year", "month", "week", "type", "payment_method", "category", "amount", "tx_count"],
+        )
+        self.mock_session.execute.return_value.all.return_value = [
+            PeriodRow("month", 2026, 3, None, "credit", "cash", "Otro", Decimal("100.00"), 2),
+            PeriodRow("month", 2026, 4, None, None, None, None, 0, 0),
+            PeriodRow("year", 2026, None, None, "credit", "cash", "Otro", Decimal("100.00"), 2),
+        ]
+        keys = [PeriodKey("month", 2026, 3), PeriodKey("month", 2026, 4), PeriodKey("year", 2026)]
+
+        self.repository.recalc_periods(keys, commit=False)
+
+        calls = self.mock_session.execute.call_args_list
+        statements = [str(c.args[0].compile(dialect=postgresql.dialect())) for c in calls]
+        assert len(statements) == 3
+        assert "FROM (VALUES" in statements[0]
+        assert "LEFT OUTER JOIN transaction_daily_rollup" in statements[0]
+        assert "ON CONFLICT (year, month) WHERE" in statements[1]
+        assert "ON CONFLICT (year) WHERE" in statements[2]
+
+        month_rows = calls[1].args[0].compile(dialect=postgresql.dialect()).params
+        assert month_rows["transaction_count_m0"] == 2
+        assert month_rows["transaction_count_m1"] == 0
+        self.mock_session.commit.assert_not_called()
+
+    def test_recalc_periods_empty_is_noop(self):
+        self.repository.recalc_periods([])
+
+        self.mock_session.execute.assert_not_called()
+        self.mock_session.commit.assert_not_called()
+
+    def test_recalc_periods_rolls_back_on_error(self):
+        self.mock_session.execute.side_effect = RuntimeError("db down")
+
+        with pytest.raises(RuntimeError):
+            self.repository.recalc_periods([PeriodKey("year", 2026)])
+
+        self.mock_session.rollback.assert_called_once()
+
+    def test_refresh_days_upserts_buckets_and_removes_stale_ones(self, monkeypatch):
+        """Each day is re-aggregated once; buckets that disappeared are deleted."""
+        self.mock_session.get_bind.return_value.dialect.name = "postgresql"
+        monkeypatch.setattr(self.repository, "_advisory_xact_lock", Mock())
+        self.mock_session.execute.return_value.all.return_value = [
+            Mock(type="credit", payment_method="cash", category="Otro", amount=Decimal("50.00"), tx_count=2),
+        ]
+
+        self.repository.refresh_days([date(2026, 3, 5), date(2026, 3, 5)])
+
+        statements = [str(c.args[0].compile(dialect=postgresql.dialect())) for c in self.mock_session.execute.call_args_list]
+        assert len(statements) == 3
+        assert "FROM transaction" in statements[0]
+        assert "coalesce(transaction.category" in statements[0]
+        assert statements[1].startswith("DELETE FROM transaction_daily_rollup")
+        assert "NOT IN" in statements[1]
+        assert "ON CONFLICT (day, type, payment_method, category) DO UPDATE" in statements[2]
+        self.mock_session.commit.assert_not_called()
+
+    def test_refresh_days_locks_each_day_before_aggregating(self):
+        """Concurrent writers of the same day are serialized so none upserts a sum from a stale snapshot."""
+        self.mock_session.get_bind.return_value.dialect.name = "postgresql"
+        self.mock_session.execute.return_value.all.return_value = []
+
+        self.repository.refresh_days([date(2026, 3, 6), date(2026, 3, 5)])
+
+        statements = [str(c.args[0].compile(dialect=postgresql.dialect())) for c in self.mock_session.execute.call_args_list]
+        assert "pg_advisory_xact_lock" in statements[0]
+        assert "FROM transaction" in statements[1]
+        assert "pg_advisory_xact_lock" in statements[3]
+        first_key = self.mock_session.execute.call_args_list[0].args[0].compile().params
+        assert advisory_lock_key("transaction_daily_rollup", "2026-03-05") in first_key.values()
+
+    def test_refresh_days_empty_day_deletes_all_buckets(self):
+        self.mock_session.execute.return_value.all.return_value = []
+
+        self.repository.refresh_days([date(2026, 3, 5)], commit=True)
+
+        assert self.mock_session.execute.call_count == 2
+        delete_sql = str(self.mock_session.execute.call_args.args[0])
+        assert "NOT IN" not in delete_sql
+        self.mock_session.commit.assert_called_once()
+
+    def test_refresh_days_rolls_back_on_error(self):
+        self.mock_session.execute.side_effect = RuntimeError("db down")
+
+        with pytest.raises(RuntimeError):
+            self.repository.refresh_days([date(2026, 3, 5)])
+
+        self.mock_session.rollback.assert_called_once()
+
+    def test_rebuild_daily_rollups_groups_once_and_inserts_in_batches(self):
+        """The whole range is aggregated in one grouped query and written in multi-row batches."""
+        self.mock_session.execute.return_value.all.return_value = [
+            Mock(day=date(2025, 12, 29), type="credit", payment_method="cash", amount=Decimal("10.00"), tx_count=1),
+            Mock(day=date(2026, 1, 2), type="debit", payment_method="cash", amount=Decimal("5.00"), tx_count=2),
+            Mock(day=date(2026, 1, 3), type="debit", payment_method="cash", amount=Decimal("7.00"), tx_count=1),
+        ]
+
+        written = self.repository.rebuild_daily_rollups(date(2025, 12, 1), date(2026, 1, 31), batch_size=2)
+
+        assert written == 3
+        calls = self.mock_session.execute.call_args_list
+        grouped = str(calls[0].args[0].compile(dialect=postgresql.dialect()))
+        assert "GROUP BY CAST(timezone(" in grouped
+        assert str(calls[1].args[0].compile(dialect=postgresql.dialect())).startswith("DELETE FROM transaction_daily_rollup")
+        batches = [c.args[1] for c in calls[2:]]
+        assert [len(b) for b in batches] == [2, 1]
+        assert batches[0][0]["iso_year"] == 2026
+        assert batches[0][0]["iso_week"] == 1
+        self.mock_session.commit.assert_not_called()
+
+    def test_rebuild_period_metrics_upserts_every_period_and_drops_stale_rows(self):
+        self.mock_session.get_bind.return_value.dialect.name = "postgresql"
+        self.mock_session.execute.return_value.all.return_value = [
+            RollupRow(2026, 1, "credit", "cash", "Otro", Decimal("100.00"), 2),
+            RollupRow(2026, 1, "debit", "cash", "Otro", Decimal("40.00"), 1),
+            RollupRow(2026, 2, "credit", "cash", "Otro", Decimal("30.00"), 1),
+        ]
+
+        written = self.repository.rebuild_period_metrics("month", 2026, 2026)
+
+        assert written == 2
+        statements = [str(c.args[0].compile(dialect=postgresql.dialect())) for c in self.mock_session.execute.call_args_list]
+        assert "GROUP BY transaction_daily_rollup.year, transaction_daily_rollup.month" in statements[0]
+        assert len(statements) == 3
+        assert "ON CONFLICT (year, month) WHERE period_type" in statements[1]
+        upsert_params = self.mock_session.execute.call_args_list[1].args[0].compile().params
+        assert upsert_params["total_income_m0"] == Decimal("100.00")
+        assert upsert_params["balance_m0"] == Decimal("60.00")
+        assert statements[2].startswith("DELETE FROM transaction_metrics")
+        assert "updated_at < %(updated_at_1)s" in statements[2]
+
+    def test_rebuild_period_metrics_keys_weeks_by_iso_year(self):
+        self.mock_session.get_bind.return_value.dialect.name = "postgresql"
+        self.mock_session.execute.return_value.all.return_value = [
+            RollupRow(2026, 1, "credit", "cash", "Otro", Decimal("1.00"), 1),
+        ]
+
+        self.repository.rebuild_period_metrics("week", 2026, 2026)
+
+        grouped = str(self.mock_session.execute.call_args_list[0].args[0].compile(dialect=postgresql.dialect()))
+        assert "GROUP BY transaction_daily_rollup.iso_year, transaction_daily_rollup.iso_week" in grouped
+        upsert_params = self.mock_session.execute.call_args_list[1].args[0].compile().params
+        assert (upsert_params["week_m0"], upsert_params["month_m0"]) == (1, None)
+
+    def test_rebuild_period_metrics_unknown_period_type(self):
+        with pytest.raises(TransactionMetricsPeriodError):
+            self.repository.rebuild_period_metrics("quarter", 2026, 2026)
@@ -10,7 +10,7 @@ from app.schemas.user import ActionSuccess, PermissionsResponse
 class TestAuthRouter:
     """Tests for the internal AuthRouter endpoints."""
 
-    @patch("app.services.auth.AuthService.get_permissions")
+    @patch("app.services.auth.AsyncAuthService.get_permissions")
     def test_get_permissions(self, mock_get_permissions, authorized_client):
         """Test permissions endpoint returns user permissions."""
         # Arrange
@@ -4,13 +4,18 @@ from decimal import Decimal
 from app.models.balance import Transaction
 from app.models.transaction_metrics import TransactionMetrics
 from app.schemas.balance import (
+    BalanceDashboardResponseSchema,
     BalanceMetricsDetailedResponseSchema,
     BalanceMetricsSimpleResponseSchema,
     BalanceTransactionsResponseSchema,
     BalanceTrendResponseSchema,
+    CategoryTrendResponseSchema,
+    TransactionImportResultSchema,
     TransactionResponseSchema,
 )
+from app.schemas.dto.periods import PeriodKey
 from app.schemas.user import ActionSuccess
+from app.utils.cache import metrics_cache
 
 
 class TestBalanceRouter:
@@ -152,6 +157,75 @@ class TestBalanceRouter:
 
         assert response.status_code == 422
 
+    def test_import_transactions_ndjson_streams_row_report(self, authorized_client):
+        body = (
+            '{"amount": 100, "date": "2025-01-01T10:00:00Z", "type": "debit", "description": "A", "paymentMethod": "cash"}\n'
+            '{"amount": 100, "type": "debit", "description": "A", "payment_method": "cash"}\n'
+            '{"amount": "NaN?"}\n'
+        )
+
+        r = authorized_client.post(
+            "/pegazzo/management/balance/transactions/import",
+            content=body,
+            headers={"Content-Type": "application/x-ndjson"},
+        )
+
+        assert r.status_code == 200
+        assert r.headers["content-type"].startswith("application/x-ndjson")
+        report = [TransactionImportResultSchema.model_validate_json(line) for line in r.text.splitlines()]
+        assert [row.row for row in report] == [1, 2, 3]
+        assert report[0].status == "failed"
+        assert report[1].status == "created"
+        assert report[2].status == "failed"
+        assert authorized_client.balance_repo.get_by_reference(report[1].reference).status == "PENDING"
+
+    def test_import_transactions_csv_confirmed(self, authorized_client):
+        body = (
+            "amount,date,type,description,payment_method,category\n"
+            "250.50,2026-02-01T10:00:00Z,credit,Renta,pegazzo_transfer,\n"
+            "99,2026-02-01T10:00:00Z,credit,Renta,pegazzo_transfer,Renta\n"
+        )
+
+        r = authorized_client.post(
+            "/pegazzo/management/balance/transactions/import?confirm=true",
+            content=body,
+            headers={"Content-Type": "text/csv"},
+        )
+
+        assert r.status_code == 200
+        report = [TransactionImportResultSchema.model_validate_json(line) for line in r.text.splitlines()]
+        assert [row.status for row in report] == ["created", "created"]
+        assert report[0].reference != report[1].reference
+        created = authorized_client.balance_repo.get_by_reference(report[0].reference)
+        assert created.status == "CONFIRMED"
+        assert created.category is None
+
+    def test_import_transactions_admin_cannot_confirm_403(self, admin_authorized_client):
+        r = admin_authorized_client.post(
+            "/pegazzo/management/balance/transactions/import?confirm=true",
+            content="amount,type,description,payment_method\n1,debit,A,cash\n",
+            headers={"Content-Type": "text/csv"},
+        )
+
+        assert r.status_code == 403
+
+    def test_import_transactions_unsupported_media_type_415(self, authorized_client):
+        r = authorized_client.post(
+            "/pegazzo/management/balance/transactions/import",
+            json=[{"amount": 1}],
+        )
+
+        assert r.status_code == 415
+
+    def test_import_transactions_unauthorized(self, client):
+        r = client.post(
+            "/pegazzo/management/balance/transactions/import",
+            content="{}\n",
+            headers={"Content-Type": "application/x-ndjson"},
+        )
+
+        assert r.status_code == 401
+
     def test_delete_transaction_success(self, authorized_client):
         """Authenticated user can delete a transaction."""
 
@@ -254,6 +328,33 @@ class TestBalanceRouter:
 
         assert response.status_code == 401
 
+    def test_get_range_metrics_success(self, authorized_client):
+        """Mock transaction (1000 debit, today) falls in the current range."""
+        today = datetime.now(UTC).date()
+
+        r = authorized_client.get(f"/pegazzo/management/balance/metrics/range?start={today}&end={today}")
+
+        assert r.status_code == 200
+        data = BalanceMetricsDetailedResponseSchema.model_validate(r.json())
+        assert data.current_period.total_expense == 1000.0
+        assert data.current_period.transaction_count == 1
+        assert data.previous_period.transaction_count == 0
+
+    def test_get_range_metrics_inverted_range_400(self, authorized_client):
+        r = authorized_client.get("/pegazzo/management/balance/metrics/range?start=2026-03-10&end=2026-03-01")
+
+        assert r.status_code == 400
+
+    def test_get_range_metrics_too_long_400(self, authorized_client):
+        r = authorized_client.get("/pegazzo/management/balance/metrics/range?start=2020-01-01&end=2026-01-01")
+
+        assert r.status_code == 400
+
+    def test_get_range_metrics_unauthorized(self, client):
+        r = client.get("/pegazzo/management/balance/metrics/range?start=2026-03-01&end=2026-03-10")
+
+        assert r.status_code == 401
+
     def test_get_management_metrics_week_success(self, authorized_client):
         authorized_client.balance_repo.mapping[("week", 2026, 1, 5)] = TransactionMetrics(
             period_type="week",
@@ -314,6 +415,52 @@ class TestBalanceRouter:
         assert r.status_code == 200
         BalanceMetricsDetailedResponseSchema.model_validate(r.json())
 
+    def test_get_management_metrics_304_when_etag_matches(self, authorized_client):
+        url = "/pegazzo/management/balance/metrics?period=year&year=2026"
+        first = authorized_client.get(url)
+        etag = first.headers["ETag"]
+
+        r = authorized_client.get(url, headers={"If-None-Match": etag})
+
+        assert r.status_code == 304
+        assert r.content == b""
+        assert r.headers["ETag"] == etag
+
+    def test_get_management_metrics_new_etag_after_period_is_rewritten(self, authorized_client):
+        url = "/pegazzo/management/balance/metrics?period=year&year=2026"
+        etag = authorized_client.get(url).headers["ETag"]
+
+        authorized_client.balance_repo.mapping[("year", 2026, None, None)] = TransactionMetrics(
+            period_type="year",
+            year=2026,
+            total_income=Decimal(10),
+            total_expense=Decimal(0),
+            balance=Decimal(10),
+            transaction_count=1,
+            payment_method_breakdown={},
+            weekly_average_income=Decimal(0),
+            weekly_average_expense=Decimal(0),
+            income_expense_ratio=Decimal(0),
+            updated_at=datetime(2026, 3, 1, tzinfo=UTC),
+        )
+        metrics_cache.invalidate([PeriodKey("year", 2026)])
+        r = authorized_client.get(url, headers={"If-None-Match": etag})
+
+        assert r.status_code == 200
+        assert r.headers["ETag"] != etag
+        assert r.json()["currentPeriod"]["totalIncome"] == 10.0
+
+    def test_get_metrics_simple_and_trend_send_etags(self, authorized_client):
+        for url in (
+            "/pegazzo/management/balance/metrics/simple?month=1&year=2025",
+            "/pegazzo/management/balance/metrics/trend?period=month&limit=3",
+        ):
+            etag = authorized_client.get(url).headers["ETag"]
+
+            r = authorized_client.get(url, headers={"If-None-Match": f'W/{etag}, "other"'})
+
+            assert r.status_code == 304
+
     def test_get_management_metrics_invalid_period_422(self, authorized_client):
         response = authorized_client.get("/pegazzo/management/balance/metrics?period=INVALID&year=2026")
 
@@ -507,6 +654,36 @@ class TestBalanceRouter:
         r = client.get("/pegazzo/management/balance/metrics/trend?period=month")
         assert r.status_code == 401
 
+    def test_get_category_trend_returns_the_stored_category_totals(self, authorized_client):
+        now = datetime.now(UTC)
+        authorized_client.balance_repo.mapping[("year", now.year, None, None)] = TransactionMetrics(
+            period_type="year",
+            year=now.year,
+            category_breakdown={"credit": {"amounts": {"Flete": 4500.0}}, "debit": {"amounts": {"uncategorized": 200.0}}},
+        )
+
+        r = authorized_client.get("/pegazzo/management/balance/metrics/categories/trend?period=year&limit=2")
+        assert r.status_code == 200
+        assert r.headers["etag"]
+
+        payload = r.json()
+        assert CategoryTrendResponseSchema.model_validate(payload)
+        assert payload["periodType"] == "year"
+        assert [(item["income"], item["expense"]) for item in payload["data"]] == [
+            ({}, {}),
+            ({"Flete": 4500.0}, {"uncategorized": 200.0}),
+        ]
+
+        r = authorized_client.get(
+            "/pegazzo/management/balance/metrics/categories/trend?period=year&limit=2",
+            headers={"If-None-Match": r.headers["etag"]},
+        )
+        assert r.status_code == 304
+
+    def test_get_category_trend_unauthorized(self, client):
+        r = client.get("/pegazzo/management/balance/metrics/categories/trend?period=month")
+        assert r.status_code == 401
+
     def test_get_transactions_month_success_default_sort_date_desc(self, authorized_client):
         """Month success: default page=1, limit=10, sort_by=date desc."""
         authorized_client.balance_repo.reset()
@@ -593,6 +770,48 @@ class TestBalanceRouter:
         assert payload["pagination"]["totalPages"] == 2
         assert len(payload["transactions"]) == 5
 
+    def test_get_transactions_cursor_walks_all_pages(self, authorized_client):
+        """Following nextCursor visits every transaction once, in the same order as offset pages."""
+        authorized_client.balance_repo.reset()
+        authorized_client.balance_repo.transactions = [
+            Transaction(
+                amount=100 + i % 3,
+                reference=f"TRX-{i:03d}",
+                date=datetime(2026, 1, 15, 12, 0, tzinfo=UTC),
+                type="debit",
+                description="Bulk",
+                payment_method="cash",
+                status="CONFIRMED",
+                category="Otro",
+            )
+            for i in range(7)
+        ]
+        url = "/pegazzo/management/balance/transactions?period=month&month=1&year=2026&limit=3&sort_by=amount&sort_order=asc"
+
+        seen: list[str] = []
+        r = authorized_client.get(url)
+        while True:
+            assert r.status_code == 200
+            pagination = r.json()["pagination"]
+            seen += [t["reference"] for t in r.json()["transactions"]]
+            if pagination["nextCursor"] is None:
+                break
+            r = authorized_client.get(url + f"&after={pagination['nextCursor']}&include_total=false")
+            assert r.json()["pagination"]["total"] is None
+
+        assert seen == ["TRX-000", "TRX-003", "TRX-006", "TRX-001", "TRX-004", "TRX-002", "TRX-005"]
+
+    def test_get_transactions_estimate_total_flags_estimate(self, authorized_client):
+        r = authorized_client.get(
+            "/pegazzo/management/balance/transactions?period=year&year=2026&status=PENDING&estimate_total=true",
+        )
+        assert r.status_code == 200
+        assert r.json()["pagination"]["totalEstimated"] is True
+
+    def test_get_transactions_invalid_cursor_400(self, authorized_client):
+        r = authorized_client.get("/pegazzo/management/balance/transactions?period=month&month=1&year=2026&after=garbage")
+        assert r.status_code == 400
+
     def test_get_transactions_month_sort_by_amount_asc(self, authorized_client):
         """Sorting by amount asc."""
         authorized_client.balance_repo.reset()
@@ -853,6 +1072,47 @@ class TestBalanceRouter:
         )
         assert r.status_code == 422
 
+    def test_authorize_transactions_batch(self, authorized_client):
+        """Owner confirms several references and gets the outcome per reference."""
+        authorized_client.balance_repo.transactions[0].status = "PENDING"
+
+        r = authorized_client.post(
+            "/pegazzo/management/balance/transactions/authorization",
+            json={"references": ["MOCK_REF_001", "NOEXIST"], "status": "CONFIRMED"},
+        )
+        assert r.status_code == 200
+        body = r.json()
+        assert body["updated"] == 1
+        assert body["failed"] == 1
+        assert body["results"][0] == {"reference": "MOCK_REF_001", "result": "updated", "status": "CONFIRMED", "error": None}
+        assert body["results"][1]["result"] == "failed"
+        assert authorized_client.balance_repo.transactions[0].status == "CONFIRMED"
+
+    def test_authorize_transactions_batch_admin_cannot_confirm(self, admin_authorized_client):
+        admin_authorized_client.balance_repo.transactions[0].status = "PENDING"
+
+        r = admin_authorized_client.post(
+            "/pegazzo/management/balance/transactions/authorization",
+            json={"references": ["MOCK_REF_001"], "status": "CONFIRMED"},
+        )
+        assert r.status_code == 200
+        assert r.json()["results"][0]["result"] == "failed"
+        assert admin_authorized_client.balance_repo.transactions[0].status == "PENDING"
+
+    def test_authorize_transactions_batch_empty_422(self, authorized_client):
+        r = authorized_client.post(
+            "/pegazzo/management/balance/transactions/authorization",
+            json={"references": [], "status": "CONFIRMED"},
+        )
+        assert r.status_code == 422
+
+    def test_authorize_transactions_batch_unauthorized(self, client):
+        r = client.post(
+            "/pegazzo/management/balance/transactions/authorization",
+            json={"references": ["MOCK_REF_001"], "status": "CONFIRMED"},
+        )
+        assert r.status_code == 401
+
     # Admin delete/edit permission tests
 
     def test_delete_transaction_admin_rejected_success(self, admin_authorized_client):
@@ -1127,3 +1387,37 @@ class TestBalanceRouter:
         r = authorized_client.get("/pegazzo/management/balance/transactions/count")
         assert r.status_code == 200
         assert r.json()["count"] == 2
+
+    def test_get_dashboard_bundles_metrics_trend_and_first_page(self, authorized_client):
+        now = datetime.now(UTC)
+        authorized_client.balance_repo.mapping[("month", now.year, now.month, None)] = TransactionMetrics(
+            period_type="month",
+            year=now.year,
+            month=now.month,
+            balance=Decimal(800),
+            total_income=Decimal(1000),
+            total_expense=Decimal(200),
+            transaction_count=3,
+            payment_method_breakdown={},
+            weekly_average_income=Decimal(0),
+            weekly_average_expense=Decimal(0),
+            income_expense_ratio=Decimal(5),
+        )
+
+        r = authorized_client.get(
+            f"/pegazzo/management/balance/dashboard?period=month&year={now.year}&month={now.month}&trend_limit=4&limit=5",
+        )
+        assert r.status_code == 200
+
+        payload = r.json()
+        assert BalanceDashboardResponseSchema.model_validate(payload)
+        assert payload["metrics"]["currentPeriod"]["totalIncome"] == 1000
+        assert len(payload["trend"]["data"]) == 4
+        assert payload["trend"]["data"][-1]["totalIncome"] == 1000
+        assert payload["transactionCount"] == 1
+        assert payload["transactions"]["transactions"][0]["reference"] == "MOCK_REF_001"
+        assert payload["transactions"]["pagination"]["limit"] == 5
+
+    def test_get_dashboard_requires_period_params(self, authorized_client):
+        r = authorized_client.get("/pegazzo/management/balance/dashboard?period=month")
+        assert r.status_code == 400
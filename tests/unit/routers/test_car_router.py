@@ -1,6 +1,9 @@
 from datetime import UTC, datetime, timedelta
+from decimal import Decimal
 from unittest.mock import patch
 
+from app.models.transaction_metrics import CarMetrics
+
 
 def _future_date(days: int = 365) -> str:
     return (datetime.now(UTC) + timedelta(days=days)).isoformat()
@@ -10,6 +13,21 @@ def _past_date(days: int = 1) -> str:
     return (datetime.now(UTC) - timedelta(days=days)).isoformat()
 
 
+def _car_metrics(car_id: str, income: str, expense: str, period_type: str = "month", **period) -> CarMetrics:
+    income, expense = Decimal(income), Decimal(expense)
+    return CarMetrics(
+        car_id=car_id,
+        period_type=period_type,
+        year=2026,
+        month=period.get("month", 3 if period_type == "month" else None),
+        week=period.get("week"),
+        total_income=income,
+        total_expense=expense,
+        balance=income - expense,
+        transaction_count=2,
+    )
+
+
 BASE_PAYLOAD = {
     "id": "CAR-001",
     "make": "Toyota",
@@ -352,3 +370,76 @@ class TestCarRouter:
         associate = response.json()["associate"]
         assert associate["name"] == "Juan"
         assert associate["surnames"] == "Pérez"
+
+    # --- GET /{car_id}/metrics ---
+
+    def test_get_car_metrics_compares_with_previous_period(self, authorized_client):
+        self._create_car(authorized_client)
+        authorized_client.car_repo.car_metrics += [
+            _car_metrics("CAR-001", "500.00", "200.00"),
+            _car_metrics("CAR-001", "100.00", "100.00", month=2),
+        ]
+
+        response = authorized_client.get("/pegazzo/management/cars/CAR-001/metrics?period=month&year=2026&month=3")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["carId"] == "CAR-001"
+        assert data["currentPeriod"]["balance"] == 300.0
+        assert data["previousPeriod"]["totalIncome"] == 100.0
+        assert data["comparison"]["incomeChangePercent"] == 400.0
+
+    def test_get_car_metrics_week_ignores_the_request_month(self, authorized_client):
+        self._create_car(authorized_client)
+        authorized_client.car_repo.car_metrics.append(_car_metrics("CAR-001", "80.00", "30.00", "week", week=11))
+
+        response = authorized_client.get("/pegazzo/management/cars/CAR-001/metrics?period=week&year=2026&month=3&week=11")
+
+        assert response.status_code == 200
+        assert response.json()["currentPeriod"]["balance"] == 50.0
+
+    def test_get_car_metrics_without_transactions_is_zero(self, authorized_client):
+        self._create_car(authorized_client)
+
+        response = authorized_client.get("/pegazzo/management/cars/CAR-001/metrics?period=year&year=2026")
+
+        assert response.status_code == 200
+        assert response.json()["currentPeriod"]["transactionCount"] == 0
+
+    def test_get_car_metrics_not_found(self, authorized_client):
+        response = authorized_client.get("/pegazzo/management/cars/NOTEXIST/metrics?period=year&year=2026")
+        assert response.status_code == 404
+
+    def test_get_car_metrics_admin_forbidden(self, admin_authorized_client):
+        response = admin_authorized_client.get("/pegazzo/management/cars/CAR-001/metrics?period=year&year=2026")
+        assert response.status_code == 403
+
+    # --- GET /metrics/ranking ---
+
+    def test_rank_cars_orders_by_balance(self, authorized_client):
+        for car_id, plate, vin in (("CAR-001", "ABC-1234", "VIN1"), ("CAR-002", "XYZ-9876", "VIN2")):
+            authorized_client.post("/pegazzo/management/cars", json={**BASE_PAYLOAD, "id": car_id, "plate": plate, "vin": vin})
+        authorized_client.car_repo.car_metrics += [
+            _car_metrics("CAR-001", "100.00", "90.00"),
+            _car_metrics("CAR-002", "400.00", "100.00"),
+            _car_metrics("CAR-001", "900.00", "0.00", month=2),
+        ]
+
+        response = authorized_client.get("/pegazzo/management/cars/metrics/ranking?period=month&year=2026&month=3")
+
+        assert response.status_code == 200
+        cars = response.json()["cars"]
+        assert [c["carId"] for c in cars] == ["CAR-002", "CAR-001"]
+        assert cars[0]["plate"] == "XYZ-9876"
+        assert cars[0]["balance"] == 300.0
+
+        response = authorized_client.get("/pegazzo/management/cars/metrics/ranking?period=month&year=2026&month=3&sort_order=asc&limit=1")
+        assert [c["carId"] for c in response.json()["cars"]] == ["CAR-001"]
+
+    def test_rank_cars_invalid_period(self, authorized_client):
+        response = authorized_client.get("/pegazzo/management/cars/metrics/ranking?period=month&year=2026")
+        assert response.status_code == 400
+
+    def test_rank_cars_admin_forbidden(self, admin_authorized_client):
+        response = admin_authorized_client.get("/pegazzo/management/cars/metrics/ranking?period=year&year=2026")
+        assert response.status_code == 403
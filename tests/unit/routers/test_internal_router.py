@@ -0,0 +1,36 @@
+from app.config import CACHE
+
+
+class TestInternalRouter:
+    """Unit tests for the /internal/stats endpoints."""
+
+    def test_metrics_cache_stats_counts_hits_and_misses(self, authorized_client, monkeypatch):
+        monkeypatch.setattr(CACHE, "ENABLED", True)
+        for _ in range(2):
+            assert authorized_client.get("/pegazzo/management/balance/metrics/simple?month=3&year=2026").status_code == 200
+
+        response = authorized_client.get("/pegazzo/internal/stats/metrics-cache")
+
+        assert response.status_code == 200
+        body = response.json()
+        assert body["backend"] == "local"
+        # The local store does not cache the ETag validator, only the response
+        assert (body["hits"], body["misses"], body["entries"]) == (1, 1, 1)
+        assert body["maxEntries"] > 0
+
+    def test_metrics_cache_stats_is_owner_only(self, admin_authorized_client):
+        assert admin_authorized_client.get("/pegazzo/internal/stats/metrics-cache").status_code == 403
+
+    def test_metrics_cache_stats_requires_auth(self, client):
+        assert client.get("/pegazzo/internal/stats/metrics-cache").status_code == 401
+
+    def test_db_pool_stats_lists_every_engine(self, authorized_client):
+        response = authorized_client.get("/pegazzo/internal/stats/db-pool")
+
+        assert response.status_code == 200
+        pools = response.json()["pools"]
+        assert [pool["name"] for pool in pools] == ["primary", "primary-async"]
+        assert {"checkedOut", "peakCheckedOut", "overflow", "waitMsAvg", "waitMsMax", "timeouts"} <= pools[0].keys()
+
+    def test_db_pool_stats_is_owner_only(self, admin_authorized_client):
+        assert admin_authorized_client.get("/pegazzo/internal/stats/db-pool").status_code == 403
@@ -0,0 +1,69 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.routers import ROUTER_GROUPS, load_router
+from app.routers.lazy import LazyRouterMiddleware
+
+
+def lazy_app() -> tuple[FastAPI, LazyRouterMiddleware]:
+    app = FastAPI()
+    middleware = LazyRouterMiddleware(app, "/pegazzo")
+    app.middleware("http")(middleware)
+    return app, middleware
+
+
+def route_paths(app: FastAPI) -> list[str]:
+    return [route.path for route in app.routes if route.path.startswith("/pegazzo")]
+
+
+class TestLazyRouterMiddleware:
+    """Unit tests for the serverless router mounting."""
+
+    def test_first_request_mounts_only_its_group(self):
+        app, middleware = lazy_app()
+
+        response = TestClient(app).get("/pegazzo/management/balance/metrics/simple")
+
+        # Mounted in time to be routed: the auth check answers, not a 404
+        assert response.status_code == 401
+        assert middleware.mounted == {"/management/balance"}
+        assert all(path.startswith("/pegazzo/management/balance") for path in route_paths(app))
+
+    def test_group_is_mounted_once(self):
+        app, middleware = lazy_app()
+
+        middleware.mount_for("/pegazzo/internal/auth/login")
+        routes = len(app.routes)
+        middleware.mount_for("/pegazzo/internal/auth/logout")
+
+        assert len(app.routes) == routes
+
+    def test_car_group_keeps_the_static_prefixes_before_the_car_id_route(self):
+        app, middleware = lazy_app()
+
+        middleware.mount_for("/pegazzo/management/cars/ABC123")
+
+        paths = route_paths(app)
+        assert paths.index("/pegazzo/management/cars/associate") < paths.index("/pegazzo/management/cars/{car_id}")
+        assert paths.index("/pegazzo/management/cars/insurance") < paths.index("/pegazzo/management/cars/{car_id}")
+
+    def test_prefix_must_match_a_whole_segment(self):
+        _, middleware = lazy_app()
+
+        middleware.mount_for("/pegazzo/management/balances")
+
+        assert middleware.mounted == set()
+
+    def test_openapi_mounts_every_group(self):
+        app, middleware = lazy_app()
+
+        schema = TestClient(app).get("/openapi.json").json()
+
+        assert middleware.mounted == set(ROUTER_GROUPS)
+        assert "/pegazzo/internal/stats/db-pool" in schema["paths"]
+
+    def test_groups_cover_every_eager_router(self):
+        names = [name for group in ROUTER_GROUPS.values() for name in group]
+
+        assert sorted(names) == ["associate", "auth", "balance", "car", "document", "image", "insurance", "internal", "user"]
+        assert load_router("car").prefix == "/management/cars"
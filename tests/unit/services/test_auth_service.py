@@ -1,13 +1,13 @@
-from unittest.mock import Mock, patch
+from unittest.mock import AsyncMock, Mock, patch
 
 import pytest
 
 from app.enum.auth import Role
-from app.errors.auth import InvalidCredentials, InvalidRefreshToken
+from app.errors.auth import AlreadyLoggedOutException, InvalidCredentials, InvalidRefreshToken
 from app.errors.user import UserNotFoundException
 from app.models.users import User
-from app.repositories.user import UserRepository
-from app.services.auth import AuthService
+from app.repositories.user import AsyncUserRepository, UserRepository
+from app.services.auth import AsyncAuthService, AuthService
 
 
 @pytest.fixture
@@ -131,3 +131,85 @@ class TestAuthService:
         self.mock_authorize.get_jwt_subject.assert_called_once()
         self.mock_repo.get_by_username.assert_called_once_with("JuanOvando")
         assert result == {"role": "administrador", "permissions": ["create_user", "delete_user"]}
+
+
+@pytest.mark.asyncio
+class TestAsyncAuthService:
+    """Unit tests for AsyncAuthService."""
+
+    def setup_method(self):
+        self.mock_authorize = Mock()
+        self.mock_repo = Mock(spec=AsyncUserRepository)
+        self.mock_repo.get_by_username = AsyncMock()
+        self.service = AsyncAuthService(authorize=self.mock_authorize, repository=self.mock_repo)
+
+    @patch("app.services.auth.run_in_threadpool", new_callable=AsyncMock, side_effect=lambda func, *args: func(*args))
+    @patch("app.services.auth.AuthUtils.verify_password", return_value=True)
+    @patch("app.services.auth.AuthUtils.create_access_token", return_value=("access_token", "refresh_token"))
+    async def test_login_verifies_the_password_off_the_event_loop(
+        self,
+        mock_create_token,
+        mock_verify_password,
+        mock_run_in_threadpool,
+    ):
+        """Test login awaits the user lookup and checks the credentials in the threadpool."""
+        user = User(username="testuser", password="hashed", role=Role.OWNER)
+        self.mock_repo.get_by_username.return_value = user
+
+        await self.service.login("testuser", "password123")
+
+        self.mock_repo.get_by_username.assert_awaited_once_with("testuser")
+        mock_run_in_threadpool.assert_awaited_once()
+        assert mock_run_in_threadpool.await_args.args[1:] == (user, "password123")
+        mock_verify_password.assert_called_once_with("password123", "hashed")
+        mock_create_token.assert_called_once()
+        self.mock_authorize.set_access_cookies.assert_called_once_with("access_token")
+
+    async def test_login_user_not_found(self):
+        """Test login with nonexistent user raises UserNotFoundException."""
+        self.mock_repo.get_by_username.return_value = None
+        with pytest.raises(UserNotFoundException):
+            await self.service.login("nouser", "password123")
+
+    @patch("app.services.auth.AuthUtils.verify_password", return_value=False)
+    async def test_login_invalid_password(self, _):
+        """Test login with wrong password raises InvalidCredentials."""
+        self.mock_repo.get_by_username.return_value = User(username="testuser", password="hashed", role=Role.EMPLOYEE)
+        with pytest.raises(InvalidCredentials):
+            await self.service.login("testuser", "wrongpass")
+
+    async def test_get_permissions_returns_role_and_permissions(self):
+        """Test get_permissions awaits the current user and returns its role and permissions."""
+        permission = Mock()
+        permission.name = "create_user"
+        mock_user = Mock()
+        mock_user.role.name = "administrador"
+        mock_user.role.permissions = [permission]
+        self.mock_authorize.get_jwt_subject.return_value = "JuanOvando"
+        self.mock_repo.get_by_username.return_value = mock_user
+
+        result = await self.service.get_permissions()
+
+        self.mock_repo.get_by_username.assert_awaited_once_with("JuanOvando")
+        assert result == {"role": "administrador", "permissions": ["create_user"]}
+
+    async def test_refresh_and_logout_run_the_sync_service(self):
+        """Test refresh and logout delegate to AuthService through the repository's run."""
+        self.mock_repo.run = AsyncMock(side_effect=lambda call: call(Mock()))
+        self.mock_authorize.get_jwt_subject.return_value = "testuser"
+        self.mock_authorize.get_raw_jwt.return_value = {"role": "owner"}
+
+        with patch("app.services.auth.AuthUtils.create_access_token", return_value=("access", "refresh")):
+            await self.service.refresh()
+        await self.service.logout()
+
+        assert self.mock_repo.run.await_count == 2
+        self.mock_authorize.set_refresh_cookies.assert_called_once_with("refresh")
+        self.mock_authorize.unset_jwt_cookies.assert_called_once()
+
+    async def test_logout_without_refresh_token_raises(self):
+        self.mock_repo.run = AsyncMock(side_effect=lambda call: call(Mock()))
+        self.mock_authorize.jwt_refresh_token_required.side_effect = Exception("missing")
+
+        with pytest.raises(AlreadyLoggedOutException):
+            await self.service.logout()
@@ -1,4 +1,4 @@
-from datetime import UTC, datetime
+from datetime import UTC, date, datetime
 from decimal import Decimal
 from types import SimpleNamespace
 from unittest.mock import Mock, patch
@@ -16,6 +16,7 @@ from app.errors.balance import (
     TransactionNotFoundException,
     TransactionStatusForbiddenException,
 )
+from app.errors.database import DBOperationError
 from app.errors.transaction_metrics import TransactionMetricsPeriodError
 from app.models.balance import Transaction
 from app.repositories.balance import BalanceRepository
@@ -23,10 +24,18 @@ from app.schemas.balance import (
     BalanceMetricsDetailedResponseSchema,
     BalanceTransactionsResponseSchema,
     BalanceTrendResponseSchema,
+    CategoryTrendResponseSchema,
+    ComparisonSchema,
     TransactionPatchSchema,
     TransactionSchema,
 )
+from app.schemas.dto.imports import ImportRecord
+from app.schemas.dto.pagination import TransactionCursor
+from app.schemas.dto.periods import PeriodKey, PeriodRawMetrics
 from app.services.balance import BalanceService
+from app.utils.cache import LocalVersionStore, MetricsCache
+from app.utils.pagination import decode_cursor, encode_cursor
+from app.utils.reference import ReferenceSequence
 
 
 @pytest.fixture
@@ -449,46 +458,67 @@ class TestBalanceService:
             self.service.get_management_metrics(period="year", year=None)
 
     def test_get_management_metrics_returns_zero_when_no_rows(self):
-        """If both current and previous are None, should return BalanceMetricsDetailedResponseSchema()."""
-        self.mock_repo.get_period_metrics.return_value = None
+        """If no period has a row, should return zeroed metrics and comparisons."""
+        self.mock_repo.get_metrics_by_keys.return_value = {}
 
         result = self.service.get_management_metrics(period="year", year=2026)
 
         assert BalanceMetricsDetailedResponseSchema.model_validate(result)
-        assert self.mock_repo.get_period_metrics.call_count == 2
+        self.mock_repo.get_metrics_by_keys.assert_called_once()
+        assert result.year_over_year.balance_change_percent == 0.0
 
         assert result.current_period.balance == 0.0
         assert result.previous_period.balance == 0.0
         assert result.comparison.balance_change_percent == 0.0
 
     def test_get_management_metrics_calls_repo_with_current_and_previous_year(self):
-        """year=2026 should query current (2026) and previous (2025)."""
+        """year=2026 should query current (2026) and previous (2025) in one lookup."""
         current = SimpleNamespace(
             balance=Decimal("100.00"),
             total_income=Decimal("200.00"),
             total_expense=Decimal("100.00"),
             transaction_count=5,
             payment_method_breakdown={},
+            category_breakdown={},
             weekly_average_income=Decimal("50.00"),
             weekly_average_expense=Decimal("25.00"),
             income_expense_ratio=Decimal("2.00"),
         )
-        prev = None
 
-        self.mock_repo.get_period_metrics.side_effect = [current, prev]
+        self.mock_repo.get_metrics_by_keys.return_value = {PeriodKey("year", 2026): current}
 
         result = self.service.get_management_metrics(period="year", year=2026)
 
         assert BalanceMetricsDetailedResponseSchema.model_validate(result)
 
-        calls = self.mock_repo.get_period_metrics.call_args_list
-        assert calls[0].kwargs == {"period_type": "year", "year": 2026, "month": None, "week": None}
-        assert calls[1].kwargs == {"period_type": "year", "year": 2025, "month": None, "week": None}
+        self.mock_repo.get_metrics_by_keys.assert_called_once()
+        keys = self.mock_repo.get_metrics_by_keys.call_args.args[0]
+        assert set(keys) == {PeriodKey("year", 2026), PeriodKey("year", 2025)}
 
         assert result.current_period.total_income == 200.0
         assert result.previous_period.total_income == 0.0
         assert result.comparison.transaction_change == 5
 
+    def test_get_management_metrics_week_looks_up_the_stored_week_without_month(self):
+        current = SimpleNamespace(
+            balance=Decimal("30.00"),
+            total_income=Decimal("50.00"),
+            total_expense=Decimal("20.00"),
+            transaction_count=3,
+            payment_method_breakdown={},
+            category_breakdown={},
+            weekly_average_income=Decimal("50.00"),
+            weekly_average_expense=Decimal("20.00"),
+            income_expense_ratio=Decimal("2.50"),
+        )
+        self.mock_repo.get_metrics_by_keys.return_value = {PeriodKey("week", 2026, week=11): current}
+
+        result = self.service.get_management_metrics(period="week", year=2026, month=3, week=11)
+
+        keys = self.mock_repo.get_metrics_by_keys.call_args.args[0]
+        assert keys[0] == PeriodKey("week", 2026, week=11)
+        assert result.current_period.balance == 30.0
+
     def test_get_management_metrics_percent_change_div_by_zero_is_zero(self):
         """If previous is 0, percentage changes should be 0 (per percent_change behavior)."""
         current = SimpleNamespace(
@@ -497,6 +527,7 @@ class TestBalanceService:
             total_expense=Decimal("0.00"),
             transaction_count=2,
             payment_method_breakdown={},
+            category_breakdown={},
             weekly_average_income=Decimal("0.00"),
             weekly_average_expense=Decimal("0.00"),
             income_expense_ratio=Decimal("0.00"),
@@ -507,12 +538,13 @@ class TestBalanceService:
             total_expense=Decimal("0.00"),
             transaction_count=0,
             payment_method_breakdown={},
+            category_breakdown={},
             weekly_average_income=Decimal("0.00"),
             weekly_average_expense=Decimal("0.00"),
             income_expense_ratio=Decimal("0.00"),
         )
 
-        self.mock_repo.get_period_metrics.side_effect = [current, previous]
+        self.mock_repo.get_metrics_by_keys.return_value = {PeriodKey("year", 2026): current, PeriodKey("year", 2025): previous}
 
         result = self.service.get_management_metrics(period="year", year=2026)
 
@@ -618,14 +650,47 @@ class TestBalanceService:
         assert all(d.period_start.month == 1 and d.period_start.day == 1 for d in result.data)
         assert all(d.period_end.month == 12 and d.period_end.day == 31 for d in result.data)
 
+    def test_get_category_trend_reads_the_stored_breakdowns_and_fills_missing_periods(self):
+        december_row = SimpleNamespace(
+            year=2025,
+            month=12,
+            week=None,
+            category_breakdown={
+                "credit": {"amounts": {"Flete": 4500.0}},
+                "debit": {"amounts": {"Combustible": 1500.0, "uncategorized": 700.0}},
+            },
+        )
+        self.mock_repo.get_metrics_for_keys.return_value = [december_row]
+
+        with patch("app.services.balance.datetime") as mock_dt:
+            mock_dt.now.return_value = datetime(2026, 1, 7, 12, 0, 0, tzinfo=UTC)
+
+            result = self.service.get_category_trend(period=PeriodType.MONTH, limit=3)
+
+        assert CategoryTrendResponseSchema.model_validate(result)
+        assert [(d.period_start.month, d.income, d.expense) for d in result.data] == [
+            (11, {}, {}),
+            (12, {"Flete": 4500.0}, {"Combustible": 1500.0, "uncategorized": 700.0}),
+            (1, {}, {}),
+        ]
+
+    def test_get_management_metrics_includes_the_category_breakdown(self):
+        current = self._metrics_row(2026, 3, "100.00")
+        current.category_breakdown = {"credit": {"amounts": {"Flete": 100.0}, "percentages": {"Flete": 100.0}}}
+        self.mock_repo.get_metrics_by_keys.return_value = {PeriodKey(PeriodType.MONTH, 2026, 3): current}
+
+        result = self.service.get_management_metrics(period=PeriodType.MONTH, year=2026, month=3)
+
+        assert result.category_breakdown.credit.amounts == {"Flete": 100.0}
+        assert result.category_breakdown.debit.amounts == {}
+
     def test_get_transactions_calls_repo_with_bounds_and_pagination(self):
         """Service should compute offset and call repo with start/end, limit/offset, sort params."""
         # Arrange
         start_dt = datetime(2026, 1, 1, 0, 0, 0, tzinfo=UTC)
         end_dt = datetime(2026, 1, 31, 23, 59, 59, tzinfo=UTC)
 
-        self.mock_repo.count_transactions_in_range.return_value = 45
-        self.mock_repo.list_transactions_in_range.return_value = []
+        self.mock_repo.list_transactions_page.return_value = ([], 45)
 
         # Act
         with patch("app.services.balance.period_bounds_utc", return_value=(start_dt, end_dt)) as mock_bounds:
@@ -650,8 +715,8 @@ class TestBalanceService:
         assert key_arg.month == 1
         assert key_arg.week is None
 
-        self.mock_repo.count_transactions_in_range.assert_called_once_with(start_dt=start_dt, end_dt=end_dt, status=None)
-        self.mock_repo.list_transactions_in_range.assert_called_once_with(
+        self.mock_repo.count_transactions_in_range.assert_not_called()
+        self.mock_repo.list_transactions_page.assert_called_once_with(
             start_dt=start_dt,
             end_dt=end_dt,
             limit=10,
@@ -671,8 +736,7 @@ class TestBalanceService:
         start_dt = datetime(2026, 1, 1, 0, 0, 0, tzinfo=UTC)
         end_dt = datetime(2026, 12, 31, 23, 59, 59, tzinfo=UTC)
 
-        self.mock_repo.count_transactions_in_range.return_value = 0
-        self.mock_repo.list_transactions_in_range.return_value = []
+        self.mock_repo.list_transactions_page.return_value = ([], 0)
 
         with patch("app.services.balance.period_bounds_utc", return_value=(start_dt, end_dt)):
             result = self.service.get_transactions(
@@ -704,8 +768,7 @@ class TestBalanceService:
         start_dt = datetime(2026, 1, 1, 0, 0, 0, tzinfo=UTC)
         end_dt = datetime(2026, 1, 31, 23, 59, 59, tzinfo=UTC)
 
-        self.mock_repo.count_transactions_in_range.return_value = total
-        self.mock_repo.list_transactions_in_range.return_value = []
+        self.mock_repo.list_transactions_page.return_value = ([], total)
 
         with patch("app.services.balance.period_bounds_utc", return_value=(start_dt, end_dt)):
             result = self.service.get_transactions(
@@ -730,8 +793,7 @@ class TestBalanceService:
         tx1 = Transaction(reference="TRX-001", amount=100, date=start_dt, type="debit", description="A", payment_method="cash", status="CONFIRMED", category="Otro")
         tx2 = Transaction(reference="TRX-002", amount=200, date=end_dt, type="debit", description="B", payment_method="cash", status="CONFIRMED", category="Otro")
 
-        self.mock_repo.count_transactions_in_range.return_value = 2
-        self.mock_repo.list_transactions_in_range.return_value = [tx1, tx2]
+        self.mock_repo.list_transactions_page.return_value = ([tx1, tx2], 2)
 
         with patch("app.services.balance.period_bounds_utc", return_value=(start_dt, end_dt)):
             result = self.service.get_transactions(
@@ -749,7 +811,7 @@ class TestBalanceService:
         assert result.transactions[0].reference == "TRX-001"
         assert result.transactions[1].reference == "TRX-002"
 
-        self.mock_repo.list_transactions_in_range.assert_called_once_with(
+        self.mock_repo.list_transactions_page.assert_called_once_with(
             start_dt=start_dt,
             end_dt=end_dt,
             limit=10,
@@ -759,6 +821,92 @@ class TestBalanceService:
             status=None,
         )
 
+    def test_get_transactions_cursor_mode_seeks_without_count(self):
+        """With `after` and no total, the service seeks past the cursor and fetches one extra row."""
+        start_dt = datetime(2026, 1, 1, tzinfo=UTC)
+        end_dt = datetime(2026, 1, 31, 23, 59, 59, tzinfo=UTC)
+        rows = [
+            Transaction(reference=f"TRX-{i}", amount=10, date=start_dt, type="debit", description="A", payment_method="cash", status="CONFIRMED")
+            for i in range(3)
+        ]
+        self.mock_repo.list_transactions_in_range.return_value = rows
+        previous = Transaction(reference="TRX-PREV", date=end_dt)
+        after = encode_cursor(previous, TransactionSortBy.DATE, SortOrder.DESC)
+
+        with patch("app.services.balance.period_bounds_utc", return_value=(start_dt, end_dt)):
+            result = self.service.get_transactions(
+                period=PeriodType.MONTH,
+                year=2026,
+                month=1,
+                limit=2,
+                after=after,
+                include_total=False,
+            )
+
+        self.mock_repo.count_transactions_in_range.assert_not_called()
+        self.mock_repo.list_transactions_in_range.assert_called_once_with(
+            start_dt=start_dt,
+            end_dt=end_dt,
+            limit=3,
+            offset=0,
+            sort_by=TransactionSortBy.DATE,
+            sort_order=SortOrder.DESC,
+            status=None,
+            after=TransactionCursor(value=end_dt, reference="TRX-PREV"),
+        )
+        assert [t.reference for t in result.transactions] == ["TRX-0", "TRX-1"]
+        assert result.pagination.total is None
+        assert result.pagination.total_pages is None
+        assert decode_cursor(result.pagination.next_cursor, TransactionSortBy.DATE, SortOrder.DESC).reference == "TRX-1"
+
+    def test_get_transactions_offset_mode_returns_next_cursor_until_last_page(self):
+        start_dt = datetime(2026, 1, 1, tzinfo=UTC)
+        end_dt = datetime(2026, 1, 31, 23, 59, 59, tzinfo=UTC)
+        tx = Transaction(reference="TRX-1", amount=10, date=start_dt, type="debit", description="A", payment_method="cash", status="CONFIRMED")
+        self.mock_repo.list_transactions_page.return_value = ([tx], 2)
+
+        with patch("app.services.balance.period_bounds_utc", return_value=(start_dt, end_dt)):
+            first = self.service.get_transactions(period=PeriodType.MONTH, year=2026, month=1, page=1, limit=1)
+            second = self.service.get_transactions(period=PeriodType.MONTH, year=2026, month=1, page=2, limit=1)
+
+        assert first.pagination.next_cursor is not None
+        assert second.pagination.next_cursor is None
+
+    def test_get_transactions_estimate_total_confirmed_reads_rollup(self):
+        """A CONFIRMED estimate reads the period rollup instead of counting rows."""
+        start_dt = datetime(2026, 1, 1, tzinfo=UTC)
+        end_dt = datetime(2026, 12, 31, 23, 59, 59, tzinfo=UTC)
+        self.mock_repo.list_transactions_in_range.return_value = []
+        self.mock_repo.get_period_metrics.return_value = SimpleNamespace(transaction_count=1234)
+
+        with patch("app.services.balance.period_bounds_utc", return_value=(start_dt, end_dt)):
+            result = self.service.get_transactions(
+                period=PeriodType.YEAR,
+                year=2026,
+                status=TransactionStatus.CONFIRMED,
+                estimate_total=True,
+            )
+
+        self.mock_repo.get_period_metrics.assert_called_once_with(period_type=PeriodType.YEAR, year=2026, month=None, week=None)
+        self.mock_repo.count_transactions_in_range.assert_not_called()
+        self.mock_repo.list_transactions_page.assert_not_called()
+        assert result.pagination.total == 1234
+        assert result.pagination.total_pages == 124
+        assert result.pagination.total_estimated is True
+
+    def test_get_transactions_estimate_total_other_status_uses_planner(self):
+        start_dt = datetime(2026, 1, 1, tzinfo=UTC)
+        end_dt = datetime(2026, 12, 31, 23, 59, 59, tzinfo=UTC)
+        self.mock_repo.list_transactions_in_range.return_value = []
+        self.mock_repo.estimate_transactions_in_range.return_value = 50
+
+        with patch("app.services.balance.period_bounds_utc", return_value=(start_dt, end_dt)):
+            result = self.service.get_transactions(period=PeriodType.YEAR, year=2026, estimate_total=True)
+
+        self.mock_repo.estimate_transactions_in_range.assert_called_once_with(start_dt=start_dt, end_dt=end_dt, status=None)
+        self.mock_repo.get_period_metrics.assert_not_called()
+        assert result.pagination.total == 50
+
     def test_authorize_transaction_owner_confirms(self):
         """Owner can confirm a PENDING transaction."""
         tx = Transaction(reference="REF1", amount=100, type="debit", description="X", payment_method="cash", status="PENDING")
@@ -828,6 +976,45 @@ class TestBalanceService:
         with pytest.raises(TransactionNotFoundException):
             self.service.authorize_transaction("NOEXIST", TransactionStatus.CONFIRMED, Role.OWNER)
 
+    def test_authorize_transactions_reports_each_reference(self):
+        """One lookup and one commit; unknown references fail without blocking the rest."""
+        first = Transaction(reference="REF1", amount=100, type="debit", description="X", payment_method="cash", status="PENDING")
+        second = Transaction(reference="REF2", amount=50, type="credit", description="Y", payment_method="cash", status="PENDING")
+        self.mock_repo.get_by_references.return_value = [second, first]
+
+        result = self.service.authorize_transactions(["REF1", "NOEXIST", "REF2", "REF1"], TransactionStatus.CONFIRMED, Role.OWNER)
+
+        self.mock_repo.get_by_references.assert_called_once_with(["REF1", "NOEXIST", "REF2"])
+        self.mock_repo.update_transactions.assert_called_once_with([first, second])
+        assert [r.reference for r in result.results] == ["REF1", "NOEXIST", "REF2"]
+        assert [r.result for r in result.results] == ["updated", "failed", "updated"]
+        assert result.results[1].error == TransactionNotFoundException("NOEXIST").detail
+        assert (result.updated, result.failed) == (2, 1)
+        assert first.status == second.status == TransactionStatus.CONFIRMED
+
+    def test_authorize_transactions_applies_admin_rules_per_row(self):
+        """Admins may only resubmit REJECTED transactions; others are left untouched."""
+        rejected = Transaction(reference="REF1", amount=100, type="debit", description="X", payment_method="cash", status="REJECTED")
+        pending = Transaction(reference="REF2", amount=50, type="credit", description="Y", payment_method="cash", status="PENDING")
+        self.mock_repo.get_by_references.return_value = [rejected, pending]
+
+        result = self.service.authorize_transactions(["REF1", "REF2"], TransactionStatus.PENDING, Role.ADMIN)
+
+        assert [r.result for r in result.results] == ["updated", "failed"]
+        assert result.results[1].status == TransactionStatus.PENDING
+        assert result.results[1].error == InvalidTransactionStatusTransitionException().detail
+        self.mock_repo.update_transactions.assert_called_once_with([rejected])
+
+    def test_authorize_transactions_nothing_to_update_skips_commit(self):
+        pending = Transaction(reference="REF1", amount=100, type="debit", description="X", payment_method="cash", status="PENDING")
+        self.mock_repo.get_by_references.return_value = [pending]
+
+        result = self.service.authorize_transactions(["REF1"], TransactionStatus.CONFIRMED, Role.ADMIN)
+
+        assert result.failed == 1
+        assert result.results[0].error == TransactionStatusForbiddenException().detail
+        self.mock_repo.update_transactions.assert_not_called()
+
     # get_transactions_count tests
 
     def test_get_transactions_count_defaults_to_current_month(self):
@@ -913,3 +1100,270 @@ class TestBalanceService:
 
             with pytest.raises(RuntimeError, match="DB down"):
                 self.service.get_transactions_count(month=1, year=2026)
+
+    def test_get_range_metrics_queries_previous_range_of_same_length(self):
+        """2026-03-01..2026-03-10 compares against 2026-02-19..2026-02-28."""
+        self.mock_repo.get_range_metrics.return_value = (
+            PeriodRawMetrics(
+                total_income=Decimal("300.00"),
+                total_expense=Decimal("100.00"),
+                transaction_count=3,
+                credit_payment_amounts={"cash": Decimal("300.00")},
+                debit_payment_amounts={"card": Decimal("100.00")},
+            ),
+            PeriodRawMetrics(
+                total_income=Decimal("100.00"),
+                total_expense=Decimal("0.00"),
+                transaction_count=1,
+                credit_payment_amounts={"cash": Decimal("100.00")},
+                debit_payment_amounts={},
+            ),
+        )
+
+        result = self.service.get_range_metrics(start=date(2026, 3, 1), end=date(2026, 3, 10))
+
+        self.mock_repo.get_range_metrics.assert_called_once_with(
+            start=date(2026, 3, 1),
+            end=date(2026, 3, 10),
+            previous_start=date(2026, 2, 19),
+        )
+        assert result.current_period.balance == 200.0
+        assert result.previous_period.balance == 100.0
+        assert result.comparison.balance_change_percent == 100.0
+        assert result.comparison.transaction_change == 2
+
+    def test_get_range_metrics_returns_zero_when_no_rollups(self):
+        self.mock_repo.get_range_metrics.return_value = (
+            PeriodRawMetrics(Decimal("0.00"), Decimal("0.00"), 0, {}, {}),
+            PeriodRawMetrics(Decimal("0.00"), Decimal("0.00"), 0, {}, {}),
+        )
+
+        result = self.service.get_range_metrics(start=date(2026, 1, 1), end=date(2026, 1, 31))
+
+        assert result == BalanceMetricsDetailedResponseSchema()
+
+    def test_resolve_import_status(self):
+        assert self.service.resolve_import_status(False, Role.ADMIN) == TransactionStatus.PENDING
+        assert self.service.resolve_import_status(True, Role.OWNER) == TransactionStatus.CONFIRMED
+
+        with pytest.raises(TransactionStatusForbiddenException):
+            self.service.resolve_import_status(True, Role.ADMIN)
+
+    def test_import_batch_reports_rows_in_order(self):
+        """Invalid rows fail, valid rows get sequential references, existing references are reported."""
+        records = [
+            ImportRecord(row=1, data={"amount": 10, "type": "debit", "description": "A", "payment_method": "cash"}),
+            ImportRecord(row=2, error="Invalid JSON: Expecting value"),
+            ImportRecord(row=3, data={"amount": 20, "type": "debit", "description": "B", "payment_method": "cash"}),
+            ImportRecord(row=4, data={"amount": 30, "type": "debit", "description": "x" * 256, "payment_method": "cash"}),
+        ]
+        self.mock_repo.bulk_create_transactions.side_effect = lambda rows: {rows[0]["reference"]}
+        self.mock_repo.reserve_reference_block.return_value = 7
+
+        with patch("app.utils.reference.reference_sequence", ReferenceSequence(block_size=100)):
+            results = self.service.import_batch(records, TransactionStatus.PENDING)
+
+        rows = self.mock_repo.bulk_create_transactions.call_args.args[0]
+        assert len(rows) == 2
+        assert [r["reference"][12:20] for r in rows] == ["00000700", "00000701"]
+        self.mock_repo.reserve_reference_block.assert_called_once()
+        assert [r.status for r in results] == ["created", "failed", "failed", "failed"]
+        assert results[0].reference == rows[0]["reference"]
+        assert results[1].errors == ["Invalid JSON: Expecting value"]
+        assert "already exists" in results[2].errors[0]
+        assert results[3].errors == ["Description must be 255 characters or fewer"]
+
+    def test_import_batch_db_error_fails_all_rows(self):
+        records = [ImportRecord(row=1, data={"amount": 10, "type": "debit", "description": "A", "payment_method": "cash"})]
+        self.mock_repo.bulk_create_transactions.side_effect = DBOperationError("Error creating transactions in the database")
+        self.mock_repo.reserve_reference_block.return_value = 1
+
+        results = self.service.import_batch(records, TransactionStatus.CONFIRMED)
+
+        assert results[0].status == "failed"
+        assert results[0].errors == ["Error creating transactions in the database"]
+
+    @staticmethod
+    def _metrics_row(year: int, month: int, income: str) -> SimpleNamespace:
+        return SimpleNamespace(
+            period_type="month",
+            year=year,
+            month=month,
+            week=None,
+            balance=Decimal(income),
+            total_income=Decimal(income),
+            total_expense=Decimal("0.00"),
+            transaction_count=1,
+            payment_method_breakdown={},
+            category_breakdown={},
+            weekly_average_income=Decimal("0.00"),
+            weekly_average_expense=Decimal("0.00"),
+            income_expense_ratio=Decimal("0.00"),
+        )
+
+    @pytest.mark.asyncio
+    async def test_get_dashboard_fetches_all_periods_in_one_lookup(self):
+        """Current, previous and trend rows come from one metrics query; count and page from one page query."""
+        self.mock_repo.get_metrics_by_keys.return_value = {
+            PeriodKey("month", 2026, 3): self._metrics_row(2026, 3, "300.00"),
+            PeriodKey("month", 2026, 2): self._metrics_row(2026, 2, "200.00"),
+            PeriodKey("month", 2025, 3): self._metrics_row(2025, 3, "150.00"),
+        }
+        self.mock_repo.list_transactions_page.return_value = ([], 0)
+
+        result = await self.service.get_dashboard(period=PeriodType.MONTH, year=2026, month=3, trend_limit=3)
+
+        self.mock_repo.get_metrics_by_keys.assert_called_once()
+        keys = self.mock_repo.get_metrics_by_keys.call_args.args[0]
+        assert {(k.year, k.month) for k in keys} == {(2026, 1), (2026, 2), (2026, 3), (2025, 3)}
+        self.mock_repo.get_period_metrics.assert_not_called()
+        self.mock_repo.list_transactions_page.assert_called_once()
+        self.mock_repo.count_transactions_in_range.assert_not_called()
+
+        assert result.metrics.current_period.total_income == 300.0
+        assert result.metrics.previous_period.total_income == 200.0
+        assert result.metrics.year_over_year.income_change_percent == 100.0
+        assert [d.total_income for d in result.trend.data] == [0.0, 200.0, 300.0]
+        assert result.transaction_count == 0
+
+    @pytest.mark.asyncio
+    async def test_get_dashboard_looks_up_stored_weeks_without_month(self):
+        """Week rows are stored without a month, so the request month must not reach the lookup keys."""
+        current = self._metrics_row(2026, None, "80.00")
+        current.week = 11
+        previous = self._metrics_row(2026, None, "40.00")
+        previous.week = 10
+        self.mock_repo.get_metrics_by_keys.return_value = {
+            PeriodKey("week", 2026, week=11): current,
+            PeriodKey("week", 2026, week=10): previous,
+        }
+        self.mock_repo.list_transactions_page.return_value = ([], 0)
+
+        result = await self.service.get_dashboard(period=PeriodType.WEEK, year=2026, month=3, week=11, trend_limit=2)
+
+        keys = self.mock_repo.get_metrics_by_keys.call_args.args[0]
+        assert all(k.month is None for k in keys)
+        assert result.metrics.current_period.total_income == 80.0
+        assert result.metrics.previous_period.total_income == 40.0
+        assert [d.total_income for d in result.trend.data] == [40.0, 80.0]
+
+    @pytest.mark.asyncio
+    async def test_get_dashboard_runs_the_page_on_its_own_repository(self):
+        """With a repository scope the page query uses a separate session-bound repository."""
+        page_repo = Mock()
+        page_repo.list_transactions_page.return_value = ([], 4)
+        scope = Mock()
+        scope.return_value.__enter__ = Mock(return_value=page_repo)
+        scope.return_value.__exit__ = Mock(return_value=False)
+        self.mock_repo.get_metrics_by_keys.return_value = {}
+        service = BalanceService(self.mock_repo, repository_scope=scope)
+
+        result = await service.get_dashboard(
+            period=PeriodType.YEAR,
+            year=2026,
+            trend_limit=2,
+            limit=5,
+            status=TransactionStatus.PENDING,
+        )
+
+        self.mock_repo.list_transactions_page.assert_not_called()
+        page_repo.list_transactions_page.assert_called_once()
+        assert page_repo.list_transactions_page.call_args.kwargs["status"] == TransactionStatus.PENDING
+        scope.return_value.__exit__.assert_called_once()
+        assert result.metrics == BalanceMetricsDetailedResponseSchema(year_over_year=ComparisonSchema())
+        assert result.transaction_count == 4
+        assert result.transactions.pagination.limit == 5
+
+    def test_cached_metrics_are_served_without_querying_again(self):
+        """A second request for the same period comes from the cache."""
+        self.mock_repo.get_metrics_by_keys.return_value = {}
+        service = BalanceService(self.mock_repo, cache=MetricsCache(LocalVersionStore()))
+
+        first = service.get_management_metrics(period="year", year=2026)
+        second = service.get_management_metrics(period="year", year=2026)
+
+        assert second is first
+        self.mock_repo.get_metrics_by_keys.assert_called_once()
+
+    def test_cached_metrics_are_recomputed_after_their_period_is_invalidated(self):
+        """Bumping the previous period also invalidates the response that compares against it."""
+        self.mock_repo.get_metrics_by_keys.return_value = {}
+        cache = MetricsCache(LocalVersionStore())
+        service = BalanceService(self.mock_repo, cache=cache)
+
+        service.get_management_metrics(period="year", year=2026)
+        service.get_metrics(month=3, year=2026)
+        cache.invalidate([PeriodKey("year", 2025)])
+        service.get_management_metrics(period="year", year=2026)
+        service.get_metrics(month=3, year=2026)
+
+        assert self.mock_repo.get_metrics_by_keys.call_count == 2
+        self.mock_repo.get_month_year_metrics.assert_called_once()
+        assert cache.stats().hits == 1
+
+    def test_cached_trend_is_keyed_by_its_periods(self):
+        """Trends of different lengths are cached separately."""
+        self.mock_repo.get_metrics_for_keys.return_value = []
+        service = BalanceService(self.mock_repo, cache=MetricsCache(LocalVersionStore()))
+
+        service.get_historical(period=PeriodType.MONTH, limit=3)
+        service.get_historical(period=PeriodType.MONTH, limit=3)
+        service.get_historical(period=PeriodType.MONTH, limit=6)
+
+        assert self.mock_repo.get_metrics_for_keys.call_count == 2
+
+    def test_metrics_etag_changes_when_a_row_is_rewritten(self):
+        """The validator is the latest updated_at and row count of the requested periods."""
+        self.mock_repo.get_metrics_validator.return_value = (None, 0)
+        before = self.service.get_management_metrics_etag(period="year", year=2026)
+        self.mock_repo.get_metrics_validator.return_value = (datetime(2026, 3, 1, tzinfo=UTC), 1)
+        after = self.service.get_management_metrics_etag(period="year", year=2026)
+
+        assert before != after
+        keys = self.mock_repo.get_metrics_validator.call_args.args[0]
+        assert set(keys) == {PeriodKey("year", 2026), PeriodKey("year", 2025)}
+
+    def test_metrics_etag_queries_the_validator_every_time_with_a_local_store(self):
+        """Another process may have rewritten the rows without this process seeing the bump."""
+        self.mock_repo.get_metrics_validator.return_value = (None, 0)
+        service = BalanceService(self.mock_repo, cache=MetricsCache(LocalVersionStore()))
+
+        service.get_management_metrics_etag(period="year", year=2026)
+        service.get_management_metrics_etag(period="year", year=2026)
+
+        assert self.mock_repo.get_metrics_validator.call_count == 2
+
+    def test_metrics_etag_caches_the_validator_with_a_shared_store(self):
+        self.mock_repo.get_metrics_validator.return_value = (None, 0)
+        versions = LocalVersionStore()
+        versions.shared = True
+        service = BalanceService(self.mock_repo, cache=MetricsCache(versions))
+
+        service.get_management_metrics_etag(period="year", year=2026)
+        service.get_management_metrics_etag(period="year", year=2026)
+
+        self.mock_repo.get_metrics_validator.assert_called_once()
+
+    def test_metrics_etag_differs_per_endpoint(self):
+        self.mock_repo.get_metrics_validator.return_value = (None, 0)
+
+        assert self.service.get_metrics_etag(month=1, year=2026) != self.service.get_management_metrics_etag(
+            period="month",
+            year=2026,
+            month=1,
+        )
+
+    def test_get_management_metrics_compares_with_the_same_period_last_year(self):
+        """Month metrics carry a year-over-year comparison from the same single lookup."""
+        self.mock_repo.get_metrics_by_keys.return_value = {
+            PeriodKey("month", 2026, 3): self._metrics_row(2026, 3, "300.00"),
+            PeriodKey("month", 2025, 3): self._metrics_row(2025, 3, "200.00"),
+        }
+
+        result = self.service.get_management_metrics(period=PeriodType.MONTH, year=2026, month=3)
+
+        keys = self.mock_repo.get_metrics_by_keys.call_args.args[0]
+        assert keys == [PeriodKey("month", 2026, 3), PeriodKey("month", 2026, 2), PeriodKey("month", 2025, 3)]
+        assert result.previous_period.total_income == 0.0
+        assert result.year_over_year.income_change_percent == 50.0
+        assert result.year_over_year.transaction_change == 0
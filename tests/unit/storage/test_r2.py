@@ -1,17 +1,28 @@
 from unittest.mock import MagicMock, patch
 
+import pytest
+
 from app.storage.r2 import (
     generate_document_read_url,
     generate_document_upload_url,
+    get_client,
     get_image_public_url,
     upload_image,
 )
 
 
+@pytest.fixture(autouse=True)
+def fresh_client():
+    """Build a new client per test, so each one sees its own patched `boto3.client`."""
+    get_client.cache_clear()
+    yield
+    get_client.cache_clear()
+
+
 class TestR2Storage:
     """Unit tests for Cloudflare R2 storage client."""
 
-    @patch("app.storage.r2.boto3.client")
+    @patch("boto3.client")
     def test_generate_document_upload_url(self, mock_boto_client):
         mock_client = MagicMock()
         mock_boto_client.return_value = mock_client
@@ -30,7 +41,7 @@ class TestR2Storage:
         )
         assert url == "https://r2.example.com/presigned-put"
 
-    @patch("app.storage.r2.boto3.client")
+    @patch("boto3.client")
     def test_generate_document_upload_url_custom_expiry(self, mock_boto_client):
         mock_client = MagicMock()
         mock_boto_client.return_value = mock_client
@@ -41,7 +52,7 @@ class TestR2Storage:
         call_kwargs = mock_client.generate_presigned_url.call_args
         assert call_kwargs[1]["ExpiresIn"] == 7200
 
-    @patch("app.storage.r2.boto3.client")
+    @patch("boto3.client")
     def test_generate_document_read_url(self, mock_boto_client):
         mock_client = MagicMock()
         mock_boto_client.return_value = mock_client
@@ -59,7 +70,7 @@ class TestR2Storage:
         )
         assert url == "https://r2.example.com/presigned-get"
 
-    @patch("app.storage.r2.boto3.client")
+    @patch("boto3.client")
     def test_generate_document_read_url_custom_expiry(self, mock_boto_client):
         mock_client = MagicMock()
         mock_boto_client.return_value = mock_client
@@ -87,7 +98,7 @@ class TestR2Storage:
         assert url == "https://pub-abc123.r2.dev/drivers/123/photo.jpg"
 
     @patch("app.storage.r2.R2")
-    @patch("app.storage.r2.boto3.client")
+    @patch("boto3.client")
     def test_upload_image_returns_public_url(self, mock_boto_client, mock_r2):
         mock_r2.PUBLIC_URL = "https://pub-abc123.r2.dev"
         mock_r2.IMAGES_BUCKET = "pegazzo-images"
@@ -0,0 +1,66 @@
+import pytest
+
+from app.enum.balance import ImportFormat
+from app.errors.balance import UnsupportedImportFormatException
+from app.utils.bulk_import import chunked, import_format, iter_lines, iter_records
+
+
+async def _aiter(items):
+    for item in items:
+        yield item
+
+
+async def _collect(items):
+    return [item async for item in items]
+
+
+def test_import_format_from_content_type():
+    assert import_format("application/x-ndjson") == ImportFormat.NDJSON
+    assert import_format("text/csv; charset=utf-8") == ImportFormat.CSV
+
+    with pytest.raises(UnsupportedImportFormatException):
+        import_format("application/json")
+
+    with pytest.raises(UnsupportedImportFormatException):
+        import_format(None)
+
+
+@pytest.mark.asyncio
+async def test_iter_lines_joins_lines_split_across_chunks():
+    encoded = '{"c": "ñ"}'.encode()
+    chunks = [b'{"a": 1}\r\n{"b"', b": 2}\n", encoded[:-3], encoded[-3:]]
+
+    lines = await _collect(iter_lines(_aiter(chunks)))
+
+    assert lines == ['{"a": 1}', '{"b": 2}', '{"c": "ñ"}']
+
+
+@pytest.mark.asyncio
+async def test_iter_records_ndjson_reports_bad_lines():
+    lines = ['{"amount": 10}', "", "not json", "[1, 2]"]
+
+    records = await _collect(iter_records(_aiter(lines), ImportFormat.NDJSON))
+
+    assert [r.row for r in records] == [1, 2, 3]
+    assert records[0].data == {"amount": 10}
+    assert records[1].error.startswith("Invalid JSON")
+    assert records[2].error == "Each line must be a JSON object"
+
+
+@pytest.mark.asyncio
+async def test_iter_records_csv_uses_header_and_drops_empty_cells():
+    lines = ["amount,type,category", '10.5,debit,"Gas, diesel"', "20,credit,", "30"]
+
+    records = await _collect(iter_records(_aiter(lines), ImportFormat.CSV))
+
+    assert records[0].data == {"amount": "10.5", "type": "debit", "category": "Gas, diesel"}
+    assert records[1].data == {"amount": "20", "type": "credit"}
+    assert records[2].row == 3
+    assert records[2].error == "Expected 3 columns, got 1"
+
+
+@pytest.mark.asyncio
+async def test_chunked_groups_items():
+    chunks = await _collect(chunked(_aiter(range(5)), 2))
+
+    assert chunks == [[0, 1], [2, 3], [4]]
@@ -0,0 +1,145 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from app.schemas.dto.periods import PeriodKey
+from app.utils.cache import (
+    ALL_PERIODS,
+    CHANGED_PERIODS_KEY,
+    LocalVersionStore,
+    MetricsCache,
+    RedisVersionStore,
+    record_changed_periods,
+    version_name,
+)
+
+MARCH = PeriodKey("month", 2026, 3)
+APRIL = PeriodKey("month", 2026, 4)
+
+
+class Counter:
+    """Compute callable counting its calls."""
+
+    def __init__(self, value="value"):
+        self.calls = 0
+        self.value = value
+
+    def __call__(self):
+        self.calls += 1
+        return self.value
+
+
+@pytest.fixture
+def cache():
+    return MetricsCache(LocalVersionStore(), max_entries=2)
+
+
+def test_get_or_set_serves_hits_without_computing_again(cache):
+    compute = Counter()
+
+    assert cache.get_or_set("metrics", [MARCH], (), compute) == "value"
+    assert cache.get_or_set("metrics", [MARCH], (), compute) == "value"
+
+    assert compute.calls == 1
+    stats = cache.stats()
+    assert (stats.hits, stats.misses, stats.entries) == (1, 1, 1)
+
+
+def test_entries_are_keyed_by_endpoint_periods_and_params(cache):
+    compute = Counter()
+
+    cache.get_or_set("metrics", [MARCH], (), compute)
+    cache.get_or_set("metrics/trend", [MARCH], (), compute)
+    cache.get_or_set("metrics", [MARCH], ("limit", 3), compute)
+
+    assert compute.calls == 3
+
+
+def test_invalidate_only_stales_entries_of_bumped_periods():
+    cache = MetricsCache(LocalVersionStore(), max_entries=10)
+    march, april = Counter(), Counter()
+    cache.get_or_set("metrics", [MARCH], (), march)
+    cache.get_or_set("metrics", [APRIL], (), april)
+
+    cache.invalidate([MARCH])
+    cache.get_or_set("metrics", [MARCH], (), march)
+    cache.get_or_set("metrics", [APRIL], (), april)
+
+    assert (march.calls, april.calls) == (2, 1)
+    assert cache.stats().invalidations == 1
+
+
+def test_invalidating_all_periods_stales_every_entry(cache):
+    compute = Counter()
+    cache.get_or_set("metrics", [MARCH], (), compute)
+
+    cache.invalidate([ALL_PERIODS])
+    cache.get_or_set("metrics", [MARCH], (), compute)
+
+    assert compute.calls == 2
+
+
+def test_bump_during_compute_leaves_the_stored_entry_stale(cache):
+    def compute():
+        cache.invalidate([MARCH])
+        return "outdated"
+
+    cache.get_or_set("metrics", [MARCH], (), compute)
+    fresh = Counter("fresh")
+
+    assert cache.get_or_set("metrics", [MARCH], (), fresh) == "fresh"
+    assert fresh.calls == 1
+
+
+def test_least_recently_used_entry_is_evicted(cache):
+    compute = Counter()
+    cache.get_or_set("metrics", [MARCH], (), compute)
+    cache.get_or_set("metrics", [APRIL], (), compute)
+    cache.get_or_set("metrics", [MARCH], (), compute)
+
+    cache.get_or_set("metrics/trend", [MARCH], (), compute)
+    cache.get_or_set("metrics", [MARCH], (), compute)
+    cache.get_or_set("metrics", [APRIL], (), compute)
+
+    assert compute.calls == 4
+    assert cache.stats().entries == 2
+
+
+def test_clear_drops_entries_and_counters(cache):
+    cache.get_or_set("metrics", [MARCH], (), Counter())
+    cache.clear()
+
+    stats = cache.stats()
+    assert (stats.entries, stats.hits, stats.misses) == (0, 0, 0)
+
+
+def test_version_name_is_unique_per_period():
+    keys = [MARCH, PeriodKey("week", 2026, week=3), PeriodKey("year", 2026), ALL_PERIODS]
+    assert len({version_name(k) for k in keys}) == len(keys)
+
+
+def test_record_changed_periods_accumulates_in_session_info():
+    info = {}
+    record_changed_periods(info, [MARCH])
+    record_changed_periods(info, [APRIL, MARCH])
+
+    assert info[CHANGED_PERIODS_KEY] == {MARCH, APRIL}
+
+
+def test_redis_version_store_requires_the_redis_package(monkeypatch):
+    monkeypatch.setitem(sys.modules, "redis", None)
+
+    with pytest.raises(RuntimeError, match="redis"):
+        RedisVersionStore("redis://localhost:6379/0")
+
+
+@pytest.mark.parametrize(("backend", "enabled"), [("local", "False"), ("redis", "True")])
+def test_cache_is_on_by_default_only_with_a_shared_version_store(backend, enabled):
+    env = {k: v for k, v in os.environ.items() if k != "CACHE_ENABLED"} | {"CACHE_BACKEND": backend}
+    code = "from app.config import CACHE; print(CACHE.ENABLED)"
+
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True, env=env)
+
+    assert result.stdout.strip() == enabled
@@ -1,8 +1,9 @@
 from __future__ import annotations
 
+from datetime import UTC, date, datetime, timedelta, timezone
 from decimal import Decimal
 
-from app.utils.dates import count_iso_weeks_in_month, iso_weeks_in_year
+from app.utils.dates import count_iso_weeks_in_month, count_iso_weeks_in_range, day_bounds_utc, iso_weeks_in_year, utc_date
 from app.utils.decimal import calculate_percentage, round_to_2_decimals
 
 
@@ -16,3 +17,24 @@ def test_decimal_utils_basic():
     assert round_to_2_decimals("10") == Decimal("10.00")
     assert calculate_percentage(Decimal("1.00"), Decimal("0.00")) == Decimal("0.00")
     assert calculate_percentage(Decimal("1.00"), Decimal("4.00")) == Decimal("25.00")
+
+
+def test_utc_date_converts_aware_datetimes():
+    local = datetime(2026, 3, 5, 20, 0, tzinfo=timezone(timedelta(hours=-6)))
+
+    assert utc_date(local) == date(2026, 3, 6)
+    assert utc_date(datetime(2026, 3, 5, 20, 0)) == date(2026, 3, 5)  # noqa: DTZ001
+
+
+def test_day_bounds_utc_is_half_open():
+    start, end = day_bounds_utc(date(2026, 12, 31))
+
+    assert start == datetime(2026, 12, 31, tzinfo=UTC)
+    assert end == datetime(2027, 1, 1, tzinfo=UTC)
+
+
+def test_count_iso_weeks_in_range():
+    assert count_iso_weeks_in_range(date(2026, 3, 4), date(2026, 3, 4)) == 1
+    # Sunday to Monday spans two ISO weeks
+    assert count_iso_weeks_in_range(date(2026, 3, 8), date(2026, 3, 9)) == 2
+    assert count_iso_weeks_in_range(date(2026, 1, 1), date(2026, 12, 31)) == 53
@@ -0,0 +1,32 @@
+import pytest
+
+from app.utils.etag import build_etag, etag_matches
+
+
+def test_build_etag_is_quoted_and_stable():
+    etag = build_etag("metrics", 2026, None)
+
+    assert etag == build_etag("metrics", 2026, None)
+    assert etag.startswith('"')
+    assert etag.endswith('"')
+
+
+def test_build_etag_changes_with_any_part():
+    assert build_etag("metrics", 2026, 1) != build_etag("metrics", 2026, 2)
+    assert build_etag("metrics", 2026) != build_etag("metrics/trend", 2026)
+
+
+@pytest.mark.parametrize(
+    ("header", "expected"),
+    [
+        (None, False),
+        ("", False),
+        ('"abc"', True),
+        ('W/"abc"', True),
+        ('"xyz", "abc"', True),
+        ("*", True),
+        ('"xyz"', False),
+    ],
+)
+def test_etag_matches(header, expected):
+    assert etag_matches(header, '"abc"') is expected
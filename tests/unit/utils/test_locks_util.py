@@ -0,0 +1,9 @@
+from app.utils.locks import advisory_lock_key
+
+
+def test_advisory_lock_key_is_stable_signed_bigint():
+    key = advisory_lock_key("transaction_metrics", "month", 2026, 3, None)
+
+    assert key == advisory_lock_key("transaction_metrics", "month", 2026, 3, None)
+    assert key != advisory_lock_key("transaction_metrics", "month", 2026, 4, None)
+    assert -(2**63) <= key < 2**63
@@ -0,0 +1,47 @@
+from datetime import UTC, datetime
+from decimal import Decimal
+
+import pytest
+
+from app.enum.balance import SortOrder, TransactionSortBy
+from app.errors.balance import InvalidCursorException
+from app.models.balance import Transaction
+from app.utils.pagination import decode_cursor, encode_cursor
+
+
+@pytest.fixture
+def transaction():
+    return Transaction(reference="REF-1", amount=Decimal("12.50"), date=datetime(2026, 1, 15, 12, 30, tzinfo=UTC))
+
+
+@pytest.mark.parametrize(
+    ("sort_by", "expected"),
+    [
+        (TransactionSortBy.DATE, datetime(2026, 1, 15, 12, 30, tzinfo=UTC)),
+        (TransactionSortBy.AMOUNT, Decimal("12.50")),
+        (TransactionSortBy.REFERENCE, "REF-1"),
+    ],
+)
+def test_cursor_round_trip(transaction, sort_by, expected):
+    token = encode_cursor(transaction, sort_by, SortOrder.DESC)
+
+    cursor = decode_cursor(token, sort_by, SortOrder.DESC)
+
+    assert cursor.value == expected
+    assert cursor.reference == "REF-1"
+    assert "=" not in token
+
+
+def test_cursor_for_another_sort_is_rejected(transaction):
+    token = encode_cursor(transaction, TransactionSortBy.DATE, SortOrder.DESC)
+
+    with pytest.raises(InvalidCursorException):
+        decode_cursor(token, TransactionSortBy.AMOUNT, SortOrder.DESC)
+    with pytest.raises(InvalidCursorException):
+        decode_cursor(token, TransactionSortBy.DATE, SortOrder.ASC)
+
+
+@pytest.mark.parametrize("token", ["not-base64!", "bm90IGpzb24", "eyJzIjoiZGF0ZSJ9"])
+def test_malformed_cursor_is_rejected(token):
+    with pytest.raises(InvalidCursorException):
+        decode_cursor(token, TransactionSortBy.DATE, SortOrder.DESC)
@@ -1,15 +1,20 @@
 from datetime import UTC, date, datetime, timedelta
 from decimal import Decimal
+from types import SimpleNamespace
 
 import pytest
 
 from app.errors.transaction_metrics import TransactionMetricsPeriodError
-from app.schemas.dto.periods import PeriodKey
+from app.schemas.dto.periods import CarPeriodKey, PeriodKey, TransactionSnapshot
 from app.utils.metrics import percent_change
 from app.utils.periods import (
+    build_period_deltas,
+    category_breakdown_schemas,
+    get_affected_car_periods,
     get_period_date_range,
     period_bounds_utc,
     previous_period_key,
+    same_period_last_year,
     weeks_for_period,
 )
 
@@ -67,6 +72,23 @@ class TestPeriodsUtils:
         with pytest.raises(TransactionMetricsPeriodError):
             previous_period_key(key)
 
+    @pytest.mark.parametrize(
+        ("key", "expected"),
+        [
+            (PeriodKey("year", 2026), PeriodKey("year", 2025)),
+            (PeriodKey("month", 2026, 1), PeriodKey("month", 2025, 1)),
+            (PeriodKey("week", 2026, week=10), PeriodKey("week", 2025, week=10)),
+            (PeriodKey("week", 2026, week=53), PeriodKey("week", 2025, week=52)),
+            (PeriodKey("week", 2021, week=52), PeriodKey("week", 2020, week=52)),
+        ],
+    )
+    def test_same_period_last_year(self, key, expected):
+        assert same_period_last_year(key) == expected
+
+    def test_same_period_last_year_invalid_period_type_raises(self):
+        with pytest.raises(TransactionMetricsPeriodError):
+            same_period_last_year(PeriodKey(period_type="INVALID", year=2026))
+
     def test_percent_change_previous_zero(self):
         assert percent_change(current=10, previous=0) == Decimal("0.00")
 
@@ -166,3 +188,70 @@ class TestPeriodsUtils:
         key = PeriodKey(period_type="INVALID", year=2026)
         with pytest.raises(TransactionMetricsPeriodError):
             period_bounds_utc(key)
+
+    def test_build_period_deltas_signs_removed_and_added_snapshots(self):
+        when = datetime(2026, 3, 5, 12, 0, tzinfo=UTC)
+        removed = [TransactionSnapshot(when, "credit", "cash", Decimal("100.00"), "CONFIRMED")]
+        added = [TransactionSnapshot(when, "debit", "cash", Decimal("30.00"), "CONFIRMED")]
+
+        deltas = build_period_deltas(removed, added)
+
+        assert set(deltas) == {
+            PeriodKey("week", 2026, None, 10),
+            PeriodKey("month", 2026, 3, None),
+            PeriodKey("year", 2026, None, None),
+        }
+        month = deltas[PeriodKey("month", 2026, 3, None)]
+        assert month.total_income == Decimal("-100.00")
+        assert month.total_expense == Decimal("30.00")
+        assert month.transaction_count == 0
+        assert month.credit_payment_amounts == {"cash": Decimal("-100.00")}
+        assert month.debit_payment_amounts == {"cash": Decimal("30.00")}
+
+    def test_build_period_deltas_date_move_touches_both_periods(self):
+        old = TransactionSnapshot(datetime(2025, 12, 31, tzinfo=UTC), "credit", "cash", Decimal("10.00"), "CONFIRMED")
+        new = TransactionSnapshot(datetime(2026, 1, 2, tzinfo=UTC), "credit", "cash", Decimal("10.00"), "CONFIRMED")
+
+        deltas = build_period_deltas([old], [new])
+
+        assert deltas[PeriodKey("year", 2025, None, None)].total_income == Decimal("-10.00")
+        assert deltas[PeriodKey("year", 2026, None, None)].total_income == Decimal("10.00")
+        # Both dates fall in ISO week 1 of 2026, so the week nets to zero
+        assert deltas[PeriodKey("week", 2026, None, 1)].transaction_count == 0
+
+    def test_get_affected_car_periods_covers_old_and_new_car(self):
+        when = datetime(2026, 3, 5, 12, 0, tzinfo=UTC)
+        old = TransactionSnapshot(when, "debit", "cash", Decimal("40.00"), "CONFIRMED", car_id="CAR-1")
+        new = TransactionSnapshot(when, "debit", "cash", Decimal("40.00"), "CONFIRMED", car_id="CAR-2")
+        no_car = TransactionSnapshot(when, "credit", "cash", Decimal("10.00"), "CONFIRMED")
+
+        keys = get_affected_car_periods([old, new, no_car])
+
+        assert len(keys) == 6
+        assert CarPeriodKey("CAR-2", PeriodKey("week", 2026, None, 10)) in keys
+        assert {k.car_id for k in keys} == {"CAR-1", "CAR-2"}
+
+    def test_build_period_deltas_recategorization_moves_the_amount_between_categories(self):
+        when = datetime(2026, 3, 5, 12, 0, tzinfo=UTC)
+        old = TransactionSnapshot(when, "debit", "cash", Decimal("40.00"), "CONFIRMED", None)
+        new = TransactionSnapshot(when, "debit", "cash", Decimal("40.00"), "CONFIRMED", "Combustible")
+
+        month = build_period_deltas([old], [new])[PeriodKey("month", 2026, 3, None)]
+
+        assert month.total_expense == Decimal("0.00")
+        assert month.debit_payment_amounts == {}
+        assert month.debit_category_amounts == {"uncategorized": Decimal("-40.00"), "Combustible": Decimal("40.00")}
+
+    def test_category_breakdown_schemas_defaults_to_empty(self):
+        row = SimpleNamespace(
+            category_breakdown={"debit": {"amounts": {"Combustible": 40.0}, "percentages": {"Combustible": 100.0}}},
+        )
+
+        breakdown = category_breakdown_schemas(row)
+
+        assert breakdown.debit.amounts == {"Combustible": 40.0}
+        assert breakdown.credit.amounts == {}
+        assert category_breakdown_schemas(None).model_dump() == {
+            "credit": {"amounts": {}, "percentages": {}},
+            "debit": {"amounts": {}, "percentages": {}},
+        }
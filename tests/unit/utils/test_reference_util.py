@@ -1,9 +1,16 @@
 from datetime import UTC, datetime
-from unittest.mock import patch
+from unittest.mock import MagicMock, patch
 
 import pytest
 
-from app.utils.reference import PAYMENT_MAP, TYPE_MAP, calculate_mod11, generate_reference
+from app.utils.reference import (
+    PAYMENT_MAP,
+    TYPE_MAP,
+    ReferenceSequence,
+    calculate_mod11,
+    generate_reference,
+    generate_references,
+)
 
 
 def test_calculate_mod11_basic():
@@ -16,6 +23,18 @@ def test_calculate_mod11_returns_x_when_10(value):
     assert calculate_mod11(value) == "X"
 
 
+def _blocks(*blocks):
+    """Return a reserve_block callable that hands out the given block numbers in order."""
+    return iter(blocks).__next__
+
+
+@pytest.fixture(autouse=True)
+def fresh_sequence():
+    """Isolate the module-level sequence between tests."""
+    with patch("app.utils.reference.reference_sequence", ReferenceSequence(block_size=10)) as sequence:
+        yield sequence
+
+
 def test_generate_reference_structure():
     """Test that generated reference has correct structure and components."""
 
@@ -24,14 +43,15 @@ def test_generate_reference_structure():
     with patch("app.utils.reference.datetime") as mock_datetime:
         mock_datetime.now.return_value = fake_now
 
-        reference = generate_reference("debit", "cash")
+        reference = generate_reference("debit", "cash", _blocks(3))
 
-    assert reference.startswith("123456")
-    assert reference[6] == TYPE_MAP["debit"]
-    assert reference[7:9] == PAYMENT_MAP["cash"]
+    assert reference.startswith("250101123456")
+    assert reference[12:20] == "00000030"
+    assert reference[20] == TYPE_MAP["debit"]
+    assert reference[21:23] == PAYMENT_MAP["cash"]
 
     dv = reference[-1]
-    assert len(reference) == 10
+    assert len(reference) == 24
 
     base = reference[:-1]
     assert dv == calculate_mod11(base)
@@ -45,27 +65,63 @@ def test_generate_reference_different_maps():
     with patch("app.utils.reference.datetime") as mock_datetime:
         mock_datetime.now.return_value = fake_now
 
-        reference = generate_reference("credit", "pegazzo_transfer")
+        reference = generate_reference("credit", "pegazzo_transfer", _blocks(0))
 
-    assert reference.startswith("100030")
-    assert reference[6] == TYPE_MAP["credit"]
-    assert reference[7:9] == PAYMENT_MAP["pegazzo_transfer"]
+    assert reference.startswith("250101100030")
+    assert reference[20] == TYPE_MAP["credit"]
+    assert reference[21:23] == PAYMENT_MAP["pegazzo_transfer"]
     assert reference[-1] == calculate_mod11(reference[:-1])
 
 
 def test_generate_reference_invalid_type():
     """Should raise KeyError if type is not found in TYPE_MAP."""
-    with patch("app.utils.reference.datetime") as mock_datetime:
-        mock_datetime.now.return_value = datetime.now(UTC)
-
-        with pytest.raises(KeyError):
-            generate_reference("not_valid", "cash")
+    with pytest.raises(KeyError):
+        generate_reference("not_valid", "cash", _blocks(0))
 
 
 def test_generate_reference_invalid_payment_method():
     """Should raise KeyError if payment method not in PAYMENT_MAP."""
+    with pytest.raises(KeyError):
+        generate_reference("debit", "not_valid", _blocks(0))
+
+
+def test_generate_references_same_second_do_not_collide():
+    """References generated in the same second get consecutive sequence numbers."""
+    fixed_time = datetime(2025, 1, 1, 12, 34, 56, tzinfo=UTC)
+
     with patch("app.utils.reference.datetime") as mock_datetime:
-        mock_datetime.now.return_value = datetime.now(UTC)
+        mock_datetime.now.return_value = fixed_time
+        references = generate_references([("debit", "cash")] * 3, _blocks(0))
+
+    assert [r[12:20] for r in references] == ["00000000", "00000001", "00000002"]
+    assert len(set(references)) == 3
+    assert all(r[-1] == calculate_mod11(r[:-1]) for r in references)
+
+
+def test_generate_references_sort_by_time():
+    """A later second sorts after an earlier one regardless of the sequence number."""
+    with patch("app.utils.reference.datetime") as mock_datetime:
+        mock_datetime.now.return_value = datetime(2025, 1, 1, 12, 0, 0, tzinfo=UTC)
+        earlier = generate_reference("debit", "cash", _blocks(9))
+        mock_datetime.now.return_value = datetime(2025, 1, 1, 12, 0, 1, tzinfo=UTC)
+        later = generate_reference("debit", "cash", _blocks(0))
+
+    assert earlier < later
+
+
+def test_reference_sequence_reserves_a_new_block_when_exhausted():
+    """Numbers come from the current block until it runs out, then from the next reserved one."""
+    sequence = ReferenceSequence(block_size=3)
+    reserve = MagicMock(side_effect=[5, 8])
+
+    assert sequence.take(2, reserve) == [15, 16]
+    assert sequence.take(3, reserve) == [17, 24, 25]
+    assert reserve.call_count == 2
+
+
+def test_reference_sequence_empty_request_does_not_reserve():
+    """Asking for zero numbers never touches the database."""
+    reserve = MagicMock()
 
-        with pytest.raises(KeyError):
-            generate_reference("debit", "not_valid")
+    assert ReferenceSequence(block_size=3).take(0, reserve) == []
+    reserve.assert_not_called()